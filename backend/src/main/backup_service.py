@@ -20,6 +20,7 @@ from pathlib import Path
 import hashlib
 
 from storage_config import storage
+from services.log_store import get_log_store
 
 logger = logging.getLogger(__name__)
 
@@ -37,14 +38,8 @@ def _sync_backup_to_s3(local_path: str, backup_filename: str):
     if not bucket:
         return
     try:
-        import boto3
-        access_key = os.getenv("AWS_ACCESS_KEY_ID", "")
-        secret_key = os.getenv("AWS_SECRET_ACCESS_KEY", "")
-        region = os.getenv("S3_REGION", "us-east-1")
-        if access_key and secret_key:
-            s3 = boto3.client("s3", aws_access_key_id=access_key, aws_secret_access_key=secret_key, region_name=region)
-        else:
-            s3 = boto3.client("s3", region_name=region)
+        from services.s3_client import get_s3_client
+        s3 = get_s3_client()
         s3_key = f"backups/{backup_filename}"
         s3.upload_file(local_path, bucket, s3_key)
         logger.info(f"☁️  Backup synced to s3://{bucket}/{s3_key}")
@@ -71,26 +66,24 @@ def save_backup_history(history: List[Dict]):
     storage.save("backup_history", {"backups": history})
 
 
+def _activity_log():
+    """Segmented activity log (see services/log_store.py); last 500 entries kept"""
+    return get_log_store(
+        "activity_logs",
+        max_entries=500,
+        id_field=None,
+        legacy=lambda: storage.load("activity_logs")
+    )
+
+
 def get_activity_logs() -> List[Dict]:
     """Get activity audit logs"""
-    try:
-        logs_data = storage.load("activity_logs")
-        if logs_data is None:
-            return []
-        return logs_data.get("logs", [])
-    except FileNotFoundError:
-        return []
+    return _activity_log().entries()
 
 
 def save_activity_log(log_entry: Dict):
     """Save activity log entry"""
-    logs = get_activity_logs()
-    logs.insert(0, log_entry)
-    
-    # Keep only last 500 logs
-    logs = logs[:500]
-    
-    storage.save("activity_logs", {"logs": logs})
+    _activity_log().append(log_entry)
 
 
 def get_next_backup_id() -> int:
@@ -12,6 +12,7 @@ This service manages scheduled automation runs:
 """
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import logging
@@ -22,11 +23,13 @@ import pytz
 # Import storage
 sys.path.insert(0, os.path.dirname(__file__))
 from storage_config import storage
+from services.log_store import get_execution_log_store
 
 # Import services for automation
 from services.database_service import DatabaseService
 from services.ranking_engine import RankingEngine
 from services.output_service import get_output_service
+from services.ranking_state import RankingStateStore, is_incremental_ranking_enabled
 from rules_service import apply_rules
 from models.color import ColorRaw
 from manual_upload_service import get_buffered_files, process_buffered_file
@@ -42,6 +45,11 @@ except Exception:
     logger.warning(f"Invalid CRON_TIMEZONE '{_tz_name}', falling back to UTC")
     TIMEZONE = pytz.utc
 
+# Pipeline mode for automated runs (RUN_PIPELINE_MODE in .env):
+#   objects  – ColorRaw/ColorProcessed models between stages (default)
+#   columnar – one DataFrame flows fetch → rules → ranking → output
+PIPELINE_MODE = "columnar" if os.getenv("RUN_PIPELINE_MODE", "objects").strip().lower() == "columnar" else "objects"
+
 # Global scheduler instance with timezone
 scheduler = BackgroundScheduler(timezone=TIMEZONE)
 scheduler.start()
@@ -86,47 +94,25 @@ def get_next_job_id() -> int:
 
 
 def get_execution_logs() -> List[Dict]:
-    """Get execution history"""
-    try:
-        logs_data = storage.load("cron_logs")
-        if logs_data is None:
-            return []
-        return logs_data.get("logs", [])
-    except FileNotFoundError:
-        return []
+    """Get execution history (most recent first)"""
+    return get_execution_log_store().entries()
 
 
 def get_execution_log_by_id(log_id: int) -> Optional[Dict]:
     """Get a single execution log by its ID."""
-    logs = get_execution_logs()
-    for log in logs:
-        if int(log.get("id", 0)) == int(log_id):
-            return log
-    return None
+    return get_execution_log_store().find(lambda log: int(log.get("id", 0)) == int(log_id))
 
 
 def _get_next_log_id() -> int:
     """Compute the next auto-incremented log ID without saving."""
-    logs = get_execution_logs()
-    if logs:
-        return max(log.get("id", 0) for log in logs) + 1
-    return 1
+    return get_execution_log_store().next_id()
 
 
 def save_execution_log(log_entry: Dict):
     """Save execution log entry"""
-    logs = get_execution_logs()
-
-    # Assign auto-incrementing ID only when not already pre-assigned
-    if not log_entry.get("id"):
-        log_entry["id"] = _get_next_log_id()
-
-    logs.insert(0, log_entry)  # Most recent first
-
-    # Keep only last 100 logs
-    logs = logs[:100]
-
-    storage.save("cron_logs", {"logs": logs})
+    # Appended to the segmented execution log (last 100 kept); an ID is
+    # assigned only when not already pre-assigned
+    get_execution_log_store().append(log_entry)
 
 
 def mark_run_output_deleted(run_id: int, deleted_by: str = "unknown_user") -> Dict:
@@ -136,14 +122,7 @@ def mark_run_output_deleted(run_id: int, deleted_by: str = "unknown_user") -> Di
     Returns:
         Dict with state details and whether this call changed state.
     """
-    logs_data = storage.load("cron_logs") or {"logs": []}
-    logs = logs_data.get("logs", [])
-
-    target = None
-    for entry in logs:
-        if int(entry.get("id", 0)) == int(run_id):
-            target = entry
-            break
+    target = get_execution_log_by_id(run_id)
 
     if not target:
         return {
@@ -162,10 +141,13 @@ def mark_run_output_deleted(run_id: int, deleted_by: str = "unknown_user") -> Di
             "output_deleted_at": target.get("output_deleted_at"),
         }
 
-    target["output_deleted"] = True
-    target["output_deleted_by"] = deleted_by or "unknown_user"
-    target["output_deleted_at"] = datetime.now().isoformat()
-    storage.save("cron_logs", {"logs": logs})
+    marks = {
+        "output_deleted": True,
+        "output_deleted_by": deleted_by or "unknown_user",
+        "output_deleted_at": datetime.now().isoformat(),
+    }
+    get_execution_log_store().update(lambda entry: int(entry.get("id", 0)) == int(run_id), marks)
+    target.update(marks)
 
     return {
         "found": True,
@@ -177,6 +159,96 @@ def mark_run_output_deleted(run_id: int, deleted_by: str = "unknown_user") -> Di
     }
 
 
+def _run_object_pipeline(run_id: int):
+    """
+    Steps 2-5 with per-row models (ColorRaw → dict → ColorProcessed).
+    Returns (original_count, excluded_count, rules_applied, processed_count).
+    """
+    # Step 2: Fetch raw colors from database
+    logger.info("📥 Fetching raw colors from database...")
+    raw_colors = db_service.fetch_all_colors()
+    original_count = len(raw_colors)
+    logger.info(f"✅ Fetched {original_count} raw colors")
+    
+    # Step 3: Apply exclusion rules
+    logger.info("🔍 Applying exclusion rules...")
+    raw_colors_dict = [color.dict() for color in raw_colors]
+    rules_result = apply_rules(raw_colors_dict)
+    filtered_colors_dict = rules_result["filtered_data"]
+    excluded_count = rules_result["excluded_count"]
+    rules_applied = rules_result["rules_applied"]
+    logger.info(f"✅ Rules applied: {rules_applied} active rules, excluded {excluded_count} rows")
+    
+    # Convert filtered dicts back to ColorRaw objects for ranking engine
+    filtered_colors = [ColorRaw(**color_dict) for color_dict in filtered_colors_dict]
+    
+    # Step 4: Apply ranking engine
+    logger.info("📊 Applying ranking engine...")
+    processed_colors = ranking_engine.run_colors(filtered_colors)
+    logger.info(f"✅ Ranked {len(processed_colors)} colors")
+    
+    # Step 5: Save to output file
+    logger.info("💾 Saving processed colors to output...")
+    output_service.append_processed_colors(processed_colors, processing_type="AUTOMATED", run_id=run_id)
+    logger.info(f"✅ Saved {len(processed_colors)} processed colors")
+    
+    return original_count, excluded_count, rules_applied, len(processed_colors)
+
+
+def _run_columnar_pipeline(run_id: int):
+    """
+    Steps 2-5 on a single DataFrame — no per-row model objects.
+    Returns (original_count, excluded_count, rules_applied, processed_count).
+    """
+    # Step 2: Fetch raw colors (vectorized schema check instead of ColorRaw)
+    logger.info("📥 Fetching raw colors from database (columnar)...")
+    raw_df = db_service.fetch_colors_frame()
+    original_count = len(raw_df)
+    logger.info(f"✅ Fetched {original_count} raw colors")
+    
+    # Incremental ranking: when the source delivered a delta, CUSIPs with new
+    # rows (plus any whose filtered rows changed) are re-ranked; otherwise
+    # every group is re-ranked and diffed.  Rules always see every row, since
+    # a rule change can exclude or restore rows of any CUSIP.
+    incremental = is_incremental_ranking_enabled()
+    if incremental and db_service.last_failed_clos:
+        # Rows of the failed CLOs are missing; ranking them incrementally would
+        # drop their CUSIPs from the state, so rank fully and keep the state.
+        logger.warning("⚠️ Partial fetch — full ranking, incremental state left unchanged")
+        incremental = False
+    touched = None
+    if incremental and db_service.last_fetch_delta is not None:
+        delta = db_service.last_fetch_delta
+        touched = set(RankingEngine.normalize_cusips(delta['CUSIP'])) if 'CUSIP' in delta.columns else set()
+    
+    # Step 3: Apply exclusion rules (DataFrame in, DataFrame out)
+    logger.info("🔍 Applying exclusion rules...")
+    rules_result = apply_rules(raw_df)
+    filtered_df = rules_result["filtered_data"]
+    excluded_count = rules_result["excluded_count"]
+    rules_applied = rules_result["rules_applied"]
+    logger.info(f"✅ Rules applied: {rules_applied} active rules, excluded {excluded_count} rows")
+    
+    # Step 4: Apply ranking engine
+    logger.info("📊 Applying ranking engine...")
+    if incremental:
+        ranking_state = RankingStateStore()
+        ranked_df, next_state = ranking_engine.rank_incremental(filtered_df, ranking_state.load(), touched)
+    else:
+        ranked_df = ranking_engine.run_colors_frame(filtered_df)
+    logger.info(f"✅ Ranked {len(ranked_df)} colors")
+    
+    # Step 5: Save to output file
+    logger.info("💾 Saving processed colors to output...")
+    output_service.append_processed_frame(ranked_df, processing_type="AUTOMATED", run_id=run_id)
+    logger.info(f"✅ Saved {len(ranked_df)} processed colors")
+    if incremental:
+        # Persist only after the changed rows are safely written
+        ranking_state.save(next_state)
+    
+    return original_count, excluded_count, rules_applied, len(ranked_df)
+
+
 def run_automation_task(job_id: int, job_name: str, triggered_by: str = "scheduled"):
     """
     Execute the automated color processing task
@@ -225,51 +297,37 @@ def run_automation_task(job_id: int, job_name: str, triggered_by: str = "schedul
         else:
             logger.info("ℹ️ No buffered manual uploads to process")
         
-        # Step 2: Fetch raw colors from database
-        logger.info("📥 Fetching raw colors from database...")
-        raw_colors = db_service.fetch_all_colors()
-        original_count = len(raw_colors)
-        logger.info(f"✅ Fetched {original_count} raw colors")
-        
-        # Step 3: Apply exclusion rules
-        logger.info("🔍 Applying exclusion rules...")
-        raw_colors_dict = [color.dict() for color in raw_colors]
-        rules_result = apply_rules(raw_colors_dict)
-        filtered_colors_dict = rules_result["filtered_data"]
-        excluded_count = rules_result["excluded_count"]
-        rules_applied = rules_result["rules_applied"]
-        logger.info(f"✅ Rules applied: {rules_applied} active rules, excluded {excluded_count} rows")
-        
-        # Convert filtered dicts back to ColorRaw objects for ranking engine
-        filtered_colors = [ColorRaw(**color_dict) for color_dict in filtered_colors_dict]
-        
-        # Step 4: Apply ranking engine
-        logger.info("📊 Applying ranking engine...")
-        processed_colors = ranking_engine.run_colors(filtered_colors)
-        logger.info(f"✅ Ranked {len(processed_colors)} colors")
-        
-        # Step 5: Save to output file
-        logger.info("💾 Saving processed colors to output...")
-        output_service.append_processed_colors(processed_colors, processing_type="AUTOMATED", run_id=_run_id)
-        logger.info(f"✅ Saved {len(processed_colors)} processed colors")
+        if PIPELINE_MODE == "columnar":
+            original_count, excluded_count, rules_applied, processed_count = _run_columnar_pipeline(_run_id)
+        else:
+            original_count, excluded_count, rules_applied, processed_count = _run_object_pipeline(_run_id)
         
-        # Success
+        # Success, or partial when some CLO queries failed
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
+        failed_clos = db_service.last_failed_clos
+        if failed_clos:
+            log_entry.update({
+                "failed_clos": sorted(failed_clos),
+                "error": f"Fetch failed for CLO(s): {failed_clos}",
+            })
         
         log_entry.update({
-            "status": "success",
+            "status": "partial" if failed_clos else "success",
             "end_time": end_time.isoformat(),
             "duration_seconds": duration,
             "original_count": original_count,
             "excluded_count": excluded_count,
-            "processed_count": len(processed_colors),
+            "processed_count": processed_count,
             "rules_applied": rules_applied,
             "manual_files_processed": manual_files_processed,
             "manual_files_failed": manual_files_failed
         })
         
-        logger.info(f"✅ Automation task completed successfully in {duration:.2f}s")
+        if failed_clos:
+            logger.warning(f"⚠️ Automation task completed without CLO(s) {sorted(failed_clos)} in {duration:.2f}s")
+        else:
+            logger.info(f"✅ Automation task completed successfully in {duration:.2f}s")
         
         # Step 6: Send email report if enabled
         try:
@@ -278,7 +336,7 @@ def run_automation_task(job_id: int, job_name: str, triggered_by: str = "schedul
             report_data = {
                 "date": start_time.strftime("%Y-%m-%d"),
                 "time": start_time.strftime("%H:%M:%S"),
-                "total_processed": len(processed_colors),
+                "total_processed": processed_count,
                 "total_excluded": excluded_count,
                 "rules_applied": rules_applied,
                 "duration": f"{duration:.2f}s",
@@ -558,5 +616,32 @@ def initialize_scheduler():
     logger.info(f"✅ Scheduler initialized with {active_count} active jobs")
 
 
+def initialize_compaction_job():
+    """
+    Schedule periodic S3 delta compaction (S3_OUTPUT_LAYOUT=delta only).
+    Interval comes from S3_DELTA_COMPACT_INTERVAL_MINUTES; 0 disables it and
+    leaves compaction to the per-run threshold.
+    """
+    if output_service._s3_layout != "delta" or output_service._s3_dest is None:
+        return
+    try:
+        minutes = int(os.getenv("S3_DELTA_COMPACT_INTERVAL_MINUTES", "0"))
+    except ValueError:
+        logger.warning("Invalid S3_DELTA_COMPACT_INTERVAL_MINUTES — compaction schedule disabled")
+        return
+    if minutes <= 0:
+        return
+    scheduler.add_job(
+        func=output_service.compact_s3_deltas,
+        trigger=IntervalTrigger(minutes=minutes, timezone=TIMEZONE),
+        id="s3_delta_compaction",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+    logger.info(f"✅ S3 delta compaction scheduled every {minutes} minute(s)")
+
+
 # Initialize on module load
 initialize_scheduler()
+initialize_compaction_job()
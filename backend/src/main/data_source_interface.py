@@ -3,10 +3,19 @@ Data Source Interface for input abstraction.
 Supports multiple data sources: Excel files, Oracle DB, etc.
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 import pandas as pd
 
 
+class PartialFetchError(ConnectionError):
+    """Some CLOs of a multi-CLO fetch failed; *frame* holds the CLOs that succeeded."""
+    
+    def __init__(self, failed: Dict[str, str], frame: pd.DataFrame):
+        super().__init__(f"Fetch failed for CLO(s) {sorted(failed)}: {failed}")
+        self.failed = failed
+        self.frame = frame
+
+
 class DataSourceInterface(ABC):
     """Abstract interface for different data sources."""
     
@@ -23,6 +32,88 @@ class DataSourceInterface(ABC):
         """
         pass
     
+    def fetch_data_since(self, clo_id: Optional[str], watermark: int) -> pd.DataFrame:
+        """
+        Fetch only rows whose MESSAGE_ID is greater than *watermark*.
+        
+        Default implementation filters the full result; sources that can
+        push the predicate down (e.g. Oracle) override this.
+        
+        Args:
+            clo_id: Optional CLO identifier to filter data
+            watermark: Highest MESSAGE_ID already fetched
+            
+        Returns:
+            DataFrame with standardized column names
+        """
+        df = self.fetch_data(clo_id=clo_id)
+        if "MESSAGE_ID" not in df.columns:
+            return df
+        return df[pd.to_numeric(df["MESSAGE_ID"], errors="coerce") > watermark]
+    
+    def iter_batches(
+        self,
+        clo_id: Optional[str] = None,
+        watermark: Optional[int] = None,
+        batch_rows: Optional[int] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Yield the source result as a sequence of DataFrames.
+        
+        Default implementation yields the full result as one chunk; sources
+        that can stream (e.g. Oracle) override this so consumers never hold
+        the whole raw result at once.
+        
+        Args:
+            clo_id: Optional CLO identifier to filter data
+            watermark: Only rows with MESSAGE_ID above this (None = all rows)
+            batch_rows: Preferred rows per chunk (source default if None)
+            
+        Returns:
+            Iterator of DataFrames with standardized column names
+        """
+        if watermark is None:
+            yield self.fetch_data(clo_id=clo_id)
+        else:
+            yield self.fetch_data_since(clo_id, watermark)
+    
+    def multi_clo_ids(self) -> List[str]:
+        """
+        CLOs a default (no clo_id) fetch should be split into, one query each.
+        
+        Empty (the default) means the source answers a default fetch with a
+        single query.
+        """
+        return []
+    
+    def fetch_clos(
+        self,
+        clo_ids: Iterable[str],
+        watermarks: Optional[Dict[str, Optional[int]]] = None,
+    ) -> pd.DataFrame:
+        """
+        Fetch several CLOs and merge them into one frame tagged with CLO_ID.
+        
+        Default implementation fetches one CLO after another; sources with
+        connection pooling (e.g. Oracle) override this to run them concurrently.
+        
+        Args:
+            clo_ids: CLO identifiers to fetch
+            watermarks: Per-CLO MESSAGE_ID watermark (missing / None = all rows)
+            
+        Returns:
+            DataFrame with standardized column names plus CLO_ID
+        """
+        frames = []
+        for clo_id in clo_ids:
+            watermark = (watermarks or {}).get(clo_id)
+            if watermark is None:
+                df = self.fetch_data(clo_id=clo_id)
+            else:
+                df = self.fetch_data_since(clo_id, watermark)
+            frames.append(df.assign(CLO_ID=clo_id))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    
     @abstractmethod
     def test_connection(self) -> Dict[str, Any]:
         """
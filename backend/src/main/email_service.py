@@ -14,6 +14,8 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 
+from services.log_store import get_log_store
+
 logger = logging.getLogger(__name__)
 
 # Paths
@@ -375,6 +377,19 @@ def send_report_email(
     )
 
 
+def _load_legacy_email_logs() -> Optional[Dict]:
+    """Old single-document email_logs.json (imported into the log store once)"""
+    if not os.path.exists(EMAIL_LOGS_FILE):
+        return None
+    with open(EMAIL_LOGS_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _email_log():
+    """Segmented email log (see services/log_store.py); last 100 entries kept"""
+    return get_log_store("email_logs", max_entries=100, legacy=_load_legacy_email_logs)
+
+
 def log_email_attempt(
     to_emails: List[str],
     subject: str,
@@ -395,16 +410,8 @@ def log_email_attempt(
         attachment_paths: Attached files
     """
     try:
-        # Load existing logs
-        if os.path.exists(EMAIL_LOGS_FILE):
-            with open(EMAIL_LOGS_FILE, 'r', encoding='utf-8') as f:
-                logs_data = json.load(f)
-        else:
-            logs_data = {"logs": [], "next_id": 1}
-        
-        # Create log entry
+        # Create log entry (ID assigned by the log store)
         log_entry = {
-            "id": logs_data['next_id'],
             "to_emails": to_emails,
             "subject": subject,
             "status": status,
@@ -414,16 +421,7 @@ def log_email_attempt(
             "attachments": [os.path.basename(p) for p in (attachment_paths or [])]
         }
         
-        logs_data['logs'].insert(0, log_entry)  # Most recent first
-        logs_data['next_id'] += 1
-        
-        # Keep only last 100 logs
-        logs_data['logs'] = logs_data['logs'][:100]
-        
-        # Save logs
-        os.makedirs(DATA_DIR, exist_ok=True)
-        with open(EMAIL_LOGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(logs_data, f, indent=2)
+        _email_log().append(log_entry)
             
     except Exception as e:
         logger.error(f"Failed to log email attempt: {e}")
@@ -439,13 +437,8 @@ def get_email_logs(limit: int = 50) -> List[Dict]:
     Returns:
         List of email log entries
     """
-    if not os.path.exists(EMAIL_LOGS_FILE):
-        return []
-    
     try:
-        with open(EMAIL_LOGS_FILE, 'r', encoding='utf-8') as f:
-            logs_data = json.load(f)
-        return logs_data.get('logs', [])[:limit]
+        return _email_log().latest(limit)
     except Exception as e:
         logger.error(f"Error loading email logs: {e}")
         return []
@@ -9,18 +9,23 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 
+from services.log_store import get_log_store
+
 logger = logging.getLogger(__name__)
 
 # Paths
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 UNIFIED_LOGS_FILE = os.path.join(DATA_DIR, 'unified_logs.json')
 
+# Keep only last 500 logs
+MAX_UNIFIED_LOGS = 500
+
 
 class LogEntry:
     """Standard log entry structure"""
     def __init__(
         self,
-        log_id: int,
+        log_id: Optional[int],
         module: str,  # 'rules', 'cron', 'restore', 'email'
         action: str,  # 'create', 'update', 'delete', 'toggle', 'restore', 'send', etc.
         description: str,
@@ -67,50 +72,28 @@ class LogEntry:
         }
 
 
-def load_unified_logs() -> Dict:
-    """Load all unified logs"""
+def _load_legacy_unified_logs() -> Optional[Dict]:
+    """Old single-document unified_logs.json (imported into the log store once)"""
     if not os.path.exists(UNIFIED_LOGS_FILE):
-        return {"logs": [], "next_id": 1}
-    
-    try:
-        with open(UNIFIED_LOGS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading unified logs: {e}")
-        return {"logs": [], "next_id": 1}
+        return None
+    with open(UNIFIED_LOGS_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
 
-def save_unified_logs(logs_data: Dict):
-    """Save unified logs locally and sync to S3 if configured"""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    with open(UNIFIED_LOGS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(logs_data, f, indent=2)
-    # Sync to S3 when configured
-    _s3_sync_log(logs_data)
+def _unified_log():
+    """Segmented unified log (see services/log_store.py); last 500 entries kept"""
+    return get_log_store(
+        "unified_logs",
+        max_entries=MAX_UNIFIED_LOGS,
+        id_field="log_id",
+        legacy=_load_legacy_unified_logs
+    )
 
 
-def _s3_sync_log(logs_data: Dict):
-    """Upload unified logs JSON to S3 if S3 is configured."""
-    try:
-        output_dest = os.getenv("OUTPUT_DESTINATION", "local").lower()
-        if output_dest not in ("s3", "both"):
-            return
-        bucket = os.getenv("S3_BUCKET_NAME", "")
-        if not bucket:
-            return
-        import boto3
-        access_key = os.getenv("AWS_ACCESS_KEY_ID", "")
-        secret_key = os.getenv("AWS_SECRET_ACCESS_KEY", "")
-        region = os.getenv("S3_REGION", "us-east-1")
-        if access_key and secret_key:
-            s3 = boto3.client("s3", aws_access_key_id=access_key, aws_secret_access_key=secret_key, region_name=region)
-        else:
-            s3 = boto3.client("s3", region_name=region)
-        body = json.dumps(logs_data, indent=2, default=str).encode("utf-8")
-        s3.put_object(Bucket=bucket, Key="logs/unified_logs.json", Body=body, ContentType="application/json")
-        logger.debug(f"Synced unified_logs.json to s3://{bucket}/logs/unified_logs.json")
-    except Exception as e:
-        logger.warning(f"S3 log sync failed (non-critical): {e}")
+def load_unified_logs() -> Dict:
+    """Load all unified logs"""
+    log = _unified_log()
+    return {"logs": log.entries(), "next_id": log.next_id()}
 
 
 def add_log(
@@ -141,10 +124,8 @@ def add_log(
     Returns:
         Created log entry
     """
-    logs_data = load_unified_logs()
-    
     log_entry = LogEntry(
-        log_id=logs_data['next_id'],
+        log_id=None,  # assigned by the log store under its lock
         module=module,
         action=action,
         description=description,
@@ -157,17 +138,12 @@ def add_log(
         metadata=metadata
     )
     
-    logs_data['logs'].insert(0, log_entry.to_dict())  # Most recent first
-    logs_data['next_id'] += 1
-    
-    # Keep only last 500 logs (to prevent file from growing too large)
-    logs_data['logs'] = logs_data['logs'][:500]
-    
-    save_unified_logs(logs_data)
+    # Appended to the segmented log (read back most recent first)
+    entry = _unified_log().append(log_entry.to_dict())
     
     logger.info(f"📝 Log added: [{module}] {action} - {description}")
     
-    return log_entry.to_dict()
+    return entry
 
 
 def get_logs(
@@ -186,31 +162,21 @@ def get_logs(
     Returns:
         List of log entries (most recent first)
     """
-    logs_data = load_unified_logs()
-    logs = logs_data.get('logs', [])
-    
-    # Filter by module
-    if module:
-        logs = [log for log in logs if log.get('module') == module]
-    
-    # Filter by entity_id
-    if entity_id is not None:
-        logs = [log for log in logs if log.get('entity_id') == entity_id]
-    
-    # Return limited results
-    return logs[:limit]
+    def matches(log: Dict) -> bool:
+        # Filter by module and entity_id
+        if module and log.get('module') != module:
+            return False
+        if entity_id is not None and log.get('entity_id') != entity_id:
+            return False
+        return True
+    
+    # Reads only as many segments as needed for `limit` matches
+    return _unified_log().latest(limit, matches)
 
 
 def get_log_by_id(log_id: int) -> Optional[Dict]:
     """Get single log entry by ID"""
-    logs_data = load_unified_logs()
-    logs = logs_data.get('logs', [])
-    
-    for log in logs:
-        if log.get('log_id') == log_id:
-            return log
-    
-    return None
+    return _unified_log().find(lambda log: log.get('log_id') == log_id)
 
 
 def revert_log(log_id: int, reverted_by: str = "admin") -> Dict:
@@ -224,15 +190,8 @@ def revert_log(log_id: int, reverted_by: str = "admin") -> Dict:
     Returns:
         Result with success status and restored data
     """
-    logs_data = load_unified_logs()
-    logs = logs_data.get('logs', [])
-    
     # Find the log entry
-    log_entry = None
-    for log in logs:
-        if log.get('log_id') == log_id:
-            log_entry = log
-            break
+    log_entry = get_log_by_id(log_id)
     
     if not log_entry:
         raise ValueError(f"Log entry {log_id} not found")
@@ -248,11 +207,14 @@ def revert_log(log_id: int, reverted_by: str = "admin") -> Dict:
     if not revert_data:
         raise ValueError(f"No revert data available for log {log_id}")
     
-    # Mark as reverted
+    # Mark as reverted (rewrites only the segment holding the entry)
     log_entry['reverted_at'] = datetime.now().isoformat()
     log_entry['reverted_by'] = reverted_by
     
-    save_unified_logs(logs_data)
+    _unified_log().update(
+        lambda log: log.get('log_id') == log_id,
+        {'reverted_at': log_entry['reverted_at'], 'reverted_by': reverted_by}
+    )
     
     # Create a new log entry for the revert action
     add_log(
@@ -286,8 +248,7 @@ def get_module_stats() -> Dict:
     Returns:
         Dict with counts per module
     """
-    logs_data = load_unified_logs()
-    logs = logs_data.get('logs', [])
+    logs = _unified_log().entries()
     
     stats = {}
     for log in logs:
@@ -310,27 +271,20 @@ def cleanup_old_logs(days: int = 90):
     """
     from datetime import timedelta
     
-    logs_data = load_unified_logs()
-    logs = logs_data.get('logs', [])
-    
     cutoff_date = datetime.now() - timedelta(days=days)
     
     # Keep only logs within date range
-    filtered_logs = []
-    for log in logs:
+    def keep(log: Dict) -> bool:
         try:
-            log_date = datetime.fromisoformat(log.get('performed_at', ''))
-            if log_date >= cutoff_date:
-                filtered_logs.append(log)
+            return datetime.fromisoformat(log.get('performed_at', '')) >= cutoff_date
         except:
             # Keep logs with invalid dates (safety)
-            filtered_logs.append(log)
+            return True
     
-    removed_count = len(logs) - len(filtered_logs)
+    # Compaction rewrites only the segments that lose entries
+    removed_count = _unified_log().compact(keep)
     
     if removed_count > 0:
-        logs_data['logs'] = filtered_logs
-        save_unified_logs(logs_data)
         logger.info(f"🧹 Cleaned up {removed_count} old log entries (>{days} days)")
     
     return removed_count
@@ -127,6 +127,7 @@ class ColorResponse(BaseModel):
     page: int
     page_size: int
     colors: list[ColorProcessed]
+    next_cursor: Optional[str] = None
     
     class Config:
         json_schema_extra = {
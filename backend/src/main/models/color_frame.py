@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Columnar Color Schema
+DataFrame counterpart of ColorRaw for the columnar pipeline
+
+coerce_color_frame() applies the same per-field coercion DatabaseService
+used when building ColorRaw objects row by row (str for text, 0.0 for bad
+numbers, int(float()) or the field default for integers, now() for
+unparseable dates), but once per column.
+validate_color_frame() then enforces the ColorRaw field constraints with
+vectorized checks and reports the rows that ColorRaw would have rejected;
+rows with a missing date are rejected as well.
+ColorBatch holds the validated columns and builds ColorRaw objects only
+when a caller asks for them.
+"""
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from models.color import ColorRaw
+
+# ColorRaw fields in model order, with the DatabaseService default used when
+# the source does not provide the column at all.
+TEXT_COLUMNS = ['TICKER', 'SECTOR', 'CUSIP', 'SOURCE', 'BIAS', 'DIFF_STATUS']
+FLOAT_COLUMNS = ['PRICE_LEVEL', 'BID', 'ASK', 'PX', 'COV_PRICE', 'PERCENT_DIFF', 'PRICE_DIFF']
+INT_DEFAULTS = {'MESSAGE_ID': 0, 'RANK': 1, 'CONFIDENCE': 5}
+DATE_COLUMNS = ['DATE', 'DATE_1']
+
+COLOR_RAW_COLUMNS = [
+    'MESSAGE_ID', 'TICKER', 'SECTOR', 'CUSIP', 'DATE',
+    'PRICE_LEVEL', 'BID', 'ASK', 'PX', 'SOURCE', 'BIAS', 'RANK',
+    'COV_PRICE', 'PERCENT_DIFF', 'PRICE_DIFF', 'CONFIDENCE', 'DATE_1', 'DIFF_STATUS',
+]
+
+# Range constraints declared on ColorRaw (Field ge/le)
+RANGE_CHECKS = {'RANK': (1, 6), 'CONFIDENCE': (0, 10)}
+
+
+def _text(series: pd.Series) -> pd.Series:
+    """str() of every value ('nan' / 'None' included), as plain Python strings."""
+    return pd.Series(series.to_numpy(dtype=object).astype(str), index=series.index, dtype=object)
+
+
+def _integer(series: pd.Series, default: int) -> pd.Series:
+    """int(float(value)) per value; missing or unparseable values become *default*."""
+    if pd.api.types.is_integer_dtype(series.dtype) and not series.isna().any():
+        return series.astype('int64')  # already exact — avoid the float round trip
+    numbers = pd.to_numeric(series, errors='coerce')
+    numbers = numbers.where(np.isfinite(numbers), np.nan)
+    return np.trunc(numbers).fillna(default).astype('int64')
+
+
+def coerce_color_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a new frame with exactly COLOR_RAW_COLUMNS, typed like ColorRaw.
+
+    Missing dates stay NaT so validate_color_frame can report them.
+    """
+    now = pd.Timestamp.now()
+    out = pd.DataFrame(index=df.index)
+    for col in COLOR_RAW_COLUMNS:
+        if col in TEXT_COLUMNS:
+            out[col] = _text(df[col]) if col in df.columns else ''
+        elif col in FLOAT_COLUMNS:
+            out[col] = (
+                pd.to_numeric(df[col], errors='coerce').astype('float64').fillna(0.0)
+                if col in df.columns else 0.0
+            )
+        elif col in INT_DEFAULTS:
+            out[col] = _integer(df[col], INT_DEFAULTS[col]) if col in df.columns else INT_DEFAULTS[col]
+        elif col in DATE_COLUMNS:
+            if col not in df.columns:
+                out[col] = now
+                continue
+            # Each value parsed on its own, like the per-row pd.to_datetime
+            parsed = pd.to_datetime(df[col], errors='coerce', format='mixed')
+            if getattr(parsed.dt, 'tz', None) is not None:
+                parsed = parsed.dt.tz_localize(None)
+            # Present but unparseable -> now(), like the per-row fallback
+            out[col] = parsed.where(parsed.notna() | df[col].isna(), now)
+    return out
+
+
+def validate_color_frame(df: pd.DataFrame, max_reported: int = 20) -> Tuple[pd.DataFrame, List[Dict]]:
+    """
+    Vectorized ColorRaw validation.
+
+    Args:
+        df: Frame produced by coerce_color_frame
+        max_reported: Cap on the number of bad rows returned in the report
+
+    Returns:
+        (valid rows, report) where report holds up to *max_reported* entries of
+        {"index", "message_id", "errors"} for rejected rows.
+    """
+    problems: Dict[str, pd.Series] = {}
+    for col, (low, high) in RANGE_CHECKS.items():
+        problems[f"{col} must be between {low} and {high}"] = ~df[col].between(low, high)
+    for col in DATE_COLUMNS:
+        problems[f"{col} is missing"] = df[col].isna()
+
+    bad = np.zeros(len(df), dtype=bool)
+    for mask in problems.values():
+        bad |= mask.to_numpy(dtype=bool)
+    if not bad.any():
+        return df, []
+
+    report = []
+    for pos in np.flatnonzero(bad)[:max_reported]:
+        report.append({
+            "index": df.index[pos],
+            "message_id": int(df['MESSAGE_ID'].iat[pos]),
+            "errors": [msg for msg, mask in problems.items() if bool(mask.iat[pos])],
+        })
+    return df[~bad], report
+
+
+class ColorBatch:
+    """
+    Validated color rows kept column-wise, plus the rejected-row report.
+
+    `colors` builds the ColorRaw objects on first access; the columns were
+    already coerced and checked, so rows are constructed without being
+    validated again one by one.
+    """
+
+    def __init__(self, frame: pd.DataFrame, rejected: int = 0, bad_rows: Optional[List[Dict]] = None):
+        self.frame = frame
+        self.rejected = rejected
+        self.bad_rows = bad_rows or []
+        self._colors: Optional[List[ColorRaw]] = None
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def where(self, mask) -> "ColorBatch":
+        """Batch of the rows selected by a boolean *mask* over the frame."""
+        return ColorBatch(self.frame[mask], self.rejected, self.bad_rows)
+
+    @property
+    def colors(self) -> List[ColorRaw]:
+        if self._colors is None:
+            records = self.frame[COLOR_RAW_COLUMNS].rename(columns=str.lower).to_dict('records')
+            self._colors = [ColorRaw.model_construct(**record) for record in records]
+        return self._colors
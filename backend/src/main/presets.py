@@ -6,6 +6,7 @@ from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Optional
 from pydantic import BaseModel
 import presets_service
+from services.query_cache import get_query_cache
 import logging_service
 import logging
 import traceback
@@ -13,6 +14,7 @@ import traceback
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/presets", tags=["Presets"])
+query_cache = get_query_cache()
 
 
 class PresetCondition(BaseModel):
@@ -254,7 +256,14 @@ async def apply_preset(preset_id: int, request: PresetApply):
                 "data": []
             }
         
-        filtered_data = presets_service.apply_preset(preset_id, request.data)
+        # The preset definition is part of the key, so edits take effect at once
+        preset = presets_service.get_preset_by_id(preset_id)
+        filtered_data = query_cache.cached(
+            "presets.apply",
+            {"preset": preset, "data": request.data},
+            lambda: presets_service.apply_preset(preset_id, request.data),
+            rows=len,
+        )
         
         logger.info(f"✅ Preset {preset_id} applied: {len(filtered_data)}/{len(request.data)} rows match")
         
@@ -208,16 +208,11 @@ def apply_preset(preset_id: int, data: List[Dict]) -> List[Dict]:
         logger.info(f"🔍 Preset conditions: {conditions}")
     
     # Import rules evaluation logic
-    from rules_service import evaluate_condition
+    from rules_service import conditions_match_mask
     
-    filtered_data = []
-    for row in data:
-        # If row matches ALL preset conditions, include it
-        matches_all = all(evaluate_condition(row, condition) for condition in conditions)
-        if matches_all:
-            filtered_data.append(row)
-    
-    return filtered_data
+    # A row is included when it matches ALL preset conditions
+    matches_all = conditions_match_mask(data, conditions)
+    return [row for row, keep in zip(data, matches_all) if keep]
 
 
 def get_preset_stats() -> Dict:
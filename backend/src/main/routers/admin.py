@@ -11,6 +11,7 @@ from datetime import datetime
 from services.column_config_service import get_column_config
 from services.database_service import DatabaseService
 from services.data_source_factory import get_data_source, get_data_source_info
+from services.oracle_pool import get_oracle_pool_stats
 from services.output_destination_factory import get_output_destination, get_output_destination_info
 
 logger = logging.getLogger(__name__)
@@ -225,6 +226,12 @@ async def test_oracle_connection():
         raise HTTPException(status_code=503, detail=str(e))
 
 
+@router.get("/oracle/pool-stats")
+async def get_oracle_pool_statistics():
+    """Open/busy sessions, acquires and credential rebuilds of the Oracle session pools."""
+    return get_oracle_pool_stats()
+
+
 @router.post("/oracle/execute-query")
 async def execute_oracle_query(request: ExecuteQueryRequest):
     """
@@ -254,57 +261,42 @@ async def execute_oracle_query(request: ExecuteQueryRequest):
         try:
             import oracledb
             
-            # Fetch credentials
-            credentials = data_source._fetch_credentials()
-            
-            # Create connection
-            dsn = oracledb.makedsn(
-                data_source.oracle_host,
-                data_source.oracle_port,
-                service_name=data_source.oracle_service
-            )
-            
-            connection = oracledb.connect(
-                user=credentials["username"],
-                password=credentials["password"],
-                dsn=dsn
-            )
-            
-            cursor = connection.cursor()
-            
-            # Strip trailing semicolons/whitespace — Oracle rejects them inside subqueries
-            clean_query = request.query.rstrip().rstrip(';').rstrip()
-            
-            # Execute query with ROWNUM limit for safety
-            limited_query = f"SELECT * FROM ({clean_query}) WHERE ROWNUM <= 1"
-            cursor.execute(limited_query)
-            
-            # Get column metadata
-            columns = []
-            for desc in cursor.description:
-                col_name = desc[0]
-                dt = desc[1]
-                col_type = getattr(dt, 'name', None) or getattr(dt, '__name__', None) or str(dt) if dt else 'UNKNOWN'
+            # Borrow a pooled session (services.oracle_pool)
+            with data_source.acquire_connection() as connection:
+                cursor = connection.cursor()
                 
-                # Map Oracle types to our types
-                data_type = "VARCHAR"
-                if "NUMBER" in col_type or "INT" in col_type:
-                    data_type = "INTEGER"
-                elif "FLOAT" in col_type or "DECIMAL" in col_type:
-                    data_type = "FLOAT"
-                elif "DATE" in col_type or "TIMESTAMP" in col_type:
-                    data_type = "DATE"
+                # Strip trailing semicolons/whitespace — Oracle rejects them inside subqueries
+                clean_query = request.query.rstrip().rstrip(';').rstrip()
                 
-                columns.append({
-                    "oracle_column_name": col_name,
-                    "display_name": col_name.replace("_", " ").title(),
-                    "data_type": data_type,
-                    "enabled": False,  # Disabled by default
-                    "required": False
-                })
-            
-            cursor.close()
-            connection.close()
+                # Execute query with ROWNUM limit for safety
+                limited_query = f"SELECT * FROM ({clean_query}) WHERE ROWNUM <= 1"
+                cursor.execute(limited_query)
+                
+                # Get column metadata
+                columns = []
+                for desc in cursor.description:
+                    col_name = desc[0]
+                    dt = desc[1]
+                    col_type = getattr(dt, 'name', None) or getattr(dt, '__name__', None) or str(dt) if dt else 'UNKNOWN'
+                    
+                    # Map Oracle types to our types
+                    data_type = "VARCHAR"
+                    if "NUMBER" in col_type or "INT" in col_type:
+                        data_type = "INTEGER"
+                    elif "FLOAT" in col_type or "DECIMAL" in col_type:
+                        data_type = "FLOAT"
+                    elif "DATE" in col_type or "TIMESTAMP" in col_type:
+                        data_type = "DATE"
+                    
+                    columns.append({
+                        "oracle_column_name": col_name,
+                        "display_name": col_name.replace("_", " ").title(),
+                        "data_type": data_type,
+                        "enabled": False,  # Disabled by default
+                        "required": False
+                    })
+                
+                cursor.close()
             
             return {
                 "success": True,
@@ -666,57 +658,42 @@ async def execute_oracle_query(request: ExecuteQueryRequest):
         
         import oracledb
         
-        # Get credentials
-        credentials = data_source._fetch_credentials()
-        
-        # Create connection
-        dsn = oracledb.makedsn(
-            data_source.oracle_host,
-            data_source.oracle_port,
-            service_name=data_source.oracle_service
-        )
-        
-        connection = oracledb.connect(
-            user=credentials["username"],
-            password=credentials["password"],
-            dsn=dsn
-        )
-        
-        cursor = connection.cursor()
-        
-        # Strip trailing semicolons/whitespace — Oracle rejects them inside subqueries
-        clean_query = request.query.rstrip().rstrip(';').rstrip()
-        
-        # Execute query with ROWNUM limit for safety
-        safe_query = f"SELECT * FROM ({clean_query}) WHERE ROWNUM <= 5"
-        cursor.execute(safe_query)
-        
-        # Get column metadata
-        columns_metadata = []
-        for desc in cursor.description:
-            col_name = desc[0]
-            dt = desc[1]
-            col_type = getattr(dt, 'name', None) or getattr(dt, '__name__', None) or str(dt) if dt else 'UNKNOWN'
+        # Borrow a pooled session (services.oracle_pool)
+        with data_source.acquire_connection() as connection:
+            cursor = connection.cursor()
+            
+            # Strip trailing semicolons/whitespace — Oracle rejects them inside subqueries
+            clean_query = request.query.rstrip().rstrip(';').rstrip()
+            
+            # Execute query with ROWNUM limit for safety
+            safe_query = f"SELECT * FROM ({clean_query}) WHERE ROWNUM <= 5"
+            cursor.execute(safe_query)
+            
+            # Get column metadata
+            columns_metadata = []
+            for desc in cursor.description:
+                col_name = desc[0]
+                dt = desc[1]
+                col_type = getattr(dt, 'name', None) or getattr(dt, '__name__', None) or str(dt) if dt else 'UNKNOWN'
+                
+                columns_metadata.append({
+                    "name": col_name,
+                    "oracle_name": col_name,
+                    "data_type": col_type,
+                    "display_name": col_name.replace('_', ' ').title(),
+                    "enabled": True
+                })
             
-            columns_metadata.append({
-                "name": col_name,
-                "oracle_name": col_name,
-                "data_type": col_type,
-                "display_name": col_name.replace('_', ' ').title(),
-                "enabled": True
-            })
-        
-        # Fetch sample data
-        rows = cursor.fetchall()
-        sample_data = []
-        for row in rows:
-            sample_data.append({
-                columns_metadata[i]["name"]: str(val) if val is not None else None 
-                for i, val in enumerate(row)
-            })
-        
-        cursor.close()
-        connection.close()
+            # Fetch sample data
+            rows = cursor.fetchall()
+            sample_data = []
+            for row in rows:
+                sample_data.append({
+                    columns_metadata[i]["name"]: str(val) if val is not None else None 
+                    for i, val in enumerate(row)
+                })
+            
+            cursor.close()
         
         return {
             "success": True,
@@ -8,12 +8,19 @@ from typing import Optional, List
 import logging
 import os
 import sys
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from models.color import ColorResponse, MonthlyStatsResponse, MonthlyStats
 from services.database_service import DatabaseService
 from services.ranking_engine import RankingEngine
 from services.output_service import get_output_service
+from services.output_index import exact_message_id_positions
+from services.output_query_engine import cursor_scope, paginate
+from services.query_cache import get_query_cache, output_version_seq
+from services.s3_client import get_s3_client_stats
+from services.s3_object_cache import get_s3_object_cache
+from services.log_store import get_execution_log_store
 from storage_config import storage
 
 # Import rules service for exclusion logic
@@ -28,6 +35,10 @@ router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 db_service = DatabaseService()
 ranking_engine = RankingEngine()
 output_service = get_output_service()
+query_cache = get_query_cache()
+
+# /colors order: most recent business DATE first, then newest processed
+_COLORS_SORT = (("DATE", False), ("PROCESSED_AT", False))
 
 
 @router.get("/data-version")
@@ -44,14 +55,11 @@ async def get_data_version():
 
         max_event_ts = ""
         max_run_id = 0
-        logs_data = storage.load("cron_logs") or {"logs": []}
-        logs = logs_data.get("logs", []) or []
-
-        for entry in logs:
+        # Newest execution log entry only (reads just the log head).  Output
+        # deletes on older runs bump dashboard_output_version.seq instead.
+        for entry in get_execution_log_store().latest(1):
             try:
-                run_id = int(entry.get("id", 0) or 0)
-                if run_id > max_run_id:
-                    max_run_id = run_id
+                max_run_id = int(entry.get("id", 0) or 0)
             except Exception:
                 pass
 
@@ -61,9 +69,10 @@ async def get_data_version():
                     max_event_ts = ts_val
 
         local_mtime = ""
-        if os.path.exists(output_service.output_file_path):
+        local_path = output_service.local_output_path
+        if os.path.exists(local_path):
             local_mtime = datetime.fromtimestamp(
-                os.path.getmtime(output_service.output_file_path)
+                os.path.getmtime(local_path)
             ).isoformat()
 
         seq = int(version_meta.get("seq", 0) or 0)
@@ -132,6 +141,7 @@ def get_todays_colors(
     # Pagination
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(10, ge=0, description="Number of records to return (use 0 for no limit)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (keyset pagination; skip is ignored)"),
     
     # CLO-based column filtering
     clo_id: Optional[str] = Query(None, description="CLO ID for column visibility filtering"),
@@ -166,11 +176,43 @@ def get_todays_colors(
     
     **Performance:** Default limit=10 for fast preview. Set limit=0 to return all matching rows.
     
+    **Cursor pagination:** pass the response's `next_cursor` as `cursor` to fetch the
+    next page as a keyset scan (stable even when a new run lands while browsing).
+    
     **Oracle Ready:** Column filtering at query level for production.
     Currently reads from Excel, will migrate to Oracle SELECT with visible columns.
     
     **Returns:** Paginated list of processed colors with total count
     """
+    params = {
+        "skip": skip, "limit": limit, "cursor": cursor, "clo_id": clo_id,
+        "cusip": cusip, "ticker": ticker, "message_id": message_id,
+        "asset_class": asset_class, "source": source, "bias": bias,
+        "processing_type": processing_type, "date_from": date_from, "date_to": date_to,
+    }
+    return query_cache.cached(
+        "dashboard.colors", params,
+        lambda: _query_processed_colors(**params),
+        rows=lambda response: len(response.colors),
+    )
+
+
+def _query_processed_colors(
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    clo_id: Optional[str],
+    cusip: Optional[str],
+    ticker: Optional[str],
+    message_id: Optional[int],
+    asset_class: Optional[str],
+    source: Optional[str],
+    bias: Optional[str],
+    processing_type: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str],
+) -> ColorResponse:
+    """Build the /colors response (cached by get_todays_colors)."""
     try:
         # Get visible columns for CLO if provided (for Oracle query compatibility)
         visible_columns = None
@@ -217,16 +259,12 @@ def get_todays_colors(
         #     OFFSET :skip ROWS FETCH NEXT :limit ROWS ONLY
         # """
         # ----------------------------------------------------------------
-        # Read ALL records so in-Python filtering and skip/limit pagination
-        # work correctly regardless of dataset size.
-        # (A cap like min(limit*10, 1000) would make pages >100 invisible.)
-        processed_records = output_service.read_processed_colors(
-            limit=None,
-            processing_type=processing_type,
-            cusip=cusip
-        )
+        # Filters run as vectorized masks over the typed output columns
+        # (CUSIP / ticker / message_id through the secondary indexes) and only
+        # the requested page is converted to ColorProcessed below.
+        engine, index = output_service.query_engine()
         
-        if not processed_records:
+        if engine.size == 0:
             logger.warning("No processed colors found in output file")
             return ColorResponse(
                 total_count=0,
@@ -235,47 +273,57 @@ def get_todays_colors(
                 colors=[]
             )
         
-        logger.info(f"Read {len(processed_records)} records from output file/S3")
+        logger.info(f"Searching {engine.size} records from output file/S3")
         
-        # Apply additional filters
-        # When migrating to S3, move these filters to S3 query for better performance
+        mask = np.ones(engine.size, dtype=bool)
+        key_hits = []
+        if cusip:
+            key_hits.append(index.lookup_text("CUSIP", [cusip]))
         if ticker:
-            processed_records = [r for r in processed_records if r.get('TICKER', '').upper() == ticker.upper()]
-            logger.info(f"Filtered by ticker '{ticker}': {len(processed_records)} records")
-        
+            key_hits.append(index.lookup_text("TICKER", [ticker]))
         if message_id:
-            processed_records = [r for r in processed_records if r.get('MESSAGE_ID') == message_id]
-            logger.info(f"Filtered by message_id {message_id}: {len(processed_records)} records")
+            key_hits.append(exact_message_id_positions(
+                engine.frame, index.lookup_message_ids([message_id]), message_id
+            ))
+        for hits in key_hits:
+            hit_mask = np.zeros(engine.size, dtype=bool)
+            hit_mask[hits] = True
+            mask &= hit_mask
         
-        if asset_class:
-            processed_records = [r for r in processed_records if r.get('SECTOR', '').upper() == asset_class.upper()]
-            logger.info(f"Filtered by asset_class '{asset_class}': {len(processed_records)} records")
+        for column, value in (
+            ("PROCESSING_TYPE", processing_type),
+            ("SECTOR", asset_class),
+            ("SOURCE", source),
+            ("BIAS", bias),
+        ):
+            if value:
+                mask &= engine.condition_mask(column, "equals", value)
         
-        if source:
-            processed_records = [r for r in processed_records if r.get('SOURCE', '').upper() == source.upper()]
-            logger.info(f"Filtered by source '{source}': {len(processed_records)} records")
+        # Date range filtering
+        if date_from:
+            mask &= engine.condition_mask("DATE", "gte", date_from)
+        if date_to:
+            mask &= engine.condition_mask("DATE", "lte", date_to)
         
-        if bias:
-            processed_records = [r for r in processed_records if r.get('BIAS', '').upper() == bias.upper()]
-            logger.info(f"Filtered by bias '{bias}': {len(processed_records)} records")
+        total_count = int(mask.sum())
+        logger.info(f"Filters matched {total_count} records")
         
-        # Date range filtering
-        if date_from or date_to:
-            filtered = []
-            for r in processed_records:
-                try:
-                    record_date = pd.to_datetime(r.get('DATE'))
-                    include = True
-                    if date_from:
-                        include = include and record_date >= pd.to_datetime(date_from)
-                    if date_to:
-                        include = include and record_date <= pd.to_datetime(date_to)
-                    if include:
-                        filtered.append(r)
-                except:
-                    continue
-            processed_records = filtered
-            logger.info(f"Filtered by date range: {len(processed_records)} records")
+        # Most recent DATE first, then newest processed; limit=0 means no limit.
+        # A cursor continues a keyset scan from the previous page's last row.
+        keys = tuple((c, a) for c, a in _COLORS_SORT if c in engine.frame.columns)
+        scope = cursor_scope({
+            "endpoint": "dashboard.colors",
+            "filters": [cusip, ticker, message_id, asset_class, source, bias, processing_type, date_from, date_to],
+            "keys": keys,
+        })
+        try:
+            page_positions, page, next_cursor = paginate(
+                engine, mask, keys, limit or 0,
+                skip=skip, cursor=cursor, scope=scope, version=output_version_seq(),
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        processed_records = engine.rows(page_positions).to_dict('records')
         
         # Convert to ColorProcessed objects for the response
         from models.color import ColorProcessed
@@ -371,16 +419,8 @@ def get_todays_colors(
                 logger.warning(f"Skipping invalid record: {e}")
                 continue
         
-        # Apply pagination (limit=0 means no limit)
-        total_count = len(processed_colors)
-        if limit and limit > 0:
-            paginated_colors = processed_colors[skip:skip + limit]
-            page = (skip // limit) + 1
-            page_size = limit
-        else:
-            paginated_colors = processed_colors[skip:]
-            page = 1
-            page_size = total_count
+        paginated_colors = processed_colors
+        page_size = limit if limit and limit > 0 else total_count
         
         logger.info(f"Returning {len(paginated_colors)} of {total_count} processed colors")
         
@@ -388,14 +428,35 @@ def get_todays_colors(
             total_count=total_count,
             page=page,
             page_size=page_size,
-            colors=paginated_colors
+            colors=paginated_colors,
+            next_cursor=next_cursor
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching processed colors: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/query-cache")
+async def get_query_cache_stats():
+    """
+    Hit / miss / eviction counters of the search and dashboard result cache.
+
+    Entries are keyed by request, output version seq and CLO column config,
+    so they never serve data older than the last write.
+    """
+    return query_cache.stats()
+
+
+@router.get("/s3-stats")
+async def get_s3_stats():
+    """Per-operation call counts and latency of the shared S3 client, plus the local object and storage caches."""
+    storage_cache = storage.cache_stats() if hasattr(storage, "cache_stats") else None
+    return {**get_s3_client_stats(), "object_cache": get_s3_object_cache().stats(), "storage_cache": storage_cache}
+
+
 @router.get("/next-run")
 async def get_next_run_time():
     """
@@ -5,13 +5,13 @@ Manual Color Processing Router - APIs for Color Processing Page
 
 This handles the manual color workflow (SEPARATE from admin panel buffer):
 1. POST /api/manual-color/import - Import Excel and get sorted preview
-2. GET /api/manual-color/preview/{session_id} - Get current preview
+2. GET /api/manual-color/preview/{session_id} - Get current preview (windowed)
 3. POST /api/manual-color/delete-rows - Delete selected rows
 4. POST /api/manual-color/apply-rules - Apply selected rules
 5. POST /api/manual-color/save - Save processed colors to output
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from pydantic import BaseModel
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Query
+from pydantic import BaseModel, Field
 from typing import List, Optional
 import logging
 import sys
@@ -28,7 +28,8 @@ from services.manual_color_service import (
     apply_selected_rules,
     save_manual_colors,
     get_active_sessions,
-    cleanup_old_sessions
+    cleanup_old_sessions,
+    PREVIEW_COLUMNS
 )
 
 logger = logging.getLogger(__name__)
@@ -51,14 +52,25 @@ class ImportResponse(BaseModel):
     duration_seconds: Optional[float] = None
 
 
+class PreviewWindow(BaseModel):
+    """Window of the preview returned as updated_preview (defaults: all rows, session order)"""
+    offset: int = Field(0, ge=0)
+    limit: int = Field(0, ge=0, description="Rows to return (0 = all)")
+    sort_by: Optional[str] = None
+    sort_desc: bool = False
+    search: Optional[str] = None
+
+
 class DeleteRowsRequest(BaseModel):
     session_id: str
     row_ids: List[int]
+    window: Optional[PreviewWindow] = None
 
 
 class ApplyRulesRequest(BaseModel):
     session_id: str
     rule_ids: List[int]
+    window: Optional[PreviewWindow] = None
 
 
 class SaveRequest(BaseModel):
@@ -80,6 +92,14 @@ class FetchFromQueryRequest(BaseModel):
     user_id: int = 1
 
 
+def _window_dict(window: Optional[PreviewWindow]) -> Optional[dict]:
+    if window is None:
+        return None
+    if window.sort_by and window.sort_by not in PREVIEW_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Unknown sort column: {window.sort_by}")
+    return window.model_dump()
+
+
 # API Endpoints
 
 @router.post("/fetch-from-query", response_model=ImportResponse)
@@ -162,14 +182,25 @@ async def import_excel_for_manual_processing(
 
 
 @router.get("/preview/{session_id}")
-async def get_preview(session_id: str):
+async def get_preview(
+    session_id: str,
+    offset: int = Query(0, ge=0, description="First row of the window"),
+    limit: int = Query(0, ge=0, description="Rows to return (0 = all)"),
+    sort_by: Optional[str] = Query(None, description="Column to sort by (default: session order)"),
+    sort_desc: bool = Query(False, description="Sort descending"),
+    search: Optional[str] = Query(None, description="Case-insensitive text match on ticker, CUSIP, sector, source, ...")
+):
     """
     Get current preview data for a session
     
-    Returns the currently filtered data after any deletions or rule applications.
+    Returns the requested window of the currently filtered data after any
+    deletions or rule applications; statistics always cover all visible rows.
     """
     try:
-        result = get_session_preview(session_id)
+        window = _window_dict(PreviewWindow(
+            offset=offset, limit=limit, sort_by=sort_by, sort_desc=sort_desc, search=search
+        ))
+        result = get_session_preview(session_id, window=window)
         
         if not result["success"]:
             raise HTTPException(status_code=404, detail=result.get("error", "Session not found"))
@@ -188,12 +219,13 @@ async def delete_selected_rows(request: DeleteRowsRequest):
     Delete selected rows from preview
     
     User can select rows in UI and delete them.
-    Returns updated preview data.
+    Returns updated preview data (only request.window when given).
     """
     try:
         result = delete_rows(
             session_id=request.session_id,
-            row_ids=request.row_ids
+            row_ids=request.row_ids,
+            window=_window_dict(request.window)
         )
         
         if not result["success"]:
@@ -216,7 +248,7 @@ async def apply_rules_to_manual_data(request: ApplyRulesRequest):
     1. User clicks "Run Rules" button in UI
     2. User selects rules from dropdown (fetched from /api/rules)
     3. Backend applies selected rules to current preview data
-    4. Returns filtered data (excluded rows removed)
+    4. Returns filtered data (excluded rows removed; only request.window when given)
     
     Rules are fetched from Rules module (/api/rules).
     """
@@ -226,7 +258,8 @@ async def apply_rules_to_manual_data(request: ApplyRulesRequest):
         
         result = apply_selected_rules(
             session_id=request.session_id,
-            rule_ids=request.rule_ids
+            rule_ids=request.rule_ids,
+            window=_window_dict(request.window)
         )
         
         if not result["success"]:
@@ -12,13 +12,17 @@ import io
 import pandas as pd
 import numpy as np
 from services.output_service import get_output_service
+from services.output_index import exact_message_id_positions, take_rows
 from services.column_config_service import get_column_config
+from services.query_cache import get_query_cache, output_version_seq
+from services.output_query_engine import DEFAULT_SORT, cursor_scope, paginate, top_k_frame
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/search", tags=["Search"])
 
 output_service = get_output_service()
 column_config = get_column_config()
+query_cache = get_query_cache()
 
 
 class SearchFilter(BaseModel):
@@ -39,6 +43,7 @@ class SearchRequest(BaseModel):
     sort_order: str = "desc"  # asc or desc
     clo_id: Optional[str] = None  # CLO ID for column filtering
     include_related_hierarchy: bool = True
+    cursor: Optional[str] = None  # next_cursor from the previous page (keyset pagination; skip ignored)
 
 
 class SearchResponse(BaseModel):
@@ -49,6 +54,7 @@ class SearchResponse(BaseModel):
     page_size: int
     results: List[Dict[str, Any]]
     available_fields: List[str]
+    next_cursor: Optional[str] = None  # pass back as `cursor` for the following page
 
 
 @router.post("/generic", response_model=SearchResponse)
@@ -78,6 +84,10 @@ def generic_search(request: SearchRequest):
     }
     ```
     
+    **Cursor pagination:** every page with more rows after it returns
+    `next_cursor`; send it back as `cursor` (same filters/sort) to get the next
+    page without re-scanning from the top.
+    
     **Operators:**
     - `equals`: Exact match
     - `contains`: Substring match (case-insensitive)
@@ -87,6 +97,15 @@ def generic_search(request: SearchRequest):
     
     **Returns:** Filtered and paginated results
     """
+    return query_cache.cached(
+        "search.generic", request.model_dump(),
+        lambda: _run_generic_search(request),
+        rows=lambda response: response.returned_count,
+    )
+
+
+def _run_generic_search(request: SearchRequest) -> SearchResponse:
+    """Evaluate a generic search request (cached by generic_search)."""
     try:
         # Get visible columns from CLO if provided
         visible_columns = None
@@ -117,11 +136,11 @@ def generic_search(request: SearchRequest):
             f"limit={request.limit}, clo_id={request.clo_id}"
         )
         
-        # Read ALL records so filtering + skip/limit pagination works correctly.
-        # output_service handles local vs S3 efficiently internally.
-        all_records = output_service.read_processed_colors(limit=None)
+        # Filters, hierarchy expansion and sorting run on typed columns of the
+        # cached output; dicts are built only for the returned page.
+        engine, index = output_service.query_engine()
         
-        if not all_records:
+        if engine.size == 0:
             return SearchResponse(
                 total_count=0,
                 returned_count=0,
@@ -132,32 +151,7 @@ def generic_search(request: SearchRequest):
             )
         
         # Apply filters with AND/OR support
-        if request.filters:
-            combined_ids = None
-            all_ids = {id(r) for r in all_records}
-
-            for idx, filter_item in enumerate(request.filters):
-                matched_records = _apply_filter(all_records, filter_item)
-                matched_ids = {id(r) for r in matched_records}
-
-                if idx == 0 or combined_ids is None:
-                    combined_ids = matched_ids
-                else:
-                    op = str(filter_item.logical_operator or "AND").upper()
-                    if op == "OR":
-                        combined_ids = combined_ids.union(matched_ids)
-                    else:
-                        combined_ids = combined_ids.intersection(matched_ids)
-
-                logger.info(
-                    f"After filter {filter_item.field} {filter_item.operator} "
-                    f"{filter_item.value} [{filter_item.logical_operator}]: "
-                    f"{len(combined_ids or all_ids)} records"
-                )
-
-            filtered_records = [r for r in all_records if id(r) in (combined_ids or all_ids)]
-        else:
-            filtered_records = all_records
+        mask = engine.match(request.filters)
 
         # If searching by CUSIP / MESSAGE_ID, include related hierarchy rows so
         # table can display parent-child context (across historical runs too).
@@ -165,56 +159,44 @@ def generic_search(request: SearchRequest):
         should_expand_hierarchy = request.include_related_hierarchy and (
             "CUSIP" in filter_fields_upper or "MESSAGE_ID" in filter_fields_upper
         )
-        if should_expand_hierarchy and len(filtered_records) > 0:
-            base_df = pd.DataFrame(filtered_records)
-            all_df = pd.DataFrame(all_records)
-            if "CUSIP" in all_df.columns and "CUSIP" in base_df.columns:
-                # Expand strictly by CUSIP only. MESSAGE_ID is not globally unique,
-                # so never use it alone for parent/child expansion.
-                matched_cusips = {
-                    str(v).strip().upper()
-                    for v in base_df.get("CUSIP", pd.Series(dtype=object)).dropna().tolist()
-                    if str(v).strip()
-                }
-                if matched_cusips:
-                    all_cusips = all_df["CUSIP"].astype(str).str.strip().str.upper()
-                    expanded_df = all_df[all_cusips.isin(matched_cusips)].drop_duplicates()
-                    filtered_records = expanded_df.to_dict('records')
-        
-        # Sort results
-        if request.sort_by and request.sort_by in available_columns:
-            df = pd.DataFrame(filtered_records)
-            ascending = request.sort_order.lower() == "asc"
-            df = df.sort_values(by=request.sort_by, ascending=ascending)
-            filtered_records = df.to_dict('records')
-        else:
-            # Default deterministic order: newest processed rows first
-            df = pd.DataFrame(filtered_records)
-            sort_cols = []
-            ascending = []
-            if "PROCESSED_AT" in df.columns:
-                sort_cols.append("PROCESSED_AT")
-                ascending.append(False)
-            if "RUN_ID" in df.columns:
-                sort_cols.append("RUN_ID")
-                ascending.append(False)
-            if "DATE" in df.columns:
-                sort_cols.append("DATE")
-                ascending.append(False)
-            if sort_cols:
-                df = df.sort_values(by=sort_cols, ascending=ascending, kind='mergesort')
-                filtered_records = df.to_dict('records')
+        if should_expand_hierarchy and mask.any() and index.has("CUSIP"):
+            # Expand strictly by CUSIP only. MESSAGE_ID is not globally unique,
+            # so never use it alone for parent/child expansion.
+            matched_cusips = {
+                str(v).strip().upper()
+                for v in engine.frame["CUSIP"].iloc[np.flatnonzero(mask)].dropna().unique().tolist()
+                if str(v).strip()
+            }
+            if matched_cusips:
+                expanded = index.lookup_text("CUSIP", matched_cusips)
+                duplicate = engine.rows(expanded).duplicated().to_numpy(dtype=bool)
+                mask = np.zeros(engine.size, dtype=bool)
+                mask[expanded[~duplicate]] = True
         
-        # Pagination (limit <= 0 means no limit)
-        total_count = len(filtered_records)
-        if request.limit and request.limit > 0:
-            paginated_records = filtered_records[request.skip:request.skip + request.limit]
-            page_size = request.limit
-            page = (request.skip // request.limit) + 1
-        else:
-            paginated_records = filtered_records[request.skip:]
-            page_size = total_count
-            page = 1
+        # Sort (default: newest processed rows first) and paginate. With a cursor
+        # the page is a keyset range scan that continues after the previous
+        # page's last row, so deep pages stay cheap and runs landing mid-browse
+        # don't shift them.
+        sort_by = request.sort_by if request.sort_by and request.sort_by in available_columns else None
+        keys = engine.sort_keys(sort_by, ascending=request.sort_order.lower() == "asc")
+        scope = cursor_scope({
+            "endpoint": "search.generic",
+            "filters": [f.model_dump() for f in request.filters],
+            "keys": keys,
+            "clo_id": request.clo_id,
+            "hierarchy": request.include_related_hierarchy,
+        })
+        try:
+            page_positions, page, next_cursor = paginate(
+                engine, mask, keys, request.limit or 0,
+                skip=request.skip, cursor=request.cursor,
+                scope=scope, version=output_version_seq(),
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        total_count = int(mask.sum())
+        page_size = request.limit if request.limit and request.limit > 0 else total_count
+        paginated_records = _to_json_safe_records(engine.rows(page_positions))
         
         # Filter columns in results if CLO filtering is active
         if visible_columns:
@@ -237,7 +219,8 @@ def generic_search(request: SearchRequest):
             page=page,
             page_size=page_size,
             results=paginated_records,
-            available_fields=available_columns
+            available_fields=available_columns,
+            next_cursor=next_cursor
         )
         
     except HTTPException:
@@ -317,70 +300,6 @@ async def get_searchable_fields(clo_id: Optional[str] = Query(None, description=
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def _apply_filter(records: List[Dict], filter_item: SearchFilter) -> List[Dict]:
-    """Apply a single filter to records"""
-    filtered = []
-    op = str(filter_item.operator or "").strip().lower().replace(" ", "_")
-    
-    for record in records:
-        field_value = record.get(filter_item.field)
-        
-        # Skip null values
-        if field_value is None:
-            continue
-        
-        try:
-            # Apply operator
-            if op == "equals":
-                if str(field_value).upper() == str(filter_item.value).upper():
-                    filtered.append(record)
-
-            elif op in ("not_equals", "not_equal_to"):
-                if str(field_value).upper() != str(filter_item.value).upper():
-                    filtered.append(record)
-            
-            elif op == "contains":
-                if str(filter_item.value).upper() in str(field_value).upper():
-                    filtered.append(record)
-            
-            elif op == "starts_with":
-                if str(field_value).upper().startswith(str(filter_item.value).upper()):
-                    filtered.append(record)
-
-            elif op in ("ends_with", "endswith"):
-                if str(field_value).upper().endswith(str(filter_item.value).upper()):
-                    filtered.append(record)
-            
-            elif op == "gt":
-                if float(field_value) > float(filter_item.value):
-                    filtered.append(record)
-            
-            elif op == "lt":
-                if float(field_value) < float(filter_item.value):
-                    filtered.append(record)
-            
-            elif op == "gte":
-                if float(field_value) >= float(filter_item.value):
-                    filtered.append(record)
-            
-            elif op == "lte":
-                if float(field_value) <= float(filter_item.value):
-                    filtered.append(record)
-            
-            elif op == "between":
-                if filter_item.value2 is None:
-                    continue
-                val = float(field_value)
-                if float(filter_item.value) <= val <= float(filter_item.value2):
-                    filtered.append(record)
-        
-        except (ValueError, TypeError):
-            # Skip records where type conversion fails
-            continue
-    
-    return filtered
-
-
 # Convenience GET endpoint for simple searches
 @router.get("/simple", response_model=SearchResponse)
 def simple_search(
@@ -444,6 +363,15 @@ def security_search(request: SecuritySearchRequest):
     - `search_type` = "cusip"      → case-insensitive match on CUSIP
     - `search_type` = "any"        → tries both MESSAGE_ID and CUSIP
     """
+    return query_cache.cached(
+        "search.security", request.model_dump(),
+        lambda: _run_security_search(request),
+        rows=lambda response: response.total_count,
+    )
+
+
+def _run_security_search(request: SecuritySearchRequest) -> SecuritySearchResponse:
+    """Evaluate a security search request (cached by security_search)."""
     try:
         query = request.query.strip()
         if not query:
@@ -451,10 +379,10 @@ def security_search(request: SecuritySearchRequest):
 
         logger.info(f"Security search: query='{query}', type={request.search_type}")
 
-        # Read ALL processed records
-        all_records = output_service.read_processed_colors(limit=None)
+        # Secondary indexes: every lookup below is O(matches), not O(history)
+        df, index = output_service.indexed_output()
 
-        if not all_records:
+        if len(df) == 0:
             return SecuritySearchResponse(
                 total_count=0,
                 results=[],
@@ -462,64 +390,46 @@ def security_search(request: SecuritySearchRequest):
                 search_type=request.search_type
             )
 
-        df = pd.DataFrame(all_records)
-        matched = pd.DataFrame()
+        matched_parts = []
 
         search_by = request.search_type.lower()
 
         if search_by in ("message_id", "any"):
-            if "MESSAGE_ID" in df.columns:
+            if index.has("MESSAGE_ID"):
                 try:
                     mid = int(query)
-                    rows = df[df["MESSAGE_ID"] == mid]
-                    matched = pd.concat([matched, rows])
+                    positions = exact_message_id_positions(df, index.lookup_message_ids([mid]), mid)
+                    matched_parts.append(take_rows(df, positions))
                 except ValueError:
                     # query is not numeric – only try as CUSIP
                     pass
 
         if search_by in ("cusip", "any"):
-            if "CUSIP" in df.columns:
-                rows = df[df["CUSIP"].astype(str).str.upper() == query.upper()]
-                matched = pd.concat([matched, rows])
+            if index.has("CUSIP"):
+                matched_parts.append(take_rows(df, index.lookup_text("CUSIP", [query])))
 
         # Also check for partial message_id string match when search_type=any
-        if search_by == "any" and "MESSAGE_ID" in df.columns:
-            rows = df[df["MESSAGE_ID"].astype(str).str.contains(query, na=False, case=False)]
-            matched = pd.concat([matched, rows])
+        if search_by == "any" and index.has("MESSAGE_ID"):
+            matched_parts.append(take_rows(df, index.message_id_text_contains(query)))
 
+        matched = pd.concat(matched_parts) if matched_parts else pd.DataFrame()
         matched = matched.drop_duplicates()
 
         # Include related hierarchy rows so users see complete parent/child context.
         # Scope strictly by CUSIP because MESSAGE_ID can repeat across CUSIPs.
         if request.include_related_hierarchy and len(matched) > 0:
-            if "CUSIP" in df.columns and "CUSIP" in matched.columns:
+            if index.has("CUSIP") and "CUSIP" in matched.columns:
                 matched_cusips = {
                     str(v).strip().upper()
                     for v in matched["CUSIP"].dropna().tolist()
                     if str(v).strip()
                 }
                 if matched_cusips:
-                    cusip_series = df["CUSIP"].astype(str).str.strip().str.upper()
-                    matched = df[cusip_series.isin(matched_cusips)].drop_duplicates()
+                    matched = take_rows(df, index.lookup_text("CUSIP", matched_cusips)).drop_duplicates()
 
         # Stable ordering: newest processed run first, then latest business DATE.
-        sort_cols = []
-        ascending = []
-        if "PROCESSED_AT" in matched.columns:
-            sort_cols.append("PROCESSED_AT")
-            ascending.append(False)
-        if "RUN_ID" in matched.columns:
-            sort_cols.append("RUN_ID")
-            ascending.append(False)
-        if "DATE" in matched.columns:
-            sort_cols.append("DATE")
-            ascending.append(False)
-
-        if sort_cols:
-            matched = matched.sort_values(by=sort_cols, ascending=ascending, kind="mergesort")
-
-        if request.limit and request.limit > 0:
-            matched = matched.head(request.limit)
+        # With a limit only the top rows are selected and sorted.
+        matched = top_k_frame(matched, DEFAULT_SORT, request.limit if request.limit and request.limit > 0 else None)
 
         results = _to_json_safe_records(matched)
         logger.info(f"Security search returned {len(results)} records for query='{query}'")
@@ -597,6 +507,26 @@ def _to_json_safe_records(df: pd.DataFrame, limit: Optional[int] = None) -> List
     return safe.to_dict("records")
 
 
+def _match_identifier_rows(df: pd.DataFrame, index, output_col: str, values: set) -> pd.DataFrame:
+    """
+    Rows whose *output_col* matches any uploaded identifier.
+
+    CUSIP/TICKER are case-insensitive index lookups.  MESSAGE_ID uses float
+    comparison so that Excel-stored float64 values (which may have lost ~1-2
+    ULP precision vs. the stored int64) still match, plus exact text matches.
+    Other columns fall back to a scan.
+    """
+    if index.has(output_col) and output_col in ("CUSIP", "TICKER"):
+        return take_rows(df, index.lookup_text(output_col, values))
+    if output_col == "MESSAGE_ID" and index.has("MESSAGE_ID"):
+        positions = np.union1d(index.lookup_message_ids(values), index.lookup_message_id_text(values))
+        return take_rows(df, positions)
+    if output_col == "ISIN":
+        upper_vals = {v.upper() for v in values}
+        return df[df[output_col].astype(str).str.upper().isin(upper_vals)]
+    return df[df[output_col].astype(str).isin(values)]
+
+
 def _detect_identifier_columns(ids_df: pd.DataFrame) -> dict:
     """
     Auto-detect identifier type from ALL cell values — including the column-name
@@ -651,37 +581,16 @@ async def _run_ids_search(contents_io: io.BytesIO):
             )
         )
 
-    all_records = output_service.read_processed_colors(limit=None)
-    if not all_records:
+    df, index = output_service.indexed_output()
+    if len(df) == 0:
         raise HTTPException(status_code=404, detail="No processed data available to search")
 
-    df = pd.DataFrame(all_records)
     matched = pd.DataFrame()
 
     for output_col, values in detected.items():
         if output_col not in df.columns:
             continue
-        if output_col == "CUSIP":
-            # Case-insensitive string match
-            upper_vals = {v.upper() for v in values}
-            rows = df[df[output_col].astype(str).str.upper().isin(upper_vals)]
-        else:
-            # MESSAGE_ID: use float comparison so that Excel-stored float64 values
-            # (which may have lost ~1-2 ULP precision vs. the stored int64) still match.
-            try:
-                float_vals = set()
-                for v in values:
-                    try:
-                        float_vals.add(float(v))
-                    except (ValueError, OverflowError):
-                        pass
-                output_as_float = pd.to_numeric(df[output_col], errors='coerce')
-                rows = df[
-                    output_as_float.isin(float_vals) |
-                    df[output_col].astype(str).isin(values)
-                ]
-            except Exception:
-                rows = df[df[output_col].astype(str).isin(values)]
+        rows = _match_identifier_rows(df, index, output_col, values)
         matched = pd.concat([matched, rows])
 
     matched = matched.drop_duplicates()
@@ -704,11 +613,10 @@ async def _run_ids_search_with_summary(contents_io: io.BytesIO):
             )
         )
 
-    all_records = output_service.read_processed_colors(limit=None)
-    if not all_records:
+    df, index = output_service.indexed_output()
+    if len(df) == 0:
         raise HTTPException(status_code=404, detail="No processed data available to search")
 
-    df = pd.DataFrame(all_records)
     matched = pd.DataFrame()
     summary = {}
 
@@ -716,24 +624,7 @@ async def _run_ids_search_with_summary(contents_io: io.BytesIO):
         if output_col not in df.columns:
             summary[output_col] = {"searched": len(values), "found": 0, "note": "column not in output"}
             continue
-        if output_col in ("CUSIP", "ISIN", "TICKER"):
-            upper_vals = {v.upper() for v in values}
-            rows = df[df[output_col].astype(str).str.upper().isin(upper_vals)]
-        else:
-            try:
-                float_vals = set()
-                for v in values:
-                    try:
-                        float_vals.add(float(v))
-                    except (ValueError, OverflowError):
-                        pass
-                output_as_float = pd.to_numeric(df[output_col], errors='coerce')
-                rows = df[
-                    output_as_float.isin(float_vals) |
-                    df[output_col].astype(str).isin(values)
-                ]
-            except Exception:
-                rows = df[df[output_col].astype(str).isin(values)]
+        rows = _match_identifier_rows(df, index, output_col, values)
         summary[output_col] = {"searched": len(values), "found": len(rows)}
         matched = pd.concat([matched, rows])
 
@@ -83,8 +83,7 @@ def get_rule_logs(limit: int = 50):
     Returns history of rule create/update/delete operations
     """
     try:
-        logs = rules_service.get_rule_logs()
-        logs = logs[:limit]
+        logs = rules_service.get_rule_logs(limit)
         
         return {
             "logs": logs,
@@ -278,8 +277,9 @@ def test_rule(request: RuleTestRequest):
         excluded = []
         included = []
         
-        for row in request.test_data:
-            if rules_service.evaluate_rule(row, temp_rule):
+        excluded_mask = rules_service.rule_exclusion_mask(request.test_data, [temp_rule])
+        for row, is_excluded in zip(request.test_data, excluded_mask):
+            if is_excluded:
                 excluded.append(row)
             else:
                 included.append(row)
@@ -341,8 +341,7 @@ def get_rule_logs(limit: int = 50):
     Returns history of rule create/update/delete operations
     """
     try:
-        logs = rules_service.get_rule_logs()
-        logs = logs[:limit]
+        logs = rules_service.get_rule_logs(limit)
         
         return {
             "logs": logs,
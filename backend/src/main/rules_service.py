@@ -3,11 +3,14 @@ Rules Engine - Core Business Logic
 Works with ANY storage backend (JSON, S3, or Oracle)
 """
 
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Union
 from datetime import datetime
+import numpy as np
+import pandas as pd
 from storage_config import storage
 import logging
 import logging_service
+from services.log_store import get_log_store
 
 logger = logging.getLogger(__name__)
 
@@ -22,26 +25,19 @@ def _ensure_rules_exist():
         logger.info("✅ Rules storage initialized")
 
 
-def _ensure_logs_exist():
-    """Initialize rule logs storage if doesn't exist"""
-    if not storage.exists(RULE_LOGS_KEY):
-        storage.save(RULE_LOGS_KEY, {"logs": []})
+def _rule_log():
+    """Segmented rule log (see services/log_store.py), imported from rule_logs once"""
+    return get_log_store(RULE_LOGS_KEY, legacy=lambda: storage.load(RULE_LOGS_KEY))
 
 
-def get_rule_logs() -> List[Dict]:
-    """Get rule operation logs"""
-    _ensure_logs_exist()
-    data = storage.load(RULE_LOGS_KEY)
-    return data.get('logs', [])
+def get_rule_logs(limit: int = 50) -> List[Dict]:
+    """Get the latest *limit* rule operation logs (most recent first)"""
+    return _rule_log().latest(limit)
 
 
 def save_rule_log(action: str, rule_name: str, details: str = "", user: str = "admin"):
     """Save rule operation log"""
-    _ensure_logs_exist()
-    logs = get_rule_logs()
-    
     log_entry = {
-        "id": len(logs) + 1,
         "action": action,
         "rule_name": rule_name,
         "details": details,
@@ -49,8 +45,7 @@ def save_rule_log(action: str, rule_name: str, details: str = "", user: str = "a
         "user": user
     }
     
-    logs.insert(0, log_entry)
-    storage.save(RULE_LOGS_KEY, {"logs": logs})
+    _rule_log().append(log_entry)  # assigns the next ID
     logger.info(f"📝 Rule log: {action} - {rule_name}")
 
 
@@ -74,6 +69,48 @@ def get_active_rules() -> List[Dict]:
     return active
 
 
+# Normalize operator names (map all possible frontend formats to backend format)
+_OPERATOR_MAP = {
+    # Equality operators (used for both numeric and text)
+    'equal to': 'equal_to',
+    'not equal to': 'not_equal_to',
+    
+    # Numeric comparison operators
+    'less than': 'less_than',
+    'greater than': 'greater_than',
+    'less than equal to': 'less_than_equal_to',
+    'greater than equal to': 'greater_than_equal_to',
+    'between': 'between',
+    
+    # Text operators
+    'contains': 'contains',
+    'starts with': 'starts_with',
+    'ends with': 'ends_with',
+    
+    # Legacy format support
+    'is equal to': 'equal_to',
+    'is not equal to': 'not_equal_to',
+    'is less than': 'less_than',
+    'is greater than': 'greater_than',
+    'equals': 'equal_to',
+    'not_equals': 'not_equal_to',
+    'not_contains': 'not_contains',
+    'does not contain': 'not_contains',
+    'greater_than': 'greater_than',
+    'less_than': 'less_than',
+    'greater_or_equal': 'greater_than_equal_to',
+    'less_or_equal': 'less_than_equal_to',
+
+    # Frontend shorthand operators
+    'gt': 'greater_than',
+    'lt': 'less_than',
+    'gte': 'greater_than_equal_to',
+    'lte': 'less_than_equal_to',
+    'eq': 'equal_to',
+    'ne': 'not_equal_to'
+}
+
+
 def evaluate_condition(row: Dict, condition: Dict) -> bool:
     """
     Evaluate single condition against a row
@@ -108,49 +145,8 @@ def evaluate_condition(row: Dict, condition: Dict) -> bool:
     value = condition.get('value', '')
     value2 = condition.get('value2', '')  # For 'between' operator
     
-    # Normalize operator names (map all possible frontend formats to backend format)
-    operator_map = {
-        # Equality operators (used for both numeric and text)
-        'equal to': 'equal_to',
-        'not equal to': 'not_equal_to',
-        
-        # Numeric comparison operators
-        'less than': 'less_than',
-        'greater than': 'greater_than',
-        'less than equal to': 'less_than_equal_to',
-        'greater than equal to': 'greater_than_equal_to',
-        'between': 'between',
-        
-        # Text operators
-        'contains': 'contains',
-        'starts with': 'starts_with',
-        'ends with': 'ends_with',
-        
-        # Legacy format support
-        'is equal to': 'equal_to',
-        'is not equal to': 'not_equal_to',
-        'is less than': 'less_than',
-        'is greater than': 'greater_than',
-        'equals': 'equal_to',
-        'not_equals': 'not_equal_to',
-        'not_contains': 'not_contains',
-        'does not contain': 'not_contains',
-        'greater_than': 'greater_than',
-        'less_than': 'less_than',
-        'greater_or_equal': 'greater_than_equal_to',
-        'less_or_equal': 'less_than_equal_to',
-
-        # Frontend shorthand operators
-        'gt': 'greater_than',
-        'lt': 'less_than',
-        'gte': 'greater_than_equal_to',
-        'lte': 'less_than_equal_to',
-        'eq': 'equal_to',
-        'ne': 'not_equal_to'
-    }
-    
     # Map to normalized operator
-    operator = operator_map.get(operator, operator)
+    operator = _OPERATOR_MAP.get(operator, operator)
     
     # Get row value (handle missing columns with case-insensitive lookup)
     row_value = None
@@ -288,12 +284,198 @@ def evaluate_rule(row: Dict, rule: Dict) -> bool:
     return result
 
 
-def apply_rules(data: List[Dict], specific_rule_ids: Optional[List[int]] = None) -> Dict:
+# ── Compiled (vectorized) rule evaluation ─────────────────────────────────────
+#
+# evaluate_condition/evaluate_rule above work one row at a time. The helpers
+# below compile the same conditions once into boolean-mask functions over a
+# whole batch. Each column used by a rule is coerced once (str, lower-case,
+# float) and shared across every rule in the batch. Results match the per-row
+# functions row for row, including the numeric-then-text fallback of
+# equal_to/not_equal_to and the WHERE/AND/OR chaining.
+
+class _RuleFrame:
+    """Column-wise view of the rows being filtered, with per-column coercion caches."""
+
+    def __init__(self, data: Union[List[Dict], pd.DataFrame]):
+        self._records = data if not isinstance(data, pd.DataFrame) else None
+        self._df = data if isinstance(data, pd.DataFrame) else None
+        self.size = len(data)
+        if self._df is not None:
+            self._keys = [str(c) for c in self._df.columns]
+        else:
+            seen = {}
+            for row in data:
+                for key in row.keys():
+                    seen.setdefault(key, None)
+            self._keys = list(seen)
+        self._text: Dict[str, pd.Series] = {}
+        self._lower: Dict[str, pd.Series] = {}
+        self._numeric: Dict[str, tuple] = {}
+
+    def _values(self, column: str) -> List[str]:
+        """str() of each row's value for *column* ('' when the row lacks it)."""
+        wanted = column.lower()
+        matches = [k for k in self._keys if str(k).lower() == wanted]
+        if not matches:
+            return [''] * self.size
+        if self._df is not None:
+            return [str(v) for v in self._df[self._df.columns[self._keys.index(matches[0])]].tolist()]
+        if len(matches) == 1:
+            key = matches[0]
+            return [str(row[key]) if key in row else '' for row in self._records]
+        # Same column under several casings: fall back to the per-row lookup
+        values = []
+        for row in self._records:
+            key = next((k for k in row.keys() if k.lower() == wanted), None)
+            values.append(str(row[key]) if key is not None else '')
+        return values
+
+    def text(self, column: str) -> pd.Series:
+        key = column.lower()
+        if key not in self._text:
+            self._text[key] = pd.Series(self._values(column), dtype=object)
+        return self._text[key]
+
+    def lower(self, column: str) -> pd.Series:
+        key = column.lower()
+        if key not in self._lower:
+            self._lower[key] = self.text(column).str.lower()
+        return self._lower[key]
+
+    def numeric(self, column: str):
+        """(float values, parsed-ok mask) using Python float() semantics."""
+        key = column.lower()
+        if key not in self._numeric:
+            text = self.text(column)
+            parsed = {v: _to_float(v) for v in pd.unique(text)}
+            floats = text.map({v: np.nan if f is None else f for v, f in parsed.items()})
+            ok = text.map({v: f is not None for v, f in parsed.items()})
+            self._numeric[key] = (floats.to_numpy(dtype='float64'), ok.to_numpy(dtype=bool))
+        return self._numeric[key]
+
+
+def _to_float(value) -> Optional[float]:
+    """float(value) or None when it does not parse (mirrors evaluate_condition)."""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _compile_condition(condition: Dict) -> Callable[[_RuleFrame], np.ndarray]:
+    """Compile one condition into a function returning a boolean mask."""
+    column = condition.get('column', '')
+    raw_operator = condition.get('operator', '')
+    operator = _OPERATOR_MAP.get(raw_operator.lower(), raw_operator.lower())
+    compare_value = str(condition.get('value', ''))
+    compare_lower = compare_value.lower()
+    compare_num = _to_float(compare_value)
+
+    if operator in ('equal_to', 'not_equal_to'):
+        def equality(frame: _RuleFrame) -> np.ndarray:
+            text_match = (frame.lower(column) == compare_lower).to_numpy(dtype=bool)
+            if compare_num is not None:
+                nums, ok = frame.numeric(column)
+                match = np.where(ok, nums == compare_num, text_match)
+            else:
+                match = text_match
+            return ~match if operator == 'not_equal_to' else match
+        return equality
+
+    if operator in ('contains', 'not_contains'):
+        def containment(frame: _RuleFrame) -> np.ndarray:
+            match = frame.lower(column).str.contains(compare_lower, regex=False).to_numpy(dtype=bool)
+            return ~match if operator == 'not_contains' else match
+        return containment
+
+    if operator == 'starts_with':
+        return lambda frame: frame.lower(column).str.startswith(compare_lower).to_numpy(dtype=bool)
+
+    if operator == 'ends_with':
+        return lambda frame: frame.lower(column).str.endswith(compare_lower).to_numpy(dtype=bool)
+
+    numeric_ops = {
+        'less_than': np.less,
+        'greater_than': np.greater,
+        'less_than_equal_to': np.less_equal,
+        'greater_than_equal_to': np.greater_equal,
+    }
+    if operator in numeric_ops:
+        op = numeric_ops[operator]
+        if compare_num is None:
+            return lambda frame: np.zeros(frame.size, dtype=bool)
+
+        def comparison(frame: _RuleFrame) -> np.ndarray:
+            nums, ok = frame.numeric(column)
+            return ok & op(nums, compare_num)
+        return comparison
+
+    if operator == 'between':
+        low = compare_num
+        high = _to_float(condition.get('value2', ''))
+        if low is None or high is None:
+            return lambda frame: np.zeros(frame.size, dtype=bool)
+
+        def between(frame: _RuleFrame) -> np.ndarray:
+            nums, ok = frame.numeric(column)
+            return ok & (nums >= low) & (nums <= high)
+        return between
+
+    logger.warning(f"⚠️ Unknown operator: {raw_operator} (normalized: {operator})")
+    return lambda frame: np.zeros(frame.size, dtype=bool)
+
+
+def compile_rule(rule: Dict) -> Callable[[_RuleFrame], np.ndarray]:
+    """
+    Compile a rule into a function returning its exclusion mask.
+
+    Chaining follows evaluate_rule: the first condition seeds the result,
+    'and'/'or' combine with it, 'where' restarts the chain and any other
+    type is evaluated but ignored.
+    """
+    steps = [(c.get('type', 'where'), _compile_condition(c)) for c in rule.get('conditions', [])]
+
+    def rule_mask(frame: _RuleFrame) -> np.ndarray:
+        result = None
+        for condition_type, condition_mask in steps:
+            match = condition_mask(frame)
+            if result is None or condition_type == 'where':
+                result = match
+            elif condition_type == 'and':
+                result = result & match
+            elif condition_type == 'or':
+                result = result | match
+        return result if result is not None else np.zeros(frame.size, dtype=bool)
+    return rule_mask
+
+
+def rule_exclusion_mask(data: Union[List[Dict], pd.DataFrame], rules: List[Dict]) -> np.ndarray:
+    """
+    Boolean mask of rows excluded by *rules* (a row is excluded by the first
+    rule that matches it, so the mask is the OR over all rules).
+    """
+    frame = _RuleFrame(data)
+    excluded = np.zeros(frame.size, dtype=bool)
+    for rule in rules:
+        excluded |= compile_rule(rule)(frame)
+    return excluded
+
+
+def conditions_match_mask(data: Union[List[Dict], pd.DataFrame], conditions: List[Dict]) -> np.ndarray:
+    """Boolean mask of rows matching ALL *conditions* (preset semantics)."""
+    frame = _RuleFrame(data)
+    matched = np.ones(frame.size, dtype=bool)
+    for condition in conditions:
+        matched &= _compile_condition(condition)(frame)
+    return matched
+
+
+def apply_rules(data: Union[List[Dict], pd.DataFrame], specific_rule_ids: Optional[List[int]] = None) -> Dict:
     """
     Apply exclusion rules to filter data
     
     Args:
-        data: List of data rows
+        data: List of data rows, or a DataFrame (filtered_data is then a DataFrame too)
         specific_rule_ids: Optional list of specific rule IDs to apply.
                           If None, applies all active rules.
                           If provided, applies only these rules (even if inactive).
@@ -335,21 +517,13 @@ def apply_rules(data: List[Dict], specific_rule_ids: Optional[List[int]] = None)
                 "original_count": len(data)
             }
     
-    filtered_data = []
-    excluded_count = 0
-    
-    for row in data:
-        should_exclude = False
-        
-        # Check each rule
-        for rule in rules_to_apply:
-            if evaluate_rule(row, rule):
-                should_exclude = True
-                excluded_count += 1
-                break  # One rule matched, exclude this row
-        
-        if not should_exclude:
-            filtered_data.append(row)
+    # Compiled evaluation: one boolean mask per rule over the whole batch
+    excluded = rule_exclusion_mask(data, rules_to_apply)
+    excluded_count = int(excluded.sum())
+    if isinstance(data, pd.DataFrame):
+        filtered_data = data[~excluded]
+    else:
+        filtered_data = [row for row, drop in zip(data, excluded) if not drop]
     
     print(f"✅ Rules applied: {len(rules_to_apply)} rules")
     print(f"📊 Original: {len(data)} rows")
@@ -8,13 +8,26 @@ Each storage "key" becomes an S3 object:
   s3://bucket/storage/presets.json
   s3://bucket/storage/email_config.json
   ...
+
+Loaded objects are kept in an in-process read-through cache keyed by object
+key.  Within S3_STORAGE_CACHE_TTL seconds a load is served from memory with no
+S3 call; after that it is revalidated with a conditional GET (If-None-Match on
+the cached ETag), so an unchanged object costs a 304 with no body.  save()
+writes through, delete() drops the entry.  S3_STORAGE_CACHE=false disables it.
+Every save/delete bumps a per-key generation; a load or save only stores its
+result if no newer write to the key started meanwhile, so a slow load can
+never put stale data over a concurrent save.
 """
 
+import copy
 import json
 import os
+import time
+import threading
 import logging
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 from storage_interface import StorageInterface
+from services.s3_client import get_s3_client
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +40,25 @@ except ImportError:
     BOTO3_AVAILABLE = False
     logger.warning("boto3 not installed. S3 storage unavailable.")
 
+_MISSING = object()
+
+
+def _storage_cache_ttl() -> Optional[float]:
+    """Seconds a cached object is served without revalidation (None = cache disabled)."""
+    if os.getenv("S3_STORAGE_CACHE", "true").strip().lower() == "false":
+        return None
+    try:
+        return max(0.0, float(os.getenv("S3_STORAGE_CACHE_TTL", "5")))
+    except ValueError:
+        return 5.0
+
+
+def _not_modified(error: Exception) -> bool:
+    response = getattr(error, "response", None) or {}
+    code = str(response.get("Error", {}).get("Code", ""))
+    status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return code in ("304", "NotModified") or status == 304
+
 
 class S3Storage(StorageInterface):
     """
@@ -55,18 +87,19 @@ class S3Storage(StorageInterface):
             raise ValueError("S3_BUCKET_NAME not configured")
 
         self._s3 = self._build_client()
+
+        # Read-through cache: object key → {"data", "etag", "checked_at"}
+        self._cache_ttl = _storage_cache_ttl()
+        self._cache: Dict[str, Dict] = {}
+        # Object key → write generation (bumped by every save/delete)
+        self._generations: Dict[str, int] = {}
+        self._cache_lock = threading.Lock()
+        self._cache_counts = {"hits": 0, "revalidated": 0, "misses": 0}
         logger.info(f"S3Storage initialized: s3://{self.bucket_name}/{self.prefix}/")
 
     def _build_client(self):
-        """Build boto3 S3 client."""
-        if self.access_key and self.secret_key:
-            return boto3.client(
-                "s3",
-                aws_access_key_id=self.access_key,
-                aws_secret_access_key=self.secret_key,
-                region_name=self.region,
-            )
-        return boto3.client("s3", region_name=self.region)
+        """Shared pooled S3 client (see services/s3_client.py)."""
+        return get_s3_client(self.region, self.access_key, self.secret_key)
 
     def _object_key(self, key: str) -> str:
         """Convert storage key to full S3 object key."""
@@ -77,30 +110,51 @@ class S3Storage(StorageInterface):
     # ------------------------------------------------------------------ #
 
     def save(self, key: str, data: Any):
-        """Serialize data as JSON and upload to S3."""
+        """Serialize data as JSON and upload to S3 (written through to the cache)."""
         obj_key = self._object_key(key)
+        generation = self._cache_generation(obj_key, bump=True)
         try:
             body = json.dumps(data, indent=2, default=str).encode("utf-8")
-            self._s3.put_object(
+            response = self._s3.put_object(
                 Bucket=self.bucket_name,
                 Key=obj_key,
                 Body=body,
                 ContentType="application/json",
             )
+            # Cache what a load would return (JSON round trip, e.g. datetimes → str)
+            self._cache_store(obj_key, json.loads(body), response.get("ETag"), generation)
             logger.debug(f"S3Storage saved: s3://{self.bucket_name}/{obj_key}")
         except Exception as e:
             logger.error(f"S3Storage failed to save '{key}': {e}")
             raise
 
     def load(self, key: str) -> Optional[Any]:
-        """Download JSON object from S3 and deserialize."""
+        """Download JSON object from S3 and deserialize (through the read cache)."""
         obj_key = self._object_key(key)
+        cached = self._cache_get(obj_key)
+        if cached is not _MISSING:
+            return cached
+        generation = self._cache_generation(obj_key)
+        entry = self._cache_entry(obj_key)
         try:
-            response = self._s3.get_object(Bucket=self.bucket_name, Key=obj_key)
+            if entry and entry.get("etag"):
+                try:
+                    response = self._s3.get_object(
+                        Bucket=self.bucket_name, Key=obj_key, IfNoneMatch=entry["etag"]
+                    )
+                except ClientError as e:
+                    if not _not_modified(e):
+                        raise
+                    return self._cache_revalidated(obj_key, entry, generation)
+            else:
+                response = self._s3.get_object(Bucket=self.bucket_name, Key=obj_key)
             body = response["Body"].read().decode("utf-8")
-            return json.loads(body)
+            data = json.loads(body)
+            self._cache_store(obj_key, data, response.get("ETag"), generation)
+            return copy.deepcopy(data)
         except ClientError as e:
             if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                self._cache_store(obj_key, None, None, generation)
                 return None
             logger.error(f"S3Storage failed to load '{key}': {e}")
             return None
@@ -111,6 +165,9 @@ class S3Storage(StorageInterface):
     def exists(self, key: str) -> bool:
         """Check if S3 object exists."""
         obj_key = self._object_key(key)
+        cached = self._cache_get(obj_key, count=False)
+        if cached is not _MISSING:
+            return cached is not None
         try:
             self._s3.head_object(Bucket=self.bucket_name, Key=obj_key)
             return True
@@ -122,6 +179,7 @@ class S3Storage(StorageInterface):
     def delete(self, key: str):
         """Delete S3 object."""
         obj_key = self._object_key(key)
+        self._cache_generation(obj_key, bump=True)
         try:
             self._s3.delete_object(Bucket=self.bucket_name, Key=obj_key)
             logger.debug(f"S3Storage deleted: {obj_key}")
@@ -149,6 +207,74 @@ class S3Storage(StorageInterface):
             logger.error(f"S3Storage failed to list keys: {e}")
             return []
 
+    # ------------------------------------------------------------------ #
+    #  Read-through cache                                                  #
+    # ------------------------------------------------------------------ #
+
+    def _cache_entry(self, obj_key: str) -> Optional[Dict]:
+        if self._cache_ttl is None:
+            return None
+        with self._cache_lock:
+            return self._cache.get(obj_key)
+
+    def _cache_get(self, obj_key: str, count: bool = True) -> Any:
+        """Copy of the cached object while within the TTL, else _MISSING."""
+        if self._cache_ttl is None:
+            return _MISSING
+        with self._cache_lock:
+            entry = self._cache.get(obj_key)
+            if entry is None or time.monotonic() - entry["checked_at"] > self._cache_ttl:
+                if count:
+                    self._cache_counts["misses"] += 1
+                return _MISSING
+            if count:
+                self._cache_counts["hits"] += 1
+            return copy.deepcopy(entry["data"])
+
+    def _cache_generation(self, obj_key: str, bump: bool = False) -> int:
+        """Current write generation of *obj_key*; *bump* starts a new one and drops the entry."""
+        with self._cache_lock:
+            generation = self._generations.get(obj_key, 0)
+            if bump:
+                generation += 1
+                self._generations[obj_key] = generation
+                self._cache.pop(obj_key, None)
+            return generation
+
+    def _cache_revalidated(self, obj_key: str, entry: Dict, generation: int) -> Any:
+        """S3 answered 304: the cached copy is current again for another TTL."""
+        with self._cache_lock:
+            self._cache_counts["revalidated"] += 1
+            if self._generations.get(obj_key, 0) == generation:
+                entry["checked_at"] = time.monotonic()
+                self._cache.setdefault(obj_key, entry)
+            return copy.deepcopy(entry["data"])
+
+    def _cache_store(self, obj_key: str, data: Any, etag: Optional[str], generation: int):
+        """Cache *data* unless a save/delete of the key started after *generation* was read."""
+        if self._cache_ttl is None:
+            return
+        with self._cache_lock:
+            if self._generations.get(obj_key, 0) != generation:
+                logger.debug(f"S3Storage cache: skipped stale store for {obj_key}")
+                return
+            self._cache[obj_key] = {"data": data, "etag": etag, "checked_at": time.monotonic()}
+
+    def cache_stats(self) -> Dict:
+        """Read-cache hit counts (hits = no S3 call, revalidated = 304, misses = full GET)."""
+        with self._cache_lock:
+            counts = dict(self._cache_counts)
+            keys = len(self._cache)
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            "enabled": self._cache_ttl is not None,
+            "ttl_seconds": self._cache_ttl,
+            "keys": keys,
+            **counts,
+            "hit_ratio": round(counts["hits"] / lookups, 4) if lookups else 0.0,
+            "no_download_ratio": round((counts["hits"] + counts["revalidated"]) / lookups, 4) if lookups else 0.0,
+        }
+
     # ------------------------------------------------------------------ #
     #  Extra helpers                                                       #
     # ------------------------------------------------------------------ #
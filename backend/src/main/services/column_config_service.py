@@ -229,15 +229,9 @@ class ColumnConfigService:
         if not bucket:
             return
         try:
-            import boto3
+            from services.s3_client import get_s3_client
             import json as _json
-            access_key = os.getenv("AWS_ACCESS_KEY_ID", "")
-            secret_key = os.getenv("AWS_SECRET_ACCESS_KEY", "")
-            region = os.getenv("S3_REGION", "us-east-1")
-            if access_key and secret_key:
-                s3 = boto3.client("s3", aws_access_key_id=access_key, aws_secret_access_key=secret_key, region_name=region)
-            else:
-                s3 = boto3.client("s3", region_name=region)
+            s3 = get_s3_client()
             body = _json.dumps(config, indent=2).encode("utf-8")
             s3.put_object(Bucket=bucket, Key="config/column_config.json", Body=body, ContentType="application/json")
             logger.info(f"Synced column_config.json to s3://{bucket}/config/column_config.json")
@@ -14,13 +14,16 @@ No code changes needed - just update .env file!
 ==================================================
 """
 import pandas as pd
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from pathlib import Path
 import logging
 from models.color import ColorRaw
+from models.color_frame import COLOR_RAW_COLUMNS, ColorBatch, coerce_color_frame, validate_color_frame
 from services.column_config_service import get_column_config
 from services.data_source_factory import get_data_source
+from data_source_interface import PartialFetchError
+from services.source_state import SourceStateStore, is_incremental_enabled
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +51,15 @@ class DatabaseService:
         # Data cache (for Excel mode performance)
         self._data_cache = None
         
+        # Incremental fetch (SOURCE_INCREMENTAL=true): rows past the stored
+        # per-CLO watermark are fetched and merged into the persisted state.
+        self._incremental = is_incremental_enabled()
+        self._source_states: Dict[str, SourceStateStore] = {}
+        # Rows fetched by the most recent incremental pull (None = full load)
+        self.last_fetch_delta: Optional[pd.DataFrame] = None
+        # CLO id -> error for CLOs missing from the most recent multi-CLO load
+        self.last_failed_clos: Dict[str, str] = {}
+        
         source_info = self.data_source.get_source_info()
         logger.info(f"DatabaseService initialized with {source_info['type']} data source")
     
@@ -55,7 +67,20 @@ class DatabaseService:
         """
         Load RAW data from configured source (Excel or Oracle)
         Uses abstraction layer for automatic source selection
+        
+        A multi-CLO load where only some CLOs fail returns the rows of the
+        others and records the failures in last_failed_clos.
         """
+        self.last_failed_clos = {}
+        if self._incremental:
+            try:
+                return self._load_incremental()
+            except Exception as e:
+                logger.error(f"❌ Incremental fetch failed ({e}) — falling back to full fetch")
+                self.request_full_refresh()
+                self.last_fetch_delta = None
+                return self._fetch_full()
+        
         source_info = self.data_source.get_source_info()
         
         # Use caching for Excel, fresh data for Oracle
@@ -67,11 +92,107 @@ class DatabaseService:
             return self._data_cache
         else:
             # Oracle or other sources - always fetch fresh
-            logger.info("Fetching fresh data from Oracle data source")
-            df = self.data_source.fetch_data(clo_id=self.clo_id)
+            df = self._fetch_full()
             logger.info(f"✅ Loaded {len(df)} records from Oracle")
             return df
     
+    def _fetch_full(self) -> pd.DataFrame:
+        """Full source result: one query, or every ORACLE_FETCH_CLOS CLO in parallel."""
+        clo_ids = self._multi_clo_ids()
+        if not clo_ids:
+            logger.info("Fetching fresh data from data source")
+            return self.data_source.fetch_data(clo_id=self.clo_id)
+        logger.info(f"Fetching fresh data for {len(clo_ids)} CLO(s)")
+        try:
+            return self.data_source.fetch_clos(clo_ids)
+        except PartialFetchError as e:
+            logger.warning(f"⚠️ {len(e.failed)} of {len(clo_ids)} CLO(s) failed: {sorted(e.failed)}")
+            self.last_failed_clos = e.failed
+            return e.frame
+    
+    def _multi_clo_ids(self) -> List[str]:
+        """CLOs a service without its own clo_id fetches in parallel (ORACLE_FETCH_CLOS)."""
+        return [] if self.clo_id else self.data_source.multi_clo_ids()
+    
+    def _source_state(self, clo_id: Optional[str]) -> SourceStateStore:
+        """Incremental state (watermark + rows) of *clo_id* (None = the default query)."""
+        key = clo_id or ""
+        if key not in self._source_states:
+            self._source_states[key] = SourceStateStore(self.data_source.get_source_info()['type'], clo_id)
+        return self._source_states[key]
+    
+    def _load_incremental(self) -> pd.DataFrame:
+        """
+        Fetch only rows past each watermark and merge them into the stored
+        state; a full refresh replaces a state when one is due.
+        
+        With ORACLE_FETCH_CLOS every CLO keeps its own state and watermark
+        and all CLO queries run concurrently (fetch_clos), so the run covers
+        the same CLO queries as a full fetch; CLOs that fail are recorded in
+        last_failed_clos and left out, as in a full multi-CLO load.
+        """
+        clo_ids = self._multi_clo_ids()
+        if not clo_ids:
+            df, delta = self._load_incremental_clo(self.clo_id)
+            self.last_fetch_delta = delta
+            return df
+        
+        states = {clo_id: self._source_state(clo_id) for clo_id in clo_ids}
+        full = {clo_id for clo_id, state in states.items() if state.full_refresh_due()}
+        watermarks = {clo_id: state.watermark for clo_id, state in states.items() if clo_id not in full}
+        logger.info(
+            f"Fetching {len(clo_ids)} CLO(s) in parallel: {len(full)} full refresh, "
+            f"{len(watermarks)} past their MESSAGE_ID watermark"
+        )
+        try:
+            fetched = self.data_source.fetch_clos(clo_ids, watermarks=watermarks)
+        except PartialFetchError as e:
+            # Failed CLOs keep their state untouched; the run is reported partial
+            logger.warning(f"⚠️ {len(e.failed)} of {len(clo_ids)} CLO(s) failed: {sorted(e.failed)}")
+            self.last_failed_clos = e.failed
+            fetched = e.frame
+        
+        frames, deltas = [], []
+        for clo_id, state in states.items():
+            if clo_id in self.last_failed_clos:
+                continue
+            if 'CLO_ID' in fetched.columns:
+                rows = fetched[fetched['CLO_ID'] == clo_id].reset_index(drop=True)
+            else:
+                rows = pd.DataFrame()
+            if clo_id in full:
+                frames.append(state.replace(rows))
+                deltas.append(None)
+            else:
+                frames.append(state.merge(rows))
+                deltas.append(rows)
+        logger.info(f"✅ Fetched {sum(len(d) for d in deltas if d is not None)} new record(s) since last run")
+        # Any CLO refreshed in full means no usable delta for the whole run
+        usable = deltas and all(d is not None for d in deltas)
+        self.last_fetch_delta = pd.concat(deltas, ignore_index=True) if usable else None
+        frames = [df for df in frames if len(df)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    
+    def _load_incremental_clo(self, clo_id: Optional[str]):
+        """(state rows, fetched delta or None after a full refresh) for one query."""
+        state = self._source_state(clo_id)
+        if state.full_refresh_due():
+            logger.info("Fetching full data set (source state full refresh)")
+            return state.replace(self.data_source.fetch_data(clo_id=clo_id)), None
+        
+        watermark = state.watermark
+        logger.info(f"Fetching rows past MESSAGE_ID watermark {watermark}")
+        delta = self.data_source.fetch_data_since(clo_id, watermark)
+        logger.info(f"✅ Fetched {len(delta)} new record(s) since last run")
+        return state.merge(delta), delta
+    
+    def request_full_refresh(self):
+        """Force the next incremental load to pull the full source result."""
+        if self._incremental:
+            for clo_id in self._multi_clo_ids() or [self.clo_id]:
+                self._source_state(clo_id).request_full_refresh()
+            self._data_cache = None
+    
     def fetch_all_colors(self, asset_classes: Optional[List[str]] = None) -> List[ColorRaw]:
         """
         Fetch all colors, optionally filtered by asset classes
@@ -82,87 +203,99 @@ class DatabaseService:
         Returns:
             List of ColorRaw objects
         """
-        df = self._load_data()
-        
-        # Filter by asset classes if provided
+        colors = self.fetch_colors_batch(asset_classes).colors
+        logger.info(f"Converted {len(colors)} records to ColorRaw objects")
+        return colors
+    
+    def fetch_colors_frame(self, asset_classes: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Columnar counterpart of fetch_all_colors: no ColorRaw objects are built.
+
+        Args:
+            asset_classes: List of sectors to filter (e.g., ['MM-CLO', '2.0_Mezz'])
+
+        Returns:
+            DataFrame with the 18 ColorRaw columns (upper-case names)
+        """
+        return self.fetch_colors_batch(asset_classes).frame
+
+    def fetch_colors_batch(self, asset_classes: Optional[List[str]] = None) -> ColorBatch:
+        """
+        Fetch, coerce and validate colors column-wise.
+
+        Columns are coerced once each (see models/color_frame.py) and the
+        ColorRaw constraints are checked with vectorized masks; rows that
+        would fail validation are dropped and reported in the log.
+        ColorRaw objects are only built if the caller reads batch.colors.
+
+        Args:
+            asset_classes: List of sectors to filter (e.g., ['MM-CLO', '2.0_Mezz'])
+
+        Returns:
+            ColorBatch over the valid rows (frame index 0..n-1)
+        """
+        frames = []
+        bad_rows = []
+        fetched = 0
+        selected = 0
+        for chunk in self._raw_chunks():
+            if fetched == 0:
+                self._warn_missing_columns(chunk.columns)
+            # Row numbers continue across chunks so rejects stay identifiable
+            chunk.index = pd.RangeIndex(fetched, fetched + len(chunk))
+            fetched += len(chunk)
+            if asset_classes:
+                chunk = chunk[chunk['SECTOR'].isin(asset_classes)]
+            selected += len(chunk)
+            frame, bad = validate_color_frame(coerce_color_frame(chunk))
+            frames.append(frame)
+            bad_rows.extend(bad[:max(0, 20 - len(bad_rows))])
+
         if asset_classes:
-            df = df[df['SECTOR'].isin(asset_classes)]
-            logger.info(f"Filtered to {len(df)} records for sectors: {asset_classes}")
-        
-        # Validate required columns are present and log any missing ones up-front.
+            logger.info(f"Filtered to {selected} records for sectors: {asset_classes}")
+        frame = pd.concat(frames) if len(frames) > 1 else frames[0]
+        rejected = selected - len(frame)
+        if rejected:
+            logger.error(f"❌ Schema check rejected {rejected} row(s); first {len(bad_rows)}:")
+            for bad in bad_rows:
+                logger.error(f"   MESSAGE_ID={bad['message_id']} (row {bad['index']}): {'; '.join(bad['errors'])}")
+
+        logger.info(f"Validated {len(frame)} records (columnar)")
+        return ColorBatch(frame.reset_index(drop=True), rejected, bad_rows)
+
+    @staticmethod
+    def _warn_missing_columns(columns):
+        """Log required source columns that are absent (their defaults are used)."""
         # Oracle custom queries MUST alias output columns to these exact names.
-        REQUIRED_COLS = [
-            'MESSAGE_ID', 'TICKER', 'SECTOR', 'CUSIP', 'DATE',
-            'PRICE_LEVEL', 'BID', 'ASK', 'PX', 'SOURCE', 'BIAS', 'RANK',
-            'COV_PRICE', 'PERCENT_DIFF', 'PRICE_DIFF', 'CONFIDENCE', 'DATE_1', 'DIFF_STATUS'
-        ]
-        actual_cols = set(df.columns.tolist())
-        missing = [c for c in REQUIRED_COLS if c not in actual_cols]
+        missing = [c for c in COLOR_RAW_COLUMNS if c not in set(columns)]
         if missing:
             logger.warning(
                 f"⚠️ Data source is missing required column(s): {missing}. "
-                "Rows that reference missing columns will be skipped. "
+                "Defaults are used for missing columns. "
                 "If using Oracle, ensure your custom query aliases output columns to the "
                 "standard names: MESSAGE_ID, TICKER, SECTOR, CUSIP, DATE, PRICE_LEVEL, "
                 "BID, ASK, PX, SOURCE, BIAS, RANK, COV_PRICE, PERCENT_DIFF, PRICE_DIFF, "
                 "CONFIDENCE, DATE_1, DIFF_STATUS."
             )
 
-        def _safe_float(val, default=0.0):
-            try:
-                f = float(val)
-                import math
-                return default if math.isnan(f) else f
-            except Exception:
-                return default
-
-        def _safe_int(val, default=0):
-            try:
-                return int(float(val)) if val is not None else default
-            except Exception:
-                return default
-
-        def _safe_date(val):
-            try:
-                return pd.to_datetime(val)
-            except Exception:
-                return pd.Timestamp.now()
+    def _raw_chunks(self):
+        """
+        RAW source rows for the columnar pipeline, chunk by chunk.
 
-        def _get(row, col, default=''):
-            return row[col] if col in actual_cols else default
+        A full (non-incremental) single-query Oracle load is streamed batch
+        by batch (OracleDataSource.iter_batches), so the raw result is never
+        held whole; every other case (including parallel multi-CLO fetches)
+        yields the _load_data() frame once.
+        """
+        if (
+            not self._incremental
+            and self.data_source.get_source_info()['type'] != 'Excel'
+            and not self._multi_clo_ids()
+        ):
+            logger.info("Streaming fresh data from Oracle data source")
+            return self.data_source.iter_batches(clo_id=self.clo_id)
+        return iter([self._load_data().copy(deep=False)])
 
-        # Convert to ColorRaw objects
-        colors = []
-        for _, row in df.iterrows():
-            try:
-                color = ColorRaw(
-                    message_id=_safe_int(_get(row, 'MESSAGE_ID', 0)),
-                    ticker=str(_get(row, 'TICKER')),
-                    sector=str(_get(row, 'SECTOR')),
-                    cusip=str(_get(row, 'CUSIP')),
-                    date=_safe_date(_get(row, 'DATE', pd.Timestamp.now())),
-                    price_level=_safe_float(_get(row, 'PRICE_LEVEL', 0.0)),
-                    bid=_safe_float(_get(row, 'BID', 0.0)),
-                    ask=_safe_float(_get(row, 'ASK', 0.0)),
-                    px=_safe_float(_get(row, 'PX', 0.0)),
-                    source=str(_get(row, 'SOURCE')),
-                    bias=str(_get(row, 'BIAS')),
-                    rank=_safe_int(_get(row, 'RANK', 1)),
-                    cov_price=_safe_float(_get(row, 'COV_PRICE', 0.0)),
-                    percent_diff=_safe_float(_get(row, 'PERCENT_DIFF', 0.0)),
-                    price_diff=_safe_float(_get(row, 'PRICE_DIFF', 0.0)),
-                    confidence=_safe_int(_get(row, 'CONFIDENCE', 5)),
-                    date_1=_safe_date(_get(row, 'DATE_1', pd.Timestamp.now())),
-                    diff_status=str(_get(row, 'DIFF_STATUS'))
-                )
-                colors.append(color)
-            except Exception as e:
-                logger.error(f"Error converting row {row.get('MESSAGE_ID')}: {e}")
-                continue
-        
-        logger.info(f"Converted {len(colors)} records to ColorRaw objects")
-        return colors
-    
     def fetch_colors_by_cusip(self, cusip_list: List[str]) -> List[ColorRaw]:
         """
         Fetch colors for specific CUSIPs
@@ -173,63 +306,11 @@ class DatabaseService:
         Returns:
             List of ColorRaw objects
         """
-        df = self._load_data()
-        df_filtered = df[df['CUSIP'].isin(cusip_list)]
+        batch = self.fetch_colors_batch()
+        selected = batch.where(batch.frame['CUSIP'].isin([str(c) for c in cusip_list]))
         
-        logger.info(f"Found {len(df_filtered)} colors for {len(cusip_list)} CUSIPs")
-
-        actual_cols = set(df_filtered.columns.tolist())
-
-        def _sf(val, d=0.0):
-            try:
-                import math; f = float(val); return d if math.isnan(f) else f
-            except Exception:
-                return d
-
-        def _si(val, d=0):
-            try:
-                return int(float(val)) if val is not None else d
-            except Exception:
-                return d
-
-        def _sd(val):
-            try:
-                return pd.to_datetime(val)
-            except Exception:
-                return pd.Timestamp.now()
-
-        def _get(row, col, default=''):
-            return row[col] if col in actual_cols else default
-
-        colors = []
-        for _, row in df_filtered.iterrows():
-            try:
-                color = ColorRaw(
-                    message_id=_si(_get(row, 'MESSAGE_ID', 0)),
-                    ticker=str(_get(row, 'TICKER')),
-                    sector=str(_get(row, 'SECTOR')),
-                    cusip=str(_get(row, 'CUSIP')),
-                    date=_sd(_get(row, 'DATE', pd.Timestamp.now())),
-                    price_level=_sf(_get(row, 'PRICE_LEVEL', 0.0)),
-                    bid=_sf(_get(row, 'BID', 0.0)),
-                    ask=_sf(_get(row, 'ASK', 0.0)),
-                    px=_sf(_get(row, 'PX', 0.0)),
-                    source=str(_get(row, 'SOURCE')),
-                    bias=str(_get(row, 'BIAS')),
-                    rank=_si(_get(row, 'RANK', 1)),
-                    cov_price=_sf(_get(row, 'COV_PRICE', 0.0)),
-                    percent_diff=_sf(_get(row, 'PERCENT_DIFF', 0.0)),
-                    price_diff=_sf(_get(row, 'PRICE_DIFF', 0.0)),
-                    confidence=_si(_get(row, 'CONFIDENCE', 5)),
-                    date_1=_sd(_get(row, 'DATE_1', pd.Timestamp.now())),
-                    diff_status=str(_get(row, 'DIFF_STATUS'))
-                )
-                colors.append(color)
-            except Exception as e:
-                logger.error(f"Error converting row: {e}")
-                continue
-        
-        return colors
+        logger.info(f"Found {len(selected)} colors for {len(cusip_list)} CUSIPs")
+        return selected.colors
     
     def fetch_colors_by_message_id(self, message_ids: List[int]) -> List[ColorRaw]:
         """
@@ -241,63 +322,11 @@ class DatabaseService:
         Returns:
             List of ColorRaw objects
         """
-        df = self._load_data()
-        df_filtered = df[df['MESSAGE_ID'].isin(message_ids)]
-        
-        logger.info(f"Found {len(df_filtered)} colors for {len(message_ids)} message IDs")
-
-        actual_cols = set(df_filtered.columns.tolist())
-
-        def _sf(val, d=0.0):
-            try:
-                import math; f = float(val); return d if math.isnan(f) else f
-            except Exception:
-                return d
-
-        def _si(val, d=0):
-            try:
-                return int(float(val)) if val is not None else d
-            except Exception:
-                return d
-
-        def _sd(val):
-            try:
-                return pd.to_datetime(val)
-            except Exception:
-                return pd.Timestamp.now()
-
-        def _get(row, col, default=''):
-            return row[col] if col in actual_cols else default
-
-        colors = []
-        for _, row in df_filtered.iterrows():
-            try:
-                color = ColorRaw(
-                    message_id=_si(_get(row, 'MESSAGE_ID', 0)),
-                    ticker=str(_get(row, 'TICKER')),
-                    sector=str(_get(row, 'SECTOR')),
-                    cusip=str(_get(row, 'CUSIP')),
-                    date=_sd(_get(row, 'DATE', pd.Timestamp.now())),
-                    price_level=_sf(_get(row, 'PRICE_LEVEL', 0.0)),
-                    bid=_sf(_get(row, 'BID', 0.0)),
-                    ask=_sf(_get(row, 'ASK', 0.0)),
-                    px=_sf(_get(row, 'PX', 0.0)),
-                    source=str(_get(row, 'SOURCE')),
-                    bias=str(_get(row, 'BIAS')),
-                    rank=_si(_get(row, 'RANK', 1)),
-                    cov_price=_sf(_get(row, 'COV_PRICE', 0.0)),
-                    percent_diff=_sf(_get(row, 'PERCENT_DIFF', 0.0)),
-                    price_diff=_sf(_get(row, 'PRICE_DIFF', 0.0)),
-                    confidence=_si(_get(row, 'CONFIDENCE', 5)),
-                    date_1=_sd(_get(row, 'DATE_1', pd.Timestamp.now())),
-                    diff_status=str(_get(row, 'DIFF_STATUS'))
-                )
-                colors.append(color)
-            except Exception as e:
-                logger.error(f"Error converting row: {e}")
-                continue
+        batch = self.fetch_colors_batch()
+        selected = batch.where(batch.frame['MESSAGE_ID'].isin(message_ids))
         
-        return colors
+        logger.info(f"Found {len(selected)} colors for {len(message_ids)} message IDs")
+        return selected.colors
     
     def fetch_monthly_stats(self, months: int = 12) -> List[dict]:
         """
@@ -315,8 +344,8 @@ class DatabaseService:
             from services.processed_data_reader import get_processed_data_reader
             reader = get_processed_data_reader()
             
-            # Read ALL processed colors to count by month
-            df_output = reader.read_processed_data()
+            # Only the date columns are needed to count by month
+            df_output = reader.read_processed_data(columns=['PROCESSED_AT', 'DATE'])
             
             if len(df_output) == 0:
                 logger.warning("No data in processed output for monthly stats")
@@ -6,6 +6,7 @@ import os
 import pandas as pd
 from typing import Dict, Any, Optional
 from data_source_interface import DataSourceInterface
+from services.excel_source_cache import get_excel_source_cache, is_excel_source_cache_enabled
 
 
 class ExcelDataSource(DataSourceInterface):
@@ -33,11 +34,22 @@ class ExcelDataSource(DataSourceInterface):
             
         Returns:
             DataFrame with raw data
+        
+        The parsed workbook is shared process-wide and kept as a Parquet
+        sidecar (services.excel_source_cache); it is re-parsed only when the
+        file's path, mtime or size changes.
         """
         if not os.path.exists(self.file_path):
             raise FileNotFoundError(f"Excel file not found: {self.file_path}")
         
-        df = pd.read_excel(self.file_path)
+        if is_excel_source_cache_enabled():
+            return get_excel_source_cache().load(self.file_path, self._parse)
+        return self._parse(self.file_path)
+    
+    @staticmethod
+    def _parse(file_path: str) -> pd.DataFrame:
+        """Read the workbook through openpyxl."""
+        df = pd.read_excel(file_path)
         
         # Standardize column names (uppercase, strip spaces)
         df.columns = df.columns.str.strip().str.upper()
@@ -58,8 +70,8 @@ class ExcelDataSource(DataSourceInterface):
                     "message": f"Excel file not found: {self.file_path}"
                 }
             
-            # Try to read the file
-            df = pd.read_excel(self.file_path)
+            # Try to read the file (served from the source cache when current)
+            df = self.fetch_data()
             row_count = len(df)
             
             return {
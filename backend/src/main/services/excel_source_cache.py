@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Excel Source Cache - Process-wide parsed copy of the RAW input workbook
+
+Parsing "Color today.xlsx" through openpyxl takes far longer than the rest of
+a fetch, and every DatabaseService (one per manual CLO fetch request) used to
+parse it again.  The first read converts the workbook once into a Parquet
+sidecar; later reads, in this process or after a restart, load the sidecar
+(or the in-memory copy) instead.
+
+Entries are keyed by the workbook's fingerprint (absolute path, mtime, size):
+replacing or editing the file changes the fingerprint and the next read
+re-parses it and rewrites the sidecar.
+
+  EXCEL_SOURCE_CACHE      true (default) | false
+  EXCEL_SOURCE_CACHE_DIR  sidecar directory (default: Source_Cache/ in the
+                          project root)
+
+Layout: <EXCEL_SOURCE_CACHE_DIR>/<sha1(path)>.parquet, with the fingerprint
+stored in the Parquet schema metadata.
+"""
+import os
+import hashlib
+import threading
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_KEY = b"excel_source_fingerprint"
+
+
+def is_excel_source_cache_enabled() -> bool:
+    """False when EXCEL_SOURCE_CACHE=false."""
+    return os.getenv("EXCEL_SOURCE_CACHE", "true").strip().lower() != "false"
+
+
+def get_excel_source_cache_dir() -> str:
+    """Directory holding workbook sidecars (EXCEL_SOURCE_CACHE_DIR)."""
+    cache_dir = os.getenv("EXCEL_SOURCE_CACHE_DIR", "").strip()
+    if cache_dir:
+        return cache_dir
+    return str(Path(__file__).parents[4] / "Source_Cache")
+
+
+def file_fingerprint(path: str) -> str:
+    """path|mtime_ns|size of *path* (raises FileNotFoundError)."""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+
+
+class ExcelSourceCache:
+    """Parsed workbooks in memory and as Parquet sidecars, keyed by fingerprint."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self._memory: Dict[str, Tuple[str, pd.DataFrame]] = {}
+        self.memory_hits = 0
+        self.sidecar_hits = 0
+        self.parses = 0
+
+    def _sidecar_path(self, path: str) -> str:
+        name = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.parquet")
+
+    def _path_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._path_locks.setdefault(key, threading.Lock())
+
+    def _memory_hit(self, key: str, fingerprint: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is None or cached[0] != fingerprint:
+                return None
+            self.memory_hits += 1
+        # The cached frame is never modified, so copy it outside the lock
+        return cached[1].copy()
+
+    def load(self, path: str, parse: Callable[[str], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Parsed contents of *path*; *parse* runs only when neither the memory
+        copy nor the sidecar matches the file's current fingerprint.
+        Callers get their own copy, so in-place edits never reach the cache.
+        A parse holds only this workbook's lock: other workbooks and memory
+        hits are not blocked behind it.
+        """
+        fingerprint = file_fingerprint(path)
+        key = os.path.abspath(path)
+        df = self._memory_hit(key, fingerprint)
+        if df is not None:
+            return df
+
+        with self._path_lock(key):
+            # Another caller may have loaded it while we waited
+            df = self._memory_hit(key, fingerprint)
+            if df is not None:
+                return df
+
+            df = self._read_sidecar(path, fingerprint)
+            if df is not None:
+                with self._lock:
+                    self.sidecar_hits += 1
+                logger.info(f"📦 Loaded {len(df)} row(s) from workbook sidecar ({os.path.basename(path)})")
+            else:
+                df = parse(path)
+                with self._lock:
+                    self.parses += 1
+                self._write_sidecar(path, fingerprint, df)
+            with self._lock:
+                self._memory[key] = (fingerprint, df)
+            return df.copy()
+
+    def _read_sidecar(self, path: str, fingerprint: str) -> Optional[pd.DataFrame]:
+        sidecar = self._sidecar_path(path)
+        if not os.path.exists(sidecar):
+            return None
+        try:
+            metadata = pq.read_schema(sidecar).metadata or {}
+            if metadata.get(FINGERPRINT_KEY, b"").decode("utf-8") != fingerprint:
+                return None
+            return pq.read_table(sidecar).to_pandas()
+        except Exception as e:
+            logger.warning(f"Workbook sidecar {sidecar} unreadable ({e}) — re-parsing")
+            return None
+
+    def _write_sidecar(self, path: str, fingerprint: str, df: pd.DataFrame):
+        sidecar = self._sidecar_path(path)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            metadata = dict(table.schema.metadata or {})
+            metadata[FINGERPRINT_KEY] = fingerprint.encode("utf-8")
+            tmp_path = f"{sidecar}.{threading.get_ident()}.tmp"
+            pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+            os.replace(tmp_path, sidecar)
+            logger.info(f"📦 Wrote workbook sidecar for {os.path.basename(path)} ({len(df)} row(s))")
+        except Exception as e:
+            # e.g. mixed-type columns Arrow cannot store — the memory copy still works
+            logger.warning(f"Could not write workbook sidecar for {path}: {e}")
+
+    def invalidate(self, path: str):
+        """Drop the memory copy and sidecar of *path*."""
+        key = os.path.abspath(path)
+        with self._path_lock(key):
+            with self._lock:
+                self._memory.pop(key, None)
+            try:
+                os.remove(self._sidecar_path(path))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": is_excel_source_cache_enabled(),
+                "cache_dir": self.cache_dir,
+                "workbooks": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "sidecar_hits": self.sidecar_hits,
+                "parses": self.parses,
+            }
+
+
+# Singleton instance
+_source_cache: Optional[ExcelSourceCache] = None
+_source_cache_lock = threading.Lock()
+
+
+def get_excel_source_cache() -> ExcelSourceCache:
+    """Get singleton Excel source cache"""
+    global _source_cache
+    if _source_cache is None:
+        with _source_cache_lock:
+            if _source_cache is None:
+                _source_cache = ExcelSourceCache(get_excel_source_cache_dir())
+    return _source_cache
@@ -0,0 +1,364 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Local Segment Store - Append-only columnar storage for processed output
+
+Enabled with OUTPUT_LOCAL_FORMAT=parquet (default is the legacy single
+Processed_Colors_Output.xlsx workbook).
+
+Every call to append() writes the new batch as immutable Parquet segments,
+one per (RUN_ID, SECTOR) partition, and records them in a small manifest.
+Existing segments are never read or rewritten on append, so the cost of a
+run depends on the batch size only — not on how much history has piled up.
+
+Layout (next to the legacy workbook):
+  Processed_Colors_Segments/
+      manifest.json
+      RUN_ID=12/SECTOR=MM-CLO/part-20260316_030138_ab12cd34.parquet
+      RUN_ID=12/SECTOR=2.0_Mezz/part-20260316_030138_ef56ab78.parquet
+      ...
+
+The manifest keeps per-segment row counts so row statistics and run deletes
+never need to open the data files.
+"""
+import os
+import json
+import shutil
+import uuid
+import threading
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import pandas as pd
+
+from services.output_filters import (
+    apply_filters,
+    project,
+    read_columns,
+    read_parquet,
+    run_may_match,
+    sector_may_match,
+)
+
+logger = logging.getLogger(__name__)
+
+SEGMENTS_DIR_NAME = "Processed_Colors_Segments"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def get_local_output_format() -> str:
+    """Return the configured local output format ('xlsx' or 'parquet')."""
+    fmt = os.getenv("OUTPUT_LOCAL_FORMAT", "xlsx").strip().lower()
+    return "parquet" if fmt == "parquet" else "xlsx"
+
+
+def segments_root_for(output_file_path: str) -> str:
+    """Segment directory that lives alongside the legacy output workbook."""
+    return str(Path(output_file_path).with_name(SEGMENTS_DIR_NAME))
+
+
+def _partition_value(value) -> str:
+    """Directory-safe partition value (sector names may contain '/' or spaces)."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return "none"
+    text = str(value).strip()
+    return quote(text, safe="-_.") if text else "none"
+
+
+def _normalize_run_id(value) -> Optional[int]:
+    """Coerce a RUN_ID cell into int (or None for legacy rows without one)."""
+    try:
+        if value is None or pd.isna(value):
+            return None
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def dedup_latest_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep only the last row per (MESSAGE_ID, CUSIP) — the read-time equivalent
+    of the legacy replace-on-append behaviour. Input must be in write order.
+    """
+    if df is None or len(df) == 0 or "MESSAGE_ID" not in df.columns:
+        return df
+    message_key = df["MESSAGE_ID"].astype(str).str.strip()
+    cusip_key = (
+        df["CUSIP"].astype(str).str.strip().str.upper()
+        if "CUSIP" in df.columns else pd.Series("", index=df.index)
+    )
+    keep = ~pd.DataFrame({"m": message_key, "c": cusip_key}).duplicated(keep="last")
+    return df[keep].reset_index(drop=True)
+
+
+class LocalSegmentStore:
+    """
+    Append-only Parquet segment store with a JSON manifest.
+
+    All manifest mutations go through a process-wide lock and are written
+    atomically (temp file + os.replace) so a crash mid-write never leaves a
+    half-written manifest behind.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, root_dir: str):
+        self.root_dir = str(root_dir)
+        self.manifest_path = os.path.join(self.root_dir, MANIFEST_FILE)
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    # ── manifest ──────────────────────────────────────────────────────────────
+
+    def exists(self) -> bool:
+        """True once the store has a manifest on disk."""
+        return os.path.exists(self.manifest_path)
+
+    def _load_manifest(self) -> Dict:
+        if not os.path.exists(self.manifest_path):
+            return {"version": MANIFEST_VERSION, "segments": []}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Could not read segment manifest ({e}) — treating store as empty")
+            return {"version": MANIFEST_VERSION, "segments": []}
+
+    def _save_manifest(self, manifest: Dict):
+        manifest["updated_at"] = datetime.now().isoformat()
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, default=str)
+        os.replace(tmp_path, self.manifest_path)
+
+    def ensure_manifest(self):
+        """Create an empty manifest if the store is brand new."""
+        with self._lock:
+            if not os.path.exists(self.manifest_path):
+                self._save_manifest({"version": MANIFEST_VERSION, "segments": []})
+
+    def list_segments(self) -> List[Dict]:
+        """Manifest entries in append order (oldest first)."""
+        return list(self._load_manifest().get("segments", []))
+
+    # ── writes ────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _segment_stats(df: pd.DataFrame) -> Dict:
+        """Row-count statistics stored in the manifest for each segment."""
+        by_type = {}
+        if "PROCESSING_TYPE" in df.columns:
+            by_type = {str(k): int(v) for k, v in df["PROCESSING_TYPE"].value_counts().items()}
+        parents = children = 0
+        if "IS_PARENT" in df.columns:
+            parents = int((df["IS_PARENT"] == True).sum())  # noqa: E712
+            children = int((df["IS_PARENT"] == False).sum())  # noqa: E712
+        return {"processing_types": by_type, "parents": parents, "children": children}
+
+    def append(self, df: pd.DataFrame) -> int:
+        """
+        Write *df* as new immutable segments partitioned by RUN_ID and SECTOR.
+
+        Returns the number of rows written.
+        """
+        if df is None or len(df) == 0:
+            return 0
+
+        run_col = df["RUN_ID"] if "RUN_ID" in df.columns else pd.Series([None] * len(df), index=df.index)
+        sector_col = df["SECTOR"] if "SECTOR" in df.columns else pd.Series([None] * len(df), index=df.index)
+        keys = pd.DataFrame({
+            "run": run_col.map(_normalize_run_id).astype(object),
+            "sector": sector_col.where(sector_col.notna(), None).astype(object),
+        }, index=df.index)
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        new_entries = []
+        for (run_id, sector), idx in keys.groupby(["run", "sector"], dropna=False, sort=False).groups.items():
+            run_id = _normalize_run_id(run_id)
+            sector = None if sector is None or pd.isna(sector) else str(sector)
+            part = df.loc[idx]
+
+            rel_dir = os.path.join(f"RUN_ID={_partition_value(run_id)}", f"SECTOR={_partition_value(sector)}")
+            rel_path = os.path.join(rel_dir, f"part-{stamp}_{uuid.uuid4().hex[:8]}.parquet")
+            abs_path = os.path.join(self.root_dir, rel_path)
+            os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+            part.to_parquet(abs_path, index=False, engine="pyarrow")
+
+            entry = {
+                "path": rel_path.replace(os.sep, "/"),
+                "run_id": run_id,
+                "sector": sector,
+                "rows": int(len(part)),
+                "created_at": datetime.now().isoformat(),
+            }
+            entry.update(self._segment_stats(part))
+            new_entries.append(entry)
+
+        with self._lock:
+            manifest = self._load_manifest()
+            manifest.setdefault("segments", []).extend(new_entries)
+            self._save_manifest(manifest)
+
+        logger.info(f"✅ Segment store: wrote {len(df)} row(s) in {len(new_entries)} segment(s)")
+        return int(len(df))
+
+    def delete_run(self, run_id: int) -> int:
+        """
+        Drop every segment belonging to *run_id*.
+
+        Only the manifest and the run's own files are touched.
+        Returns the number of rows removed.
+        """
+        target = _normalize_run_id(run_id)
+        with self._lock:
+            manifest = self._load_manifest()
+            segments = manifest.get("segments", [])
+            doomed = [s for s in segments if _normalize_run_id(s.get("run_id")) == target]
+            if not doomed:
+                return 0
+            manifest["segments"] = [s for s in segments if _normalize_run_id(s.get("run_id")) != target]
+            self._save_manifest(manifest)
+
+        removed = 0
+        for seg in doomed:
+            removed += int(seg.get("rows", 0) or 0)
+            try:
+                os.remove(os.path.join(self.root_dir, seg["path"]))
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Could not remove segment file {seg['path']}: {e}")
+
+        run_dir = os.path.join(self.root_dir, f"RUN_ID={_partition_value(target)}")
+        shutil.rmtree(run_dir, ignore_errors=True)
+        return removed
+
+    def clear(self):
+        """Remove all segments and reset the manifest."""
+        with self._lock:
+            for name in os.listdir(self.root_dir):
+                path = os.path.join(self.root_dir, name)
+                if os.path.isdir(path) and name.startswith("RUN_ID="):
+                    shutil.rmtree(path, ignore_errors=True)
+            self._save_manifest({"version": MANIFEST_VERSION, "segments": []})
+
+    def import_legacy_excel(self, excel_path: str) -> int:
+        """
+        One-time migration of an existing Processed_Colors_Output.xlsx into
+        segments, so switching OUTPUT_LOCAL_FORMAT keeps the run history.
+        """
+        if self.exists() or not os.path.exists(excel_path):
+            self.ensure_manifest()
+            return 0
+        try:
+            legacy_df = pd.read_excel(excel_path, engine="openpyxl")
+        except Exception as e:
+            logger.warning(f"Could not import legacy output workbook ({e}) — starting empty segment store")
+            self.ensure_manifest()
+            return 0
+        if len(legacy_df) == 0:
+            self.ensure_manifest()
+            return 0
+        rows = self.append(legacy_df)
+        logger.info(f"📦 Imported {rows} legacy row(s) from {excel_path} into segment store")
+        return rows
+
+    # ── reads ─────────────────────────────────────────────────────────────────
+
+    def read(
+        self,
+        nrows: Optional[int] = None,
+        dedup_latest: bool = False,
+        columns: Optional[List[str]] = None,
+        filters: Optional[Dict] = None,
+        strict: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Read segments in append order and concatenate (column union).
+
+        With *nrows*, stops opening files once enough rows are collected.
+        With *dedup_latest* (OUTPUT_PRESERVE_HISTORY=false), only the newest
+        row per (MESSAGE_ID, CUSIP) is kept — the read-time equivalent of the
+        legacy workbook's replace-on-append behaviour.
+
+        *columns* / *filters* (see services.output_filters) prune the read:
+        segments whose RUN_ID / SECTOR partition or PROCESSING_TYPE counts
+        cannot match are not opened, and the rest are read with column and
+        row-group pruning.  With *dedup_latest*, rows are filtered after the
+        dedup so a superseded row never reappears.
+
+        An unreadable segment is logged and skipped unless *strict*, in which
+        case the error propagates so the caller never sees a partial result.
+        """
+        filters = filters or {}
+        pushdown = filters if not dedup_latest else {}
+        read_cols = read_columns(columns, filters, dedup=dedup_latest)
+        frames = []
+        collected = 0
+        skipped = 0
+        for seg in self.list_segments():
+            if pushdown and not self._segment_may_match(seg, pushdown):
+                skipped += 1
+                continue
+            path = os.path.join(self.root_dir, seg["path"])
+            try:
+                if pushdown or read_cols is not None:
+                    part = read_parquet(path, columns=read_cols, filters=pushdown)
+                else:
+                    part = pd.read_parquet(path, engine="pyarrow")
+            except Exception as e:
+                if strict:
+                    raise
+                logger.error(f"  Failed to read segment {seg['path']}: {e} — skipping")
+                continue
+            if len(part) == 0:
+                continue
+            frames.append(part)
+            collected += len(part)
+            if nrows and not dedup_latest and collected >= nrows:
+                break
+        if skipped:
+            logger.info(f"Segment store: pruned {skipped} segment(s) by partition")
+
+        if not frames:
+            return pd.DataFrame()
+
+        df = pd.concat(frames, ignore_index=True)
+        if dedup_latest:
+            df = dedup_latest_rows(df)
+            df = apply_filters(df, filters)
+        if nrows:
+            df = df.head(nrows)
+        return project(df, columns)
+
+    @staticmethod
+    def _segment_may_match(seg: Dict, filters: Dict) -> bool:
+        """False when the manifest entry proves no row of the segment can match."""
+        if not sector_may_match(seg.get("sector"), filters) or not run_may_match(seg.get("run_id"), filters):
+            return False
+        types = seg.get("processing_types")
+        if "processing_type" in filters and types:
+            return int(types.get(filters["processing_type"], 0) or 0) > 0
+        return True
+
+    def stats(self) -> Dict:
+        """Aggregate row statistics straight from the manifest (no data reads)."""
+        total = parents = children = 0
+        by_type: Dict[str, int] = {}
+        segments = self.list_segments()
+        for seg in segments:
+            total += int(seg.get("rows", 0) or 0)
+            parents += int(seg.get("parents", 0) or 0)
+            children += int(seg.get("children", 0) or 0)
+            for k, v in (seg.get("processing_types") or {}).items():
+                by_type[k] = by_type.get(k, 0) + int(v)
+        return {
+            "total": total,
+            "processing_types": by_type,
+            "parents": parents,
+            "children": children,
+            "segments": len(segments),
+        }
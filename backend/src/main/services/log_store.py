@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Log Store - Append-only segmented storage for audit / execution logs
+
+Unified logs, cron execution logs, rule logs, email logs and backup activity
+logs used to be one JSON document each, loaded in full, prepended to,
+truncated and written back for every entry — on S3 a GET+PUT of the whole
+history per log line.
+
+Each log is now a small head plus immutable segments:
+
+  logs/<name>/head.json         next_id, the active segment's entries and
+                                the index of sealed segments
+  logs/<name>/seg-000001.jsonl  sealed segment, one entry per line (oldest first)
+
+Appending rewrites only the head (bounded by LOG_SEGMENT_ENTRIES entries);
+when the active segment is full it is sealed into a new seg-*.jsonl file.
+Reading the latest few entries reads only the head.  Retention drops whole
+sealed segments once the rest already hold max_entries; compact() rewrites
+segments for age-based cleanup, update() rewrites the one segment holding an
+entry (revert / output-deleted marks).
+
+Files live beside the other structured data: in the JSON data directory, or
+under the S3Storage prefix when storage is S3 (storage_config).  On first use
+a log imports its legacy JSON document.
+
+  LOG_SEGMENT_ENTRIES  entries per segment (default 50)
+"""
+import os
+import json
+import threading
+import logging
+from typing import Callable, Dict, Iterator, List, Optional
+
+from storage_config import storage
+
+logger = logging.getLogger(__name__)
+
+HEAD_FILE = "head.json"
+
+try:
+    from botocore.exceptions import ClientError
+except ImportError:
+    ClientError = Exception
+
+
+def get_log_segment_entries() -> int:
+    """Entries per sealed segment (LOG_SEGMENT_ENTRIES, default 50)."""
+    try:
+        return max(1, int(os.getenv("LOG_SEGMENT_ENTRIES", "50")))
+    except ValueError:
+        return 50
+
+
+def _segment_name(seg: int) -> str:
+    return f"seg-{seg:06d}.jsonl"
+
+
+def _encode_lines(entries: List[Dict]) -> bytes:
+    return "".join(json.dumps(entry, default=str) + "\n" for entry in entries).encode("utf-8")
+
+
+def _decode_lines(body: bytes) -> List[Dict]:
+    return [json.loads(line) for line in body.decode("utf-8").splitlines() if line.strip()]
+
+
+class _LocalLogFiles:
+    """Log files in a local directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def read(self, name: str) -> Optional[bytes]:
+        try:
+            with open(os.path.join(self.directory, name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, name: str, body: bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def delete(self, name: str):
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass
+
+
+class _S3LogFiles:
+    """Log files as objects under an S3 prefix."""
+
+    def __init__(self, s3_client, bucket: str, prefix: str):
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def read(self, name: str) -> Optional[bytes]:
+        try:
+            return self.s3.get_object(Bucket=self.bucket, Key=f"{self.prefix}/{name}")["Body"].read()
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+
+    def write(self, name: str, body: bytes):
+        content_type = "application/json" if name.endswith(".json") else "application/x-ndjson"
+        self.s3.put_object(Bucket=self.bucket, Key=f"{self.prefix}/{name}", Body=body, ContentType=content_type)
+
+    def delete(self, name: str):
+        self.s3.delete_object(Bucket=self.bucket, Key=f"{self.prefix}/{name}")
+
+
+def _files_for(name: str):
+    """Local or S3 files for log *name*, following the configured storage."""
+    if hasattr(storage, "bucket_name"):
+        from services.s3_client import get_s3_client
+        client = get_s3_client(storage.region, storage.access_key, storage.secret_key)
+        return _S3LogFiles(client, storage.bucket_name, f"{storage.prefix}/logs/{name}")
+    return _LocalLogFiles(os.path.join(storage.data_dir, "logs", name))
+
+
+class SegmentedLog:
+    """
+    Append-only log, newest entries returned first.
+
+    Args:
+        name: Log name (directory / key prefix)
+        files: _LocalLogFiles or _S3LogFiles
+        max_entries: Entries kept (0 = unbounded)
+        id_field: Field given an auto-incrementing ID when missing (None = no IDs)
+        legacy: Returns the old single-document log ({"logs": [...newest first], "next_id"?})
+    """
+
+    def __init__(
+        self,
+        name: str,
+        files,
+        max_entries: int = 0,
+        id_field: Optional[str] = "id",
+        legacy: Optional[Callable[[], Optional[Dict]]] = None,
+        segment_entries: Optional[int] = None
+    ):
+        self.name = name
+        self.files = files
+        self.max_entries = max_entries
+        self.id_field = id_field
+        self.legacy = legacy
+        self.segment_entries = segment_entries or get_log_segment_entries()
+        self._lock = threading.RLock()
+
+    # ── head ──────────────────────────────────────────────────────────────────
+
+    def _load_head(self) -> Dict:
+        body = self.files.read(HEAD_FILE)
+        if body is not None:
+            return json.loads(body.decode("utf-8"))
+        return self._import_legacy()
+
+    def _save_head(self, head: Dict):
+        self.files.write(HEAD_FILE, json.dumps(head, default=str).encode("utf-8"))
+
+    def _import_legacy(self) -> Dict:
+        head = {"next_id": 1, "active": [], "segments": []}
+        try:
+            data = self.legacy() if self.legacy else None
+        except Exception as e:
+            logger.warning(f"Could not read legacy {self.name} log: {e}")
+            data = None
+        entries = list(reversed((data or {}).get("logs", []) or []))
+        if not entries:
+            return head
+        head["next_id"] = int((data or {}).get("next_id") or 1)
+        for entry in entries:
+            self._note_id(head, entry)
+        seg = 0
+        while len(entries) - seg * self.segment_entries >= self.segment_entries:
+            chunk = entries[seg * self.segment_entries:(seg + 1) * self.segment_entries]
+            seg += 1
+            self._write_segment(head, seg, chunk)
+        head["active"] = entries[seg * self.segment_entries:]
+        self._save_head(head)
+        logger.info(f"📦 Imported {len(entries)} legacy {self.name} entries into segmented log")
+        return head
+
+    def _note_id(self, head: Dict, entry: Dict):
+        if not self.id_field:
+            return
+        try:
+            head["next_id"] = max(int(head.get("next_id", 1)), int(entry.get(self.id_field) or 0) + 1)
+        except (TypeError, ValueError):
+            pass
+
+    def _write_segment(self, head: Dict, seg: int, entries: List[Dict]):
+        self.files.write(_segment_name(seg), _encode_lines(entries))
+        head["segments"] = [s for s in head["segments"] if s["seg"] != seg] + [{"seg": seg, "count": len(entries)}]
+        head["segments"].sort(key=lambda s: s["seg"])
+
+    def _read_segment(self, seg: int) -> List[Dict]:
+        body = self.files.read(_segment_name(seg))
+        return _decode_lines(body) if body else []
+
+    # ── writes ────────────────────────────────────────────────────────────────
+
+    def append(self, entry: Dict) -> Dict:
+        """Add *entry* (assigning its ID when missing) and return it."""
+        with self._lock:
+            head = self._load_head()
+            if self.id_field and not entry.get(self.id_field):
+                entry[self.id_field] = int(head.get("next_id", 1))
+            self._note_id(head, entry)
+            head["active"].append(entry)
+            if len(head["active"]) >= self.segment_entries:
+                seg = (head["segments"][-1]["seg"] if head["segments"] else 0) + 1
+                self._write_segment(head, seg, head["active"])
+                head["active"] = []
+                self._apply_retention(head)
+            self._save_head(head)
+        return entry
+
+    def _apply_retention(self, head: Dict):
+        if not self.max_entries:
+            return
+        total = len(head["active"]) + sum(s["count"] for s in head["segments"])
+        while head["segments"] and total - head["segments"][0]["count"] >= self.max_entries:
+            oldest = head["segments"].pop(0)
+            total -= oldest["count"]
+            self.files.delete(_segment_name(oldest["seg"]))
+
+    def update(self, match: Callable[[Dict], bool], fields: Dict) -> Optional[Dict]:
+        """Set *fields* on the newest entry matching *match*; returns it (None if absent)."""
+        with self._lock:
+            head = self._load_head()
+            for entry in reversed(head["active"]):
+                if match(entry):
+                    entry.update(fields)
+                    self._save_head(head)
+                    return entry
+            for segment in reversed(head["segments"]):
+                entries = self._read_segment(segment["seg"])
+                for entry in reversed(entries):
+                    if match(entry):
+                        entry.update(fields)
+                        self.files.write(_segment_name(segment["seg"]), _encode_lines(entries))
+                        return entry
+        return None
+
+    def compact(self, keep: Callable[[Dict], bool]) -> int:
+        """Drop entries for which *keep* is False; returns how many were removed."""
+        removed = 0
+        with self._lock:
+            head = self._load_head()
+            for segment in list(head["segments"]):
+                entries = self._read_segment(segment["seg"])
+                kept = [entry for entry in entries if keep(entry)]
+                if len(kept) == len(entries):
+                    continue
+                removed += len(entries) - len(kept)
+                if kept:
+                    self._write_segment(head, segment["seg"], kept)
+                else:
+                    head["segments"].remove(segment)
+                    self.files.delete(_segment_name(segment["seg"]))
+            kept = [entry for entry in head["active"] if keep(entry)]
+            removed += len(head["active"]) - len(kept)
+            head["active"] = kept
+            if removed:
+                self._save_head(head)
+        return removed
+
+    # ── reads ─────────────────────────────────────────────────────────────────
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """Entries newest first, reading sealed segments only as far as consumed."""
+        head = self._load_head()
+        returned = 0
+        for entry in reversed(head["active"]):
+            if self.max_entries and returned >= self.max_entries:
+                return
+            returned += 1
+            yield entry
+        for segment in reversed(head["segments"]):
+            for entry in reversed(self._read_segment(segment["seg"])):
+                if self.max_entries and returned >= self.max_entries:
+                    return
+                returned += 1
+                yield entry
+
+    def latest(self, limit: int, match: Optional[Callable[[Dict], bool]] = None) -> List[Dict]:
+        """Up to *limit* newest entries (optionally only those matching *match*)."""
+        result = []
+        if limit <= 0:
+            return result
+        for entry in self.iter_entries():
+            if match is None or match(entry):
+                result.append(entry)
+                if len(result) >= limit:
+                    break
+        return result
+
+    def entries(self) -> List[Dict]:
+        """All retained entries, newest first."""
+        return list(self.iter_entries())
+
+    def find(self, match: Callable[[Dict], bool]) -> Optional[Dict]:
+        """Newest entry matching *match*."""
+        return next((entry for entry in self.iter_entries() if match(entry)), None)
+
+    def next_id(self) -> int:
+        """ID the next appended entry without one would get."""
+        return int(self._load_head().get("next_id", 1))
+
+
+# Registry of log instances
+_logs: Dict[str, SegmentedLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_log_store(
+    name: str,
+    max_entries: int = 0,
+    id_field: Optional[str] = "id",
+    legacy: Optional[Callable[[], Optional[Dict]]] = None
+) -> SegmentedLog:
+    """Get the shared segmented log *name* (created on first use)."""
+    log = _logs.get(name)
+    if log is None:
+        with _logs_lock:
+            log = _logs.get(name)
+            if log is None:
+                log = SegmentedLog(name, _files_for(name), max_entries, id_field, legacy)
+                _logs[name] = log
+    return log
+
+
+def get_execution_log_store() -> SegmentedLog:
+    """
+    Cron / manual-run execution logs (formerly the "cron_logs" storage document,
+    last 100 kept).  Shared by cron_service, the manual color save and the
+    dashboard output version.
+    """
+    return get_log_store("cron_logs", max_entries=100, legacy=lambda: storage.load("cron_logs"))
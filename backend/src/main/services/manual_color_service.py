@@ -12,17 +12,20 @@ This is SEPARATE from admin panel buffer logic.
 """
 from typing import Dict, List, Optional, Tuple
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from datetime import datetime
 import logging
 import os
 import json
 from pathlib import Path
 
-from storage_config import storage
 from models.color import ColorRaw, ColorProcessed
 from services.ranking_engine import RankingEngine
 from services.output_service import get_output_service
 from services.column_config_service import get_column_config
+from services.log_store import get_execution_log_store
+from services.manual_session_store import ManualColorSession, MANUAL_SESSION_DIR, session_files
 from rules_service import apply_rules
 from manual_upload_service import get_buffered_files
 import logging_service
@@ -34,52 +37,14 @@ ranking_engine = RankingEngine()
 output_service = get_output_service()
 column_config = get_column_config()
 
-# Manual color session directory (temporary storage for preview)
-MANUAL_SESSION_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "manual_color_sessions")
-os.makedirs(MANUAL_SESSION_DIR, exist_ok=True)
-
-
-class ManualColorSession:
-    """
-    Manages a manual color processing session
-    """
-    def __init__(self, session_id: str):
-        self.session_id = session_id
-        self.session_file = os.path.join(MANUAL_SESSION_DIR, f"{session_id}.json")
-        self.data = self._load_session()
-    
-    def _load_session(self) -> Dict:
-        """Load session data from file"""
-        if os.path.exists(self.session_file):
-            with open(self.session_file, 'r') as f:
-                return json.load(f)
-        return {
-            "session_id": self.session_id,
-            "created_at": datetime.now().isoformat(),
-            "original_filename": None,
-            "raw_data": [],
-            "sorted_data": [],
-            "filtered_data": [],
-            "applied_rules": [],
-            "deleted_rows": [],
-            "status": "new"
-        }
-    
-    def save_session(self):
-        """Save session data to file"""
-        with open(self.session_file, 'w') as f:
-            json.dump(self.data, f, indent=2)
-    
-    def update(self, **kwargs):
-        """Update session data"""
-        self.data.update(kwargs)
-        self.data["updated_at"] = datetime.now().isoformat()
-        self.save_session()
-    
-    def delete_session(self):
-        """Delete session file"""
-        if os.path.exists(self.session_file):
-            os.remove(self.session_file)
+# Preview rows (sorted_data) columns, usable as sort keys in preview windows
+PREVIEW_COLUMNS = (
+    "row_id", "message_id", "ticker", "sector", "cusip", "date", "price_level", "bid", "ask", "px",
+    "source", "bias", "rank", "cov_price", "percent_diff", "price_diff", "confidence", "date_1",
+    "diff_status", "is_parent", "parent_message_id", "children_count",
+)
+# Columns matched (case-insensitive substring) by a preview window's search text
+PREVIEW_SEARCH_COLUMNS = ("message_id", "ticker", "sector", "cusip", "source", "bias", "diff_status")
 
 
 def generate_session_id(user_id: int = 1) -> str:
@@ -221,8 +186,7 @@ def import_manual_colors(
         session.update(
             original_filename=filename,
             raw_data=raw_data_dict,
-            sorted_data=sorted_data_dict,
-            filtered_data=sorted_data_dict.copy(),  # Initially same as sorted
+            sorted_data=sorted_data_dict,  # filtered view starts as the whole sorted base
             rows_imported=len(raw_colors),
             rows_valid=len(raw_colors) - len(parsing_errors),
             parsing_errors=parsing_errors,
@@ -381,26 +345,14 @@ def _clear_consumed_buffer_entries(upload_ids: List[int]) -> int:
 def _get_next_execution_log_id() -> int:
     """Return the next ID for cron-style execution logs stored under cron_logs."""
     try:
-        logs_data = storage.load("cron_logs")
-        logs = (logs_data or {}).get("logs", [])
-        if not logs:
-            return 1
-        return max(int(log.get("id", 0)) for log in logs) + 1
+        return get_execution_log_store().next_id()
     except Exception:
         return 1
 
 
 def _save_manual_execution_log(log_entry: Dict):
     """Persist a manual execution entry into cron_logs for Restore section visibility."""
-    logs_data = storage.load("cron_logs") or {"logs": []}
-    logs = logs_data.get("logs", [])
-
-    if not log_entry.get("id"):
-        log_entry["id"] = _get_next_execution_log_id()
-
-    logs.insert(0, log_entry)
-    logs = logs[:100]
-    storage.save("cron_logs", {"logs": logs})
+    get_execution_log_store().append(log_entry)
 
 
 def fetch_from_clo_query(clo_id: str, user_id: int = 1) -> Dict:
@@ -507,7 +459,6 @@ def fetch_from_clo_query(clo_id: str, user_id: int = 1) -> Dict:
         session.update(
             original_filename=f"datasource_{clo_id}",
             sorted_data=sorted_data_dict,
-            filtered_data=sorted_data_dict.copy(),
             consumed_buffer_upload_ids=consumed_buffer_ids,
             rows_imported=len(raw_colors),
             rows_valid=len(raw_colors),
@@ -550,36 +501,93 @@ def fetch_from_clo_query(clo_id: str, user_id: int = 1) -> Dict:
             "duration_seconds": (datetime.now() - start_time).total_seconds(),
         }
 
-def get_session_preview(session_id: str) -> Dict:
+def _preview_statistics(table: pa.Table) -> Dict:
+    """Row / parent / child counts of the visible rows, computed on the Arrow table."""
+    parent_rows = 0
+    if "is_parent" in table.column_names and table.num_rows:
+        parent_rows = int(pc.sum(pc.fill_null(pc.cast(table["is_parent"], pa.bool_()), False)).as_py() or 0)
+    return {
+        "total_rows": table.num_rows,
+        "parent_rows": parent_rows,
+        "child_rows": table.num_rows - parent_rows
+    }
+
+
+def _preview_window(table: pa.Table, window: Optional[Dict] = None) -> Tuple[List[Dict], Dict]:
+    """
+    Slice of the visible rows to send to the client.
+    
+    window keys (all optional): offset, limit (0/None = all rows), sort_by,
+    sort_desc, search.  Search and sort run on the Arrow table; only the
+    returned slice is converted to dicts.
+    
+    Returns:
+        (rows, window info incl. matched_rows before slicing)
+    """
+    window = window or {}
+    offset = max(0, int(window.get("offset") or 0))
+    limit = max(0, int(window.get("limit") or 0))
+    sort_by = window.get("sort_by")
+    sort_desc = bool(window.get("sort_desc"))
+    search = str(window.get("search") or "").strip().lower()
+    
+    if search and table.num_rows:
+        mask = None
+        for name in PREVIEW_SEARCH_COLUMNS:
+            if name not in table.column_names:
+                continue
+            text = pc.utf8_lower(pc.cast(table[name], pa.string()))
+            hit = pc.fill_null(pc.match_substring(text, search), False)
+            mask = hit if mask is None else pc.or_(mask, hit)
+        if mask is not None:
+            table = table.filter(mask)
+    
+    if sort_by and sort_by in table.column_names:
+        table = table.sort_by([(sort_by, "descending" if sort_desc else "ascending")])
+    
+    rows = table.slice(offset, limit or None).to_pylist()
+    return rows, {
+        "offset": offset,
+        "limit": limit,
+        "returned_rows": len(rows),
+        "matched_rows": table.num_rows,
+        "sort_by": sort_by,
+        "sort_desc": sort_desc,
+        "search": search or None
+    }
+
+
+def get_session_preview(session_id: str, window: Optional[Dict] = None) -> Dict:
     """
     Get current preview data for session
     
     Args:
         session_id: Session identifier
+        window: Optional offset/limit/sort_by/sort_desc/search (see _preview_window)
     
     Returns:
-        Dict with current filtered data
+        Dict with the requested window of the current filtered data
     """
     try:
         session = ManualColorSession(session_id)
+        filtered_table = session.filtered_table()
         
-        if not session.data.get("filtered_data"):
+        if filtered_table.num_rows == 0:
             return {
                 "success": False,
                 "error": "Session not found or no data available"
             }
         
+        rows, window_info = _preview_window(filtered_table, window)
+        
         return {
             "success": True,
             "session_id": session_id,
-            "data": session.data["filtered_data"],
+            "data": rows,
+            "window": window_info,
             "applied_rules": session.data.get("applied_rules", []),
-            "deleted_rows": session.data.get("deleted_rows", []),
-            "statistics": {
-                "total_rows": len(session.data["filtered_data"]),
-                "parent_rows": sum(1 for c in session.data["filtered_data"] if c.get("is_parent")),
-                "child_rows": sum(1 for c in session.data["filtered_data"] if not c.get("is_parent"))
-            }
+            "deleted_rows": session.deleted_rows,
+            "statistics": _preview_statistics(filtered_table)
         }
     except Exception as e:
         logger.error(f"❌ Failed to get session preview: {e}")
@@ -589,13 +597,14 @@ def get_session_preview(session_id: str) -> Dict:
         }
 
 
-def delete_rows(session_id: str, row_ids: List[int]) -> Dict:
+def delete_rows(session_id: str, row_ids: List[int], window: Optional[Dict] = None) -> Dict:
     """
     Delete selected rows from preview
     
     Args:
         session_id: Session identifier
         row_ids: List of row IDs to delete
+        window: Optional preview window for updated_preview (see _preview_window)
     
     Returns:
         Dict with updated data
@@ -603,31 +612,23 @@ def delete_rows(session_id: str, row_ids: List[int]) -> Dict:
     try:
         session = ManualColorSession(session_id)
         
-        # Filter out deleted rows
-        current_data = session.data["filtered_data"]
-        deleted_rows = session.data.get("deleted_rows", [])
-        
-        # Add to deleted list
-        deleted_rows.extend(row_ids)
-        
-        # Remove from filtered data
-        updated_data = [row for row in current_data if row["row_id"] not in row_ids]
-        
-        session.update(
-            filtered_data=updated_data,
-            deleted_rows=deleted_rows
-        )
+        # Record the deletion (only the deleted IDs are written)
+        session.delete(row_ids)
+        deleted_rows = session.deleted_rows
+        filtered_table = session.filtered_table()
+        updated_preview, window_info = _preview_window(filtered_table, window)
         
         logger.info(f"✅ Deleted {len(row_ids)} rows from session {session_id}")
         
         return {
             "success": True,
             "deleted_count": len(row_ids),
-            "remaining_count": len(updated_data),
-            "updated_preview": updated_data,
+            "remaining_count": filtered_table.num_rows,
+            "updated_preview": updated_preview,
+            "window": window_info,
             "statistics": {
                 "total_deleted": len(deleted_rows),
-                "remaining_rows": len(updated_data)
+                "remaining_rows": filtered_table.num_rows
             }
         }
     except Exception as e:
@@ -638,13 +639,14 @@ def delete_rows(session_id: str, row_ids: List[int]) -> Dict:
         }
 
 
-def apply_selected_rules(session_id: str, rule_ids: List[int]) -> Dict:
+def apply_selected_rules(session_id: str, rule_ids: List[int], window: Optional[Dict] = None) -> Dict:
     """
     Apply selected rules to manual color data
     
     Args:
         session_id: Session identifier
         rule_ids: List of rule IDs to apply
+        window: Optional preview window for updated_preview (see _preview_window)
     
     Returns:
         Dict with filtered data after applying rules
@@ -652,9 +654,9 @@ def apply_selected_rules(session_id: str, rule_ids: List[int]) -> Dict:
     try:
         session = ManualColorSession(session_id)
         
-        current_data = session.data["filtered_data"]
+        current_data = session.filtered_frame()
         
-        if not current_data:
+        if current_data.empty:
             return {
                 "success": False,
                 "error": "No data available in session"
@@ -665,18 +667,17 @@ def apply_selected_rules(session_id: str, rule_ids: List[int]) -> Dict:
         # Apply rules using existing rules service
         rules_result = apply_rules(current_data, specific_rule_ids=rule_ids)
         
-        filtered_data = rules_result["filtered_data"]
         excluded_count = rules_result["excluded_count"]
         rules_applied_info = rules_result["rules_applied"]
         
-        # Update session
-        applied_rules = session.data.get("applied_rules", [])
-        applied_rules.extend(rule_ids)
-        
-        session.update(
-            filtered_data=filtered_data,
-            applied_rules=list(set(applied_rules))  # Remove duplicates
+        # Update session: only the newly excluded row IDs are written
+        kept_ids = set(rules_result["filtered_data"]["row_id"].tolist())
+        session.exclude(
+            [row_id for row_id in current_data["row_id"].tolist() if row_id not in kept_ids],
+            rule_ids
         )
+        filtered_table = session.filtered_table()
+        updated_preview, window_info = _preview_window(filtered_table, window)
         
         logger.info(f"✅ Rules applied: excluded {excluded_count} rows")
         
@@ -684,12 +685,13 @@ def apply_selected_rules(session_id: str, rule_ids: List[int]) -> Dict:
             "success": True,
             "rules_applied": len(rule_ids),
             "excluded_count": excluded_count,
-            "remaining_rows": len(filtered_data),
-            "updated_preview": filtered_data,
+            "remaining_rows": filtered_table.num_rows,
+            "updated_preview": updated_preview,
+            "window": window_info,
             "statistics": {
                 "total_rows": len(current_data),
                 "excluded_rows": excluded_count,
-                "remaining_rows": len(filtered_data)
+                "remaining_rows": filtered_table.num_rows
             },
             "rules_info": rules_applied_info
         }
@@ -718,7 +720,7 @@ def save_manual_colors(session_id: str, user_id: int = 1) -> Dict:
         session = ManualColorSession(session_id)
         
         # Get the current filtered/edited data from the session
-        final_data = session.data.get("filtered_data")
+        final_data = session.filtered_records()
         if not final_data:
             # If no filtered data exists, use the sorted preview
             final_data = session.data.get("sorted_preview", [])
@@ -872,7 +874,7 @@ def save_manual_colors(session_id: str, user_id: int = 1) -> Dict:
             "duration_seconds": duration,
             "metadata": {
                 "applied_rules_count": len(session.data.get("applied_rules", [])),
-                "deleted_rows_count": len(session.data.get("deleted_rows", [])),
+                "deleted_rows_count": len(session.deleted_rows),
                 "consumed_buffer_upload_ids": consumed_ids,
                 "pending_buffer_upload_ids": pending_buffer_ids,
                 "buffer_cleared_count": buffer_cleared_count,
@@ -915,7 +917,7 @@ def get_active_sessions(user_id: Optional[int] = None) -> List[Dict]:
                     "updated_at": session_data.get("updated_at"),
                     "filename": session_data.get("original_filename"),
                     "status": session_data.get("status"),
-                    "rows_count": len(session_data.get("filtered_data", []))
+                    "rows_count": session_data.get("rows_count", len(session_data.get("filtered_data", [])))
                 })
         
         return sessions
@@ -940,7 +942,9 @@ def cleanup_old_sessions(days: int = 1) -> int:
         
         for session_file in Path(MANUAL_SESSION_DIR).glob("*.json"):
             if session_file.stat().st_mtime < cutoff_time:
-                session_file.unlink()
+                for path in session_files(session_file.stem, str(session_file.parent)):
+                    if os.path.exists(path):
+                        os.remove(path)
                 deleted_count += 1
         
         logger.info(f"🧹 Cleaned up {deleted_count} old sessions")
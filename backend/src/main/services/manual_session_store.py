@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Manual Session Store - Columnar storage for manual color sessions
+
+A session used to be one JSON file holding raw_data, sorted_data and
+filtered_data, rewritten in full on every delete / rule click.  Now:
+
+  <id>.json              small metadata (status, filename, counts, rule IDs)
+  <id>.sorted.parquet    immutable sorted rows (written once per session)
+  <id>.raw.parquet       immutable raw rows (file imports only)
+  <id>.edits.jsonl       append-only edit log:
+                           {"op": "delete",  "row_ids": [...]}
+                           {"op": "exclude", "row_ids": [...], "rule_ids": [...]}
+
+The visible ("filtered") rows are the sorted base minus the deleted and
+rule-excluded row IDs, kept in memory as boolean masks over the base.  An
+edit appends one log line holding only the changed row IDs and rewrites the
+small metadata file.
+
+Sessions written in the old single-JSON layout are read as-is and converted
+to this layout on their first edit.
+"""
+import os
+import json
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Manual color session directory (temporary storage for preview)
+MANUAL_SESSION_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "manual_color_sessions")
+os.makedirs(MANUAL_SESSION_DIR, exist_ok=True)
+
+# Row lists kept in the columnar files, never in the metadata JSON
+ROW_KEYS = ("raw_data", "sorted_data", "filtered_data")
+
+_session_locks: Dict[str, threading.Lock] = {}
+_session_locks_guard = threading.Lock()
+
+
+def _session_lock(session_id: str) -> threading.Lock:
+    with _session_locks_guard:
+        return _session_locks.setdefault(session_id, threading.Lock())
+
+
+def _rows_table(rows: List[Dict]) -> pa.Table:
+    return pa.Table.from_pylist(rows) if rows else pa.table({"row_id": pa.array([], pa.int64())})
+
+
+def _write_table(table: pa.Table, path: str):
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def session_files(session_id: str, session_dir: Optional[str] = None) -> List[str]:
+    """Every file belonging to *session_id* (metadata, row files, edit log)."""
+    base = os.path.join(session_dir or MANUAL_SESSION_DIR, session_id)
+    return [f"{base}.json", f"{base}.sorted.parquet", f"{base}.raw.parquet", f"{base}.edits.jsonl"]
+
+
+class ManualColorSession:
+    """
+    Manages a manual color processing session
+    """
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.session_file = os.path.join(MANUAL_SESSION_DIR, f"{session_id}.json")
+        self.sorted_file = os.path.join(MANUAL_SESSION_DIR, f"{session_id}.sorted.parquet")
+        self.raw_file = os.path.join(MANUAL_SESSION_DIR, f"{session_id}.raw.parquet")
+        self.edits_file = os.path.join(MANUAL_SESSION_DIR, f"{session_id}.edits.jsonl")
+        self._legacy_rows: Optional[Dict[str, List[Dict]]] = None
+        self._base: Optional[pa.Table] = None
+        self._row_index: Optional[pd.Index] = None
+        self._deleted: Optional[np.ndarray] = None
+        self._excluded: Optional[np.ndarray] = None
+        self._deleted_order: List[int] = []
+        self.data = self._load_session()
+
+    def _load_session(self) -> Dict:
+        """Load session metadata (row data stays in the columnar files)"""
+        if os.path.exists(self.session_file):
+            with open(self.session_file, 'r') as f:
+                data = json.load(f)
+            if any(key in data for key in ROW_KEYS):
+                # Old single-JSON layout: keep the rows until the first edit converts it
+                self._legacy_rows = {key: data.pop(key, None) or [] for key in ROW_KEYS}
+            return data
+        return {
+            "session_id": self.session_id,
+            "created_at": datetime.now().isoformat(),
+            "original_filename": None,
+            "applied_rules": [],
+            "status": "new"
+        }
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self.session_file)
+
+    def save_session(self):
+        """Save session metadata to file"""
+        self._convert_legacy()
+        tmp_path = f"{self.session_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.session_file)
+
+    def update(self, **kwargs):
+        """
+        Update session data.
+
+        sorted_data / raw_data replace the row files (and reset all edits);
+        filtered_data is recorded as an exclusion of the sorted rows it lacks.
+        Everything else is metadata.
+        """
+        with _session_lock(self.session_id):
+            rows = {key: kwargs.pop(key) for key in ROW_KEYS if key in kwargs}
+            if "sorted_data" in rows:
+                self._write_base(rows["sorted_data"])
+            if "raw_data" in rows:
+                _write_table(_rows_table(rows["raw_data"]), self.raw_file)
+            self.data.update(kwargs)
+            if "filtered_data" in rows:
+                self._convert_legacy()
+                keep = {row.get("row_id") for row in rows["filtered_data"]}
+                self._record_exclusion([r for r in self.visible_row_ids() if r not in keep], [])
+            self._touch()
+
+    def delete_session(self):
+        """Delete session files"""
+        for path in session_files(self.session_id):
+            if os.path.exists(path):
+                os.remove(path)
+
+    # ── rows ──────────────────────────────────────────────────────────────────
+
+    def _write_base(self, sorted_rows: List[Dict]):
+        self._legacy_rows = None
+        self.data.pop("deleted_rows", None)
+        self._base = _rows_table(sorted_rows)
+        self._row_index = None
+        _write_table(self._base, self.sorted_file)
+        if os.path.exists(self.edits_file):
+            os.remove(self.edits_file)
+        n = self._base.num_rows
+        self._deleted = np.zeros(n, dtype=bool)
+        self._excluded = np.zeros(n, dtype=bool)
+        self._deleted_order = []
+
+    def base_table(self) -> pa.Table:
+        """Immutable sorted rows (row_id first) as an Arrow table."""
+        if self._base is None:
+            if self._legacy_rows is not None:
+                self._base = _rows_table(self._legacy_rows["sorted_data"])
+            elif os.path.exists(self.sorted_file):
+                self._base = pq.read_table(self.sorted_file)
+            else:
+                self._base = _rows_table([])
+        return self._base
+
+    def _position_of(self) -> pd.Index:
+        """row_id of every base row, by position."""
+        if self._row_index is None:
+            self._row_index = pd.Index(self.base_table().column("row_id").to_numpy(zero_copy_only=False))
+        return self._row_index
+
+    def _load_masks(self):
+        if self._deleted is not None:
+            return
+        n = self.base_table().num_rows
+        self._deleted = np.zeros(n, dtype=bool)
+        self._excluded = np.zeros(n, dtype=bool)
+        self._deleted_order = []
+        if self._legacy_rows is not None:
+            deleted = list(self.data.get("deleted_rows", []) or [])
+            self._apply_edit({"op": "delete", "row_ids": deleted})
+            keep = {row.get("row_id") for row in self._legacy_rows["filtered_data"]}
+            hidden = set(deleted)
+            self._apply_edit({"op": "exclude", "row_ids": [
+                row_id for row_id in self._position_of() if row_id not in keep and row_id not in hidden
+            ]})
+            return
+        if os.path.exists(self.edits_file):
+            with open(self.edits_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        self._apply_edit(json.loads(line))
+
+    def _apply_edit(self, edit: Dict):
+        positions = self._position_of().get_indexer(edit.get("row_ids", []))
+        positions = positions[positions >= 0]
+        if edit.get("op") == "delete":
+            self._deleted_order.extend(edit.get("row_ids", []))
+            self._deleted[positions] = True
+        else:
+            self._excluded[positions] = True
+
+    def _append_edit(self, edit: Dict):
+        self._convert_legacy()
+        with open(self.edits_file, 'a') as f:
+            f.write(json.dumps(edit) + "\n")
+        self._apply_edit(edit)
+
+    def _convert_legacy(self):
+        """Write an old single-JSON session in the columnar layout."""
+        if self._legacy_rows is None:
+            return
+        self._load_masks()
+        legacy, self._legacy_rows = self._legacy_rows, None
+        _write_table(self.base_table(), self.sorted_file)
+        if legacy["raw_data"]:
+            _write_table(_rows_table(legacy["raw_data"]), self.raw_file)
+        base_ids = self._position_of()
+        with open(self.edits_file, 'w') as f:
+            if self._deleted_order:
+                f.write(json.dumps({"op": "delete", "row_ids": self._deleted_order}) + "\n")
+            excluded = [int(r) for r in base_ids[self._excluded]]
+            if excluded:
+                f.write(json.dumps({"op": "exclude", "row_ids": excluded, "rule_ids": []}) + "\n")
+        self.data.pop("deleted_rows", None)
+        logger.info(f"📦 Converted manual session {self.session_id} to the columnar layout")
+
+    def visible_mask(self) -> np.ndarray:
+        """Rows of the sorted base that are neither deleted nor rule-excluded."""
+        self._load_masks()
+        return ~(self._deleted | self._excluded)
+
+    def visible_row_ids(self) -> List[int]:
+        return [int(r) for r in self._position_of()[self.visible_mask()]]
+
+    def filtered_table(self) -> pa.Table:
+        """Visible rows as an Arrow table, in sorted order."""
+        return self.base_table().filter(pa.array(self.visible_mask()))
+
+    def filtered_records(self) -> List[Dict]:
+        """Visible rows as dicts (the former filtered_data list)."""
+        return self.filtered_table().to_pylist()
+
+    def filtered_frame(self) -> pd.DataFrame:
+        """Visible rows as an object-dtype DataFrame (values exactly as in filtered_records)."""
+        table = self.filtered_table()
+        return pd.DataFrame(
+            {name: pd.Series(table.column(name).to_pylist(), dtype=object) for name in table.column_names}
+        )
+
+    def raw_records(self) -> List[Dict]:
+        if self._legacy_rows is not None:
+            return self._legacy_rows["raw_data"]
+        return pq.read_table(self.raw_file).to_pylist() if os.path.exists(self.raw_file) else []
+
+    @property
+    def deleted_rows(self) -> List[int]:
+        self._load_masks()
+        return list(self._deleted_order)
+
+    @property
+    def rows_count(self) -> int:
+        return int(self.visible_mask().sum())
+
+    # ── edits ─────────────────────────────────────────────────────────────────
+
+    def delete(self, row_ids: Iterable[int]) -> int:
+        """Mark *row_ids* deleted; returns how many visible rows that removed."""
+        with _session_lock(self.session_id):
+            row_ids = [int(r) for r in row_ids]
+            visible = set(self.visible_row_ids())
+            removed = sum(1 for r in set(row_ids) if r in visible)
+            self._append_edit({"op": "delete", "row_ids": row_ids})
+            self._touch()
+        return removed
+
+    def exclude(self, row_ids: Iterable[int], rule_ids: Iterable[int]):
+        """Hide *row_ids* as excluded by *rule_ids* and remember the rules."""
+        with _session_lock(self.session_id):
+            self._record_exclusion([int(r) for r in row_ids], [int(r) for r in rule_ids])
+            self._touch()
+
+    def _record_exclusion(self, row_ids: List[int], rule_ids: List[int]):
+        if row_ids:
+            self._append_edit({"op": "exclude", "row_ids": row_ids, "rule_ids": rule_ids})
+        if rule_ids:
+            self.data["applied_rules"] = list(set(self.data.get("applied_rules", []) + rule_ids))
+
+    def _touch(self):
+        self.data["updated_at"] = datetime.now().isoformat()
+        self.data["rows_count"] = self.rows_count
+        self.save_session()
@@ -4,11 +4,17 @@ Fetches credentials from client API and queries Oracle DB using dynamic column m
 """
 import os
 import json
+import time
+import logging
 import requests
 import pandas as pd
-from typing import Dict, Any, Optional, List
+import pyarrow as pa
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, Optional, List
 from datetime import datetime, timedelta
-from data_source_interface import DataSourceInterface
+from data_source_interface import DataSourceInterface, PartialFetchError
+from services.oracle_pool import get_oracle_pool_manager
 
 # Optional import - only needed when Oracle is configured
 try:
@@ -29,6 +35,55 @@ except ImportError:
     oracledb = None
     _thick_mode_initialized = False
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_FETCH_BATCH_ROWS = 20000
+
+
+def get_oracle_fetch_mode() -> str:
+    """ORACLE_FETCH_MODE: "arrow" (default, streamed record batches) or "read_sql"."""
+    mode = os.getenv("ORACLE_FETCH_MODE", "arrow").strip().lower()
+    return mode if mode in ("arrow", "read_sql") else "arrow"
+
+
+def get_oracle_fetch_batch_rows() -> int:
+    """ORACLE_FETCH_BATCH_ROWS: rows per fetched batch (also arraysize/prefetchrows)."""
+    try:
+        return max(100, int(os.getenv("ORACLE_FETCH_BATCH_ROWS", str(DEFAULT_FETCH_BATCH_ROWS))))
+    except ValueError:
+        return DEFAULT_FETCH_BATCH_ROWS
+
+
+def get_oracle_fetch_concurrency() -> int:
+    """ORACLE_FETCH_CONCURRENCY: CLO queries in flight (default ORACLE_POOL_MAX)."""
+    default = os.getenv("ORACLE_POOL_MAX", "4")
+    try:
+        return max(1, int(os.getenv("ORACLE_FETCH_CONCURRENCY", default)))
+    except ValueError:
+        return 4
+
+
+def _standardize_columns(table: pa.Table) -> pa.Table:
+    """Upper-case, stripped column names (same as the read_sql path)."""
+    return table.rename_columns([str(name).strip().upper() for name in table.column_names])
+
+
+def _empty_table(names: List[str]) -> pa.Table:
+    """Zero-row table with the query's (standardized) columns."""
+    return _standardize_columns(pa.table({name: pa.array([], pa.null()) for name in names}))
+
+
+# Oracle errors meaning the cached credentials are no longer valid
+# (ORA-01017 invalid username/password, ORA-28000 account locked,
+#  ORA-28001 password expired)
+_AUTH_ERROR_CODES = {1017, 28000, 28001}
+
+
+def _is_auth_error(error: Exception) -> bool:
+    args = getattr(error, "args", ())
+    code = getattr(args[0], "code", None) if args else None
+    return code in _AUTH_ERROR_CODES
+
 
 class OracleDataSource(DataSourceInterface):
     """Oracle database data source implementation with dynamic column mapping."""
@@ -132,6 +187,45 @@ class OracleDataSource(DataSourceInterface):
         # If we still don't have credentials, raise error
         raise ValueError("Oracle credentials not available from API or .env file")
     
+    def _dsn(self) -> str:
+        return oracledb.makedsn(
+            self.oracle_host,
+            self.oracle_port,
+            service_name=self.oracle_service
+        )
+    
+    @contextmanager
+    def acquire_connection(self):
+        """
+        Borrow a session from the shared pool (services.oracle_pool).
+        
+        The pool is built from the cached credentials and rebuilt when they
+        change. If the pool rejects them (rotated before the cache TTL ran
+        out), credentials are re-fetched once and the pool rebuilt.
+        The session returns to the pool when the block exits.
+        """
+        self._check_driver_available()
+        
+        if not all([self.oracle_host, self.oracle_port, self.oracle_service]):
+            raise ValueError("Oracle connection details not configured")
+        
+        dsn = self._dsn()
+        manager = get_oracle_pool_manager()
+        credentials = self._fetch_credentials()
+        try:
+            pool, connection = manager.acquire(dsn, credentials["username"], credentials["password"])
+        except oracledb.DatabaseError as e:
+            if not _is_auth_error(e):
+                raise
+            manager.discard(dsn)
+            self._cached_credentials = None
+            credentials = self._fetch_credentials()
+            pool, connection = manager.acquire(dsn, credentials["username"], credentials["password"])
+        try:
+            yield connection
+        finally:
+            manager.release(pool, connection)
+    
     def _get_clo_column_mapping(self, clo_id: Optional[str] = None) -> Dict[str, str]:
         """
         Get column mapping for specific CLO from column_config.json.
@@ -496,46 +590,243 @@ ORDER BY
         Returns:
             DataFrame with standardized column names
         """
-        self._check_driver_available()
+        return self._fetch(clo_id)
+    
+    def _saved_query(self, clo_id: str) -> str:
+        """The CLO's saved query (queries.base_query, else legacy oracle_query)."""
+        clo_config = self.column_config.get(clo_id, {})
+        if not isinstance(clo_config, dict):
+            return ""
+        base_query = clo_config.get("queries", {}).get("base_query", {})
+        return (base_query.get("query", "") if isinstance(base_query, dict) else "") or clo_config.get("oracle_query", "")
+    
+    def configured_clo_ids(self) -> List[str]:
+        """Enabled CLOs in column_config.json that have a saved query."""
+        return [
+            clo_id for clo_id, clo_config in self.column_config.items()
+            if isinstance(clo_config, dict)
+            and clo_config.get("enabled", True) is not False
+            and self._saved_query(clo_id)
+        ]
+    
+    def multi_clo_ids(self) -> List[str]:
+        """
+        CLOs selected by ORACLE_FETCH_CLOS for default fetches:
+        empty = the single default query, "all" = every configured CLO,
+        otherwise a comma-separated list of CLO ids.
+        """
+        selection = os.getenv("ORACLE_FETCH_CLOS", "").strip()
+        if not selection:
+            return []
+        if selection.lower() == "all":
+            return self.configured_clo_ids()
+        return [clo_id.strip() for clo_id in selection.split(",") if clo_id.strip()]
+    
+    def fetch_clos(
+        self,
+        clo_ids: Optional[Iterable[str]] = None,
+        watermarks: Optional[Dict[str, Optional[int]]] = None,
+        max_workers: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Run each CLO's saved query concurrently and merge the results.
         
-        if not all([self.oracle_host, self.oracle_port, self.oracle_service]):
-            raise ValueError("Oracle connection details not configured")
+        At most ORACLE_FETCH_CONCURRENCY queries run at a time, each on its
+        own pooled session, so a run costs about the slowest CLO query rather
+        than the sum of all of them. Rows are tagged with CLO_ID. If every
+        CLO fails ConnectionError is raised; if only some fail,
+        PartialFetchError carries the failed CLO ids and the merged rows of
+        the others so the caller can decide whether to use them.
         
-        # Fetch credentials
-        credentials = self._fetch_credentials()
+        Args:
+            clo_ids: CLOs to fetch (default: configured_clo_ids())
+            watermarks: Per-CLO MESSAGE_ID watermark; a CLO with one fetches
+                only rows past it (missing / None = all rows)
+            max_workers: Concurrency override
+            
+        Returns:
+            DataFrame with standardized column names plus CLO_ID
+            
+        Raises:
+            PartialFetchError: Some (not all) CLO queries failed
+        """
+        clo_ids = list(dict.fromkeys(clo_ids if clo_ids is not None else self.configured_clo_ids()))
+        missing = [clo_id for clo_id in clo_ids if not self._saved_query(clo_id)]
+        if missing:
+            # Without a saved query _build_query would run the whole-universe default
+            logger.warning(f"⚠️ No saved query for CLO(s) {missing} — skipped in multi-CLO fetch")
+            clo_ids = [clo_id for clo_id in clo_ids if clo_id not in missing]
+        if not clo_ids:
+            return pd.DataFrame()
         
-        # Build connection string
-        dsn = oracledb.makedsn(
-            self.oracle_host,
-            self.oracle_port,
-            service_name=self.oracle_service
+        # Resolve credentials once so workers share the cached copy
+        self._fetch_credentials()
+        
+        def _fetch_one(clo_id: str):
+            started = time.perf_counter()
+            df = self._fetch(clo_id, watermark=(watermarks or {}).get(clo_id))
+            return df, time.perf_counter() - started
+        
+        workers = min(max_workers or get_oracle_fetch_concurrency(), len(clo_ids))
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="oracle-clo") as pool:
+            futures = [(clo_id, pool.submit(_fetch_one, clo_id)) for clo_id in clo_ids]
+        
+        frames = []
+        errors = {}
+        slowest = 0.0
+        for clo_id, future in futures:
+            try:
+                df, seconds = future.result()
+            except Exception as e:
+                errors[clo_id] = str(e)
+                logger.error(f"❌ Oracle fetch for CLO {clo_id} failed: {e}")
+                continue
+            slowest = max(slowest, seconds)
+            frames.append(df.assign(CLO_ID=clo_id))
+        
+        if not frames:
+            raise ConnectionError(f"Oracle fetch failed for every CLO: {errors}")
+        merged = pd.concat(frames, ignore_index=True)
+        logger.info(
+            f"⚡ Oracle multi-CLO fetch: {len(frames)}/{len(clo_ids)} CLO(s), {len(merged)} row(s), "
+            f"wall {time.perf_counter() - started:.2f}s (slowest {slowest:.2f}s, {workers} worker(s))"
         )
+        if errors:
+            raise PartialFetchError(errors, merged)
+        return merged
+    
+    def fetch_data_since(self, clo_id: Optional[str], watermark: int) -> pd.DataFrame:
+        """
+        Fetch only rows with MESSAGE_ID above *watermark*.
+        The predicate wraps the CLO query so Oracle filters before transfer.
+        """
+        return self._fetch(clo_id, watermark=watermark)
+    
+    def iter_batches(
+        self,
+        clo_id: Optional[str] = None,
+        watermark: Optional[int] = None,
+        batch_rows: Optional[int] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream the CLO query as DataFrames of at most *batch_rows* rows.
+        
+        Rows arrive as typed Arrow record batches (see _arrow_batches), so
+        only one batch is held in Python at a time. With
+        ORACLE_FETCH_MODE=read_sql the whole result comes back as one
+        pd.read_sql DataFrame instead. The pooled session is kept until the
+        iterator is exhausted or closed.
+        """
+        self._check_driver_available()
         
-        # Connect and query
-        connection = None
         try:
-            connection = oracledb.connect(
-                user=credentials["username"],
-                password=credentials["password"],
-                dsn=dsn
-            )
-            
-            # Build query with dynamic column mapping
-            query = self._build_query(clo_id)
-            
-            # Execute query and load into DataFrame
-            df = pd.read_sql(query, connection)
-            
-            # Standardize column names (uppercase, strip spaces)
-            df.columns = df.columns.str.strip().str.upper()
-            
-            return df
-            
+            with self.acquire_connection() as connection:
+                query, params = self._query_with_params(clo_id, watermark)
+                if get_oracle_fetch_mode() == "read_sql":
+                    yield self._read_sql(connection, query, params)
+                    return
+                for table in self._arrow_batches(connection, query, params, batch_rows):
+                    yield table.to_pandas()
+        except oracledb.Error as e:
+            raise ConnectionError(f"Oracle database error: {str(e)}")
+    
+    def _fetch(self, clo_id: Optional[str] = None, watermark: Optional[int] = None) -> pd.DataFrame:
+        """Run the CLO query (optionally past a MESSAGE_ID watermark)."""
+        self._check_driver_available()
+        
+        try:
+            with self.acquire_connection() as connection:
+                query, params = self._query_with_params(clo_id, watermark)
+                if get_oracle_fetch_mode() == "read_sql":
+                    return self._read_sql(connection, query, params)
+                tables = list(self._arrow_batches(connection, query, params))
         except oracledb.Error as e:
             raise ConnectionError(f"Oracle database error: {str(e)}")
+        
+        # One conversion of the whole result (batches share the query schema)
+        table = pa.concat_tables(tables, promote_options="permissive")
+        logger.info(f"Fetched {table.num_rows} row(s) from Oracle in {len(tables)} Arrow batch(es)")
+        return table.to_pandas()
+    
+    def _query_with_params(self, clo_id: Optional[str], watermark: Optional[int]):
+        """CLO query and bind parameters (wrapped with the watermark predicate if given)."""
+        # Build query with dynamic column mapping
+        query = self._build_query(clo_id)
+        params = None
+        if watermark is not None:
+            # Incremental fetch: only rows past the stored high-watermark
+            query = (
+                f"SELECT src.* FROM ({query.strip().rstrip(';')}) src "
+                f"WHERE src.MESSAGE_ID > :watermark"
+            )
+            params = {"watermark": int(watermark)}
+        return query, params
+    
+    @staticmethod
+    def _read_sql(connection, query: str, params: Optional[Dict]) -> pd.DataFrame:
+        """Legacy fetch through pandas (ORACLE_FETCH_MODE=read_sql)."""
+        df = pd.read_sql(query, connection, params=params)
+        
+        # Standardize column names (uppercase, strip spaces)
+        df.columns = df.columns.str.strip().str.upper()
+        
+        return df
+    
+    @staticmethod
+    def _arrow_batches(connection, query: str, params: Optional[Dict], batch_rows: Optional[int] = None) -> Iterator[pa.Table]:
+        """
+        Typed Arrow tables of at most *batch_rows* rows, straight from the driver.
+        
+        Uses oracledb's DataFrame fetch (columns built in the driver, no
+        per-row Python objects). Only a driver mode without it
+        (NotSupportedError) falls back to a cursor with arraysize/prefetchrows
+        tuned to the batch size; any other error propagates.
+        Always yields at least one (possibly empty) table carrying the columns.
+        An empty result is described with a parse-only call, so the query
+        is never executed twice.
+        """
+        batch_rows = batch_rows or get_oracle_fetch_batch_rows()
+        
+        if hasattr(connection, "fetch_df_batches"):
+            yielded = False
+            try:
+                for odf in connection.fetch_df_batches(statement=query, parameters=params, size=batch_rows):
+                    yielded = True
+                    yield _standardize_columns(pa.table(odf))
+            except oracledb.NotSupportedError:
+                if yielded:
+                    raise
+                logger.info("Oracle DataFrame fetch not supported by this driver mode — using cursor batches")
+            else:
+                if not yielded:
+                    cursor = connection.cursor()
+                    try:
+                        cursor.parse(query)
+                        names = [desc[0] for desc in cursor.description or []]
+                    finally:
+                        cursor.close()
+                    yield _empty_table(names)
+                return
+        
+        cursor = connection.cursor()
+        try:
+            cursor.arraysize = batch_rows
+            cursor.prefetchrows = batch_rows + 1
+            cursor.execute(query, params or {})
+            names = [desc[0] for desc in cursor.description]
+            yielded = False
+            while True:
+                rows = cursor.fetchmany(batch_rows)
+                if not rows:
+                    break
+                columns = list(zip(*rows))
+                yielded = True
+                yield _standardize_columns(pa.table({name: pa.array(col) for name, col in zip(names, columns)}))
+            if not yielded:
+                yield _empty_table(names)
         finally:
-            if connection:
-                connection.close()
+            cursor.close()
     
     def test_connection(self) -> Dict[str, Any]:
         """
@@ -568,28 +859,13 @@ ORDER BY
                     "message": "Oracle connection details incomplete (host/port/service)"
                 }
             
-            # Test credentials fetch (API or .env)
-            credentials = self._fetch_credentials()
-            
-            # Test database connection
-            dsn = oracledb.makedsn(
-                self.oracle_host,
-                self.oracle_port,
-                service_name=self.oracle_service
-            )
-            
-            connection = oracledb.connect(
-                user=credentials["username"],
-                password=credentials["password"],
-                dsn=dsn
-            )
-            
-            # Test query — simple dual query, no table name needed
-            cursor = connection.cursor()
-            cursor.execute("SELECT 1 FROM DUAL")
-            result = cursor.fetchone()
-            cursor.close()
-            connection.close()
+            # Test credentials fetch (API or .env) and a pooled session
+            with self.acquire_connection() as connection:
+                # Test query — simple dual query, no table name needed
+                cursor = connection.cursor()
+                cursor.execute("SELECT 1 FROM DUAL")
+                result = cursor.fetchone()
+                cursor.close()
             
             thick_mode_status = "enabled" if _thick_mode_initialized else "disabled (thin mode)"
             cred_source = "API" if has_api else ".env file"
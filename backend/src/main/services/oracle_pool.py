@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Oracle Pool - Process-wide oracledb session pools
+
+OracleDataSource (cron fetches, test_connection) and the admin query endpoints
+borrow sessions from one pool per DSN instead of opening a new connection
+for every query, so connection setup (listener hand-off, authentication,
+thick-mode session creation) is paid once per session rather than per call.
+
+Pools are created lazily from the data source's cached credentials.  When
+_fetch_credentials() returns different credentials (rotation via the
+credentials API), the pool for that DSN is rebuilt transparently; the old
+pool is closed once every session acquired from it has been released.
+Sessions are borrowed with acquire()/release(), which count them per pool,
+so a pool is never closed between being picked and its acquire() call.
+
+Tuning (env):
+  ORACLE_POOL_MIN           sessions kept open (default 1)
+  ORACLE_POOL_MAX           sessions at most (default 4)
+  ORACLE_POOL_INCREMENT     sessions opened when the pool grows (default 1)
+  ORACLE_POOL_TIMEOUT       idle seconds before extra sessions close (default 300)
+  ORACLE_POOL_WAIT_SECONDS  wait for a free session before failing (default 30)
+  ORACLE_POOL_PING_SECONDS  ping idle sessions older than this on acquire (default 60)
+"""
+import os
+import time
+import hashlib
+import threading
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import oracledb
+except ImportError:
+    oracledb = None
+
+
+def _env_int(name: str, default: int, minimum: int = 0) -> int:
+    try:
+        return max(minimum, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _fingerprint(username: str, password: str) -> str:
+    return hashlib.sha256(f"{username}\0{password}".encode("utf-8")).hexdigest()
+
+
+class _PoolEntry:
+    """One DSN's pool plus the credentials it was built with and its counters."""
+
+    def __init__(self, dsn: str, username: str, fingerprint: str, pool):
+        self.dsn = dsn
+        self.username = username
+        self.fingerprint = fingerprint
+        self.pool = pool
+        self.created_at = time.time()
+        self.acquires = 0
+
+
+class OraclePoolManager:
+    """Lazily built, credential-aware session pools keyed by DSN."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _PoolEntry] = {}
+        self._retired: List = []
+        # Pool → sessions borrowed through acquire() (including acquires in flight)
+        self._borrowed: Dict = {}
+        self.rebuilds = 0
+
+    def _create_pool(self, dsn: str, username: str, password: str):
+        pool_min = _env_int("ORACLE_POOL_MIN", 1)
+        pool_max = max(pool_min, _env_int("ORACLE_POOL_MAX", 4, minimum=1))
+        pool = oracledb.create_pool(
+            user=username,
+            password=password,
+            dsn=dsn,
+            min=pool_min,
+            max=pool_max,
+            increment=_env_int("ORACLE_POOL_INCREMENT", 1, minimum=1),
+            getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+            wait_timeout=_env_int("ORACLE_POOL_WAIT_SECONDS", 30) * 1000,
+            timeout=_env_int("ORACLE_POOL_TIMEOUT", 300),
+            ping_interval=_env_int("ORACLE_POOL_PING_SECONDS", 60),
+        )
+        logger.info(f"🔌 Oracle session pool created ({dsn}, min={pool_min}, max={pool_max})")
+        return pool
+
+    def _close_retired(self):
+        still_busy = []
+        for pool in self._retired:
+            if self._borrowed.get(pool):
+                still_busy.append(pool)
+                continue
+            try:
+                pool.close()
+            except Exception:
+                still_busy.append(pool)  # sessions still borrowed — retry later
+        self._retired = still_busy
+
+    def _pool_for(self, dsn: str, username: str, password: str):
+        """Pool for *dsn* built with these credentials (rebuilt when they change); caller holds _lock."""
+        fingerprint = _fingerprint(username, password)
+        self._close_retired()
+        entry = self._entries.get(dsn)
+        if entry is not None and entry.fingerprint == fingerprint:
+            entry.acquires += 1
+            return entry.pool
+        if entry is not None:
+            logger.info(f"🔄 Oracle credentials changed — rebuilding session pool for {dsn}")
+            self._retired.append(entry.pool)
+            self._close_retired()
+            self.rebuilds += 1
+        pool = self._create_pool(dsn, username, password)
+        entry = _PoolEntry(dsn, username, fingerprint, pool)
+        entry.acquires = 1
+        self._entries[dsn] = entry
+        return pool
+
+    def acquire(self, dsn: str, username: str, password: str):
+        """
+        Borrow a session from the pool for *dsn*; returns (pool, connection).
+
+        The pool is counted as borrowed before its acquire() runs (outside the
+        lock, since it may wait for a free session), so a concurrent rebuild
+        retires it but cannot close it. Pair every call with release().
+        """
+        if oracledb is None:
+            raise RuntimeError("Oracle driver not installed. Install with: pip install oracledb")
+        with self._lock:
+            pool = self._pool_for(dsn, username, password)
+            self._borrowed[pool] = self._borrowed.get(pool, 0) + 1
+        try:
+            return pool, pool.acquire()
+        except Exception:
+            self._return(pool)
+            raise
+
+    def release(self, pool, connection):
+        """Return *connection* to *pool*; closes the pool if it was retired meanwhile."""
+        try:
+            connection.close()
+        finally:
+            self._return(pool)
+
+    def _return(self, pool):
+        with self._lock:
+            remaining = self._borrowed.get(pool, 0) - 1
+            if remaining > 0:
+                self._borrowed[pool] = remaining
+            else:
+                self._borrowed.pop(pool, None)
+            self._close_retired()
+
+    def discard(self, dsn: str):
+        """Drop the pool for *dsn* (e.g. after an authentication failure)."""
+        with self._lock:
+            entry = self._entries.pop(dsn, None)
+            if entry is not None:
+                self._retired.append(entry.pool)
+                self._close_retired()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pools = []
+            for entry in self._entries.values():
+                pool = entry.pool
+                pools.append({
+                    "dsn": entry.dsn,
+                    "username": entry.username,
+                    "opened": getattr(pool, "opened", None),
+                    "busy": getattr(pool, "busy", None),
+                    "min": getattr(pool, "min", None),
+                    "max": getattr(pool, "max", None),
+                    "acquires": entry.acquires,
+                    "borrowed": self._borrowed.get(pool, 0),
+                    "created_at": entry.created_at,
+                })
+            return {"pools": pools, "rebuilds": self.rebuilds, "retired_pending_close": len(self._retired)}
+
+
+# Singleton instance
+_pool_manager: Optional[OraclePoolManager] = None
+_pool_manager_lock = threading.Lock()
+
+
+def get_oracle_pool_manager() -> OraclePoolManager:
+    """Get singleton Oracle pool manager"""
+    global _pool_manager
+    if _pool_manager is None:
+        with _pool_manager_lock:
+            if _pool_manager is None:
+                _pool_manager = OraclePoolManager()
+    return _pool_manager
+
+
+def get_oracle_pool_stats() -> Dict:
+    """Open/busy sessions and acquire counts per pooled DSN."""
+    return get_oracle_pool_manager().stats()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Output Filters - Predicate and projection pushdown for processed-output reads
+
+ProcessedDataReader accepts row filters and a column list:
+
+  sectors          SECTOR is one of these values (exact match)
+  run_ids          RUN_ID is one of these integers
+  processing_type  PROCESSING_TYPE equals this value
+  date_from/to     DATE within [date_from, date_to] (inclusive, parsed dates)
+  columns          only these columns are returned (missing ones are ignored)
+
+Parquet objects are opened as pyarrow dataset fragments, so unneeded columns
+are never decoded and row groups whose statistics cannot match are skipped.
+DATE is pushed down only when it is stored as a timestamp; text dates are
+parsed and filtered in pandas after the (already pruned) read.  Excel/CSV
+objects are read with usecols and filtered in pandas.
+"""
+import os
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+logger = logging.getLogger(__name__)
+
+# Columns needed to dedup rows (OUTPUT_PRESERVE_HISTORY=false)
+DEDUP_COLUMNS = ("MESSAGE_ID", "CUSIP")
+
+
+def normalize_filters(
+    sectors: Optional[Iterable] = None,
+    run_ids: Optional[Iterable] = None,
+    processing_type: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> Dict:
+    """Filter dict with only the given predicates (values normalized)."""
+    filters = {}
+    if sectors is not None:
+        filters["sectors"] = {str(s) for s in sectors if s is not None and str(s).strip()}
+    if run_ids is not None:
+        filters["run_ids"] = {int(r) for r in run_ids if r is not None and str(r).strip()}
+    if processing_type:
+        filters["processing_type"] = str(processing_type)
+    if date_from:
+        filters["date_from"] = pd.to_datetime(date_from)
+    if date_to:
+        filters["date_to"] = pd.to_datetime(date_to)
+    return filters
+
+
+def filter_columns(filters: Dict) -> List[str]:
+    """Columns the given filters read."""
+    cols = []
+    if "sectors" in filters:
+        cols.append("SECTOR")
+    if "run_ids" in filters:
+        cols.append("RUN_ID")
+    if "processing_type" in filters:
+        cols.append("PROCESSING_TYPE")
+    if "date_from" in filters or "date_to" in filters:
+        cols.append("DATE")
+    return cols
+
+
+def sector_may_match(sector, filters: Dict) -> bool:
+    """False when a file/segment holding only *sector* cannot pass the sector filter."""
+    return "sectors" not in filters or (sector is not None and str(sector) in filters["sectors"])
+
+
+def run_may_match(run_id, filters: Dict) -> bool:
+    """False when a segment holding only *run_id* cannot pass the RUN_ID filter."""
+    if "run_ids" not in filters:
+        return True
+    try:
+        return run_id is not None and int(run_id) in filters["run_ids"]
+    except (TypeError, ValueError):
+        return False
+
+
+def _typed_values(field: pa.Field, values) -> List:
+    """Filter values converted to *field*'s type family (ints stay ints, else text)."""
+    if pa.types.is_integer(field.type):
+        out = []
+        for v in values:
+            try:
+                out.append(int(v))
+            except (TypeError, ValueError):
+                continue
+        return out
+    return [str(v) for v in values]
+
+
+def arrow_filter(schema: pa.Schema, filters: Dict) -> Tuple[Optional[ds.Expression], bool, bool]:
+    """
+    (expression or None, dates left for pandas, can match at all) for *filters*
+    over a file with *schema*.  A file lacking a filtered column cannot match.
+    """
+    expr = None
+    residual_dates = False
+
+    def _and(e):
+        nonlocal expr
+        expr = e if expr is None else expr & e
+
+    for key, col in (("sectors", "SECTOR"), ("run_ids", "RUN_ID")):
+        if key in filters:
+            if col not in schema.names:
+                return None, False, False
+            values = _typed_values(schema.field(col), filters[key])
+            if not values:
+                return None, False, False
+            _and(ds.field(col).isin(values))
+    if "processing_type" in filters:
+        if "PROCESSING_TYPE" not in schema.names:
+            return None, False, False
+        _and(ds.field("PROCESSING_TYPE") == filters["processing_type"])
+    if "date_from" in filters or "date_to" in filters:
+        if "DATE" not in schema.names:
+            return None, False, False
+        dtype = schema.field("DATE").type
+        if pa.types.is_timestamp(dtype) and dtype.tz is None:
+            if "date_from" in filters:
+                _and(ds.field("DATE") >= pa.scalar(filters["date_from"].to_pydatetime()).cast(dtype))
+            if "date_to" in filters:
+                _and(ds.field("DATE") <= pa.scalar(filters["date_to"].to_pydatetime()).cast(dtype))
+        else:
+            residual_dates = True
+    return expr, residual_dates, True
+
+
+def apply_filters(df: pd.DataFrame, filters: Dict, dates_only: bool = False) -> pd.DataFrame:
+    """pandas evaluation of *filters* (for Excel/CSV and text DATE columns)."""
+    if df is None or len(df) == 0 or not filters:
+        return df
+    keep = pd.Series(True, index=df.index)
+    if not dates_only:
+        for key, col in (("sectors", "SECTOR"), ("run_ids", "RUN_ID"), ("processing_type", "PROCESSING_TYPE")):
+            if key not in filters:
+                continue
+            if col not in df.columns:
+                return df.iloc[0:0]
+            if key == "sectors":
+                keep &= df[col].astype(str).isin(filters[key]) & df[col].notna()
+            elif key == "run_ids":
+                keep &= pd.to_numeric(df[col], errors="coerce").isin(filters[key])
+            else:
+                keep &= df[col] == filters[key]
+    if "date_from" in filters or "date_to" in filters:
+        if "DATE" not in df.columns:
+            return df.iloc[0:0]
+        dates = pd.to_datetime(df["DATE"], errors="coerce")
+        if "date_from" in filters:
+            keep &= dates >= filters["date_from"]
+        if "date_to" in filters:
+            keep &= dates <= filters["date_to"]
+    keep = keep.fillna(False).astype(bool)
+    return df if keep.all() else df[keep].reset_index(drop=True)
+
+
+def read_columns(columns: Optional[Iterable[str]], filters: Dict, dedup: bool = False) -> Optional[List[str]]:
+    """Columns to read: the requested ones plus any needed for pandas-side filters/dedup."""
+    if columns is None:
+        return None
+    wanted = list(dict.fromkeys(columns))
+    extra = filter_columns(filters) + (list(DEDUP_COLUMNS) if dedup else [])
+    return wanted + [c for c in extra if c not in wanted]
+
+
+def project(df: pd.DataFrame, columns: Optional[Iterable[str]]) -> pd.DataFrame:
+    """Keep only the requested *columns* that exist, in request order."""
+    if columns is None or df is None:
+        return df
+    return df[[c for c in dict.fromkeys(columns) if c in df.columns]]
+
+
+def read_parquet(source, columns: Optional[List[str]] = None, filters: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    Read one Parquet file (path or seekable file object) with column pruning
+    and row-group filtering.  Returns only the rows passing *filters*.
+    """
+    filters = filters or {}
+    if isinstance(source, (str, os.PathLike)):
+        fragment = ds.ParquetFileFormat().make_fragment(str(source), filesystem=pafs.LocalFileSystem())
+    else:
+        fragment = ds.ParquetFileFormat().make_fragment(source)
+    schema = fragment.physical_schema
+    expr, residual_dates, possible = arrow_filter(schema, filters)
+    if not possible:
+        return pd.DataFrame()
+    names = None
+    if columns is not None:
+        names = [c for c in dict.fromkeys(columns) if c in schema.names]
+        if residual_dates and "DATE" not in names:
+            names.append("DATE")
+    table = fragment.to_table(schema=schema, columns=names, filter=expr)
+    df = table.to_pandas()
+    if residual_dates:
+        df = apply_filters(df, filters, dates_only=True)
+    return df
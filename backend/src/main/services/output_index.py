@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Output Index - Secondary hash indexes over the processed output
+
+Maps normalized identifier values to row positions in the processed-output
+frame cached by OutputService, so point and multi-key lookups by CUSIP,
+TICKER or MESSAGE_ID cost O(matches) instead of a full scan with
+str.upper() on every request.
+
+Keys:
+  CUSIP, TICKER     str(value).strip().upper()
+  MESSAGE_ID        float64 value — the same equality the import-IDs search
+                    uses, so Excel-rounded IDs still hit. Exact integer
+                    matching is a post-filter over the (few) candidates.
+  MESSAGE_ID_TEXT   str(value) as stored, for substring matching over the
+                    distinct IDs instead of every row
+
+The index is rebuilt whenever the cached frame is (re)loaded, extended when
+rows are appended and compacted when a run is deleted.  An index is never
+modified once built: extended() and drop_rows() return a new one, so a
+reader holding the previous (frame, index) pair keeps a consistent view.
+"""
+import logging
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TEXT_KEY_COLUMNS = ("CUSIP", "TICKER")
+MESSAGE_ID_COLUMN = "MESSAGE_ID"
+MESSAGE_ID_TEXT = "MESSAGE_ID_TEXT"
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def normalize_text_keys(values) -> pd.Series:
+    """Case-insensitive key for CUSIP / TICKER values."""
+    series = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    keys = series.astype(object).where(series.notna(), None)
+    keys = keys.map(lambda v: None if v is None else str(v).strip().upper())
+    return keys.where(keys != "", None)
+
+
+def normalize_message_id_keys(values) -> pd.Series:
+    """float64 key for MESSAGE_ID values (NaN for anything non-numeric)."""
+    series = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    if series.dtype == object or pd.api.types.is_string_dtype(series.dtype):
+        series = series.map(lambda v: v.strip() if isinstance(v, str) else v)
+    return pd.to_numeric(series, errors="coerce").astype("float64")
+
+
+class OutputIndex:
+    """Normalized key -> sorted row positions, per indexed column."""
+
+    def __init__(self):
+        self._maps: Dict[str, Dict] = {}
+        self.size = 0
+
+    # ── build / maintain ──────────────────────────────────────────────────────
+
+    @staticmethod
+    def _column_keys(df: pd.DataFrame) -> Dict[str, pd.Series]:
+        keys = {}
+        for col in TEXT_KEY_COLUMNS:
+            if col in df.columns:
+                keys[col] = normalize_text_keys(df[col])
+        if MESSAGE_ID_COLUMN in df.columns:
+            ids = df[MESSAGE_ID_COLUMN]
+            keys[MESSAGE_ID_COLUMN] = normalize_message_id_keys(ids)
+            keys[MESSAGE_ID_TEXT] = ids.astype(object).where(ids.notna(), None).map(
+                lambda v: None if v is None else str(v)
+            )
+        return keys
+
+    @staticmethod
+    def _group_positions(keys: pd.Series, offset: int = 0) -> Dict:
+        """{key: int64 positions} for the non-null keys of *keys*."""
+        values = keys.to_numpy()
+        groups = pd.Series(np.arange(len(values), dtype=np.int64)).groupby(
+            values, sort=False, dropna=True
+        ).indices
+        return {k: v.astype(np.int64) + offset for k, v in groups.items()}
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "OutputIndex":
+        """Index every row of *df* (positions are iloc positions)."""
+        index = cls()
+        index.size = len(df)
+        for name, keys in cls._column_keys(df).items():
+            index._maps[name] = cls._group_positions(keys)
+        logger.info(f"🔎 Output index built: {index.size} row(s), {len(index._maps)} key column(s)")
+        return index
+
+    def extended(self, df: pd.DataFrame) -> "OutputIndex":
+        """Index of this frame plus *df* appended after the current last position."""
+        index = OutputIndex()
+        index.size = self.size + len(df)
+        index._maps = {name: dict(mapping) for name, mapping in self._maps.items()}
+        for name, keys in self._column_keys(df).items():
+            mapping = index._maps.setdefault(name, {})
+            for key, positions in self._group_positions(keys, offset=self.size).items():
+                existing = mapping.get(key)
+                mapping[key] = positions if existing is None else np.concatenate([existing, positions])
+        return index
+
+    def drop_rows(self, keep: np.ndarray) -> "OutputIndex":
+        """Index of the frame that remains after ``frame[keep]`` (positions renumbered)."""
+        keep = np.asarray(keep, dtype=bool)
+        new_positions = np.cumsum(keep, dtype=np.int64) - 1
+        index = OutputIndex()
+        index.size = int(keep.sum())
+        for name, mapping in self._maps.items():
+            kept = {}
+            for key, positions in mapping.items():
+                remaining = positions[keep[positions]]
+                if len(remaining):
+                    kept[key] = new_positions[remaining]
+            index._maps[name] = kept
+        return index
+
+    # ── lookups ───────────────────────────────────────────────────────────────
+
+    def has(self, name: str) -> bool:
+        """True when *name* is indexed (the column existed in the frame)."""
+        return name in self._maps
+
+    def _positions(self, name: str, keys: Iterable) -> np.ndarray:
+        mapping = self._maps.get(name, {})
+        hits = [mapping[k] for k in keys if k in mapping]
+        if not hits:
+            return _EMPTY
+        return np.unique(np.concatenate(hits))
+
+    def lookup_text(self, column: str, values: Iterable) -> np.ndarray:
+        """Positions whose CUSIP/TICKER matches any of *values* (case-insensitive)."""
+        keys = {k for k in normalize_text_keys(values).tolist() if k is not None}
+        return self._positions(column, keys)
+
+    def lookup_message_ids(self, values: Iterable) -> np.ndarray:
+        """Positions whose MESSAGE_ID equals any of *values* as float64."""
+        keys = {k for k in normalize_message_id_keys(values).tolist() if not pd.isna(k)}
+        return self._positions(MESSAGE_ID_COLUMN, keys)
+
+    def lookup_message_id_text(self, values: Iterable) -> np.ndarray:
+        """Positions whose str(MESSAGE_ID) is exactly one of *values*."""
+        return self._positions(MESSAGE_ID_TEXT, {str(v) for v in values})
+
+    def message_id_text_contains(self, fragment: str) -> np.ndarray:
+        """Positions whose str(MESSAGE_ID) contains *fragment* (scans distinct IDs only)."""
+        needle = str(fragment).lower()
+        mapping = self._maps.get(MESSAGE_ID_TEXT, {})
+        return self._positions(MESSAGE_ID_TEXT, [k for k in mapping if needle in k.lower()])
+
+
+def exact_message_id_positions(df: pd.DataFrame, positions: np.ndarray, message_id: int) -> np.ndarray:
+    """Narrow float64 candidates to rows whose MESSAGE_ID == *message_id* exactly."""
+    if len(positions) == 0:
+        return positions
+    candidates = df[MESSAGE_ID_COLUMN].iloc[positions]
+    return positions[(candidates == message_id).to_numpy(dtype=bool, na_value=False)]
+
+
+def take_rows(df: Optional[pd.DataFrame], positions: np.ndarray) -> pd.DataFrame:
+    """Rows of *df* at *positions*, in frame order."""
+    if df is None:
+        return pd.DataFrame()
+    return df.iloc[np.sort(positions)]
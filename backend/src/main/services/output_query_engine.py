@@ -0,0 +1,593 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Output Query Engine - Vectorized evaluation of /search/generic filters
+
+Built once per output version over the frame cached by OutputService (see
+OutputService.query_engine()).  Each column gets typed views on first use and
+keeps them until the next write:
+
+  text      dictionary-encoded (categorical) column: codes + the upper-cased
+            str() of each distinct value.  equals / contains / starts_with /
+            ends_with run over the distinct values only, then map to rows
+            through the codes — SECTOR, SOURCE, BIAS have a handful each.
+  numeric   float64 values with Python float() semantics, for gt/lt/between
+  datetime  datetime64 for DATE, DATE_1 and PROCESSED_AT, so date
+            comparisons work on date strings as well
+
+Filters become boolean masks combined left to right with their AND/OR
+operator.  Sort keys become (missing flag, int64/float64 rank) arrays cached
+per key set.  A page of K rows is a top-K selection (argpartition, then a
+lexsort of just those rows); the full order is built and cached only for deep
+pages (> TOPK_MAX_ROWS) or limit=0.  Only the rows of the requested page are
+turned into dicts.
+
+Keyset pagination: keyset_page() resumes from a cursor state (last rank, last
+sort-key values, ties already returned) instead of re-slicing from the top,
+and encode_cursor()/decode_cursor() turn states into opaque tokens.
+
+Missing values never match a filter.
+"""
+import json
+import base64
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DATE_COLUMNS = frozenset({"DATE", "DATE_1", "PROCESSED_AT"})
+CATEGORY_COLUMNS = ("SECTOR", "SOURCE", "BIAS", "PROCESSING_TYPE", "DIFF_STATUS")
+PRICE_COLUMNS = ("PRICE_LEVEL", "BID", "ASK", "PX", "COV_PRICE", "PERCENT_DIFF", "PRICE_DIFF")
+
+# Newest processed rows first — the generic search default order
+DEFAULT_SORT = (("PROCESSED_AT", False), ("RUN_ID", False), ("DATE", False))
+
+# Pages ending beyond this many rows use the full (cached) sort instead of top-K
+TOPK_MAX_ROWS = 5000
+
+_NUMERIC_OPS = {
+    "gt": np.greater,
+    "lt": np.less,
+    "gte": np.greater_equal,
+    "lte": np.less_equal,
+}
+
+
+def normalize_operator(operator: Optional[str]) -> str:
+    """'Starts With' -> 'starts_with' (same normalization as the router)."""
+    return str(operator or "").strip().lower().replace(" ", "_")
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def _to_datetime(value) -> Optional[pd.Timestamp]:
+    try:
+        parsed = pd.to_datetime(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    if pd.isna(parsed):
+        return None
+    return parsed.tz_localize(None) if parsed.tzinfo is not None else parsed
+
+
+class _Column:
+    """Lazily built typed views of one output column."""
+
+    def __init__(self, series: pd.Series):
+        self.series = series
+        codes, uniques = pd.factorize(series.to_numpy(dtype=object), use_na_sentinel=True)
+        self.codes = codes
+        self.uniques = uniques
+        self._upper: Optional[np.ndarray] = None
+        self._numeric: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._datetime: Optional[np.ndarray] = None
+
+    @property
+    def present(self) -> np.ndarray:
+        return self.codes >= 0
+
+    def _rows(self, per_unique: np.ndarray, fill) -> np.ndarray:
+        """Broadcast a per-distinct-value array to rows (missing rows get *fill*)."""
+        present = self.codes >= 0
+        if not len(per_unique):
+            return np.full(len(self.codes), fill, dtype=per_unique.dtype)
+        return np.where(present, per_unique[np.where(present, self.codes, 0)], fill)
+
+    def upper(self) -> np.ndarray:
+        """str(value).upper() per distinct value."""
+        if self._upper is None:
+            self._upper = np.array([str(v).upper() for v in self.uniques], dtype=object)
+        return self._upper
+
+    def text_mask(self, predicate) -> np.ndarray:
+        """Rows whose upper-cased text satisfies *predicate* (evaluated per distinct value)."""
+        per_unique = np.fromiter((bool(predicate(v)) for v in self.upper()), dtype=bool, count=len(self.uniques))
+        return self._rows(per_unique, False)
+
+    def numeric(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(float64 values, parsed-ok mask) using float() per distinct value."""
+        if self._numeric is None:
+            parsed = [_to_float(v) for v in self.uniques]
+            per_unique = np.array([np.nan if f is None else f for f in parsed], dtype="float64")
+            ok = np.array([f is not None for f in parsed], dtype=bool)
+            self._numeric = (self._rows(per_unique, np.nan), self._rows(ok, False))
+        return self._numeric
+
+    def datetime(self) -> np.ndarray:
+        """datetime64[ns] values (NaT where missing or unparseable)."""
+        if self._datetime is None:
+            parsed = pd.to_datetime(pd.Series(self.uniques, dtype=object), errors="coerce", format="mixed")
+            if getattr(parsed.dt, "tz", None) is not None:
+                parsed = parsed.dt.tz_localize(None)
+            per_unique = parsed.to_numpy(dtype="datetime64[ns]")
+            self._datetime = self._rows(per_unique, np.datetime64("NaT"))
+        return self._datetime
+
+
+class OutputQueryEngine:
+    """Vectorized filters and sort orders over one version of the processed output."""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.size = len(frame)
+        self._columns: Dict[str, _Column] = {}
+        self._orders: Dict[Tuple, Dict[str, np.ndarray]] = {}
+        self._views: Dict[Tuple, Dict[str, Any]] = {}
+        # Typed views for the columns the search UI filters on most
+        for col in CATEGORY_COLUMNS:
+            self.column(col)
+        for col in PRICE_COLUMNS:
+            if self.column(col) is not None:
+                self.column(col).numeric()
+        for col in DATE_COLUMNS:
+            if self.column(col) is not None:
+                self.column(col).datetime()
+
+    def column(self, name: str) -> Optional[_Column]:
+        if name not in self.frame.columns:
+            return None
+        if name not in self._columns:
+            self._columns[name] = _Column(self.frame[name])
+        return self._columns[name]
+
+    # ── filters ───────────────────────────────────────────────────────────────
+
+    def condition_mask(self, field: str, operator: str, value: Any, value2: Any = None) -> np.ndarray:
+        """Boolean row mask for one SearchFilter."""
+        col = self.column(field)
+        none = np.zeros(self.size, dtype=bool)
+        if col is None or value is None:
+            return none
+        op = normalize_operator(operator)
+        needle = str(value).upper()
+
+        if op == "equals":
+            mask = col.text_mask(lambda v: v == needle)
+            if field in DATE_COLUMNS:
+                target = _to_datetime(value)
+                if target is not None:
+                    mask |= col.datetime() == np.datetime64(target, "ns")
+            return mask
+        if op in ("not_equals", "not_equal_to"):
+            return col.present & ~col.text_mask(lambda v: v == needle)
+        if op == "contains":
+            return col.text_mask(lambda v: needle in v)
+        if op == "starts_with":
+            return col.text_mask(lambda v: v.startswith(needle))
+        if op in ("ends_with", "endswith"):
+            return col.text_mask(lambda v: v.endswith(needle))
+
+        if op in _NUMERIC_OPS or op == "between":
+            if op == "between" and value2 is None:
+                return none
+            if field in DATE_COLUMNS:
+                mask = self._date_range_mask(col, op, value, value2)
+                if mask is not None:
+                    return mask
+            low, high = _to_float(value), _to_float(value2) if op == "between" else None
+            if low is None or (op == "between" and high is None):
+                return none
+            nums, ok = col.numeric()
+            with np.errstate(invalid="ignore"):
+                if op == "between":
+                    return ok & (nums >= low) & (nums <= high)
+                return ok & _NUMERIC_OPS[op](nums, low)
+
+        return none
+
+    @staticmethod
+    def _date_range_mask(col: _Column, op: str, value: Any, value2: Any) -> Optional[np.ndarray]:
+        """Date comparison when the filter values parse as dates (None = use numbers)."""
+        if _to_float(value) is not None:
+            return None
+        low = _to_datetime(value)
+        high = _to_datetime(value2) if op == "between" else None
+        if low is None or (op == "between" and high is None):
+            return None
+        dates = col.datetime()
+        present = ~np.isnat(dates)
+        low64 = np.datetime64(low, "ns")
+        if op == "between":
+            return present & (dates >= low64) & (dates <= np.datetime64(high, "ns"))
+        return present & _NUMERIC_OPS[op](dates, low64)
+
+    def match(self, filters: Iterable) -> np.ndarray:
+        """
+        Combine SearchFilter-like objects (field, operator, value, value2,
+        logical_operator) left to right; the first filter's operator is ignored.
+        """
+        combined: Optional[np.ndarray] = None
+        for item in filters:
+            mask = self.condition_mask(item.field, item.operator, item.value, getattr(item, "value2", None))
+            if combined is None:
+                combined = mask
+            elif str(getattr(item, "logical_operator", None) or "AND").upper() == "OR":
+                combined = combined | mask
+            else:
+                combined = combined & mask
+            logger.info(
+                f"After filter {item.field} {item.operator} {item.value} "
+                f"[{getattr(item, 'logical_operator', 'AND')}]: {int(combined.sum())} records"
+            )
+        if combined is None:
+            return np.ones(self.size, dtype=bool)
+        return combined
+
+    # ── ordering / materialization ────────────────────────────────────────────
+
+    def sort_keys(self, sort_by: Optional[str] = None, ascending: bool = False) -> Tuple[Tuple[str, bool], ...]:
+        """Effective ((column, ascending), ...) for an explicit sort_by or the default order."""
+        keys = ((sort_by, ascending),) if sort_by else DEFAULT_SORT
+        return tuple((c, a) for c, a in keys if c in self.frame.columns)
+
+    def _sort_view(self, keys: Tuple[Tuple[str, bool], ...]) -> Dict[str, Any]:
+        """
+        Sort columns (date columns as parsed datetime64) and their rank arrays.
+
+        Mixed-type columns that cannot be ordered natively make the whole key
+        set compare as text, like the previous pandas fallback.
+        """
+        if keys not in self._views:
+            data = {}
+            for col, _ in keys:
+                if col in DATE_COLUMNS:
+                    data[col] = self.column(col).datetime()
+                else:
+                    data[col] = self.frame[col].to_numpy()
+            as_text = False
+            try:
+                ranks = [rank_arrays(data[col], ascending) for col, ascending in keys]
+            except TypeError:
+                as_text = True
+                data = {col: np.array([str(v) for v in values], dtype=object) for col, values in data.items()}
+                ranks = [rank_arrays(data[col], ascending) for col, ascending in keys]
+            self._views[keys] = {"data": data, "ranks": ranks, "as_text": as_text}
+        return self._views[keys]
+
+    def _ordering(self, keys: Tuple[Tuple[str, bool], ...]) -> Dict[str, np.ndarray]:
+        """Cached full stable sort for *keys*: order (rank -> position) and rank_of (position -> rank)."""
+        if keys not in self._orders:
+            order = lexsort_positions(np.arange(self.size, dtype=np.int64), self._sort_view(keys)["ranks"])
+            rank_of = np.empty(self.size, dtype=np.int64)
+            rank_of[order] = np.arange(self.size, dtype=np.int64)
+            self._orders[keys] = {"order": order, "rank_of": rank_of}
+        return self._orders[keys]
+
+    def ordered_positions(
+        self,
+        mask: np.ndarray,
+        sort_by: Optional[str] = None,
+        ascending: bool = False,
+        keys: Optional[Tuple[Tuple[str, bool], ...]] = None,
+    ) -> np.ndarray:
+        """Positions selected by *mask*, in result order (default: newest processed first)."""
+        order = self._ordering(keys if keys is not None else self.sort_keys(sort_by, ascending))["order"]
+        return order[mask[order]]
+
+    def top_positions(self, mask: np.ndarray, keys: Tuple[Tuple[str, bool], ...], k: int) -> np.ndarray:
+        """
+        First *k* positions selected by *mask*, in result order.
+
+        Uses the cached full order when this version already has one;
+        otherwise a partial selection (argpartition) plus a sort of just the
+        selected rows.  Deep pages (k > TOPK_MAX_ROWS) fall back to the full sort.
+        """
+        if keys in self._orders or k > TOPK_MAX_ROWS:
+            order = self._ordering(keys)["order"]
+            found = []
+            chunk = max(k * 4, 256)
+            for start in range(0, self.size, chunk):
+                block = order[start:start + chunk]
+                found.extend(block[mask[block]].tolist())
+                if len(found) >= k:
+                    break
+            return np.asarray(found[:k], dtype=np.int64)
+        return top_k_positions(np.flatnonzero(mask), self._sort_view(keys)["ranks"], k)
+
+    def rows(self, positions: np.ndarray) -> pd.DataFrame:
+        """Frame rows at *positions*, in the given order."""
+        return self.frame.iloc[positions]
+
+    # ── keyset pagination ─────────────────────────────────────────────────────
+
+    def cursor_state(
+        self,
+        keys: Tuple[Tuple[str, bool], ...],
+        emitted: np.ndarray,
+        prior: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Resume point after the rows in *emitted* (positions in result order).
+
+        Holds the last row's sort-key values and how many rows with exactly
+        that key have been returned so far — enough to continue after a write
+        without repeating or skipping rows — plus its rank when this version
+        has a full order to scan from.
+        """
+        last = int(emitted[-1])
+        same = np.ones(len(emitted), dtype=bool)
+        for missing, key in self._sort_view(keys)["ranks"]:
+            same &= (missing[emitted] == missing[last]) & (key[emitted] == key[last])
+        ties = int(same.sum())
+        key_values = self._key_values(keys, last)
+        if prior is not None and same.all() and prior.get("key") == key_values:
+            ties += int(prior.get("ties", 0))
+        state = {"key": key_values, "ties": ties}
+        if keys in self._orders:
+            state["rank"] = int(self._orders[keys]["rank_of"][last])
+        return state
+
+    def _key_values(self, keys: Tuple[Tuple[str, bool], ...], position: int) -> list:
+        """JSON-safe sort-key values of the row at *position*."""
+        data = self._sort_view(keys)["data"]
+        return [_encode_key(data[col][position]) for col, _ in keys]
+
+    def keyset_page(
+        self,
+        mask: np.ndarray,
+        keys: Tuple[Tuple[str, bool], ...],
+        limit: int,
+        after: Optional[Dict] = None,
+        same_version: bool = False,
+    ) -> Tuple[np.ndarray, Optional[Dict]]:
+        """
+        Up to *limit* matching positions following cursor state *after*
+        (None = first page), plus the state for the next page (None at the end).
+
+        Within one data version that has a full order, the scan starts right
+        after the stored rank.  Otherwise rows sorting after the stored key are
+        selected and only the top of them is ordered (top_positions).
+        """
+        skip_ties = 0
+        if after is None:
+            found = self.top_positions(mask, keys, limit + 1)
+        elif same_version and keys in self._orders and 0 <= int(after.get("rank", -1)) < self.size:
+            order = self._orders[keys]["order"]
+            found = []
+            chunk = max(limit * 4, 256)
+            position = int(after["rank"]) + 1
+            while position < self.size and len(found) < limit + 1:
+                block = order[position:position + chunk]
+                found.extend(block[mask[block]].tolist())
+                position += chunk
+            found = np.asarray(found, dtype=np.int64)
+        else:
+            later, equal = self._after_key(keys, after.get("key") or [])
+            eligible = mask & (later | equal)
+            skip_ties = min(int(after.get("ties", 0)), int((mask & equal).sum()))
+            found = self.top_positions(eligible, keys, skip_ties + limit + 1)
+
+        page = np.asarray(found[skip_ties:skip_ties + limit], dtype=np.int64)
+        if len(page) == 0:
+            return page, None
+        has_more = len(found) > skip_ties + limit
+        state = self.cursor_state(keys, page, prior=after) if has_more else None
+        return page, state
+
+    def _after_key(self, keys: Tuple[Tuple[str, bool], ...], key_values: list) -> Tuple[np.ndarray, np.ndarray]:
+        """(sorts strictly after, sorts equal to) the key tuple *key_values*, per row."""
+        view = self._sort_view(keys)
+        later = np.zeros(self.size, dtype=bool)
+        equal = np.ones(self.size, dtype=bool)
+        for (col, ascending), encoded in zip(keys, key_values):
+            values = pd.Series(view["data"][col])
+            target = _decode_key(encoded)
+            if view["as_text"] and target is not None:
+                target = str(target)
+            missing = values.isna().to_numpy(dtype=bool)
+            if target is None:
+                col_later = np.zeros(self.size, dtype=bool)     # missing values sort last
+                col_equal = missing
+            else:
+                try:
+                    greater = values > target if ascending else values < target
+                    col_equal = (values == target).to_numpy(dtype=bool, na_value=False)
+                except TypeError:
+                    text = values.astype(str)
+                    greater = text > str(target) if ascending else text < str(target)
+                    col_equal = (text == str(target)).to_numpy(dtype=bool, na_value=False)
+                col_later = greater.to_numpy(dtype=bool, na_value=False) | missing
+            later |= equal & col_later
+            equal &= col_equal
+        return later, equal
+
+
+# ── sort primitives ───────────────────────────────────────────────────────────
+
+def rank_arrays(values, ascending: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (missing flag, order key) for one sort column: lexsorting on (flag, key)
+    reproduces a stable pandas sort_values with missing values last.
+
+    Integers and datetimes keep exact int64 keys, floats stay float64, other
+    values are ranked by a sorted factorize (TypeError when not comparable).
+    """
+    arr = values.to_numpy() if isinstance(values, pd.Series) else np.asarray(values)
+    if arr.dtype.kind == "M":
+        missing = np.isnat(arr)
+        key = np.where(missing, 0, arr.view("i8"))
+    elif arr.dtype.kind in "iub":
+        missing = np.zeros(len(arr), dtype=bool)
+        key = arr.astype(np.int64)
+    elif arr.dtype.kind == "f":
+        missing = np.isnan(arr)
+        key = np.where(missing, 0.0, arr)
+    else:
+        codes, _ = pd.factorize(arr, sort=True, use_na_sentinel=True)
+        missing = codes < 0
+        key = codes.astype(np.int64)
+    return missing, (key if ascending else -key)
+
+
+def lexsort_positions(positions: np.ndarray, ranks) -> np.ndarray:
+    """*positions* (ascending) stably sorted by the rank arrays, first key first."""
+    if not ranks or len(positions) < 2:
+        return positions
+    sort_keys = []
+    for missing, key in reversed(ranks):
+        sort_keys.append(key[positions])
+        sort_keys.append(missing[positions])
+    return positions[np.lexsort(sort_keys)]
+
+
+def _select_top(positions: np.ndarray, ranks, k: int) -> np.ndarray:
+    """The *k* positions that sort first (unordered); ties beyond the keys go by position."""
+    if len(positions) <= k:
+        return positions
+    if not ranks:
+        return positions[:k]
+    missing, key = ranks[0]
+    absent = missing[positions]
+    if absent.any():
+        present = positions[~absent]
+        if len(present) < k:
+            # Missing values sort last: all present rows, then the best of the missing
+            return np.concatenate([present, _select_top(positions[absent], ranks[1:], k - len(present))])
+        positions = present
+    values = key[positions]
+    kth = np.partition(values, k - 1)[k - 1]
+    before = positions[values < kth]
+    tied = positions[values == kth]
+    return np.concatenate([before, _select_top(tied, ranks[1:], k - len(before))])
+
+
+def top_k_positions(positions: np.ndarray, ranks, k: int) -> np.ndarray:
+    """First *k* of *positions* (ascending) in rank order, without sorting the rest."""
+    if k <= 0:
+        return positions[:0]
+    return lexsort_positions(np.sort(_select_top(positions, ranks, k)), ranks)
+
+
+def top_k_frame(df: pd.DataFrame, keys: Tuple[Tuple[str, bool], ...], k: Optional[int]) -> pd.DataFrame:
+    """
+    ``df.sort_values(...).head(k)`` for (column, ascending) *keys*, selecting the
+    top *k* rows before sorting.  k=None/0 or a deep k sorts everything.
+    """
+    keys = tuple((c, a) for c, a in keys if c in df.columns)
+    if not keys or len(df) == 0:
+        return df.head(k) if k else df
+    try:
+        ranks = [rank_arrays(df[col], ascending) for col, ascending in keys]
+    except TypeError:
+        ordered = df.sort_values(by=[c for c, _ in keys], ascending=[a for _, a in keys], kind="mergesort")
+        return ordered.head(k) if k else ordered
+    positions = np.arange(len(df), dtype=np.int64)
+    if k and k <= TOPK_MAX_ROWS:
+        return df.iloc[top_k_positions(positions, ranks, k)]
+    ordered = lexsort_positions(positions, ranks)
+    return df.iloc[ordered[:k] if k else ordered]
+
+
+def _encode_key(value) -> Any:
+    """Sort-key value -> JSON (timestamps tagged, missing -> None)."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return {"ts": pd.Timestamp(value).isoformat()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _decode_key(value) -> Any:
+    if isinstance(value, dict) and "ts" in value:
+        return np.datetime64(pd.Timestamp(value["ts"]), "ns")
+    return value
+
+
+def encode_cursor(state: Dict) -> str:
+    """Opaque, URL-safe cursor token for a keyset state."""
+    raw = json.dumps(state, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Dict:
+    """Inverse of encode_cursor (ValueError for malformed tokens)."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+    if not isinstance(state, dict):
+        raise ValueError("Invalid cursor")
+    return state
+
+
+def cursor_scope(query: Dict) -> str:
+    """Fingerprint of the filters/sort a cursor was issued for."""
+    raw = json.dumps(query, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def paginate(
+    engine: OutputQueryEngine,
+    mask: np.ndarray,
+    keys: Tuple[Tuple[str, bool], ...],
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    scope: str = "",
+    version: int = 0,
+) -> Tuple[np.ndarray, int, Optional[str]]:
+    """
+    One page of the rows selected by *mask*, in *keys* order.
+
+    With *cursor* the page continues a keyset scan (skip is ignored);
+    otherwise it is the skip/limit slice.  limit <= 0 returns everything from
+    *skip* on.  Returns (positions, page number, next cursor or None).
+    Raises ValueError for a malformed cursor or one issued for another query.
+    """
+    if limit <= 0:
+        return engine.ordered_positions(mask, keys=keys)[skip:], 1, None
+
+    if cursor:
+        payload = decode_cursor(cursor)
+        if payload.get("scope") != scope:
+            raise ValueError("Cursor does not belong to this query")
+        positions, state = engine.keyset_page(
+            mask, keys, limit,
+            after=payload.get("state"),
+            same_version=payload.get("version") == version,
+        )
+        page_number = int(payload.get("page", 0) or 0) + 1
+    else:
+        # Only the first skip+limit+1 rows are ordered (top-K); the extra row tells whether more follow
+        end = skip + limit
+        prefix = engine.top_positions(mask, keys, end + 1)
+        positions = prefix[skip:end]
+        state = engine.cursor_state(keys, prefix[:end]) if len(positions) and len(prefix) > end else None
+        page_number = skip // limit + 1
+
+    next_cursor = None
+    if state is not None:
+        next_cursor = encode_cursor({"scope": scope, "version": version, "page": page_number, "state": state})
+    return positions, page_number, next_cursor
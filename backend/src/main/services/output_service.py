@@ -8,6 +8,11 @@ Configuration via OUTPUT_DESTINATION in .env:
   s3     – upload one file per sub-asset to S3
   both   – append locally AND upload per sub-asset to S3
 
+Local format via OUTPUT_LOCAL_FORMAT in .env:
+  xlsx    – single Processed_Colors_Output.xlsx rewritten on every append (default)
+  parquet – append-only segments partitioned by RUN_ID/SECTOR plus a manifest
+            (see services/local_segment_store.py); append cost is O(batch)
+
 Duplicate prevention:
     Legacy replacement mode dedups by (MESSAGE_ID, CUSIP) composite key so
     same MESSAGE_ID across different CUSIPs never overwrites each other.
@@ -19,6 +24,11 @@ S3 output:
   Column visibility (CLO config) is applied only at READ time (search API layer)
   so that historical data is never lost when an admin changes column settings.
   S3 key pattern:  {S3_PREFIX}{SECTOR}/Processed_Colors_{SECTOR}.{S3_FILE_FORMAT}
+
+  S3_OUTPUT_LAYOUT=delta switches the write path to small per-run delta
+  objects under {SECTOR}/_deltas/; compact_s3_deltas() folds them back into
+  the per-sector file once S3_DELTA_COMPACT_THRESHOLD deltas pile up (and on
+  the optional S3_DELTA_COMPACT_INTERVAL_MINUTES schedule in cron_service).
 """
 import io
 import os
@@ -30,7 +40,17 @@ import logging
 import threading
 from models.color import ColorProcessed
 from services.output_destination_factory import get_output_destination
-from services.s3_destination import S3Destination
+from services.s3_destination import S3Destination, get_s3_output_layout, is_delta_key
+from services.local_segment_store import (
+    LocalSegmentStore,
+    get_local_output_format,
+    segments_root_for,
+)
+from services.ranking_state import RankingStateStore, is_incremental_ranking_enabled
+from services.output_index import OutputIndex
+from services.output_query_engine import OutputQueryEngine
+from services.s3_fanout import fan_out
+from services.s3_object_cache import get_s3_object_cache
 from storage_config import storage
 
 logger = logging.getLogger(__name__)
@@ -64,12 +84,27 @@ class OutputService:
         self.output_file_path = str(output_file_path)
         self._dest_type = os.getenv("OUTPUT_DESTINATION", "local").lower()
         self._preserve_history = os.getenv("OUTPUT_PRESERVE_HISTORY", "true").lower() != "false"
+        self._local_format = get_local_output_format()
+        self._segment_store: Optional[LocalSegmentStore] = None
+        if self._local_format == "parquet" and self._dest_type in ("local", "both"):
+            self._segment_store = LocalSegmentStore(segments_root_for(self.output_file_path))
+
+        self._s3_layout = get_s3_output_layout()
+        try:
+            self._compact_threshold = max(1, int(os.getenv("S3_DELTA_COMPACT_THRESHOLD", "20")))
+        except ValueError:
+            self._compact_threshold = 20
+        # Held by S3 compaction and by run deletes: both rewrite sector objects
+        self._compaction_lock = threading.Lock()
 
         # Destination instances (primarily used for S3 uploads)
         self.destination = get_output_destination()
         self.use_multiple_destinations = isinstance(self.destination, list)
         self._cache_lock = threading.Lock()
         self._cached_df: Optional[pd.DataFrame] = None
+        self._cached_index: Optional[OutputIndex] = None
+        self._cached_engine: Optional[OutputQueryEngine] = None
+        self._cache_generation = 0
 
         # Resolve S3 destination for per-CLO uploads
         if self._dest_type == "s3":
@@ -82,12 +117,25 @@ class OutputService:
 
         logger.info(
             f"OutputService initialized | mode={self._dest_type} | "
+            f"local_format={self._local_format} | s3_layout={self._s3_layout} | "
             f"preserve_history={self._preserve_history} | file={self.output_file_path}"
         )
         self._ensure_output_file()
 
+    @property
+    def local_output_path(self) -> str:
+        """Path whose mtime tracks local output changes (workbook or segment manifest)."""
+        if self._segment_store is not None:
+            return self._segment_store.manifest_path
+        return self.output_file_path
+
     def _ensure_output_file(self):
         """Create output Excel file with headers if it does not yet exist."""
+        if self._segment_store is not None:
+            # First start in parquet mode: carry over any existing workbook history.
+            if not self._segment_store.exists():
+                self._segment_store.import_legacy_excel(self.output_file_path)
+            return
         if not os.path.exists(self.output_file_path):
             logger.info("Creating new output file with headers")
             df = pd.DataFrame(columns=[
@@ -100,12 +148,56 @@ class OutputService:
             df.to_excel(self.output_file_path, index=False, engine='openpyxl')
             logger.info(f"Created output file: {self.output_file_path}")
 
-    def _bump_output_version(self, action: str, run_id: Optional[int] = None, rows_changed: Optional[int] = None):
+    @staticmethod
+    def _reset_ranking_state():
+        """Output rows were removed — make the next incremental ranking emit everything again."""
+        if is_incremental_ranking_enabled():
+            RankingStateStore().clear()
+
+    def _maintain_cache(self, action: str, run_id: Optional[int] = None, appended: Optional[pd.DataFrame] = None):
+        """
+        Keep the in-memory output frame and its OutputIndex in step with a write.
+
+        With a local-only destination an append replaces both with extended
+        copies (segment store with history preserved — the rows read back are
+        exactly the cache plus the batch) and a run delete drops the run's rows
+        from copies of both (unless the segment store dedups at read time —
+        then deleting a run can bring back rows it had superseded).  Frames and indexes already handed out are never
+        modified.
+        Anything else invalidates them; the next read reloads and re-indexes.
+        """
+        with self._cache_lock:
+            cached, index = self._cached_df, self._cached_index
+            self._cached_df = None
+            self._cached_index = None
+            self._cached_engine = None
+            self._cache_generation += 1
+            if cached is None or index is None or self._dest_type != "local":
+                return
+            if (action == "append_processed_colors" and appended is not None
+                    and self._segment_store is not None and self._preserve_history):
+                self._cached_df = pd.concat([cached, appended], ignore_index=True)
+                self._cached_index = index.extended(appended)
+            elif (action == "delete_run_output" and "RUN_ID" in cached.columns
+                    and (self._preserve_history or self._segment_store is None)):
+                # With dedup applied at read time (segment store, history not
+                # preserved) the run's rows may have hidden older ones that now
+                # reappear, so that case reloads instead.
+                keep = (cached["RUN_ID"] != run_id).to_numpy(dtype=bool, na_value=True)
+                self._cached_df = cached[keep].reset_index(drop=True)
+                self._cached_index = index.drop_rows(keep)
+
+    def _bump_output_version(
+        self,
+        action: str,
+        run_id: Optional[int] = None,
+        rows_changed: Optional[int] = None,
+        appended: Optional[pd.DataFrame] = None,
+    ):
         """Persist lightweight output version metadata for cheap dashboard invalidation checks."""
         try:
-            # Invalidate in-memory read cache on any output mutation.
-            with self._cache_lock:
-                self._cached_df = None
+            # Update (or invalidate) the in-memory read cache on any output mutation.
+            self._maintain_cache(action, run_id=run_id, appended=appended)
 
             current = storage.load("dashboard_output_version") or {}
             seq = int(current.get("seq", 0) or 0) + 1
@@ -159,7 +251,38 @@ class OutputService:
             f"(type={processing_type}, dest={self._dest_type})"
         )
         new_df = self._colors_to_dataframe(colors, processing_type, run_id)
+        return self._write_output_frame(new_df, run_id)
+
+    def append_processed_frame(
+        self,
+        ranked_df: pd.DataFrame,
+        processing_type: str = "AUTOMATED",
+        run_id: Optional[int] = None,
+    ) -> int:
+        """
+        Columnar counterpart of append_processed_colors.
+
+        Takes the DataFrame returned by RankingEngine.run_colors_frame and
+        writes it to the same destination(s) without building models.
+
+        Returns the number of new records written.
+        """
+        if self._dest_type in ("local", "both"):
+            self._ensure_output_file()
+
+        if ranked_df is None or len(ranked_df) == 0:
+            logger.warning("No colors to append — 0 records passed the exclusion rules")
+            return 0
+
+        logger.info(
+            f"Saving {len(ranked_df)} processed colors "
+            f"(type={processing_type}, dest={self._dest_type}, columnar)"
+        )
+        new_df = self._frame_to_output_dataframe(ranked_df, processing_type, run_id)
+        return self._write_output_frame(new_df, run_id)
 
+    def _write_output_frame(self, new_df: pd.DataFrame, run_id: Optional[int]) -> int:
+        """Persist an output-schema DataFrame to the configured destination(s)."""
         if self._dest_type in ("local", "both"):
             self._append_to_local_file(new_df)
 
@@ -169,7 +292,8 @@ class OutputService:
         self._bump_output_version(
             action="append_processed_colors",
             run_id=run_id,
-            rows_changed=len(new_df)
+            rows_changed=len(new_df),
+            appended=new_df,
         )
 
         return len(new_df)
@@ -214,6 +338,33 @@ class OutputService:
             })
         return pd.DataFrame(records)
 
+    @staticmethod
+    def _frame_to_output_dataframe(
+        ranked_df: pd.DataFrame,
+        processing_type: str,
+        run_id: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Vectorized _colors_to_dataframe for a ranked ColorRaw-schema frame."""
+        processed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        out = pd.DataFrame({
+            'RUN_ID': run_id,
+            'PROCESSED_AT': processed_at,
+            'PROCESSING_TYPE': processing_type,
+        }, index=ranked_df.index)
+        for col in (
+            'MESSAGE_ID', 'TICKER', 'SECTOR', 'CUSIP', 'DATE',
+            'PRICE_LEVEL', 'BID', 'ASK', 'PX', 'SOURCE', 'BIAS', 'RANK',
+            'COV_PRICE', 'PERCENT_DIFF', 'PRICE_DIFF', 'CONFIDENCE',
+            'DATE_1', 'DIFF_STATUS', 'IS_PARENT', 'PARENT_MESSAGE_ID', 'CHILDREN_COUNT',
+        ):
+            if col in ('DATE', 'DATE_1'):
+                out[col] = pd.to_datetime(ranked_df[col]).dt.strftime("%Y-%m-%d")
+            elif col == 'PARENT_MESSAGE_ID':
+                out[col] = pd.array(ranked_df[col].tolist(), dtype="Int64")
+            else:
+                out[col] = ranked_df[col]
+        return out.reset_index(drop=True)
+
     @staticmethod
     def _build_message_cusip_keys(df: pd.DataFrame) -> list:
         """Build stable dedup keys as (MESSAGE_ID, CUSIP_UPPER) tuples per row."""
@@ -235,7 +386,15 @@ class OutputService:
         In history-preserving mode (default), rows from earlier runs are kept so
         search can show full run history for the same CUSIP/MESSAGE_ID.
         Legacy dedup behavior can be re-enabled with OUTPUT_PRESERVE_HISTORY=false.
+
+        With OUTPUT_LOCAL_FORMAT=parquet the batch is written as new segments
+        only; existing history is never read back.  Legacy dedup is applied at
+        read time instead (newest row per MESSAGE_ID + CUSIP wins).
         """
+        if self._segment_store is not None:
+            self._segment_store.append(new_df)
+            return
+
         try:
             existing_df = pd.read_excel(self.output_file_path, engine='openpyxl')
             logger.info(f"Existing records in local file: {len(existing_df)}")
@@ -350,42 +509,144 @@ class OutputService:
         else:
             sectors = [s for s in new_df['SECTOR'].dropna().unique() if str(s).strip()]
 
+        if self._s3_layout == "delta":
+            self._save_sector_deltas(new_df, sectors)
+            return
+
         logger.info(f"S3 per-CLO upload ({len(sectors)} sub-asset(s)): {sectors}")
+        self._s3_dest._get_s3_client()   # create the shared client before fanning out
+        fan_out(sectors, lambda sector: self._save_sector_to_s3(new_df, sector), label="sector-upload")
+
+    def _save_sector_to_s3(self, new_df: pd.DataFrame, sector):
+        """
+        Download → merge → upload one sector's accumulated file.
+
+        Returns (upload result, bytes uploaded); raises on upload failure so
+        the fan-out reports the sector as failed.
+        """
+        filename = f"{sector}/Processed_Colors_{sector}"
 
-        for sector in sectors:
-            filename = f"{sector}/Processed_Colors_{sector}"
+        # Step 1: download existing accumulation for this sector
+        try:
+            existing_df = self._s3_dest.load_output(filename)
+        except Exception as e:
+            logger.warning(f"Could not download existing S3 data for '{sector}': {e} — starting fresh")
+            existing_df = pd.DataFrame()
+
+        # Step 2: optional legacy dedup — remove rows superseded by new batch
+        new_sector_df = new_df[new_df['SECTOR'] == sector].copy() if 'SECTOR' in new_df.columns else new_df.copy()
+        if (not self._preserve_history) and len(existing_df) > 0 and 'MESSAGE_ID' in existing_df.columns and len(new_sector_df) > 0:
+            new_keys = set(self._build_message_cusip_keys(new_sector_df))
+            before = len(existing_df)
+            existing_keys = self._build_message_cusip_keys(existing_df)
+            existing_df = existing_df[[k not in new_keys for k in existing_keys]]
+            replaced = before - len(existing_df)
+            if replaced:
+                logger.info(f"S3 dedup [{sector}]: replaced {replaced} stale row(s)")
+
+        # Step 3: merge — column union, NaN fills schema gaps (no data loss)
+        merged_df = pd.concat([existing_df, new_sector_df], ignore_index=True)
+
+        # Step 4: upload full schema — NO column filtering here
+        result = self._s3_dest.save_output(merged_df, filename)
+        if result.get('status') != 'success':
+            raise RuntimeError(result.get('message', 'unknown error'))
+        logger.info(
+            f"✅ S3 [{sector}]: {result['message']} "
+            f"({len(merged_df)} total rows, {len(merged_df.columns)} cols)"
+        )
+        return result, result.get('bytes', 0)
+    
+    def _save_sector_deltas(self, new_df: pd.DataFrame, sectors: list):
+        """
+        S3_OUTPUT_LAYOUT=delta write path: upload only this batch, one small
+        delta object per sector. Nothing is downloaded, so the cost of a run
+        no longer grows with the accumulated history.
 
-            # Step 1: download existing accumulation for this sector
+        Sectors whose delta count reaches S3_DELTA_COMPACT_THRESHOLD are
+        compacted in a background thread.
+        """
+        logger.info(f"S3 per-CLO delta upload ({len(sectors)} sub-asset(s)): {sectors}")
+        run_ids = new_df['RUN_ID'].dropna() if 'RUN_ID' in new_df.columns else pd.Series(dtype=object)
+        run_id = int(run_ids.iloc[0]) if len(run_ids) else None
+
+        def _upload(sector):
+            sector_df = new_df[new_df['SECTOR'] == sector]
+            if len(sector_df) == 0:
+                return False, 0
+            result = self._s3_dest.save_delta(sector_df, sector, run_id=run_id)
+            if result.get('status') != 'success':
+                raise RuntimeError(result.get('message', 'unknown error'))
+            logger.info(f"✅ S3 delta [{sector}]: {result['message']} ({len(sector_df)} rows)")
             try:
-                existing_df = self._s3_dest.load_output(filename)
+                compact_due = len(self._s3_dest.list_delta_keys(sector)) >= self._compact_threshold
             except Exception as e:
-                logger.warning(f"Could not download existing S3 data for '{sector}': {e} — starting fresh")
-                existing_df = pd.DataFrame()
-
-            # Step 2: optional legacy dedup — remove rows superseded by new batch
-            new_sector_df = new_df[new_df['SECTOR'] == sector].copy() if 'SECTOR' in new_df.columns else new_df.copy()
-            if (not self._preserve_history) and len(existing_df) > 0 and 'MESSAGE_ID' in existing_df.columns and len(new_sector_df) > 0:
-                new_keys = set(self._build_message_cusip_keys(new_sector_df))
-                before = len(existing_df)
-                existing_keys = self._build_message_cusip_keys(existing_df)
-                existing_df = existing_df[[k not in new_keys for k in existing_keys]]
-                replaced = before - len(existing_df)
-                if replaced:
-                    logger.info(f"S3 dedup [{sector}]: replaced {replaced} stale row(s)")
-
-            # Step 3: merge — column union, NaN fills schema gaps (no data loss)
-            merged_df = pd.concat([existing_df, new_sector_df], ignore_index=True)
-
-            # Step 4: upload full schema — NO column filtering here
-            result = self._s3_dest.save_output(merged_df, filename)
-            if result.get('status') == 'success':
-                logger.info(
-                    f"✅ S3 [{sector}]: {result['message']} "
-                    f"({len(merged_df)} total rows, {len(merged_df.columns)} cols)"
-                )
-            else:
-                logger.error(f"❌ S3 [{sector}]: {result.get('message', 'unknown error')}")
-    
+                logger.warning(f"Could not count S3 deltas for '{sector}': {e}")
+                compact_due = False
+            return compact_due, result.get('bytes', 0)
+
+        self._s3_dest._get_s3_client()   # create the shared client before fanning out
+        report = fan_out(sectors, _upload, label="delta-upload")
+        due = [r.item for r in report.succeeded if r.value]
+
+        if due:
+            threading.Thread(
+                target=self.compact_s3_deltas,
+                kwargs={"sectors": due},
+                name="s3-delta-compaction",
+                daemon=True,
+            ).start()
+
+    def compact_s3_deltas(self, sectors: Optional[list] = None) -> dict:
+        """
+        Merge pending S3 delta objects into their per-sector files.
+
+        Args:
+            sectors: Sectors to compact; None compacts every sector with deltas.
+
+        Returns:
+            Dict with status, sectors compacted and number of deltas merged.
+        """
+        if self._s3_dest is None:
+            return {"status": "skipped", "message": "S3 destination not configured", "deltas_merged": 0}
+
+        # One compaction at a time per process; a concurrent trigger just skips.
+        if not self._compaction_lock.acquire(blocking=False):
+            logger.info("S3 compaction already running — skipping")
+            return {"status": "skipped", "message": "Compaction already running", "deltas_merged": 0}
+        try:
+            if sectors is None:
+                sectors = self._s3_dest.list_delta_sectors()
+            merged_total = 0
+            compacted = []
+            for sector in sectors:
+                try:
+                    result = self._s3_dest.compact_sector(sector, dedup_latest=not self._preserve_history)
+                except Exception as e:
+                    logger.error(f"❌ S3 compaction [{sector}]: {e}")
+                    continue
+                if result.get('status') == 'conflict':
+                    logger.info(f"S3 compaction [{sector}]: {result['message']} — retried next pass")
+                    continue
+                if result.get('status') != 'success':
+                    logger.error(f"❌ S3 compaction [{sector}]: {result.get('message', 'unknown error')}")
+                    continue
+                if result['deltas_merged']:
+                    merged_total += result['deltas_merged']
+                    compacted.append(sector)
+                    logger.info(
+                        f"🗜️ S3 compaction [{sector}]: merged {result['deltas_merged']} delta(s) "
+                        f"({result['rows']} total rows)"
+                    )
+            return {
+                "status": "success",
+                "message": f"Merged {merged_total} delta(s) across {len(compacted)} sector(s)",
+                "sectors": compacted,
+                "deltas_merged": merged_total,
+            }
+        finally:
+            self._compaction_lock.release()
+
     def get_processed_count(self) -> dict:
         """
         Get statistics about processed data from configured destination
@@ -394,6 +655,19 @@ class OutputService:
             Dictionary with counts by processing type
         """
         try:
+            # Segment store keeps row counts in its manifest — no data read needed.
+            if self._segment_store is not None and self._dest_type == "local" and self._preserve_history:
+                stats = self._segment_store.stats()
+                types = stats["processing_types"]
+                return {
+                    'total_processed': stats["total"],
+                    'automated': types.get('AUTOMATED', 0),
+                    'manual': types.get('MANUAL', 0),
+                    'parents': stats["parents"],
+                    'children': stats["children"],
+                    'output_file': self._segment_store.root_dir
+                }
+
             # Use abstracted reader
             from services.processed_data_reader import get_processed_data_reader
             reader = get_processed_data_reader()
@@ -427,6 +701,12 @@ class OutputService:
     def clear_output_file(self):
         """Clear all data from output file (keep headers)"""
         logger.warning("Clearing output file")
+        self._reset_ranking_state()
+        if self._segment_store is not None:
+            self._segment_store.clear()
+            self._bump_output_version(action="clear_output_file", rows_changed=0)
+            logger.info("Output segment store cleared")
+            return
         # Remove existing file so _ensure_output_file recreates it fresh
         if os.path.exists(self.output_file_path):
             os.remove(self.output_file_path)
@@ -439,6 +719,7 @@ class OutputService:
         Remove all output rows that belong to a specific automation run.
 
         Local: reads the Excel file, drops rows where RUN_ID == run_id, rewrites.
+               In segment mode the run's partitions are simply dropped.
         S3:    re-uploads each affected CLO file without those rows.
 
         Returns a dict with 'deleted' (row count) and 'message'.
@@ -446,7 +727,11 @@ class OutputService:
         deleted_total = 0
 
         # ── local ────────────────────────────────────────────────────────────
-        if self._dest_type in ("local", "both"):
+        if self._dest_type in ("local", "both") and self._segment_store is not None:
+            deleted_local = self._segment_store.delete_run(run_id)
+            deleted_total += deleted_local
+            logger.info(f"✅ Deleted {deleted_local} row(s) for RUN_ID={run_id} from segment store")
+        elif self._dest_type in ("local", "both"):
             try:
                 df = pd.read_excel(self.output_file_path, engine='openpyxl')
                 if 'RUN_ID' in df.columns:
@@ -469,11 +754,16 @@ class OutputService:
 
         # ── S3 ────────────────────────────────────────────────────────────────
         # Single-file-per-sector design: each sector has one accumulated file
-        # named {PREFIX}{SECTOR}/Processed_Colors_{SECTOR}.{ext}
+        # named {PREFIX}{SECTOR}/Processed_Colors_{SECTOR}.{ext} plus, with
+        # S3_OUTPUT_LAYOUT=delta, any not-yet-compacted delta objects.
         # To delete a run: download each sector file, filter out rows with
         # RUN_ID == run_id, then re-upload.  Sectors with no matching rows are
-        # left unchanged (no re-upload needed).
+        # left unchanged (no re-upload needed).  Objects are processed
+        # concurrently; a failing object is logged and does not stop the rest.
+        # Holding the compaction lock keeps a compaction from folding the
+        # run's deltas back into a base while they are being removed.
         if self._dest_type in ("s3", "both") and self._s3_dest is not None:
+            self._compaction_lock.acquire()
             try:
                 s3_client = self._s3_dest._get_s3_client()
                 bucket = self._s3_dest.bucket_name
@@ -494,50 +784,17 @@ class OutputService:
                 if not sector_keys:
                     logger.info(f"S3: no sector files found for RUN_ID={run_id} deletion")
                 else:
-                    for key in sector_keys:
-                        try:
-                            response = s3_client.get_object(Bucket=bucket, Key=key)
-                            body = response['Body'].read()
-                            if fmt == 'csv':
-                                sector_df = pd.read_csv(io.BytesIO(body))
-                            elif fmt == 'parquet':
-                                sector_df = pd.read_parquet(io.BytesIO(body), engine='pyarrow')
-                            else:
-                                sector_df = pd.read_excel(io.BytesIO(body), engine='openpyxl')
-
-                            if 'RUN_ID' not in sector_df.columns:
-                                continue
-
-                            before = len(sector_df)
-                            sector_df = sector_df[sector_df['RUN_ID'] != run_id]
-                            removed = before - len(sector_df)
-
-                            if removed == 0:
-                                continue  # Nothing to do for this sector
-
-                            deleted_total += removed
-                            # Re-upload the filtered file
-                            buf = io.BytesIO()
-                            if fmt == 'csv':
-                                sector_df.to_csv(buf, index=False)
-                            elif fmt == 'parquet':
-                                sector_df.to_parquet(buf, index=False, engine='pyarrow')
-                            else:
-                                sector_df.to_excel(buf, index=False, engine='openpyxl')
-                            buf.seek(0)
-                            s3_client.put_object(
-                                Bucket=bucket,
-                                Key=key,
-                                Body=buf.getvalue(),
-                            )
-                            logger.info(
-                                f"✅ S3 [{key}]: removed {removed} row(s) for RUN_ID={run_id}"
-                            )
-                        except Exception as e:
-                            logger.error(f"Error processing S3 sector file {key}: {e}")
+                    report = fan_out(
+                        sector_keys,
+                        lambda key: self._delete_run_from_s3_object(s3_client, bucket, key, fmt, run_id),
+                        label="run-delete",
+                    )
+                    deleted_total += sum(r.value for r in report.succeeded)
 
             except Exception as e:
                 logger.error(f"Error deleting run output from S3: {e}")
+            finally:
+                self._compaction_lock.release()
 
         if deleted_total == 0:
             return {
@@ -548,6 +805,7 @@ class OutputService:
                 )
             }
 
+        self._reset_ranking_state()
         self._bump_output_version(
             action="delete_run_output",
             run_id=run_id,
@@ -558,120 +816,104 @@ class OutputService:
             "message": f"Deleted {deleted_total} output row(s) for RUN_ID={run_id}"
         }
     
-    def read_processed_colors(
-        self, 
-        processing_type: str = None,
-        limit: int = None,
-        cusip: str = None,
-        ticker: str = None,
-        message_id: int = None,
-        date_from: str = None,
-        date_to: str = None
-    ) -> List[dict]:
+    @staticmethod
+    def _delete_run_from_s3_object(s3_client, bucket: str, key: str, fmt: str, run_id: int):
         """
-        Read processed colors from configured output destination (local Excel or S3)
-        FULLY ABSTRACTED - reads from local or S3 based on .env configuration
-        
-        Args:
-            processing_type: Filter by "AUTOMATED" or "MANUAL" (None = all)
-            limit: Maximum number of records to return
-            cusip: Filter by specific CUSIP
-            ticker: Filter by ticker symbol
-            message_id: Filter by message ID
-            date_from: Start date filter (YYYY-MM-DD)
-            date_to: End date filter (YYYY-MM-DD)
-            
-        Returns:
-            List of color dictionaries
+        Drop *run_id*'s rows from one sector object (re-upload, or delete an
+        emptied delta).  Returns (rows removed, bytes transferred).
         """
-        try:
-            # Use abstracted reader (works with local Excel or S3)
-            from services.processed_data_reader import get_processed_data_reader
-            reader = get_processed_data_reader()
+        cache = get_s3_object_cache()
+        body, object_metadata, nbytes = cache.get_object(s3_client, bucket, key)
+        if fmt == 'csv':
+            sector_df = pd.read_csv(io.BytesIO(body))
+        elif fmt == 'parquet':
+            sector_df = pd.read_parquet(io.BytesIO(body), engine='pyarrow')
+        else:
+            sector_df = pd.read_excel(io.BytesIO(body), engine='openpyxl')
+
+        if 'RUN_ID' not in sector_df.columns:
+            return 0, nbytes
+
+        before = len(sector_df)
+        sector_df = sector_df[sector_df['RUN_ID'] != run_id]
+        removed = before - len(sector_df)
+
+        if removed == 0:
+            return 0, nbytes  # Nothing to do for this sector
+
+        if is_delta_key(key) and len(sector_df) == 0:
+            # Delta held only this run — drop the object
+            s3_client.delete_object(Bucket=bucket, Key=key)
+            cache.invalidate(bucket, key)
+            logger.info(f"✅ S3 [{key}]: removed delta for RUN_ID={run_id}")
+            return removed, nbytes
+        # Re-upload the filtered file
+        buf = io.BytesIO()
+        if fmt == 'csv':
+            sector_df.to_csv(buf, index=False)
+        elif fmt == 'parquet':
+            sector_df.to_parquet(buf, index=False, engine='pyarrow')
+        else:
+            sector_df.to_excel(buf, index=False, engine='openpyxl')
+        payload = buf.getvalue()
+        # Keep user metadata (e.g. compacted_through) on the rewritten object
+        metadata = dict(object_metadata)
+        if 'row_count' in metadata:
+            metadata['row_count'] = str(len(sector_df))
+        s3_client.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=payload,
+            Metadata=metadata,
+        )
+        cache.invalidate(bucket, key)
+        logger.info(
+            f"✅ S3 [{key}]: removed {removed} row(s) for RUN_ID={run_id}"
+        )
+        return removed, nbytes + len(payload)
 
-            with self._cache_lock:
-                cached = self._cached_df
+    def indexed_output(self):
+        """
+        Full processed-output frame plus its OutputIndex.
 
-            if cached is not None and len(cached) > 0:
-                df = cached.copy()
-                logger.info(f"Using in-memory processed-data cache: {len(df)} rows")
-            else:
-                # For local Excel: applying nrows is a genuine performance win (reading stops at row N).
-                # For S3: nrows does NOT prevent full file downloads — skip the optimization.
-                if self._dest_type == "local" and limit and limit < 100:
-                    nrows_to_read = min(limit * 10, 2000)
-                    logger.info(f"PERFORMANCE: Reading only {nrows_to_read} rows for limit={limit}")
-                    df = reader.read_processed_data(nrows=nrows_to_read)
-                else:
-                    df = reader.read_processed_data()
+        Loaded and indexed once per output version; writes keep both current
+        (see _maintain_cache).  The frame is shared — callers must not modify it.
 
-                # Cache only full reads, not nrows-limited samples.
-                if not (self._dest_type == "local" and limit and limit < 100):
-                    with self._cache_lock:
-                        self._cached_df = df.copy()
-            
-            if len(df) == 0:
-                logger.warning("Processed data is empty")
-                return []
-            
-            logger.info(f"Initial data loaded: {len(df)} rows")
-            
-            # Apply filters
-            if processing_type:
-                df = df[df['PROCESSING_TYPE'] == processing_type]
-                logger.info(f"After processing_type filter: {len(df)} rows")
-            
-            if cusip:
-                df = df[df['CUSIP'].str.upper() == cusip.upper()]
-                logger.info(f"After cusip filter: {len(df)} rows")
-            
-            if ticker:
-                df = df[df['TICKER'].str.upper() == ticker.upper()]
-                logger.info(f"After ticker filter: {len(df)} rows")
-            
-            if message_id:
-                df = df[df['MESSAGE_ID'] == message_id]
-                logger.info(f"After message_id filter: {len(df)} rows")
-            
-            # Date range filtering
-            if date_from or date_to:
-                df['DATE_PARSED'] = pd.to_datetime(df['DATE'], errors='coerce')
-                if date_from:
-                    df = df[df['DATE_PARSED'] >= pd.to_datetime(date_from)]
-                if date_to:
-                    df = df[df['DATE_PARSED'] <= pd.to_datetime(date_to)]
-                df = df.drop('DATE_PARSED', axis=1)
-                logger.info(f"After date range filter: {len(df)} rows")
-            
-            # Sort by most recent date first (primary), then processed time (secondary)
-            if 'DATE' in df.columns:
-                df['DATE_PARSED'] = pd.to_datetime(df['DATE'], errors='coerce')
-                if 'PROCESSED_AT' in df.columns:
-                    df['PROCESSED_AT_PARSED'] = pd.to_datetime(df['PROCESSED_AT'], errors='coerce')
-                    df = df.sort_values(['DATE_PARSED', 'PROCESSED_AT_PARSED'], ascending=[False, False])
-                    df = df.drop('PROCESSED_AT_PARSED', axis=1)
-                else:
-                    df = df.sort_values('DATE_PARSED', ascending=False)
-                df = df.drop('DATE_PARSED', axis=1)
-                logger.info("Sorted by DATE (most recent first)")
-            elif 'PROCESSED_AT' in df.columns:
-                # Fallback if DATE column missing
-                df = df.sort_values('PROCESSED_AT', ascending=False)
-                logger.info("Sorted by PROCESSED_AT (fallback)")
-            
-            # Apply limit
-            if limit:
-                df = df.head(limit)
-            
-            # Convert to list of dicts
-            records = df.to_dict('records')
-            
-            logger.info(f"✅ Returning {len(records)} processed colors")
-            return records
-            
-        except Exception as e:
-            logger.error(f"Error reading processed colors: {e}")
-            return []
+        Raises OutputReadError when the output cannot be read; only frames from
+        successful reads are cached, so the next call retries.
+        """
+        with self._cache_lock:
+            cached, index = self._cached_df, self._cached_index
+            generation = self._cache_generation
+
+        if cached is None:
+            from services.processed_data_reader import get_processed_data_reader
+            cached = get_processed_data_reader().read_processed_data(strict=True)
+            index = None
+        if index is None:
+            index = OutputIndex.build(cached)
+
+        with self._cache_lock:
+            # Don't resurrect a frame that a concurrent write has already superseded.
+            if generation == self._cache_generation:
+                self._cached_df, self._cached_index = cached, index
+        return cached, index
+
+    def query_engine(self):
+        """
+        (OutputQueryEngine, OutputIndex) over the current output version.
+
+        The engine's typed columns are built on first use after each write.
+        """
+        df, index = self.indexed_output()
+        with self._cache_lock:
+            engine = self._cached_engine
+        if engine is None or engine.frame is not df:
+            engine = OutputQueryEngine(df)
+            with self._cache_lock:
+                if self._cached_df is df:
+                    self._cached_engine = engine
+        return engine, index
 
 
 # Singleton instance
@@ -3,12 +3,33 @@ Processed Data Reader - Abstraction for reading processed output data.
 
 This is SEPARATE from data_source (RAW input) - this reads PROCESSED output.
 Configured via OUTPUT_DESTINATION in .env to read from local Excel or AWS S3.
+With OUTPUT_LOCAL_FORMAT=parquet, local reads come from the append-only
+segment store instead of the workbook.
 """
 import os
 import io
 import pandas as pd
-from typing import Optional
+import pyarrow as pa
+from typing import Dict, Iterable, List, Optional
 import logging
+from services.local_segment_store import (
+    LocalSegmentStore,
+    dedup_latest_rows,
+    get_local_output_format,
+    segments_root_for,
+)
+from services.output_filters import (
+    apply_filters,
+    normalize_filters,
+    project,
+    read_columns,
+    read_parquet,
+    sector_may_match,
+)
+from services.s3_destination import delta_stamp, group_output_keys
+from services.s3_client import get_s3_client
+from services.s3_fanout import fan_out
+from services.s3_object_cache import get_s3_object_cache
 
 # Optional import - only needed when S3 is configured
 try:
@@ -24,6 +45,10 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+class OutputReadError(RuntimeError):
+    """The processed output exists but could not be read (strict reads only)."""
+
+
 class ProcessedDataReader:
     """Read processed color data from configured output destination."""
     
@@ -33,6 +58,8 @@ class ProcessedDataReader:
         
         # Local Excel configuration
         self.local_file_path = self._get_local_output_path()
+        self.local_format = get_local_output_format()
+        self.preserve_history = os.getenv("OUTPUT_PRESERVE_HISTORY", "true").lower() != "false"
         
         # S3 configuration
         self.s3_bucket = os.getenv("S3_BUCKET_NAME", "")
@@ -61,83 +88,218 @@ class ProcessedDataReader:
             raise RuntimeError("boto3 not installed. Install with: pip install boto3")
         
         if self._s3_client is None:
-            if self.aws_access_key and self.aws_secret_key:
-                self._s3_client = boto3.client(
-                    's3',
-                    aws_access_key_id=self.aws_access_key,
-                    aws_secret_access_key=self.aws_secret_key,
-                    region_name=self.s3_region
-                )
-            else:
-                # Use IAM role or default credentials
-                self._s3_client = boto3.client('s3', region_name=self.s3_region)
+            # Shared pooled client (IAM role / default chain when no keys are set)
+            self._s3_client = get_s3_client(self.s3_region, self.aws_access_key, self.aws_secret_key)
         return self._s3_client
     
-    def read_processed_data(self, nrows: Optional[int] = None) -> pd.DataFrame:
+    def read_processed_data(
+        self,
+        nrows: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        sectors: Optional[Iterable[str]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        run_ids: Optional[Iterable[int]] = None,
+        processing_type: Optional[str] = None,
+        strict: bool = False,
+    ) -> pd.DataFrame:
         """
         Read processed color data from configured destination.
         
         Args:
             nrows: Optional limit on number of rows to read
+            columns: Only return these columns (None = all)
+            sectors: Only rows whose SECTOR is one of these
+            date_from: Only rows with DATE >= this date (YYYY-MM-DD)
+            date_to: Only rows with DATE <= this date (YYYY-MM-DD)
+            run_ids: Only rows whose RUN_ID is one of these
+            processing_type: Only rows with this PROCESSING_TYPE
+            strict: Raise OutputReadError instead of returning an empty (or
+                partial) frame when a file or object cannot be read
             
         Returns:
-            DataFrame with processed color data
+            DataFrame with processed color data (empty when there is no output yet)
+
+        Filters are pushed down to the files (see services.output_filters):
+        sector files / segments that cannot match are not read at all.
         """
+        filters = normalize_filters(
+            sectors=sectors, run_ids=run_ids, processing_type=processing_type,
+            date_from=date_from, date_to=date_to,
+        )
         # Determine source based on configuration
         if self.output_destination == "s3":
-            return self._read_from_s3(nrows)
+            return self._read_from_s3(nrows, columns, filters, strict)
         elif self.output_destination == "both":
             # When both are configured, prioritize S3 for reading
             try:
-                return self._read_from_s3(nrows)
+                return self._read_from_s3(nrows, columns, filters, strict)
             except Exception as e:
                 logger.warning(f"Failed to read from S3, falling back to local: {e}")
-                return self._read_from_local(nrows)
+                return self._read_from_local(nrows, columns, filters, strict)
         else:
             # Default to local
-            return self._read_from_local(nrows)
+            return self._read_from_local(nrows, columns, filters, strict)
     
-    def _read_from_local(self, nrows: Optional[int] = None) -> pd.DataFrame:
-        """Read from local Excel file."""
+    def _read_from_local(
+        self, nrows: Optional[int] = None, columns: Optional[List[str]] = None, filters: Optional[Dict] = None,
+        strict: bool = False
+    ) -> pd.DataFrame:
+        """Read from local Excel file (or the segment store in parquet mode)."""
+        filters = filters or {}
+        if self.local_format == "parquet":
+            return self._read_from_local_segments(nrows, columns, filters, strict)
         try:
             if not os.path.exists(self.local_file_path):
                 logger.warning(f"Local file not found: {self.local_file_path}")
                 return pd.DataFrame()
-            
-            if nrows:
-                df = pd.read_excel(self.local_file_path, nrows=nrows)
+
+            read_cols = read_columns(columns, filters)
+            usecols = None if read_cols is None else (lambda c: c in read_cols)
+            # With row filters, nrows applies to the filtered rows
+            if nrows and not filters:
+                df = pd.read_excel(self.local_file_path, nrows=nrows, usecols=usecols)
                 logger.info(f"Read {len(df)} rows (limited) from local Excel")
             else:
-                df = pd.read_excel(self.local_file_path)
+                df = pd.read_excel(self.local_file_path, usecols=usecols)
                 logger.info(f"Read {len(df)} rows from local Excel")
+                df = apply_filters(df, filters)
+                if nrows:
+                    df = df.head(nrows)
             
-            return df
+            return project(df, columns)
             
         except Exception as e:
             logger.error(f"Error reading from local Excel: {e}")
+            if strict:
+                raise OutputReadError(f"Error reading from local Excel: {e}") from e
             return pd.DataFrame()
     
-    def _read_from_s3(self, nrows: Optional[int] = None) -> pd.DataFrame:
+    def _read_from_local_segments(
+        self, nrows: Optional[int] = None, columns: Optional[List[str]] = None, filters: Optional[Dict] = None,
+        strict: bool = False
+    ) -> pd.DataFrame:
+        """Read from the local append-only Parquet segment store."""
+        try:
+            store = LocalSegmentStore(segments_root_for(self.local_file_path))
+            if not store.exists():
+                logger.warning(f"Local segment store not found: {store.root_dir}")
+                return pd.DataFrame()
+            df = store.read(
+                nrows=nrows, dedup_latest=not self.preserve_history, columns=columns, filters=filters,
+                strict=strict,
+            )
+            logger.info(f"Read {len(df)} rows from local segment store")
+            return df
+        except Exception as e:
+            logger.error(f"Error reading from local segment store: {e}")
+            if strict:
+                raise OutputReadError(f"Error reading from local segment store: {e}") from e
+            return pd.DataFrame()
+
+    def _read_s3_object(self, s3_client, key: str, columns: Optional[List[str]] = None, filters: Optional[Dict] = None):
+        """
+        Download one output object as (DataFrame, user metadata, bytes fetched).
+
+        Objects go through the local S3 object cache (ETag revalidation), so
+        an unchanged object is not downloaded again.  With the cache disabled,
+        Parquet objects are read through ranged GETs: only the footer, the
+        requested columns and the row groups that can match are fetched.
         """
-        Read all per-sector accumulated files from S3.
+        filters = filters or {}
+        fmt = self.s3_file_format
+        cache = get_s3_object_cache()
+        pushdown = fmt == 'parquet' and (columns is not None or filters)
+        if pushdown and not cache.enabled:
+            head = s3_client.head_object(Bucket=self.s3_bucket, Key=key)
+            source = _S3RangeFile(s3_client, self.s3_bucket, key, int(head['ContentLength']))
+            df = read_parquet(source, columns=columns, filters=filters)
+            return df, head.get('Metadata', {}) or {}, source.bytes_read
 
-        Each sector has exactly ONE file:
+        body, metadata, nbytes = cache.get_object(s3_client, self.s3_bucket, key)
+        if pushdown:
+            return read_parquet(pa.BufferReader(body), columns=columns, filters=filters), metadata, nbytes
+        usecols = None if columns is None else (lambda c: c in columns)
+        if fmt == 'csv':
+            df = pd.read_csv(io.BytesIO(body), usecols=usecols)
+        elif fmt == 'parquet':
+            df = pd.read_parquet(io.BytesIO(body), engine='pyarrow')
+        else:
+            df = pd.read_excel(io.BytesIO(body), engine='openpyxl', usecols=usecols)
+        return apply_filters(df, filters), metadata, nbytes
+
+    def _read_s3_sector(self, s3_client, group, columns: Optional[List[str]], filters: Dict, strict: bool = False):
+        """
+        One sector folder's base file then its pending deltas, in write order.
+
+        Returns ((frames, deltas read), bytes fetched); unreadable objects are
+        logged and skipped, or raise OutputReadError when *strict*.
+        """
+        base_key, delta_keys = group
+        frames = []
+        deltas_read = 0
+        nbytes = 0
+        watermark = ''
+        if base_key:
+            try:
+                df, metadata, size = self._read_s3_object(s3_client, base_key, columns, filters)
+                watermark = metadata.get('compacted_through', '')
+                frames.append(df)
+                nbytes += size
+                logger.info(f"  {base_key}: {len(df)} row(s)")
+            except Exception as e:
+                if strict:
+                    raise OutputReadError(f"Failed to read {base_key}: {e}") from e
+                logger.error(f"  Failed to read {base_key}: {e} — skipping")
+        for key in delta_keys:
+            if watermark and delta_stamp(key) <= watermark:
+                continue
+            try:
+                df, _, size = self._read_s3_object(s3_client, key, columns, filters)
+                frames.append(df)
+                nbytes += size
+                deltas_read += 1
+            except Exception as e:
+                if strict:
+                    raise OutputReadError(f"Failed to read {key}: {e}") from e
+                logger.error(f"  Failed to read {key}: {e} — skipping")
+        return (frames, deltas_read), nbytes
+
+    def _read_from_s3(
+        self, nrows: Optional[int] = None, columns: Optional[List[str]] = None, filters: Optional[Dict] = None,
+        strict: bool = False
+    ) -> pd.DataFrame:
+        """
+        Read all per-sector files from S3: accumulated base + pending deltas.
+
+        Each sector has ONE accumulated file:
           {S3_PREFIX}{SECTOR}/Processed_Colors_{SECTOR}.{format}
+        and, with S3_OUTPUT_LAYOUT=delta, zero or more delta objects under
+          {S3_PREFIX}{SECTOR}/_deltas/
+        Deltas are applied after their base in write order. Deltas already
+        folded into the base (stamp <= its 'compacted_through' metadata) are
+        skipped, so a half-finished compaction never double counts rows.
+
+        Accumulated files are deduped at write time; deltas are deduped here
+        when OUTPUT_PRESERVE_HISTORY=false (newest row per MESSAGE_ID+CUSIP).
+
+        With a sector filter, other sector folders are not read at all.  Row
+        filters are pushed into each object unless a delta dedup is needed,
+        in which case they are applied after it.
 
-        Data is already deduped at write time (newest MESSAGE_ID wins) so no
-        dedup step is needed here.  Reading is fast: one file per sector,
-        typically 5-20 files total regardless of how many runs have happened.
+        Sector folders are fetched concurrently (S3_MAX_CONCURRENCY, see
+        services.s3_fanout) and concatenated in key order.
         """
+        filters = filters or {}
         try:
             if not self.s3_bucket:
                 raise ValueError("S3_BUCKET_NAME not configured")
 
             s3_client = self._get_s3_client()
             prefix = self.s3_prefix.lstrip('/')
-            fmt = self.s3_file_format
-            ext = f'.{fmt}'
+            ext = f'.{self.s3_file_format}'
 
-            # List only Processed_Colors_*.{ext} sector files
+            # List only Processed_Colors_*.{ext} sector files (base and deltas)
             paginator = s3_client.get_paginator('list_objects_v2')
             keys = []
             for page in paginator.paginate(Bucket=self.s3_bucket, Prefix=prefix):
@@ -151,33 +313,53 @@ class ProcessedDataReader:
                 logger.warning(f"No sector files found in S3 under '{prefix}'")
                 return pd.DataFrame()
 
-            logger.info(f"Reading {len(keys)} sector file(s) from S3")
+            groups = group_output_keys(keys)
+            if "sectors" in filters:
+                groups = [
+                    (base_key, delta_keys) for base_key, delta_keys in groups
+                    if sector_may_match(self._sector_of(base_key or delta_keys[0], prefix), filters)
+                ]
+            has_deltas = any(delta_keys for _, delta_keys in groups)
+            dedup = has_deltas and not self.preserve_history
+            pushdown = {} if dedup else filters
+            read_cols = read_columns(columns, filters, dedup=dedup)
 
+            logger.info(f"Reading {sum(bool(b) + len(d) for b, d in groups)} sector file(s) from S3")
+
+            report = fan_out(
+                groups,
+                lambda group: self._read_s3_sector(s3_client, group, read_cols, pushdown, strict),
+                label="sector-read",
+            )
+            if strict and report.failed:
+                raise OutputReadError(
+                    f"{len(report.failed)} of {len(groups)} sector folder(s) could not be read: "
+                    f"{report.failed[0].error}"
+                )
             dfs = []
-            for key in keys:
-                try:
-                    response = s3_client.get_object(Bucket=self.s3_bucket, Key=key)
-                    body = response['Body'].read()
-                    if fmt == 'csv':
-                        df = pd.read_csv(io.BytesIO(body))
-                    elif fmt == 'parquet':
-                        df = pd.read_parquet(io.BytesIO(body), engine='pyarrow')
-                    else:
-                        df = pd.read_excel(io.BytesIO(body), engine='openpyxl')
-                    dfs.append(df)
-                    logger.info(f"  {key}: {len(df)} row(s)")
-                except Exception as e:
-                    logger.error(f"  Failed to read {key}: {e} — skipping")
+            deltas_read = 0
+            for result in report.succeeded:
+                frames, sector_deltas = result.value
+                dfs.extend(frames)
+                deltas_read += sector_deltas
 
             if not dfs:
                 return pd.DataFrame()
 
             combined = pd.concat(dfs, ignore_index=True)
+            if deltas_read and not self.preserve_history:
+                combined = dedup_latest_rows(combined)
+            if dedup:
+                combined = apply_filters(combined, filters)
 
             if nrows:
                 combined = combined.head(nrows)
+            combined = project(combined, columns)
 
-            logger.info(f"✅ S3 read complete: {len(combined)} row(s) from {len(dfs)} sector file(s)")
+            logger.info(
+                f"✅ S3 read complete: {len(combined)} row(s) from {len(dfs)} file(s) "
+                f"({deltas_read} delta(s))"
+            )
             return combined
 
         except NoCredentialsError:
@@ -187,6 +369,12 @@ class ProcessedDataReader:
             logger.error(f"Error reading from S3: {e}")
             raise
     
+    @staticmethod
+    def _sector_of(key: str, prefix: str) -> str:
+        """SECTOR of a {prefix}{SECTOR}/... output key."""
+        folder = key.split('/_deltas/', 1)[0] if '/_deltas/' in key else key.rsplit('/', 1)[0]
+        return folder[len(prefix):] if folder.startswith(prefix) else folder.rsplit('/', 1)[-1]
+
     def get_recent_colors(self, limit: int = 50, sort_by_date: bool = True) -> pd.DataFrame:
         """
         Get most recent processed colors.
@@ -219,6 +407,49 @@ class ProcessedDataReader:
         return df.head(limit)
 
 
+class _S3RangeFile(io.RawIOBase):
+    """Seekable read-only view of an S3 object that fetches byte ranges on demand."""
+
+    def __init__(self, s3_client, bucket: str, key: str, size: int):
+        self._client = s3_client
+        self._bucket = bucket
+        self._key = key
+        self._size = size
+        self._pos = 0
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self._size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = self._size if size is None or size < 0 else min(self._size, self._pos + size)
+        if end <= self._pos:
+            return b""
+        response = self._client.get_object(
+            Bucket=self._bucket, Key=self._key, Range=f"bytes={self._pos}-{end - 1}"
+        )
+        data = response['Body'].read()
+        self._pos += len(data)
+        self.bytes_read += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
 def get_processed_data_reader() -> ProcessedDataReader:
     """Factory function to get processed data reader instance."""
     return ProcessedDataReader()
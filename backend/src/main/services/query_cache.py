@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Query Cache - Version-keyed LRU cache for search and dashboard responses
+
+Repeated UI requests (same filters, same page) against unchanged output are
+answered from memory.  Keys combine:
+  - the endpoint name and its normalized request (JSON, sorted keys)
+  - dashboard_output_version.seq, bumped by OutputService on every write
+  - a CLO column-config token (mtimes of clo_mappings.json / column_config.json)
+so any output write or column-visibility change makes older entries
+unreachable; they age out through LRU eviction.
+
+Bounds (env):
+  QUERY_CACHE_MAX_ENTRIES  entries kept (default 256, 0 disables the cache)
+  QUERY_CACHE_MAX_ROWS     result rows kept across all entries (default 200000)
+"""
+import os
+import json
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from storage_config import storage
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_CLO_MAPPINGS_FILE = Path(__file__).parent.parent / "data" / "clo_mappings.json"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def output_version_seq() -> int:
+    """Current dashboard_output_version.seq (0 before the first write)."""
+    try:
+        return int((storage.load("dashboard_output_version") or {}).get("seq", 0) or 0)
+    except Exception:
+        return 0
+
+
+def column_config_version() -> str:
+    """Token that changes whenever CLO mappings or the column config are saved."""
+    from services.column_config_service import get_column_config
+    parts = []
+    for path in (_CLO_MAPPINGS_FILE, Path(get_column_config().config_file_path)):
+        try:
+            parts.append(str(os.stat(path).st_mtime_ns))
+        except OSError:
+            parts.append("none")
+    return ":".join(parts)
+
+
+def normalize_request(payload: Any) -> str:
+    """Stable text form of a request (dict keys sorted, non-JSON values via str())."""
+    return json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+
+
+class QueryResultCache:
+    """Thread-safe LRU bounded by entry count and total result rows."""
+
+    def __init__(self, max_entries: int = 256, max_rows: int = 200_000):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int]]" = OrderedDict()
+        self._rows = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def make_key(self, namespace: str, request: Any) -> Tuple:
+        """(namespace, request digest, output seq, column-config token)."""
+        digest = hashlib.sha1(normalize_request(request).encode("utf-8")).hexdigest()
+        return (namespace, digest, output_version_seq(), column_config_version())
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key: Tuple, value: Any, rows: int = 1):
+        rows = max(1, int(rows))
+        if not self.enabled or rows > self.max_rows:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._rows -= old[1]
+            self._entries[key] = (value, rows)
+            self._rows += rows
+            while self._entries and (len(self._entries) > self.max_entries or self._rows > self.max_rows):
+                _, (_, evicted_rows) = self._entries.popitem(last=False)
+                self._rows -= evicted_rows
+                self.evictions += 1
+
+    def cached(
+        self,
+        namespace: str,
+        request: Any,
+        compute: Callable[[], T],
+        rows: Callable[[T], int] = lambda _: 1,
+    ) -> T:
+        """
+        Return the cached result for *request*, computing and storing it on a miss.
+
+        Only results *compute* returns are stored.  It must raise when the
+        underlying read fails (OutputService.indexed_output raises
+        OutputReadError) — an empty result is cached as a real answer, an
+        exception is passed on and the next request computes again.
+        """
+        if not self.enabled:
+            return compute()
+        key = self.make_key(namespace, request)
+        hit, value = self.get(key)
+        if hit:
+            logger.info(f"⚡ Query cache hit: {namespace}")
+            return value
+        try:
+            value = compute()
+        except Exception as e:
+            logger.warning(f"⚠️ Query cache: {namespace} failed ({type(e).__name__}), result not cached")
+            raise
+        self.put(key, value, rows(value))
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "rows": self._rows,
+                "max_entries": self.max_entries,
+                "max_rows": self.max_rows,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Singleton instance
+_query_cache: Optional[QueryResultCache] = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryResultCache:
+    """Get singleton query result cache"""
+    global _query_cache
+    if _query_cache is None:
+        with _query_cache_lock:
+            if _query_cache is None:
+                _query_cache = QueryResultCache(
+                    max_entries=_env_int("QUERY_CACHE_MAX_ENTRIES", 256),
+                    max_rows=_env_int("QUERY_CACHE_MAX_ROWS", 200_000),
+                )
+    return _query_cache
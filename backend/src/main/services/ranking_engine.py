@@ -3,10 +3,22 @@
 """
 Ranking Engine - Core "Run Colors" Algorithm
 Implements parent-child hierarchy based on DATE (desc) > RANK (asc) > PX (desc)
+
+Two equivalent entry points:
+  run_colors        – list of ColorRaw models in, list of ColorProcessed out
+  run_colors_frame  – DataFrame / Arrow table in, DataFrame out (vectorized;
+                      one lexsort instead of per-CUSIP Python sorting)
+
+rank_incremental builds on run_colors_frame: it re-ranks only the CUSIP
+groups touched by new data or whose rows changed since the previous ranking
+state, and returns just the rows whose hierarchy or content changed.
 """
-from typing import List, Dict
+from typing import List, Dict, Iterable, Optional, Tuple
 from collections import defaultdict
+import numpy as np
+import pandas as pd
 from models.color import ColorRaw, ColorProcessed
+from models.color_frame import COLOR_RAW_COLUMNS, DATE_COLUMNS
 import logging
 
 logger = logging.getLogger(__name__)
@@ -55,6 +67,194 @@ class RankingEngine:
         
         return result
     
+    def run_colors_frame(self, data) -> pd.DataFrame:
+        """
+        Columnar "Run Colors" — same hierarchy as run_colors, without models.
+
+        Args:
+            data: DataFrame (or anything with .to_pandas(), e.g. a pyarrow
+                  Table) holding MESSAGE_ID, CUSIP, DATE, RANK and PX columns.
+                  Column names are matched case-insensitively.
+
+        Returns:
+            Input rows reordered exactly as run_colors orders them (CUSIP groups
+            in first-seen order, then DATE desc > RANK asc > PX desc, ties in
+            input order) with IS_PARENT, PARENT_MESSAGE_ID and CHILDREN_COUNT
+            columns added.
+        """
+        df = data if isinstance(data, pd.DataFrame) else data.to_pandas()
+        if len(df) == 0:
+            logger.warning("Empty color frame provided to ranking engine")
+            out = df.copy()
+            out["IS_PARENT"] = pd.Series(dtype=bool)
+            out["PARENT_MESSAGE_ID"] = pd.Series(dtype=object)
+            out["CHILDREN_COUNT"] = pd.Series(dtype="int64")
+            return out
+
+        logger.info(f"Processing {len(df)} colors (columnar)")
+        cols = {str(c).upper(): c for c in df.columns}
+        missing = [c for c in ("MESSAGE_ID", "CUSIP", "DATE", "RANK", "PX") if c not in cols]
+        if missing:
+            raise ValueError(f"Ranking input is missing column(s): {missing}")
+
+        # Group key: normalized CUSIP, groups numbered in first-seen order
+        cusip_key = df[cols["CUSIP"]].astype(str).str.strip().str.upper()
+        group_codes, uniques = pd.factorize(cusip_key, sort=False)
+        logger.info(f"Grouped into {len(uniques)} unique CUSIPs")
+
+        # DATE desc (missing dates last)
+        dates = pd.to_datetime(df[cols["DATE"]], errors="coerce")
+        if getattr(dates.dt, "tz", None) is not None:
+            dates = dates.dt.tz_convert("UTC").dt.tz_localize(None)
+        date_ns = dates.to_numpy(dtype="datetime64[ns]").astype("int64")
+        date_key = np.where(dates.isna().to_numpy(), np.iinfo(np.int64).max, -date_ns)
+
+        # RANK asc (missing ranks last)
+        rank = pd.to_numeric(df[cols["RANK"]], errors="coerce").to_numpy(dtype="float64")
+        rank_key = np.where(np.isnan(rank), np.inf, rank)
+
+        # PX desc; a falsy PX (0 / missing) sorts as -inf, matching run_colors
+        px = pd.to_numeric(df[cols["PX"]], errors="coerce").to_numpy(dtype="float64")
+        px_key = np.where(np.isnan(px) | (px == 0), -np.inf, -px)
+
+        # Single stable lexsort — last key is the primary one
+        order = np.lexsort((np.arange(len(df)), px_key, rank_key, date_key, group_codes))
+        out = df.iloc[order].reset_index(drop=True)
+        sorted_codes = group_codes[order]
+
+        # Group boundaries in the sorted frame
+        starts = np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]
+        group_start = np.maximum.accumulate(np.where(starts, np.arange(len(out)), 0))
+        group_size = np.bincount(sorted_codes, minlength=len(uniques))[sorted_codes]
+
+        message_ids = out[cols["MESSAGE_ID"]].to_numpy(dtype=object)
+        parent_ids = message_ids[group_start].copy()
+        parent_ids[starts] = None
+
+        out["IS_PARENT"] = starts
+        out["PARENT_MESSAGE_ID"] = parent_ids
+        out["CHILDREN_COUNT"] = np.where(starts, group_size - 1, 0).astype("int64")
+
+        parents = int(starts.sum())
+        logger.info(f"Processed: {parents} parents, {len(out) - parents} children")
+        return out
+
+    # Columns that identify a row / carry its hierarchy in the ranking state
+    STATE_COLUMNS = ["CUSIP_KEY", "MESSAGE_ID", "OCCURRENCE", "ROW_HASH",
+                     "IS_PARENT", "PARENT_MESSAGE_ID", "CHILDREN_COUNT"]
+
+    # Content hashed into ROW_HASH: source fields only.  DATE / DATE_1 are left
+    # out because coercion fills unparseable or absent dates with now(), which
+    # would change the hash on every run; DATE still reaches the state through
+    # the hierarchy, since it is the primary sort key.
+    HASH_COLUMNS = [c for c in COLOR_RAW_COLUMNS if c not in DATE_COLUMNS]
+
+    @staticmethod
+    def normalize_cusips(values: pd.Series) -> pd.Series:
+        """Group key used by both ranking paths: str(CUSIP).strip().upper()."""
+        return values.astype(str).str.strip().str.upper()
+
+    def rank_incremental(
+        self,
+        data: pd.DataFrame,
+        previous_state: pd.DataFrame,
+        touched_cusips: Optional[Iterable[str]] = None,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Re-rank only the CUSIP groups that can differ from the previous state.
+
+        Args:
+            data: Every rule-filtered color (ColorRaw columns) — the full input a
+                  run_colors_frame() call would get, not just the new rows.
+            previous_state: Frame with STATE_COLUMNS from the last run (may be empty).
+            touched_cusips: Normalized CUSIPs that received new or changed rows.
+                  Groups whose set of rows differs from the previous state
+                  (rows excluded by a rule, removed at the source, or a CUSIP
+                  that dropped out entirely) are re-ranked as well.  None
+                  re-ranks every group (e.g. after a full source refresh).
+
+        Returns:
+            (changed_rows, next_state) — changed_rows are ranked rows that are new
+            or whose content/hierarchy differs from the previous state; next_state
+            equals the state a full re-rank of *data* would produce and replaces
+            previous_state once changed_rows have been written.
+        """
+        cols = {str(c).upper(): c for c in data.columns}
+        keys = self.normalize_cusips(data[cols["CUSIP"]]) if len(data) else pd.Series(dtype=object)
+        if touched_cusips is not None:
+            touched = set(touched_cusips) | self._membership_changes(data, keys, previous_state)
+            data = data[keys.isin(touched).to_numpy()]
+            logger.info(f"Incremental ranking: {len(touched)} touched CUSIP(s), {len(data)} row(s)")
+
+        ranked = self.run_colors_frame(data)
+
+        # Snapshot of the new ranking for the touched groups
+        content_cols = [cols[c] for c in self.HASH_COLUMNS if c in cols]
+        snapshot = pd.DataFrame({
+            "CUSIP_KEY": self.normalize_cusips(ranked[cols["CUSIP"]]) if len(ranked) else pd.Series(dtype=object),
+            "MESSAGE_ID": ranked[cols["MESSAGE_ID"]].astype(str) if len(ranked) else pd.Series(dtype=object),
+        })
+        snapshot["OCCURRENCE"] = snapshot.groupby(["CUSIP_KEY", "MESSAGE_ID"]).cumcount().astype("int64")
+        # Content hash stored as int64 (same bits) so it round-trips through Parquet
+        snapshot["ROW_HASH"] = (
+            pd.util.hash_pandas_object(ranked[content_cols], index=False).to_numpy().view("int64")
+            if len(ranked) else np.zeros(0, dtype="int64")
+        )
+        snapshot["IS_PARENT"] = ranked["IS_PARENT"].astype(bool).to_numpy()
+        snapshot["PARENT_MESSAGE_ID"] = ranked["PARENT_MESSAGE_ID"].map(
+            lambda v: None if v is None or pd.isna(v) else str(v)
+        ).astype(object).to_numpy()
+        snapshot["CHILDREN_COUNT"] = ranked["CHILDREN_COUNT"].astype("int64").to_numpy()
+
+        # A row is emitted when it is new or any of its tracked fields changed
+        ident = ["CUSIP_KEY", "MESSAGE_ID", "OCCURRENCE"]
+        compare = ["ROW_HASH", "IS_PARENT", "PARENT_MESSAGE_ID", "CHILDREN_COUNT"]
+        if previous_state is None or len(previous_state) == 0:
+            changed = np.ones(len(snapshot), dtype=bool)
+            previous_state = pd.DataFrame(columns=self.STATE_COLUMNS)
+        else:
+            joined = snapshot.merge(
+                previous_state[self.STATE_COLUMNS], on=ident, how="left",
+                suffixes=("", "_PREV"), indicator=True,
+            )
+            changed = (joined["_merge"] == "left_only").to_numpy().copy()
+            for col in compare:
+                prev, curr = joined[f"{col}_PREV"], joined[col]
+                same = (prev == curr) | (prev.isna() & curr.isna())
+                changed |= ~same.to_numpy(dtype=bool)
+
+        # Untouched groups keep their previous state; touched ones are replaced
+        if touched_cusips is None:
+            kept = previous_state.iloc[0:0]
+        else:
+            kept = previous_state[~previous_state["CUSIP_KEY"].isin(touched)]
+        next_state = pd.concat([kept[self.STATE_COLUMNS], snapshot], ignore_index=True).astype({
+            "CUSIP_KEY": object, "MESSAGE_ID": object, "OCCURRENCE": "int64", "ROW_HASH": "int64",
+            "IS_PARENT": bool, "PARENT_MESSAGE_ID": object, "CHILDREN_COUNT": "int64",
+        })
+
+        changed_rows = ranked[changed].reset_index(drop=True)
+        logger.info(f"Incremental ranking: {len(changed_rows)} changed row(s) of {len(ranked)} re-ranked")
+        return changed_rows, next_state
+
+    @staticmethod
+    def _membership_changes(data: pd.DataFrame, keys: pd.Series, previous_state: pd.DataFrame) -> set:
+        """CUSIPs whose (MESSAGE_ID, count) rows differ between *data* and *previous_state*."""
+        if previous_state is None or len(previous_state) == 0:
+            return set(keys)
+        cols = {str(c).upper(): c for c in data.columns}
+        current = pd.DataFrame({
+            "CUSIP_KEY": keys.to_numpy(dtype=object),
+            "MESSAGE_ID": data[cols["MESSAGE_ID"]].astype(str).to_numpy(dtype=object),
+        }).value_counts()
+        previous = previous_state[["CUSIP_KEY", "MESSAGE_ID"]].astype(object).value_counts()
+        current, previous = current.align(previous, fill_value=0)
+        differs = current.index[(current != previous).to_numpy()]
+        changed = set(differs.get_level_values("CUSIP_KEY"))
+        if changed:
+            logger.info(f"Incremental ranking: {len(changed)} CUSIP(s) gained or lost rows")
+        return changed
+
     def _group_by_cusip(self, colors: List[ColorRaw]) -> Dict[str, List[ColorRaw]]:
         """Group colors by CUSIP identifier"""
         grouped = defaultdict(list)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Ranking State - Persisted parent/child hierarchy for incremental ranking
+
+Enabled with RANKING_INCREMENTAL=true together with RUN_PIPELINE_MODE=columnar.
+
+Stores one row per ranked color (CUSIP key, MESSAGE_ID, source-field hash and
+IS_PARENT / PARENT_MESSAGE_ID / CHILDREN_COUNT) so a run can re-rank only the
+CUSIPs that received new data or gained / lost rows, and emit just the rows
+that changed (see RankingEngine.rank_incremental).
+
+File: <SOURCE_STATE_DIR>/ranking__<clo>.parquet
+"""
+import os
+import threading
+import logging
+from typing import Optional
+from urllib.parse import quote
+
+import pandas as pd
+
+from services.source_state import get_source_state_dir
+
+logger = logging.getLogger(__name__)
+
+
+def is_incremental_ranking_enabled() -> bool:
+    """True when RANKING_INCREMENTAL=true."""
+    return os.getenv("RANKING_INCREMENTAL", "false").strip().lower() == "true"
+
+
+class RankingStateStore:
+    """Load/save the ranking state for one CLO."""
+
+    _lock = threading.Lock()
+
+    def __init__(self, clo_id: Optional[str] = None, state_dir: Optional[str] = None):
+        self.state_dir = state_dir or get_source_state_dir()
+        self.path = os.path.join(self.state_dir, f"ranking__{quote(clo_id or 'default', safe='')}.parquet")
+
+    def load(self) -> pd.DataFrame:
+        """Previous ranking state (empty DataFrame on first run or unreadable file)."""
+        if not os.path.exists(self.path):
+            return pd.DataFrame()
+        try:
+            return pd.read_parquet(self.path, engine="pyarrow")
+        except Exception as e:
+            logger.warning(f"Could not read ranking state ({e}) — re-ranking all groups")
+            return pd.DataFrame()
+
+    def save(self, state: pd.DataFrame):
+        """Replace the stored state (call only after the changed rows are written)."""
+        with self._lock:
+            os.makedirs(self.state_dir, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            state.to_parquet(tmp_path, index=False, engine="pyarrow")
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Drop the state so the next run emits every ranked row again."""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
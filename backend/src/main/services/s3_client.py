@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+S3 Client - Process-wide, pooled boto3 S3 client provider
+
+Every S3 path in the backend (output destination and reader, S3Storage,
+S3Service, column-config / backup / log sync) gets its client from
+get_s3_client() instead of building its own.  Clients are shared per
+(region, credentials), so they share one connection pool and one credential
+resolution, and parallel sector I/O (services.s3_fanout) does not queue on a
+10-connection default pool.
+
+Tuning (env):
+  S3_MAX_POOL_CONNECTIONS  HTTP connections kept per client (default 50)
+  S3_MAX_ATTEMPTS          total attempts per request incl. retries (default 5)
+  S3_RETRY_MODE            standard | adaptive (default standard)
+  S3_CONNECT_TIMEOUT       seconds (default 5)
+  S3_READ_TIMEOUT          seconds (default 60)
+TCP keep-alive is enabled on pooled connections.
+
+Every API call is timed through botocore events (parameter build → after-call);
+get_s3_client_stats() returns per-operation counts and latencies, and
+add_s3_timing_hook() registers a callback(operation, seconds, ok).
+"""
+import os
+import time
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import boto3
+    from botocore.config import Config
+    BOTO3_AVAILABLE = True
+except ImportError:
+    BOTO3_AVAILABLE = False
+    boto3 = None
+    Config = None
+
+_START_KEY = "_s3_timing_started"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.1, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def s3_client_config():
+    """botocore Config for pooled S3 clients (see module docstring for env)."""
+    retry_mode = os.getenv("S3_RETRY_MODE", "standard").strip().lower()
+    return Config(
+        max_pool_connections=_env_int("S3_MAX_POOL_CONNECTIONS", 50),
+        retries={
+            "total_max_attempts": _env_int("S3_MAX_ATTEMPTS", 5),
+            "mode": retry_mode if retry_mode in ("standard", "adaptive", "legacy") else "standard",
+        },
+        connect_timeout=_env_float("S3_CONNECT_TIMEOUT", 5),
+        read_timeout=_env_float("S3_READ_TIMEOUT", 60),
+        tcp_keepalive=True,
+    )
+
+
+class S3OperationStats:
+    """Thread-safe per-operation call counters and latencies."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ops: Dict[str, Dict] = {}
+        self._hooks: List[Callable[[str, float, bool], None]] = []
+
+    def add_hook(self, hook: Callable[[str, float, bool], None]):
+        with self._lock:
+            self._hooks.append(hook)
+
+    def record(self, operation: str, seconds: float, ok: bool):
+        with self._lock:
+            op = self._ops.setdefault(operation, {"calls": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            op["calls"] += 1
+            op["errors"] += 0 if ok else 1
+            op["total_seconds"] += seconds
+            op["max_seconds"] = max(op["max_seconds"], seconds)
+            hooks = list(self._hooks)
+        for hook in hooks:
+            try:
+                hook(operation, seconds, ok)
+            except Exception as e:
+                logger.debug(f"S3 timing hook failed: {e}")
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                name: {
+                    "calls": op["calls"],
+                    "errors": op["errors"],
+                    "avg_ms": round(op["total_seconds"] * 1000 / op["calls"], 2) if op["calls"] else 0.0,
+                    "max_ms": round(op["max_seconds"] * 1000, 2),
+                }
+                for name, op in sorted(self._ops.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._ops.clear()
+
+
+_stats = S3OperationStats()
+
+
+def _start_timer(model=None, context=None, **kwargs):
+    if context is not None:
+        context[_START_KEY] = time.perf_counter()
+
+
+def _after_call(model=None, context=None, http_response=None, **kwargs):
+    started = (context or {}).pop(_START_KEY, None)
+    if started is None or model is None:
+        return
+    status = getattr(http_response, "status_code", 200) or 200
+    _stats.record(model.name, time.perf_counter() - started, status < 400)
+
+
+def _after_call_error(model=None, context=None, **kwargs):
+    started = (context or {}).pop(_START_KEY, None)
+    if started is not None and model is not None:
+        _stats.record(model.name, time.perf_counter() - started, False)
+
+
+_clients: Dict[Tuple, object] = {}
+_clients_lock = threading.Lock()
+
+
+def get_s3_client(region: Optional[str] = None, access_key: Optional[str] = None, secret_key: Optional[str] = None):
+    """
+    Shared pooled S3 client.
+
+    Defaults: S3_REGION and AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY; without
+    keys the default credential chain (IAM role, profile) is used.
+    """
+    if not BOTO3_AVAILABLE:
+        raise RuntimeError("boto3 not installed. Install with: pip install boto3")
+
+    region = region or os.getenv("S3_REGION", "us-east-1")
+    if access_key is None and secret_key is None:
+        access_key = os.getenv("AWS_ACCESS_KEY_ID", "")
+        secret_key = os.getenv("AWS_SECRET_ACCESS_KEY", "")
+    key = (region, access_key or "", secret_key or "")
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            kwargs = {"region_name": region, "config": s3_client_config()}
+            if access_key and secret_key:
+                kwargs.update(aws_access_key_id=access_key, aws_secret_access_key=secret_key)
+            client = boto3.client("s3", **kwargs)
+            client.meta.events.register("before-parameter-build.s3", _start_timer)
+            client.meta.events.register("after-call.s3", _after_call)
+            client.meta.events.register("after-call-error.s3", _after_call_error)
+            _clients[key] = client
+            logger.info(f"☁️  S3 client created (region={region}, pool={client.meta.config.max_pool_connections})")
+    return client
+
+
+def add_s3_timing_hook(hook: Callable[[str, float, bool], None]):
+    """Call hook(operation, seconds, ok) after every S3 API call."""
+    _stats.add_hook(hook)
+
+
+def get_s3_client_stats() -> Dict:
+    """Per-operation S3 call counts, errors and latency (ms) since start."""
+    return {"clients": len(_clients), "operations": _stats.snapshot()}
@@ -1,13 +1,30 @@
 """
 AWS S3 Output Destination Implementation.
 Uploads processed data to AWS S3 bucket.
+
+Two per-sector layouts share the same prefix (S3_OUTPUT_LAYOUT):
+  accumulated – one object per sector, rewritten on every run (default):
+                  {S3_PREFIX}{SECTOR}/Processed_Colors_{SECTOR}.{fmt}
+  delta       – every run writes a small delta object per sector:
+                  {S3_PREFIX}{SECTOR}/_deltas/Processed_Colors_{SECTOR}__{stamp}_{id}_run{RUN_ID}.{fmt}
+                compact_sector() later folds deltas into the accumulated
+                object and records the newest merged stamp in its
+                'compacted_through' metadata, so readers skip deltas that were
+                merged but not yet deleted.
+
+The accumulated key scheme is unchanged, so existing objects stay readable.
 """
 import os
 import io
+import uuid
 import logging
 import pandas as pd
-from typing import Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
 from output_destination_interface import OutputDestinationInterface
+from services.local_segment_store import dedup_latest_rows
+from services.s3_client import get_s3_client
+from services.s3_object_cache import get_s3_object_cache
 
 # Optional import - only needed when S3 is configured
 try:
@@ -22,6 +39,52 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+DELTA_DIR = "_deltas"
+DELTA_STAMP_FORMAT = "%Y%m%dT%H%M%S%f"
+# Deltas younger than this are left for the next compaction so an upload
+# still in flight (stamped earlier than it lands) is never skipped.
+COMPACT_MIN_DELTA_AGE_SECONDS = 60
+
+
+def get_s3_output_layout() -> str:
+    """Return the configured S3 output layout ('accumulated' or 'delta')."""
+    layout = os.getenv("S3_OUTPUT_LAYOUT", "accumulated").strip().lower()
+    return "delta" if layout == "delta" else "accumulated"
+
+
+def is_delta_key(key: str) -> bool:
+    """True for per-run delta objects (as opposed to accumulated sector files)."""
+    return f"/{DELTA_DIR}/" in f"/{key}"
+
+
+def delta_stamp(key: str) -> str:
+    """UTC write stamp embedded in a delta key ('' when it cannot be parsed)."""
+    fname = key.split('/')[-1]
+    if '__' not in fname:
+        return ''
+    return fname.rsplit('__', 1)[1].split('_', 1)[0]
+
+
+def group_output_keys(keys: List[str]) -> List[Tuple[Optional[str], List[str]]]:
+    """
+    Group Processed_Colors_* keys by sector folder.
+
+    Returns (accumulated_key_or_None, delta_keys_oldest_first) per folder so
+    readers can apply base + deltas in write order.
+    """
+    groups: Dict[str, Dict[str, Any]] = {}
+    for key in keys:
+        if is_delta_key(key):
+            folder = f"/{key}".rsplit(f"/{DELTA_DIR}/", 1)[0].lstrip('/')
+            groups.setdefault(folder, {"base": None, "deltas": []})["deltas"].append(key)
+        else:
+            folder = key.rsplit('/', 1)[0] if '/' in key else ''
+            groups.setdefault(folder, {"base": None, "deltas": []})["base"] = key
+    return [
+        (g["base"], sorted(g["deltas"], key=delta_stamp))
+        for _, g in sorted(groups.items())
+    ]
+
 
 class S3Destination(OutputDestinationInterface):
     """AWS S3 output destination implementation."""
@@ -47,16 +110,8 @@ class S3Destination(OutputDestinationInterface):
             raise RuntimeError("boto3 not installed. Install with: pip install boto3")
         
         if self._s3_client is None:
-            if self.access_key and self.secret_key:
-                self._s3_client = boto3.client(
-                    's3',
-                    aws_access_key_id=self.access_key,
-                    aws_secret_access_key=self.secret_key,
-                    region_name=self.region
-                )
-            else:
-                # Use IAM role or default credentials
-                self._s3_client = boto3.client('s3', region_name=self.region)
+            # Shared pooled client (IAM role / default chain when no keys are set)
+            self._s3_client = get_s3_client(self.region, self.access_key, self.secret_key)
         
         return self._s3_client
     
@@ -82,23 +137,36 @@ class S3Destination(OutputDestinationInterface):
         buffer.seek(0)
         return buffer
 
+    def _parse_file_buffer(self, buffer: io.BytesIO) -> pd.DataFrame:
+        """
+        Read a BytesIO buffer back into a DataFrame (parse errors propagate).
+        Format must match self.file_format used when the file was written.
+        """
+        buffer.seek(0)
+        if self.file_format == "csv":
+            return pd.read_csv(buffer)
+        elif self.file_format == "parquet":
+            return pd.read_parquet(buffer, engine='pyarrow')
+        else:
+            return pd.read_excel(buffer, engine='openpyxl')
+
     def _read_file_buffer(self, buffer: io.BytesIO) -> pd.DataFrame:
         """
         Read a BytesIO buffer back into a DataFrame.
-        Format must match self.file_format used when the file was written.
         Returns an empty DataFrame on any parse error.
         """
-        buffer.seek(0)
         try:
-            if self.file_format == "csv":
-                return pd.read_csv(buffer)
-            elif self.file_format == "parquet":
-                return pd.read_parquet(buffer, engine='pyarrow')
-            else:
-                return pd.read_excel(buffer, engine='openpyxl')
+            return self._parse_file_buffer(buffer)
         except Exception as e:
             return pd.DataFrame()
 
+    def _object_key(self, filename: str) -> str:
+        """Full S3 key for *filename* (prefix + configured file extension)."""
+        if not filename.endswith(f'.{self.file_format}'):
+            base_name = filename.rsplit('.', 1)[0]
+            filename = f"{base_name}.{self.file_format}"
+        return f"{self.prefix}{filename}".lstrip('/')
+
     def load_output(self, filename: str) -> pd.DataFrame:
         """
         Download an existing S3 object and parse it back to a DataFrame.
@@ -112,17 +180,10 @@ class S3Destination(OutputDestinationInterface):
         if not self.bucket_name:
             return pd.DataFrame()
 
-        # Ensure correct extension in the key
-        if not filename.endswith(f'.{self.file_format}'):
-            base_name = filename.rsplit('.', 1)[0]
-            filename = f"{base_name}.{self.file_format}"
-
-        s3_key = f"{self.prefix}{filename}".lstrip('/')
+        s3_key = self._object_key(filename)
 
         try:
-            s3_client = self._get_s3_client()
-            response = s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
-            body = response['Body'].read()
+            body, _, _ = get_s3_object_cache().get_object(self._get_s3_client(), self.bucket_name, s3_key)
             return self._read_file_buffer(io.BytesIO(body))
         except ClientError as e:
             if e.response['Error']['Code'] in ('NoSuchKey', '404'):
@@ -163,6 +224,8 @@ class S3Destination(OutputDestinationInterface):
                     Delete={'Objects': batch}
                 )
                 deleted += len(resp.get('Deleted', []))
+                for obj in batch:
+                    get_s3_object_cache().invalidate(self.bucket_name, obj['Key'])
             return deleted
         except Exception as e:
             logger.error(f"S3 delete_objects error: {e}")
@@ -189,13 +252,8 @@ class S3Destination(OutputDestinationInterface):
                     "type": "s3"
                 }
             
-            # Ensure filename has correct extension
-            if not filename.endswith(f'.{self.file_format}'):
-                base_name = filename.rsplit('.', 1)[0]
-                filename = f"{base_name}.{self.file_format}"
-            
-            # Build S3 key with prefix
-            s3_key = f"{self.prefix}{filename}".lstrip('/')
+            # Build S3 key with prefix and the configured extension
+            s3_key = self._object_key(filename)
             
             # Prepare file buffer
             file_buffer = self._prepare_file_buffer(df)
@@ -206,8 +264,9 @@ class S3Destination(OutputDestinationInterface):
                 # Convert metadata values to strings (S3 requirement)
                 s3_metadata = {k: str(v) for k, v in metadata.items()}
             
-            # Upload to S3
+            # Upload to S3 (the cached copy of the old version is dropped)
             s3_client = self._get_s3_client()
+            get_s3_object_cache().invalidate(self.bucket_name, s3_key)
             s3_client.upload_fileobj(
                 file_buffer,
                 self.bucket_name,
@@ -226,7 +285,8 @@ class S3Destination(OutputDestinationInterface):
                 "location": s3_url,
                 "type": "s3",
                 "bucket": self.bucket_name,
-                "key": s3_key
+                "key": s3_key,
+                "bytes": file_buffer.getbuffer().nbytes
             }
             
         except NoCredentialsError:
@@ -251,6 +311,160 @@ class S3Destination(OutputDestinationInterface):
                 "type": "s3"
             }
     
+    # ── delta layout ──────────────────────────────────────────────────────────
+
+    def _load_object(self, s3_key: str) -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """
+        Download one object as (DataFrame, user metadata).
+        Only a missing object yields an empty DataFrame; other AWS errors
+        surface and an object that cannot be parsed raises ValueError.
+        """
+        try:
+            body, metadata, _ = get_s3_object_cache().get_object(self._get_s3_client(), self.bucket_name, s3_key)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                return pd.DataFrame(), {}
+            raise
+        try:
+            return self._parse_file_buffer(io.BytesIO(body)), metadata
+        except Exception as e:
+            raise ValueError(f"Could not parse s3://{self.bucket_name}/{s3_key}: {e}") from e
+
+    def list_delta_keys(self, sector: str) -> List[str]:
+        """Delta object keys for *sector*, oldest first."""
+        return sorted(self._list_delta_etags(sector), key=delta_stamp)
+
+    def _list_delta_etags(self, sector: str) -> Dict[str, str]:
+        """{delta key: ETag} for *sector*."""
+        if not self.bucket_name:
+            return {}
+        delta_prefix = f"{self.prefix}{sector}/{DELTA_DIR}/".lstrip('/')
+        etags = {}
+        paginator = self._get_s3_client().get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=delta_prefix):
+            for obj in page.get('Contents', []):
+                if obj['Key'].endswith(f'.{self.file_format}'):
+                    etags[obj['Key']] = obj.get('ETag', '')
+        return etags
+
+    def _object_etag(self, s3_key: str) -> Optional[str]:
+        """ETag of *s3_key* (None when the object does not exist)."""
+        try:
+            return self._get_s3_client().head_object(Bucket=self.bucket_name, Key=s3_key).get('ETag', '')
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('NoSuchKey', '404', 'NotFound'):
+                return None
+            raise
+
+    def list_delta_sectors(self) -> List[str]:
+        """Sectors that currently have at least one uncompacted delta."""
+        if not self.bucket_name:
+            return []
+        prefix = self.prefix.lstrip('/')
+        sectors = set()
+        paginator = self._get_s3_client().get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                key = obj['Key']
+                if is_delta_key(key):
+                    folder = f"/{key}".rsplit(f"/{DELTA_DIR}/", 1)[0].lstrip('/')
+                    sectors.add(folder[len(prefix):] if folder.startswith(prefix) else folder)
+        return sorted(sectors)
+
+    def save_delta(self, df: pd.DataFrame, sector: str, run_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Write *df* as a new immutable delta object for *sector*.
+        Only the batch itself is uploaded — the accumulated file is not touched.
+        """
+        stamp = datetime.now(timezone.utc).strftime(DELTA_STAMP_FORMAT)
+        run_part = f"run{run_id}" if run_id is not None else "run"
+        filename = (
+            f"{sector}/{DELTA_DIR}/Processed_Colors_{sector}__"
+            f"{stamp}_{uuid.uuid4().hex[:6]}_{run_part}.{self.file_format}"
+        )
+        return self.save_output(df, filename, metadata={"row_count": len(df), "run_id": run_id or ""})
+
+    def compact_sector(
+        self,
+        sector: str,
+        dedup_latest: bool = False,
+        min_age_seconds: int = COMPACT_MIN_DELTA_AGE_SECONDS,
+    ) -> Dict[str, Any]:
+        """
+        Fold the sector's deltas into its accumulated object.
+
+        Order of operations keeps readers consistent at every step:
+          1. upload the merged accumulated object with 'compacted_through'
+             set to the newest merged delta stamp
+          2. delete the merged deltas (readers already skip them via the stamp)
+
+        Before step 1 the base and merged deltas are checked again: if any was
+        rewritten or removed meanwhile (e.g. by a run delete in another
+        process) nothing is uploaded and status "conflict" is returned, so the
+        deleted rows are not written back; the next pass retries.
+
+        If the base or a delta cannot be parsed, status "error" is returned
+        and both are left untouched.
+
+        Deltas younger than *min_age_seconds* are left for the next pass.
+        With *dedup_latest* (OUTPUT_PRESERVE_HISTORY=false) only the newest row
+        per (MESSAGE_ID, CUSIP) survives in the merged object.
+        """
+        listed = self._list_delta_etags(sector)
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=min_age_seconds)).strftime(DELTA_STAMP_FORMAT)
+        delta_keys = [k for k in sorted(listed, key=delta_stamp) if delta_stamp(k) <= cutoff]
+        if not delta_keys:
+            return {"status": "success", "sector": sector, "deltas_merged": 0, "rows": None}
+
+        base_filename = f"{sector}/Processed_Colors_{sector}"
+        base_key = self._object_key(base_filename)
+        base_etag = self._object_etag(base_key)
+        try:
+            base_df, base_meta = self._load_object(base_key)
+            watermark = base_meta.get('compacted_through', '')
+
+            frames = [base_df]
+            newest = watermark
+            for key in delta_keys:
+                stamp = delta_stamp(key)
+                if watermark and stamp <= watermark:
+                    continue  # merged by an earlier pass whose delete did not finish
+                delta_df, _ = self._load_object(key)
+                frames.append(delta_df)
+                newest = max(newest, stamp)
+        except ValueError as e:
+            # Never overwrite the base or delete deltas around an unreadable object
+            logger.error(f"S3 compaction [{sector}]: {e} — nothing committed")
+            return {"status": "error", "sector": sector, "deltas_merged": 0, "message": str(e)}
+
+        non_empty = [f for f in frames if len(f) > 0]
+        merged = pd.concat(non_empty, ignore_index=True) if non_empty else pd.DataFrame()
+        if dedup_latest:
+            merged = dedup_latest_rows(merged)
+
+        current = self._list_delta_etags(sector)
+        if (self._object_etag(base_key) != base_etag
+                or any(current.get(key) != listed[key] for key in delta_keys)):
+            logger.warning(f"S3 compaction [{sector}]: objects changed while merging — not committed")
+            return {"status": "conflict", "sector": sector, "deltas_merged": 0,
+                    "message": "Sector objects changed during compaction"}
+
+        result = self.save_output(
+            merged, base_filename,
+            metadata={"row_count": len(merged), "compacted_through": newest},
+        )
+        if result.get('status') != 'success':
+            return {"status": "error", "sector": sector, "deltas_merged": 0,
+                    "message": result.get('message', 'upload failed')}
+
+        deleted = self.delete_objects_by_keys(delta_keys)
+        if deleted < len(delta_keys):
+            logger.warning(
+                f"S3 compaction [{sector}]: {len(delta_keys) - deleted} merged delta(s) not deleted "
+                f"— readers skip them via compacted_through"
+            )
+        return {"status": "success", "sector": sector, "deltas_merged": len(delta_keys), "rows": len(merged)}
+
     def _get_content_type(self) -> str:
         """Get content type based on file format."""
         content_types = {
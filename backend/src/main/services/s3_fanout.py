@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+S3 Fan-out - Bounded concurrent execution of per-sector S3 operations
+
+Reading, appending and run-deleting the per-sector output objects is one
+GET/PUT round trip per CLO sub-asset.  fan_out() runs those per-sector tasks
+on a bounded thread pool so a 20-sector run costs about one round trip of
+wall time instead of twenty.
+
+  S3_MAX_CONCURRENCY  sector operations in flight (default 8, 1 = sequential)
+
+Each task is isolated: an exception fails only its own sector and is
+reported back, never raised to the caller.  A task returns
+``(value, bytes_transferred)``; fan_out() logs the aggregate bytes and
+latency of the batch.
+"""
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_S3_CONCURRENCY = 8
+
+
+def get_s3_concurrency() -> int:
+    """Configured S3_MAX_CONCURRENCY (at least 1)."""
+    try:
+        return max(1, int(os.getenv("S3_MAX_CONCURRENCY", str(DEFAULT_S3_CONCURRENCY))))
+    except ValueError:
+        return DEFAULT_S3_CONCURRENCY
+
+
+class SectorResult:
+    """Outcome of one fanned-out task."""
+
+    __slots__ = ("item", "value", "error", "bytes", "seconds")
+
+    def __init__(self, item: Any, value: Any = None, error: Optional[Exception] = None,
+                 nbytes: int = 0, seconds: float = 0.0):
+        self.item = item
+        self.value = value
+        self.error = error
+        self.bytes = nbytes
+        self.seconds = seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class FanOutReport:
+    """Per-item results (input order) plus aggregate bytes and latency."""
+
+    def __init__(self, label: str, results: List[SectorResult], elapsed: float, workers: int):
+        self.label = label
+        self.results = results
+        self.elapsed = elapsed
+        self.workers = workers
+
+    @property
+    def succeeded(self) -> List[SectorResult]:
+        return [r for r in self.results if r.ok]
+
+    @property
+    def failed(self) -> List[SectorResult]:
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(r.bytes for r in self.results)
+
+    def summary(self) -> dict:
+        latencies = [r.seconds for r in self.results]
+        return {
+            "label": self.label,
+            "items": len(self.results),
+            "failed": len(self.failed),
+            "workers": self.workers,
+            "bytes": self.total_bytes,
+            "wall_seconds": round(self.elapsed, 3),
+            "sum_seconds": round(sum(latencies), 3),
+            "max_seconds": round(max(latencies), 3) if latencies else 0.0,
+        }
+
+
+def _run_one(fn: Callable[[Any], Tuple[Any, int]], item: Any) -> SectorResult:
+    started = time.perf_counter()
+    try:
+        value, nbytes = fn(item)
+        return SectorResult(item, value=value, nbytes=int(nbytes or 0), seconds=time.perf_counter() - started)
+    except Exception as e:
+        return SectorResult(item, error=e, seconds=time.perf_counter() - started)
+
+
+def fan_out(
+    items: Iterable[Any],
+    fn: Callable[[Any], Tuple[Any, int]],
+    label: str,
+    max_workers: Optional[int] = None,
+) -> FanOutReport:
+    """
+    Run ``fn(item) -> (value, bytes)`` for every item, at most
+    S3_MAX_CONCURRENCY at a time.  Results keep the input order.
+    """
+    items = list(items)
+    workers = min(max_workers or get_s3_concurrency(), max(1, len(items)))
+    started = time.perf_counter()
+    if workers <= 1:
+        results = [_run_one(fn, item) for item in items]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"s3-{label}") as pool:
+            results = list(pool.map(lambda item: _run_one(fn, item), items))
+    report = FanOutReport(label, results, time.perf_counter() - started, workers)
+
+    if items:
+        s = report.summary()
+        logger.info(
+            f"⚡ S3 {label}: {s['items'] - s['failed']}/{s['items']} ok, {s['bytes']} byte(s), "
+            f"wall {s['wall_seconds']}s (sum {s['sum_seconds']}s, max {s['max_seconds']}s, "
+            f"{s['workers']} worker(s))"
+        )
+    for r in report.failed:
+        logger.error(f"❌ S3 {label} [{r.item}]: {r.error}")
+    return report
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+S3 Object Cache - Size-bounded local disk cache of S3 output objects
+
+Sector files are re-read on every output-cache miss, run delete and
+accumulated-layout append, although most of them have not changed since
+the last read.  This cache keeps a local copy of each object with its ETag
+and revalidates with a conditional GET (If-None-Match): an unchanged object
+costs a 304 round trip with no body, a changed one is downloaded once and
+replaces the old copy.
+
+Shared by ProcessedDataReader, S3Destination (load_output, compaction) and
+OutputService.delete_run_output.  Writers call invalidate() for the keys
+they overwrite or delete.
+
+  S3_CACHE_DIR      cache directory (default: S3_Cache/ in the project root)
+  S3_CACHE_MAX_MB   size bound, least recently used objects evicted first
+                    (default 512, 0 disables the cache)
+
+Layout: one <sha1(bucket/key)>.bin per object plus index.json holding
+key, ETag, size, user metadata and last access.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+
+try:
+    from botocore.exceptions import ClientError
+except ImportError:
+    ClientError = Exception
+
+
+def get_s3_cache_dir() -> str:
+    """Directory holding cached S3 objects (S3_CACHE_DIR)."""
+    cache_dir = os.getenv("S3_CACHE_DIR", "").strip()
+    if cache_dir:
+        return cache_dir
+    return str(Path(__file__).parents[4] / "S3_Cache")
+
+
+def _not_modified(error: Exception) -> bool:
+    response = getattr(error, "response", None) or {}
+    code = str(response.get("Error", {}).get("Code", ""))
+    status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return code in ("304", "NotModified") or status == 304
+
+
+class S3ObjectCache:
+    """key+ETag keyed local copies of S3 objects with LRU eviction."""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._entries = self._load_index()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    # ── index ─────────────────────────────────────────────────────────────────
+
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, INDEX_FILE)
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", {})
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"S3 object cache index unreadable ({e}) — starting empty")
+            return {}
+        return {k: v for k, v in entries.items() if os.path.exists(self._data_path(k))}
+
+    def _save_index(self):
+        tmp_path = f"{self._index_path()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": self._entries}, f)
+        os.replace(tmp_path, self._index_path())
+
+    @staticmethod
+    def _cache_key(bucket: str, key: str) -> str:
+        return f"{bucket}/{key}"
+
+    def _data_path(self, cache_key: str) -> str:
+        name = hashlib.sha1(cache_key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.bin")
+
+    # ── public API ────────────────────────────────────────────────────────────
+
+    def get_object(self, s3_client, bucket: str, key: str) -> Tuple[bytes, Dict[str, str], int]:
+        """
+        Body and user metadata of the current version of s3://bucket/key,
+        plus the bytes downloaded (0 when the local copy was revalidated).
+        Errors from S3 (e.g. NoSuchKey) propagate.
+        """
+        if not self.enabled:
+            response = s3_client.get_object(Bucket=bucket, Key=key)
+            body = response["Body"].read()
+            return body, response.get("Metadata", {}) or {}, len(body)
+
+        cache_key = self._cache_key(bucket, key)
+        with self._lock:
+            entry = dict(self._entries.get(cache_key) or {})
+        data_path = self._data_path(cache_key)
+
+        if entry.get("etag"):
+            try:
+                response = s3_client.get_object(Bucket=bucket, Key=key, IfNoneMatch=entry["etag"])
+            except ClientError as e:
+                if not _not_modified(e):
+                    raise
+                try:
+                    with open(data_path, "rb") as f:
+                        body = f.read()
+                    self._touch(cache_key)
+                    return body, entry.get("metadata", {}), 0
+                except FileNotFoundError:
+                    # Evicted/removed meanwhile — fall through to a full download
+                    response = s3_client.get_object(Bucket=bucket, Key=key)
+        else:
+            response = s3_client.get_object(Bucket=bucket, Key=key)
+
+        body = response["Body"].read()
+        metadata = response.get("Metadata", {}) or {}
+        self._store(cache_key, data_path, body, response.get("ETag", ""), metadata)
+        return body, metadata, len(body)
+
+    def invalidate(self, bucket: str, key: str):
+        """Forget a key that was overwritten or deleted."""
+        cache_key = self._cache_key(bucket, key)
+        with self._lock:
+            if self._entries.pop(cache_key, None) is None:
+                return
+            self._remove_file(self._data_path(cache_key))
+            self._save_index()
+
+    def clear(self):
+        with self._lock:
+            for cache_key in list(self._entries):
+                self._remove_file(self._data_path(cache_key))
+            self._entries.clear()
+            self._save_index()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "objects": len(self._entries),
+                "bytes": sum(int(e.get("size", 0)) for e in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    # ── internals ─────────────────────────────────────────────────────────────
+
+    def _touch(self, cache_key: str):
+        with self._lock:
+            self.hits += 1
+            if cache_key in self._entries:
+                self._entries[cache_key]["last_access"] = time.time()
+
+    def _store(self, cache_key: str, data_path: str, body: bytes, etag: str, metadata: Dict):
+        if len(body) > self.max_bytes:
+            with self._lock:
+                self.misses += 1
+            self.invalidate(*cache_key.split("/", 1))
+            return
+        tmp_path = f"{data_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        with self._lock:
+            self.misses += 1
+            os.replace(tmp_path, data_path)
+            self._entries[cache_key] = {
+                "etag": etag,
+                "size": len(body),
+                "metadata": metadata,
+                "last_access": time.time(),
+            }
+            self._evict(keep=cache_key)
+            self._save_index()
+
+    def _evict(self, keep: str):
+        total = sum(int(e.get("size", 0)) for e in self._entries.values())
+        for cache_key, entry in sorted(self._entries.items(), key=lambda kv: kv[1].get("last_access", 0)):
+            if total <= self.max_bytes:
+                break
+            if cache_key == keep:
+                continue
+            total -= int(entry.get("size", 0))
+            del self._entries[cache_key]
+            self._remove_file(self._data_path(cache_key))
+            self.evictions += 1
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not remove cached S3 object {path}: {e}")
+
+
+# Singleton instance
+_object_cache: Optional[S3ObjectCache] = None
+_object_cache_lock = threading.Lock()
+
+
+def get_s3_object_cache() -> S3ObjectCache:
+    """Get singleton S3 object cache"""
+    global _object_cache
+    if _object_cache is None:
+        with _object_cache_lock:
+            if _object_cache is None:
+                try:
+                    max_mb = max(0.0, float(os.getenv("S3_CACHE_MAX_MB", "512")))
+                except ValueError:
+                    max_mb = 512.0
+                _object_cache = S3ObjectCache(get_s3_cache_dir(), int(max_mb * 1024 * 1024))
+    return _object_cache
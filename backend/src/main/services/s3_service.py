@@ -24,6 +24,8 @@ from typing import List, Optional
 from datetime import datetime
 import pandas as pd
 
+from services.s3_client import get_s3_client
+
 logger = logging.getLogger(__name__)
 
 # Check if boto3 is available
@@ -80,7 +82,7 @@ class S3Service:
         self.prefix = prefix
         
         # Initialize S3 client
-        self.s3_client = boto3.client('s3', region_name=self.region)
+        self.s3_client = get_s3_client(region=self.region)
         
         logger.info(f"S3Service initialized: bucket={self.bucket_name}, region={self.region}")
         
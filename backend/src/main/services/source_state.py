@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Source State - Incremental fetch bookkeeping for RAW input data
+
+Enabled with SOURCE_INCREMENTAL=true (default off: every run pulls the full
+source result, as before).
+
+For every (data source, CLO) pair the store keeps:
+  <SOURCE_STATE_DIR>/<source>__<clo>.parquet           RAW rows of the last full refresh
+  <SOURCE_STATE_DIR>/<source>__<clo>.parts/part-N.parquet
+                                                       rows fetched by each later run
+  <SOURCE_STATE_DIR>/<source>__<clo>.json              high-watermark, part list, refresh times
+
+A run fetches only rows whose MESSAGE_ID is past the watermark (message IDs
+are time-ordered) and writes them as one new part file; the base is never
+rewritten.  Reading the state concatenates base and parts and keeps the
+newest row per (MESSAGE_ID, CUSIP), so ranking still sees complete CUSIP
+groups.
+
+A full refresh (fetch everything, write a new base and drop the parts) runs
+when there is no state yet, when SOURCE_FULL_REFRESH_HOURS have passed since
+the last one, or when requested explicitly. It also picks up rows that were
+corrected or removed at the source, which the watermark alone cannot see.
+"""
+import os
+import json
+import shutil
+import threading
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_COLUMN = "MESSAGE_ID"
+
+
+def is_incremental_enabled() -> bool:
+    """True when SOURCE_INCREMENTAL=true."""
+    return os.getenv("SOURCE_INCREMENTAL", "false").strip().lower() == "true"
+
+
+def get_source_state_dir() -> str:
+    """Directory holding incremental state files (SOURCE_STATE_DIR)."""
+    state_dir = os.getenv("SOURCE_STATE_DIR", "").strip()
+    if state_dir:
+        return state_dir
+    return str(Path(__file__).parents[4] / "Source_State")
+
+
+def _full_refresh_interval() -> timedelta:
+    try:
+        hours = float(os.getenv("SOURCE_FULL_REFRESH_HOURS", "24"))
+    except ValueError:
+        hours = 24.0
+    return timedelta(hours=max(hours, 0.0))
+
+
+class SourceStateStore:
+    """Accumulated RAW rows plus high-watermark for one (source, CLO) pair."""
+
+    _lock = threading.Lock()
+
+    def __init__(self, source_name: str, clo_id: Optional[str] = None, state_dir: Optional[str] = None):
+        self.state_dir = state_dir or get_source_state_dir()
+        name = f"{quote(source_name.lower(), safe='')}__{quote(clo_id or 'default', safe='')}"
+        self.data_path = os.path.join(self.state_dir, f"{name}.parquet")
+        self.parts_dir = os.path.join(self.state_dir, f"{name}.parts")
+        self.meta_path = os.path.join(self.state_dir, f"{name}.json")
+
+    # ── metadata ──────────────────────────────────────────────────────────────
+
+    def _load_meta(self) -> Dict:
+        if not os.path.exists(self.meta_path):
+            return {}
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read source state metadata ({e}) — forcing full refresh")
+            return {}
+
+    def _save_meta(self, meta: Dict):
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, default=str)
+        os.replace(tmp_path, self.meta_path)
+
+    @property
+    def watermark(self) -> Optional[int]:
+        """Highest MESSAGE_ID already in the state (None before the first run)."""
+        value = self._load_meta().get("watermark")
+        return int(value) if value is not None else None
+
+    def full_refresh_due(self) -> bool:
+        """True when the next fetch must pull the full source result."""
+        meta = self._load_meta()
+        if meta.get("force_full_refresh") or meta.get("watermark") is None:
+            return True
+        if not os.path.exists(self.data_path):
+            return True
+        try:
+            last_full = datetime.fromisoformat(meta["last_full_refresh"])
+        except (KeyError, TypeError, ValueError):
+            return True
+        return datetime.now() - last_full >= _full_refresh_interval()
+
+    def request_full_refresh(self):
+        """Make the next fetch a full refresh."""
+        with self._lock:
+            meta = self._load_meta()
+            meta["force_full_refresh"] = True
+            os.makedirs(self.state_dir, exist_ok=True)
+            self._save_meta(meta)
+
+    # ── data ──────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _max_watermark(df: pd.DataFrame) -> Optional[int]:
+        if WATERMARK_COLUMN not in df.columns or len(df) == 0:
+            return None
+        ids = pd.to_numeric(df[WATERMARK_COLUMN], errors="coerce").dropna()
+        return int(ids.max()) if len(ids) else None
+
+    @staticmethod
+    def _row_keys(df: pd.DataFrame) -> pd.Index:
+        """(MESSAGE_ID, CUSIP) identity of each row — one message can carry several CUSIPs."""
+        cols = [c for c in (WATERMARK_COLUMN, "CUSIP") if c in df.columns]
+        if not cols:
+            return pd.Index([None] * len(df))
+        return pd.MultiIndex.from_frame(df[cols].astype(str))
+
+    def _part_path(self, part: int) -> str:
+        return os.path.join(self.parts_dir, f"part-{part:06d}.parquet")
+
+    def load(self) -> pd.DataFrame:
+        """Accumulated rows, newest per (MESSAGE_ID, CUSIP) (empty DataFrame when there is no state)."""
+        return self._read(self._load_meta().get("parts", []))
+
+    def _read(self, parts: List[int]) -> pd.DataFrame:
+        frames = []
+        if os.path.exists(self.data_path):
+            frames.append(pd.read_parquet(self.data_path, engine="pyarrow"))
+        for part in parts:
+            frames.append(pd.read_parquet(self._part_path(part), engine="pyarrow"))
+        frames = [df for df in frames if len(df)]
+        if not frames:
+            return pd.DataFrame()
+        if len(frames) == 1:
+            return frames[0]
+        merged = pd.concat(frames, ignore_index=True)
+        # A row fetched again replaces the stored one (newest part wins)
+        return merged[~self._row_keys(merged).duplicated(keep="last")].reset_index(drop=True)
+
+    def replace(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Store the result of a full refresh as the new base and drop the parts."""
+        with self._lock:
+            os.makedirs(self.state_dir, exist_ok=True)
+            # Until the new metadata lands, a crash leaves the next run a full refresh
+            pending = self._load_meta()
+            pending["force_full_refresh"] = True
+            self._save_meta(pending)
+            tmp_path = f"{self.data_path}.tmp"
+            df.to_parquet(tmp_path, index=False, engine="pyarrow")
+            os.replace(tmp_path, self.data_path)
+            meta = {
+                "watermark": self._max_watermark(df),
+                "rows": int(len(df)),
+                "parts": [],
+                "last_full_refresh": datetime.now().isoformat(),
+                "last_fetch": datetime.now().isoformat(),
+                "last_fetch_rows": int(len(df)),
+            }
+            self._save_meta(meta)
+            shutil.rmtree(self.parts_dir, ignore_errors=True)
+        logger.info(f"📥 Source state refreshed: {len(df)} row(s), watermark={meta['watermark']}")
+        return df
+
+    def merge(self, delta: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add rows fetched past the watermark to the state as a new part file.
+
+        Only *delta* is written; a (MESSAGE_ID, CUSIP) seen again replaces the
+        stored row when the state is read (newest fetch wins).
+        Returns the merged frame.
+        """
+        with self._lock:
+            meta = self._load_meta()
+            parts = list(meta.get("parts", []))
+            meta["last_fetch"] = datetime.now().isoformat()
+            meta["last_fetch_rows"] = int(len(delta))
+            if len(delta):
+                part = (parts[-1] if parts else 0) + 1
+                os.makedirs(self.parts_dir, exist_ok=True)
+                tmp_path = f"{self._part_path(part)}.tmp"
+                delta.to_parquet(tmp_path, index=False, engine="pyarrow")
+                os.replace(tmp_path, self._part_path(part))
+                parts.append(part)
+                marks = [v for v in (meta.get("watermark"), self._max_watermark(delta)) if v is not None]
+                meta["watermark"] = max(marks) if marks else None
+                meta["parts"] = parts
+            # Metadata last: a part written without it is ignored and overwritten
+            self._save_meta(meta)
+            merged = self._read(parts)
+        if len(delta):
+            logger.info(
+                f"📥 Source state added {len(delta)} new row(s) as part {parts[-1]} → {len(merged)} total, "
+                f"watermark={meta['watermark']}"
+            )
+        return merged
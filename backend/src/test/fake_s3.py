@@ -0,0 +1,87 @@
+"""In-memory stand-in for the boto3 S3 client calls the backend makes."""
+import hashlib
+import io
+
+from botocore.exceptions import ClientError
+
+
+def _error(code: str, status: int, operation: str) -> ClientError:
+    return ClientError({"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}}, operation)
+
+
+class _Paginator:
+    def __init__(self, client):
+        self.client = client
+
+    def paginate(self, Bucket, Prefix=""):
+        contents = [
+            {"Key": key, "ETag": obj["ETag"], "Size": len(obj["Body"])}
+            for (bucket, key), obj in sorted(self.client.objects.items())
+            if bucket == Bucket and key.startswith(Prefix)
+        ]
+        yield {"Contents": contents}
+
+
+class FakeS3Client:
+    """Objects kept as {(bucket, key): {"Body", "ETag", "Metadata"}}; calls are counted."""
+
+    def __init__(self):
+        self.objects = {}
+        self.calls = {}
+        self.on_get = None
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def _store(self, bucket, key, body, metadata=None):
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        self.objects[(bucket, key)] = {"Body": body, "ETag": etag, "Metadata": dict(metadata or {})}
+        return etag
+
+    def get_paginator(self, name):
+        return _Paginator(self)
+
+    def put_object(self, Bucket, Key, Body, Metadata=None, **kwargs):
+        self._count("put_object")
+        body = Body.encode("utf-8") if isinstance(Body, str) else bytes(Body)
+        return {"ETag": self._store(Bucket, Key, body, Metadata)}
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None):
+        self._count("upload_fileobj")
+        self._store(Bucket, Key, Fileobj.read(), (ExtraArgs or {}).get("Metadata"))
+
+    def get_object(self, Bucket, Key, IfNoneMatch=None, **kwargs):
+        self._count("get_object")
+        if self.on_get:
+            self.on_get(Key)
+        obj = self.objects.get((Bucket, Key))
+        if obj is None:
+            raise _error("NoSuchKey", 404, "GetObject")
+        if IfNoneMatch is not None and IfNoneMatch == obj["ETag"]:
+            raise _error("304", 304, "GetObject")
+        return {
+            "Body": io.BytesIO(obj["Body"]),
+            "ETag": obj["ETag"],
+            "Metadata": dict(obj["Metadata"]),
+            "ContentLength": len(obj["Body"]),
+        }
+
+    def head_object(self, Bucket, Key, **kwargs):
+        self._count("head_object")
+        obj = self.objects.get((Bucket, Key))
+        if obj is None:
+            raise _error("404", 404, "HeadObject")
+        return {"ETag": obj["ETag"], "Metadata": dict(obj["Metadata"]), "ContentLength": len(obj["Body"])}
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        self._count("delete_object")
+        self.objects.pop((Bucket, Key), None)
+        return {}
+
+    def delete_objects(self, Bucket, Delete):
+        self._count("delete_objects")
+        deleted = []
+        for entry in Delete["Objects"]:
+            if self.objects.pop((Bucket, entry["Key"]), None) is not None:
+                deleted.append({"Key": entry["Key"]})
+        return {"Deleted": deleted}
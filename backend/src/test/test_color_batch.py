@@ -0,0 +1,100 @@
+import sys
+import os
+import math
+import unittest
+import numpy as np
+import pandas as pd
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from models.color import ColorRaw
+from models.color_frame import ColorBatch, coerce_color_frame, validate_color_frame
+
+
+def _row_loop(df):
+    """The per-row ColorRaw conversion DatabaseService used before ColorBatch."""
+    def _float(val, default=0.0):
+        try:
+            f = float(val)
+            return default if math.isnan(f) else f
+        except Exception:
+            return default
+
+    def _int(val, default=0):
+        try:
+            return int(float(val)) if val is not None else default
+        except Exception:
+            return default
+
+    colors = []
+    for _, row in df.iterrows():
+        try:
+            colors.append(ColorRaw(
+                message_id=_int(row['MESSAGE_ID']), ticker=str(row['TICKER']), sector=str(row['SECTOR']),
+                cusip=str(row['CUSIP']), date=pd.to_datetime(row['DATE']), price_level=_float(row['PRICE_LEVEL']),
+                bid=_float(row['BID']), ask=_float(row['ASK']), px=_float(row['PX']), source=str(row['SOURCE']),
+                bias=str(row['BIAS']), rank=_int(row['RANK'], 1), cov_price=_float(row['COV_PRICE']),
+                percent_diff=_float(row['PERCENT_DIFF']), price_diff=_float(row['PRICE_DIFF']),
+                confidence=_int(row['CONFIDENCE'], 5), date_1=pd.to_datetime(row['DATE_1']),
+                diff_status=str(row['DIFF_STATUS']),
+            ))
+        except Exception:
+            continue
+    return colors
+
+
+def _source_frame():
+    n = 12
+    return pd.DataFrame({
+        "MESSAGE_ID": [1000 + i for i in range(n)],
+        "TICKER": ["WDMNT 2022-9A ER", None, "OCT 51A E", np.nan] * 3,
+        "SECTOR": ["MM-CLO", "2.0_Mezz"] * 6,
+        "CUSIP": [f"97988RBL{i}" for i in range(n)],
+        "DATE": ["2026-01-11", "2026-01-12 09:30", "02/03/2026", "2026-02-01"] * 3,
+        "PRICE_LEVEL": [101.7, "99.25", "n/a", np.nan] * 3,
+        "BID": [101.7, 0, None, "100"] * 3,
+        "ASK": ["102.575", 0.0, 1e3, -1] * 3,
+        "PX": [101.7, "abc", 99.0, "inf"] * 3,
+        "SOURCE": ["SMBC", "JPM", "", None] * 3,
+        "BIAS": ["BID", "OFFER", "BWIC COVER", "BID"] * 3,
+        "RANK": [3, "2", 7, 1.9, 0, None] * 2,
+        "COV_PRICE": [102.2] * n,
+        "PERCENT_DIFF": [0.49, "x", None, 1] * 3,
+        "PRICE_DIFF": [0.5] * n,
+        "CONFIDENCE": [9, 11, "5", None] * 3,
+        "DATE_1": ["2026-01-10"] * n,
+        "DIFF_STATUS": ["OK", None, "CHANGED", "OK"] * 3,
+    })
+
+
+class ColorBatchParityTestCase(unittest.TestCase):
+    def setUp(self):
+        self.source = _source_frame()
+        frame, self.bad_rows = validate_color_frame(coerce_color_frame(self.source))
+        self.batch = ColorBatch(frame.reset_index(drop=True), len(self.source) - len(frame), self.bad_rows)
+
+    def test_colors_match_row_loop(self):
+        expected = [color.model_dump() for color in _row_loop(self.source)]
+        self.assertEqual([color.model_dump() for color in self.batch.colors], expected)
+        self.assertEqual(len(self.batch) + self.batch.rejected, len(self.source))
+
+    def test_rejected_rows_are_reported(self):
+        reported = {bad["message_id"] for bad in self.bad_rows}
+        kept = {color.message_id for color in self.batch.colors}
+        self.assertEqual(reported, set(self.source["MESSAGE_ID"]) - kept)
+
+    def test_missing_dates_are_rejected(self):
+        source = self.source.assign(DATE=self.source["DATE"].where(self.source.index % 5 != 0, None))
+        frame, bad_rows = validate_color_frame(coerce_color_frame(source))
+
+        self.assertFalse(frame["DATE"].isna().any())
+        missing = {bad["message_id"] for bad in bad_rows if "DATE is missing" in bad["errors"]}
+        self.assertEqual(missing, {1000, 1005, 1010})
+
+    def test_where_selects_rows_without_rebuilding_models(self):
+        subset = self.batch.where((self.batch.frame["SECTOR"] == "MM-CLO").to_numpy())
+        expected = [c.model_dump() for c in self.batch.colors if c.sector == "MM-CLO"]
+        self.assertEqual([c.model_dump() for c in subset.colors], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
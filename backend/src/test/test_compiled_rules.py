@@ -0,0 +1,74 @@
+import sys
+import os
+import random
+import unittest
+import numpy as np
+import pandas as pd
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from rules_service import conditions_match_mask, evaluate_condition, evaluate_rule, rule_exclusion_mask
+
+OPERATORS = [
+    "equal to", "not equal to", "less than", "greater than", "less than equal to",
+    "greater than equal to", "between", "contains", "starts with", "ends with",
+    "does not contain", "eq", "gte", "unknown op",
+]
+VALUES = ["100", "99.5", "1e2", " 100 ", "abc", "ABC corp", "", "nan", "inf", "-3", "MM-CLO"]
+
+
+def _rows(n, seed=11):
+    rng = random.Random(seed)
+    cells = [100, 99.5, -3, 0, "100", " 100 ", "1e2", "abc", "ABC Corp", "MM-CLO", "mm-clo", "", None, "nan", True]
+    return [
+        {"PX": rng.choice(cells), "Ticker": rng.choice(cells), "SECTOR": rng.choice(cells), "BID": rng.choice(cells)}
+        for _ in range(n)
+    ]
+
+
+def _condition(rng, condition_type):
+    return {
+        "type": condition_type,
+        "column": rng.choice(["px", "TICKER", "Sector", "bid", "MISSING"]),
+        "operator": rng.choice(OPERATORS),
+        "value": rng.choice(VALUES),
+        "value2": rng.choice(VALUES),
+    }
+
+
+def _rule(rng):
+    types = ["where"] + [rng.choice(["and", "or", "where", "subgroup"]) for _ in range(rng.randint(0, 3))]
+    return {"conditions": [_condition(rng, t) for t in types]}
+
+
+class CompiledRuleParityTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(5)
+        self.rows = _rows(200)
+
+    def _row_loop(self, rows, rules):
+        return np.array([any(evaluate_rule(row, rule) for rule in rules) for row in rows], dtype=bool)
+
+    def test_exclusion_mask_matches_row_loop(self):
+        for _ in range(60):
+            rules = [_rule(self.rng) for _ in range(self.rng.randint(1, 3))]
+            np.testing.assert_array_equal(rule_exclusion_mask(self.rows, rules), self._row_loop(self.rows, rules))
+
+    def test_dataframe_input_matches_row_loop_on_its_records(self):
+        df = pd.DataFrame(self.rows)
+        records = df.to_dict("records")
+        for _ in range(30):
+            rules = [_rule(self.rng)]
+            np.testing.assert_array_equal(rule_exclusion_mask(df, rules), self._row_loop(records, rules))
+
+    def test_conditions_mask_requires_every_condition(self):
+        for _ in range(30):
+            conditions = [_condition(self.rng, "where") for _ in range(2)]
+            expected = [all(evaluate_condition(row, c) for c in conditions) for row in self.rows]
+            np.testing.assert_array_equal(conditions_match_mask(self.rows, conditions), expected)
+
+    def test_rule_without_conditions_excludes_nothing(self):
+        self.assertFalse(rule_exclusion_mask(self.rows, [{"conditions": []}]).any())
+
+
+if __name__ == '__main__':
+    unittest.main()
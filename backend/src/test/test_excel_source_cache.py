@@ -0,0 +1,36 @@
+import sys
+import os
+import tempfile
+import unittest
+import pandas as pd
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from services.excel_source_cache import ExcelSourceCache
+
+
+class ExcelSourceCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "raw.xlsx")
+        with open(self.path, "wb") as f:
+            f.write(b"workbook")
+        self.cache = ExcelSourceCache(os.path.join(self.tmp.name, "cache"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _parse(self, path):
+        return pd.DataFrame({"MESSAGE_ID": [1, 2], "PX": [100.0, 101.0]})
+
+    def test_in_place_edits_do_not_reach_the_cache(self):
+        first = self.cache.load(self.path, self._parse)
+        first.loc[0, "PX"] = -1.0
+        first["PX"] *= 2
+
+        second = self.cache.load(self.path, self._parse)
+        self.assertEqual(second["PX"].tolist(), [100.0, 101.0])
+        self.assertEqual((self.cache.parses, self.cache.memory_hits), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
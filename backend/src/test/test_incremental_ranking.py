@@ -0,0 +1,87 @@
+import sys
+import os
+import random
+import unittest
+from datetime import datetime, timedelta
+import pandas as pd
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from services.ranking_engine import RankingEngine
+
+IDENT = ["CUSIP_KEY", "MESSAGE_ID", "OCCURRENCE"]
+
+
+def _make_frame(n, cusips, first_id=1000, seed=11):
+    rng = random.Random(seed)
+    base = datetime(2026, 3, 2)
+    return pd.DataFrame([{
+        "MESSAGE_ID": first_id + i,
+        "TICKER": f"TICK {i}",
+        "SECTOR": "MM-CLO",
+        "CUSIP": rng.choice(cusips),
+        "DATE": base + timedelta(days=rng.randint(0, 3)),
+        "PRICE_LEVEL": 100.0,
+        "BID": 100.0,
+        "ASK": 101.0,
+        "PX": rng.choice([0.0, 99.5, 101.7, 102.25]),
+        "SOURCE": "SMBC",
+        "BIAS": "BID",
+        "RANK": rng.randint(1, 3),
+        "COV_PRICE": 102.2,
+        "PERCENT_DIFF": 0.49,
+        "PRICE_DIFF": -0.5,
+        "CONFIDENCE": 9,
+        "DATE_1": base,
+        "DIFF_STATUS": "Small Difference",
+    } for i in range(n)])
+
+
+def _sorted_state(state):
+    return state.sort_values(IDENT).reset_index(drop=True)
+
+
+class IncrementalRankingParityTestCase(unittest.TestCase):
+    def setUp(self):
+        self.engine = RankingEngine()
+        self.cusips = [f"CUSIP{i:04d}" for i in range(12)]
+        self.data = _make_frame(240, self.cusips)
+        _, self.state = self.engine.rank_incremental(self.data, pd.DataFrame())
+
+    def test_incremental_state_equals_full_rank(self):
+        keys = RankingEngine.normalize_cusips(self.data["CUSIP"])
+        excluded = self.data[keys == "CUSIP0001"].index[:3]
+        dropped = keys == "CUSIP0002"
+        current = self.data.drop(index=excluded)[~dropped.drop(index=excluded)]
+        delta = _make_frame(20, ["CUSIP0003", "NEWCUSIP1"], first_id=5000, seed=12)
+        current = pd.concat([current, delta], ignore_index=True)
+
+        touched = set(RankingEngine.normalize_cusips(delta["CUSIP"]))
+        changed, state = self.engine.rank_incremental(current, self.state, touched)
+        _, full_state = self.engine.rank_incremental(current, pd.DataFrame())
+
+        pd.testing.assert_frame_equal(_sorted_state(state), _sorted_state(full_state))
+        self.assertNotIn("CUSIP0002", set(state["CUSIP_KEY"]))
+
+        # Rows emitted are exactly those that are new or changed against the old state
+        joined = full_state.merge(self.state, on=IDENT, how="left", suffixes=("", "_PREV"))
+        differs = joined["ROW_HASH_PREV"].isna()
+        for col in ("ROW_HASH", "IS_PARENT", "CHILDREN_COUNT"):
+            differs |= joined[col] != joined[f"{col}_PREV"]
+        differs |= joined["PARENT_MESSAGE_ID"].fillna("") != joined["PARENT_MESSAGE_ID_PREV"].fillna("")
+        self.assertEqual(
+            sorted(joined.loc[differs, "MESSAGE_ID"]),
+            sorted(changed["MESSAGE_ID"].astype(str)),
+        )
+
+        ranked = self.engine.run_colors_frame(current)
+        self.assertEqual(int(ranked["IS_PARENT"].sum()), int(state["IS_PARENT"].sum()))
+
+    def test_defaulted_dates_do_not_change_hash(self):
+        later = self.data.copy()
+        later["DATE_1"] = datetime(2026, 4, 1)
+        changed, _ = self.engine.rank_incremental(later, self.state, set())
+        self.assertEqual(len(changed), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import sys
+import os
+import tempfile
+import unittest
+import pandas as pd
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from services.local_segment_store import LocalSegmentStore
+
+
+def _rows(run_id, message_ids, sectors, processing_type="AUTOMATED", px=100.0):
+    return pd.DataFrame({
+        "RUN_ID": [run_id] * len(message_ids),
+        "PROCESSING_TYPE": [processing_type] * len(message_ids),
+        "MESSAGE_ID": message_ids,
+        "CUSIP": [f"C{m}" for m in message_ids],
+        "SECTOR": sectors,
+        "IS_PARENT": [i % 2 == 0 for i in range(len(message_ids))],
+        "PX": [px] * len(message_ids),
+    })
+
+
+class LocalSegmentStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = LocalSegmentStore(os.path.join(self.tmp.name, "Processed_Colors_Segments"))
+        self.run1 = _rows(1, [1, 2, 3], ["MM-CLO", "2.0_Mezz", "MM-CLO"])
+        self.run2 = _rows(2, [4, 5], ["MM-CLO", "MM-CLO"], processing_type="MANUAL")
+        self.store.append(self.run1)
+        self.store.append(self.run2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _sorted(self, df):
+        return df.sort_values("MESSAGE_ID").reset_index(drop=True)
+
+    def test_round_trip_partitions_by_run_and_sector(self):
+        self.assertEqual(len(self.store.list_segments()), 3)
+        expected = pd.concat([self.run1, self.run2], ignore_index=True)
+        pd.testing.assert_frame_equal(self._sorted(self.store.read()), expected)
+        self.assertEqual(len(self.store.read(nrows=2)), 2)
+
+    def test_stats_come_from_the_manifest(self):
+        stats = self.store.stats()
+        self.assertEqual(stats["total"], 5)
+        self.assertEqual(stats["processing_types"], {"AUTOMATED": 3, "MANUAL": 2})
+        self.assertEqual((stats["parents"], stats["children"]), (3, 2))
+        self.assertEqual(stats["segments"], 3)
+
+    def test_delete_run_removes_its_segments_only(self):
+        self.assertEqual(self.store.delete_run(1), 3)
+        self.assertEqual(self.store.delete_run(1), 0)
+
+        self.assertEqual(sorted(self.store.read()["MESSAGE_ID"]), [4, 5])
+        self.assertFalse(os.path.exists(os.path.join(self.store.root_dir, "RUN_ID=1")))
+        self.assertEqual(self.store.stats()["total"], 2)
+
+    def test_dedup_latest_keeps_newest_row(self):
+        self.store.append(_rows(3, [2], ["2.0_Mezz"], px=99.0))
+
+        df = self.store.read(dedup_latest=True)
+        self.assertEqual(sorted(df["MESSAGE_ID"]), [1, 2, 3, 4, 5])
+        self.assertEqual(df.loc[df["MESSAGE_ID"] == 2, "PX"].tolist(), [99.0])
+        self.assertEqual(len(self.store.read()), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import sys
+import os
+import tempfile
+import unittest
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from services.log_store import SegmentedLog, _LocalLogFiles
+
+
+class SegmentedLogTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = _LocalLogFiles(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _log(self, max_entries=0, legacy=None):
+        return SegmentedLog("test", self.files, max_entries=max_entries, legacy=legacy, segment_entries=3)
+
+    def _segment_files(self):
+        return sorted(name for name in os.listdir(self.tmp.name) if name.startswith("seg-"))
+
+    def test_append_assigns_ids_newest_first(self):
+        log = self._log()
+        for i in range(7):
+            log.append({"msg": i})
+
+        self.assertEqual([e["id"] for e in log.entries()], [7, 6, 5, 4, 3, 2, 1])
+        self.assertEqual([e["msg"] for e in log.latest(2)], [6, 5])
+        self.assertEqual(log.next_id(), 8)
+        self.assertEqual(self._segment_files(), ["seg-000001.jsonl", "seg-000002.jsonl"])
+        # A fresh instance reads the same files
+        self.assertEqual(self._log().entries(), log.entries())
+
+    def test_retention_drops_whole_segments(self):
+        log = self._log(max_entries=4)
+        for i in range(10):
+            log.append({"msg": i})
+
+        self.assertEqual([e["id"] for e in log.entries()], [10, 9, 8, 7])
+        self.assertEqual(self._segment_files(), ["seg-000002.jsonl", "seg-000003.jsonl"])
+        self.assertEqual(log.next_id(), 11)
+
+    def test_update_rewrites_matching_entry(self):
+        log = self._log()
+        for i in range(5):
+            log.append({"msg": i})
+
+        updated = log.update(lambda e: e["id"] == 2, {"reverted_at": "2026-01-01"})
+        self.assertEqual(updated["msg"], 1)
+        self.assertEqual(self._log().find(lambda e: e["id"] == 2)["reverted_at"], "2026-01-01")
+        self.assertIsNone(log.update(lambda e: e["id"] == 99, {"x": 1}))
+
+    def test_compact_removes_entries_and_empty_segments(self):
+        log = self._log()
+        for i in range(7):
+            log.append({"msg": i})
+
+        removed = log.compact(lambda e: e["id"] > 3)
+        self.assertEqual(removed, 3)
+        self.assertEqual([e["id"] for e in log.entries()], [7, 6, 5, 4])
+        self.assertEqual(self._segment_files(), ["seg-000002.jsonl"])
+        self.assertEqual(log.append({"msg": "next"})["id"], 8)
+
+    def test_legacy_document_is_imported(self):
+        legacy = {"logs": [{"id": 5, "msg": "e"}, {"id": 4, "msg": "d"}, {"id": 3, "msg": "c"},
+                           {"id": 2, "msg": "b"}], "next_id": 6}
+        log = self._log(legacy=lambda: legacy)
+
+        self.assertEqual([e["id"] for e in log.entries()], [5, 4, 3, 2])
+        self.assertEqual(log.append({"msg": "f"})["id"], 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
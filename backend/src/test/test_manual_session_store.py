@@ -0,0 +1,103 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from services import manual_session_store
+from services.manual_session_store import ManualColorSession
+
+
+def _rows(row_ids):
+    return [{"row_id": r, "CUSIP": f"C{r}", "PX": float(r)} for r in row_ids]
+
+
+class ManualColorSessionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patch = mock.patch.object(manual_session_store, "MANUAL_SESSION_DIR", self.tmp.name)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmp.cleanup()
+
+    def _new_session(self, row_ids):
+        session = ManualColorSession("s1")
+        session.update(sorted_data=_rows(row_ids), status="sorted")
+        return session
+
+    def _visible(self, session):
+        return [row["row_id"] for row in session.filtered_records()]
+
+    def test_legacy_session_converts_on_first_edit(self):
+        legacy = {
+            "session_id": "s1",
+            "status": "rules_applied",
+            "applied_rules": [7],
+            "deleted_rows": [4, 2],
+            "raw_data": _rows([1, 2, 3, 4, 5]),
+            "sorted_data": _rows([1, 2, 3, 4, 5]),
+            "filtered_data": _rows([1, 5]),
+        }
+        with open(os.path.join(self.tmp.name, "s1.json"), "w") as f:
+            json.dump(legacy, f)
+
+        session = ManualColorSession("s1")
+        self.assertEqual(self._visible(session), [1, 5])
+        self.assertEqual(session.delete([5]), 1)
+
+        with open(os.path.join(self.tmp.name, "s1.json")) as f:
+            metadata = json.load(f)
+        self.assertFalse(set(manual_session_store.ROW_KEYS) & set(metadata))
+
+        reloaded = ManualColorSession("s1")
+        self.assertEqual(self._visible(reloaded), [1])
+        self.assertEqual(reloaded.deleted_rows, [4, 2, 5])
+        self.assertEqual(reloaded.data["applied_rules"], [7])
+        self.assertEqual([row["row_id"] for row in reloaded.raw_records()], [1, 2, 3, 4, 5])
+
+    def test_delete_and_exclude_survive_reload(self):
+        session = self._new_session([1, 2, 3, 4])
+        session.delete([2])
+        session.exclude([3], [9])
+
+        reloaded = ManualColorSession("s1")
+        self.assertEqual(self._visible(reloaded), [1, 4])
+        self.assertEqual(reloaded.deleted_rows, [2])
+        self.assertEqual(reloaded.data["applied_rules"], [9])
+        self.assertEqual(reloaded.data["rows_count"], 2)
+
+    def test_filtered_data_is_recorded_as_exclusion(self):
+        session = self._new_session([1, 2, 3])
+        session.update(filtered_data=_rows([1, 3]))
+
+        reloaded = ManualColorSession("s1")
+        self.assertEqual(self._visible(reloaded), [1, 3])
+        self.assertEqual(reloaded.deleted_rows, [])
+
+    def test_new_sorted_data_resets_edits(self):
+        session = self._new_session([1, 2, 3])
+        session.delete([1])
+        session.exclude([2], [4])
+        session.update(sorted_data=_rows([10, 11]))
+
+        self.assertFalse(os.path.exists(session.edits_file))
+        reloaded = ManualColorSession("s1")
+        self.assertEqual(self._visible(reloaded), [10, 11])
+        self.assertEqual(reloaded.deleted_rows, [])
+
+    def test_empty_base(self):
+        session = self._new_session([])
+        self.assertEqual(session.delete([1]), 0)
+
+        reloaded = ManualColorSession("s1")
+        self.assertEqual(reloaded.filtered_records(), [])
+        self.assertEqual(reloaded.rows_count, 0)
+        self.assertEqual(len(reloaded.filtered_frame()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import sys
+import os
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+import pandas as pd
+import pyarrow as pa
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from data_source_interface import PartialFetchError
+from services.oracle_data_source import OracleDataSource
+
+
+class FetchClosTestCase(unittest.TestCase):
+    def setUp(self):
+        self.source = OracleDataSource()
+        self.failing = set()
+
+        def fetch(clo_id, watermark=None):
+            if clo_id in self.failing:
+                raise ConnectionError(f"ORA-12170 for {clo_id}")
+            return pd.DataFrame({"MESSAGE_ID": [int(clo_id[-1]) * 10, int(clo_id[-1]) * 10 + 1]})
+
+        self.patches = [
+            mock.patch.object(self.source, "_saved_query", return_value="SELECT 1 FROM DUAL"),
+            mock.patch.object(self.source, "_fetch_credentials", return_value={}),
+            mock.patch.object(self.source, "_fetch", side_effect=fetch),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def test_merges_every_clo(self):
+        df = self.source.fetch_clos(["CLO1", "CLO2"], max_workers=2)
+        self.assertEqual(sorted(df["MESSAGE_ID"]), [10, 11, 20, 21])
+        self.assertEqual(set(df["CLO_ID"]), {"CLO1", "CLO2"})
+
+    def test_failed_clos_are_reported(self):
+        self.failing = {"CLO2"}
+        with self.assertRaises(PartialFetchError) as ctx:
+            self.source.fetch_clos(["CLO1", "CLO2", "CLO3"], max_workers=3)
+
+        self.assertEqual(list(ctx.exception.failed), ["CLO2"])
+        self.assertEqual(set(ctx.exception.frame["CLO_ID"]), {"CLO1", "CLO3"})
+
+    def test_every_clo_failing_raises(self):
+        self.failing = {"CLO1", "CLO2"}
+        with self.assertRaises(ConnectionError) as ctx:
+            self.source.fetch_clos(["CLO1", "CLO2"])
+        self.assertNotIsInstance(ctx.exception, PartialFetchError)
+
+
+class IterBatchesFetchModeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.source = OracleDataSource()
+        self.connection = object()
+
+        @contextmanager
+        def acquire():
+            yield self.connection
+
+        self.read_sql = mock.Mock(return_value=pd.DataFrame({"MESSAGE_ID": [1, 2, 3]}))
+        self.arrow_batches = mock.Mock(return_value=iter([
+            pa.table({"MESSAGE_ID": [1, 2]}),
+            pa.table({"MESSAGE_ID": [3]}),
+        ]))
+        self.patches = [
+            mock.patch.object(self.source, "_check_driver_available"),
+            mock.patch.object(self.source, "acquire_connection", side_effect=acquire),
+            mock.patch.object(self.source, "_query_with_params", return_value=("SELECT 1 FROM DUAL", None)),
+            mock.patch.object(self.source, "_read_sql", self.read_sql),
+            mock.patch.object(self.source, "_arrow_batches", self.arrow_batches),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def test_arrow_mode_streams_batches(self):
+        with mock.patch.dict(os.environ, {"ORACLE_FETCH_MODE": "arrow"}):
+            frames = list(self.source.iter_batches())
+
+        self.assertEqual([len(frame) for frame in frames], [2, 1])
+        self.read_sql.assert_not_called()
+
+    def test_read_sql_mode_is_honoured(self):
+        with mock.patch.dict(os.environ, {"ORACLE_FETCH_MODE": "read_sql"}):
+            frames = list(self.source.iter_batches())
+
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(list(frames[0]["MESSAGE_ID"]), [1, 2, 3])
+        self.read_sql.assert_called_once_with(self.connection, "SELECT 1 FROM DUAL", None)
+        self.arrow_batches.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+import os
+import unittest
+from unittest import mock
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from services.oracle_pool import OraclePoolManager
+
+DSN = "db-host:1521/COLORS"
+
+
+class _Connection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def close(self):
+        self.pool.busy -= 1
+
+
+class _Pool:
+    """Mimics oracledb: close() fails while sessions are busy, acquire() fails once closed."""
+
+    def __init__(self, on_acquire=None):
+        self.busy = 0
+        self.closed = False
+        self.on_acquire = on_acquire
+
+    def acquire(self):
+        if self.on_acquire:
+            self.on_acquire()
+        if self.closed:
+            raise RuntimeError("pool is closed")
+        self.busy += 1
+        return _Connection(self)
+
+    def close(self):
+        if self.busy:
+            raise RuntimeError("pool has busy connections")
+        self.closed = True
+
+
+class PoolManagerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.manager = OraclePoolManager()
+        self.pools = []
+        self.patch = mock.patch.object(self.manager, "_create_pool", side_effect=self._create)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+
+    def _create(self, dsn, username, password):
+        self.pools.append(_Pool())
+        return self.pools[-1]
+
+    def test_same_credentials_reuse_the_pool(self):
+        for _ in range(3):
+            self.manager.release(*self.manager.acquire(DSN, "app", "pw1"))
+        self.assertEqual(len(self.pools), 1)
+        self.assertEqual(self.manager.stats()["pools"][0]["borrowed"], 0)
+
+    def test_retired_pool_closes_after_last_release(self):
+        old_pool, connection = self.manager.acquire(DSN, "app", "pw1")
+        self.manager.release(*self.manager.acquire(DSN, "app", "pw2"))
+
+        self.assertFalse(old_pool.closed)
+        self.manager.release(old_pool, connection)
+        self.assertTrue(old_pool.closed)
+        self.assertEqual(self.manager.rebuilds, 1)
+
+    def test_rotation_during_acquire_does_not_close_the_pool(self):
+        pool, connection = self.manager.acquire(DSN, "app", "pw1")
+        self.manager.release(pool, connection)
+
+        def rotate():
+            # Another thread rotates credentials while this acquire is waiting
+            pool.on_acquire = None
+            self.manager.release(*self.manager.acquire(DSN, "app", "pw2"))
+
+        pool.on_acquire = rotate
+        same_pool, connection = self.manager.acquire(DSN, "app", "pw1")
+        self.assertIs(same_pool, pool)
+        self.assertFalse(pool.closed)
+        self.manager.release(pool, connection)
+        self.assertTrue(pool.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from services.output_index import OutputIndex
+from services.output_service import OutputService
+from services.processed_data_reader import OutputReadError
+
+
+def _frame(cusips, message_ids):
+    return pd.DataFrame({
+        "CUSIP": cusips,
+        "TICKER": [f"T{i}" for i in range(len(cusips))],
+        "MESSAGE_ID": message_ids,
+    })
+
+
+class OutputIndexExtendTestCase(unittest.TestCase):
+    def test_extended_matches_full_build(self):
+        first = _frame(["aaa111", "BBB222", "aaa111"], [1, 2, 3])
+        appended = _frame(["AAA111 ", "ccc333"], [4, 2])
+        index = OutputIndex.build(first).extended(appended)
+        full = OutputIndex.build(pd.concat([first, appended], ignore_index=True))
+
+        self.assertEqual(index.size, full.size)
+        for cusip in ("aaa111", "BBB222", "ccc333", "zzz"):
+            np.testing.assert_array_equal(index.lookup_text("CUSIP", [cusip]), full.lookup_text("CUSIP", [cusip]))
+        np.testing.assert_array_equal(index.lookup_message_ids([2]), [1, 4])
+        np.testing.assert_array_equal(index.lookup_text("TICKER", ["t1"]), [1, 4])
+
+    def test_extended_leaves_original_untouched(self):
+        original = OutputIndex.build(_frame(["aaa111"], [1]))
+        original.extended(_frame(["aaa111", "bbb222"], [2, 3]))
+
+        self.assertEqual(original.size, 1)
+        np.testing.assert_array_equal(original.lookup_text("CUSIP", ["aaa111"]), [0])
+        self.assertEqual(len(original.lookup_text("CUSIP", ["bbb222"])), 0)
+
+
+class IndexedOutputReadFailureTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with mock.patch.dict(os.environ, {"OUTPUT_DESTINATION": "local", "OUTPUT_LOCAL_FORMAT": "xlsx"}):
+            self.service = OutputService(os.path.join(self.tmp.name, "Processed_Colors_Output.xlsx"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_failed_read_is_not_cached(self):
+        reader = mock.Mock()
+        reader.read_processed_data.side_effect = OutputReadError("disk error")
+        with mock.patch("services.processed_data_reader.get_processed_data_reader", return_value=reader):
+            with self.assertRaises(OutputReadError):
+                self.service.indexed_output()
+        self.assertIsNone(self.service._cached_df)
+
+        reader.read_processed_data.side_effect = None
+        reader.read_processed_data.return_value = _frame(["aaa111"], [1])
+        with mock.patch("services.processed_data_reader.get_processed_data_reader", return_value=reader):
+            df, index = self.service.indexed_output()
+        self.assertEqual(len(df), 1)
+        self.assertIs(self.service._cached_df, df)
+        reader.read_processed_data.assert_called_with(strict=True)
+
+
+class DeleteRunCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _service_with_cache(self, preserve_history):
+        env = {
+            "OUTPUT_DESTINATION": "local",
+            "OUTPUT_LOCAL_FORMAT": "parquet",
+            "OUTPUT_PRESERVE_HISTORY": "true" if preserve_history else "false",
+        }
+        with mock.patch.dict(os.environ, env):
+            service = OutputService(os.path.join(self.tmp.name, "Processed_Colors_Output.xlsx"))
+        cached = _frame(["aaa111", "bbb222"], [1, 2]).assign(RUN_ID=[1, 2])
+        service._cached_df = cached
+        service._cached_index = OutputIndex.build(cached)
+        return service
+
+    def test_delete_with_history_drops_the_runs_rows(self):
+        service = self._service_with_cache(preserve_history=True)
+        service._maintain_cache("delete_run_output", run_id=2)
+
+        self.assertEqual(list(service._cached_df["MESSAGE_ID"]), [1])
+        self.assertEqual(service._cached_index.size, 1)
+
+    def test_delete_with_dedup_reloads(self):
+        # Run 2 may have superseded older rows that reads must now bring back
+        service = self._service_with_cache(preserve_history=False)
+        service._maintain_cache("delete_run_output", run_id=2)
+
+        self.assertIsNone(service._cached_df)
+        self.assertIsNone(service._cached_index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import sys
+import os
+import random
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from main.handler import app
+from routers import dashboard
+from services.output_index import OutputIndex
+from services.output_query_engine import OutputQueryEngine, paginate
+from services.query_cache import QueryResultCache
+
+PREFIX = os.environ.get('BASE_PATH', "")
+SORT = (("DATE", False), ("PROCESSED_AT", False))
+
+
+def _output_frame(n, seed=3):
+    rng = random.Random(seed)
+    base = datetime(2026, 5, 1)
+    dates = [base + timedelta(days=rng.randint(0, 5)) for _ in range(n)]
+    processed = [base + timedelta(hours=rng.randint(0, 3)) for _ in range(n)]
+    for i in rng.sample(range(n), 5):
+        dates[i] = None
+    return pd.DataFrame({
+        "RUN_ID": [rng.randint(1, 4) for _ in range(n)],
+        "PROCESSED_AT": processed,
+        "PROCESSING_TYPE": [rng.choice(["AUTOMATED", "MANUAL"]) for _ in range(n)],
+        "MESSAGE_ID": list(range(10_000, 10_000 + n)),
+        "TICKER": [f"TICK {i % 7}" for i in range(n)],
+        "SECTOR": [rng.choice(["MM-CLO", "2.0_Mezz"]) for _ in range(n)],
+        "CUSIP": [f"CUSIP{i % 11:04d}" for i in range(n)],
+        "DATE": dates,
+        "PX": [rng.choice([99.5, 101.0]) for _ in range(n)],
+        "RANK": [rng.randint(1, 3) for _ in range(n)],
+    })
+
+
+def _full_order(frame, mask=None):
+    """Reference order: stable sort on DATE desc, PROCESSED_AT desc, missing last."""
+    selected = frame if mask is None else frame[mask]
+    ordered = selected.sort_values(["DATE", "PROCESSED_AT"], ascending=False, kind="mergesort", na_position="last")
+    return ordered["MESSAGE_ID"].tolist()
+
+
+class PagingMatchesFullSortTestCase(unittest.TestCase):
+    def setUp(self):
+        self.frame = _output_frame(400)
+        self.engine = OutputQueryEngine(self.frame)
+        self.mask = np.ones(len(self.frame), dtype=bool)
+
+    def _ids(self, positions):
+        return self.frame["MESSAGE_ID"].to_numpy()[positions].tolist()
+
+    def test_top_k_pages_match_full_sort(self):
+        expected = _full_order(self.frame)
+        for skip, limit in ((0, 10), (10, 25), (380, 50)):
+            positions, _, _ = paginate(self.engine, self.mask, SORT, limit, skip=skip)
+            self.assertEqual(self._ids(positions), expected[skip:skip + limit])
+
+    def test_cursor_pages_match_full_sort(self):
+        pages = []
+        positions, _, cursor = paginate(self.engine, self.mask, SORT, 30, scope="s")
+        pages.extend(self._ids(positions))
+        while cursor:
+            positions, _, cursor = paginate(self.engine, self.mask, SORT, 30, cursor=cursor, scope="s")
+            pages.extend(self._ids(positions))
+        self.assertEqual(pages, _full_order(self.frame))
+
+
+class DashboardColorsRouterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.frame = _output_frame(300, seed=5)
+        engine_pair = (OutputQueryEngine(self.frame), OutputIndex.build(self.frame))
+        self.patches = [
+            mock.patch.object(dashboard.output_service, "query_engine", return_value=engine_pair),
+            mock.patch.object(dashboard, "query_cache", QueryResultCache(max_entries=0)),
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def _get(self, **params):
+        response = self.client.get(PREFIX + "/api/dashboard/colors", params=params)
+        self.assertEqual(response.status_code, 200, response.text)
+        return response.json()
+
+    def test_skip_limit_pages_match_full_sort(self):
+        expected = _full_order(self.frame)
+        body = self._get(skip=40, limit=20)
+        self.assertEqual(body["total_count"], len(self.frame))
+        self.assertEqual([c["message_id"] for c in body["colors"]], expected[40:60])
+
+    def test_filtered_cursor_pages_match_full_sort(self):
+        mask = ((self.frame["SECTOR"] == "MM-CLO") & (self.frame["PROCESSING_TYPE"] == "MANUAL")
+                & (self.frame["DATE"] >= "2026-05-02"))
+        params = {"limit": 15, "asset_class": "MM-CLO", "processing_type": "MANUAL", "date_from": "2026-05-02"}
+        seen = []
+        body = self._get(**params)
+        while True:
+            self.assertEqual(body["total_count"], int(mask.sum()))
+            seen.extend(c["message_id"] for c in body["colors"])
+            if not body.get("next_cursor"):
+                break
+            body = self._get(cursor=body["next_cursor"], **params)
+        self.assertEqual(seen, _full_order(self.frame, mask))
+
+
+if __name__ == '__main__':
+    unittest.main()
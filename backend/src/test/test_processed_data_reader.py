@@ -0,0 +1,78 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from services.local_segment_store import LocalSegmentStore, segments_root_for
+from services.processed_data_reader import OutputReadError, ProcessedDataReader
+
+
+def _output(run_id, sector, processing_type, dates):
+    return pd.DataFrame({
+        "RUN_ID": [run_id] * len(dates),
+        "PROCESSING_TYPE": [processing_type] * len(dates),
+        "MESSAGE_ID": [run_id * 100 + i for i in range(len(dates))],
+        "CUSIP": [f"C{run_id}{i}" for i in range(len(dates))],
+        "SECTOR": [sector] * len(dates),
+        "DATE": pd.to_datetime(dates),
+        "PX": [100.0 + i for i in range(len(dates))],
+    })
+
+
+class ReaderPushdownTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        env = {
+            "OUTPUT_DESTINATION": "local",
+            "OUTPUT_LOCAL_FORMAT": "parquet",
+            "OUTPUT_DIR": self.tmp.name,
+            "OUTPUT_PRESERVE_HISTORY": "true",
+        }
+        with mock.patch.dict(os.environ, env):
+            self.reader = ProcessedDataReader()
+        self.store = store = LocalSegmentStore(segments_root_for(self.reader.local_file_path))
+        store.append(_output(1, "MM-CLO", "AUTOMATED", ["2026-01-05", "2026-02-10"]))
+        store.append(_output(2, "2.0_Mezz", "MANUAL", ["2026-01-20", "2026-03-01"]))
+        store.append(_output(3, "MM-CLO", "MANUAL", ["2026-02-15"]))
+        self.full = self.reader.read_processed_data()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _expected(self, mask, columns=None):
+        expected = self.full[mask]
+        if columns:
+            expected = expected[columns]
+        return expected.sort_values("MESSAGE_ID" if not columns else columns[0]).reset_index(drop=True)
+
+    def test_filters_match_pandas_filtering(self):
+        df = self.reader.read_processed_data(
+            sectors=["MM-CLO"], processing_type="MANUAL", date_from="2026-02-01", date_to="2026-02-28",
+        )
+        mask = ((self.full["SECTOR"] == "MM-CLO") & (self.full["PROCESSING_TYPE"] == "MANUAL")
+                & (self.full["DATE"] >= "2026-02-01") & (self.full["DATE"] <= "2026-02-28"))
+        pd.testing.assert_frame_equal(df.sort_values("MESSAGE_ID").reset_index(drop=True), self._expected(mask))
+
+    def test_run_filter_and_columns(self):
+        df = self.reader.read_processed_data(run_ids=[1, 3], columns=["MESSAGE_ID", "PX"])
+        self.assertEqual(list(df.columns), ["MESSAGE_ID", "PX"])
+        pd.testing.assert_frame_equal(
+            df.sort_values("MESSAGE_ID").reset_index(drop=True),
+            self._expected(self.full["RUN_ID"].isin([1, 3]), ["MESSAGE_ID", "PX"]),
+        )
+
+    def test_strict_read_raises_on_unreadable_segment(self):
+        seg = self.store.list_segments()[-1]
+        with open(os.path.join(self.store.root_dir, seg["path"]), "wb") as f:
+            f.write(b"not parquet")
+
+        self.assertEqual(len(self.reader.read_processed_data()), len(self.full) - 1)
+        with self.assertRaises(OutputReadError):
+            self.reader.read_processed_data(strict=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
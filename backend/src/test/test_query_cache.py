@@ -0,0 +1,33 @@
+import sys
+import os
+import unittest
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from services.processed_data_reader import OutputReadError
+from services.query_cache import QueryResultCache
+
+
+class QueryResultCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = QueryResultCache(max_entries=8, max_rows=100)
+
+    def test_result_is_cached(self):
+        calls = []
+        compute = lambda: calls.append(1) or []
+        self.assertEqual(self.cache.cached("test.ns", {"q": 1}, compute, rows=len), [])
+        self.assertEqual(self.cache.cached("test.ns", {"q": 1}, compute, rows=len), [])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_failed_read_is_not_cached(self):
+        def failing():
+            raise OutputReadError("output unavailable")
+
+        with self.assertRaises(OutputReadError):
+            self.cache.cached("test.ns", {"q": 2}, failing)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+        self.assertEqual(self.cache.cached("test.ns", {"q": 2}, lambda: ["row"], rows=len), ["row"])
+
+
+if __name__ == '__main__':
+    unittest.main()
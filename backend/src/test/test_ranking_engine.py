@@ -0,0 +1,72 @@
+import sys
+import os
+import random
+import unittest
+from datetime import datetime, timedelta
+import pandas as pd
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from models.color import ColorRaw
+from services.ranking_engine import RankingEngine
+
+
+def _make_colors(n, seed=7):
+    rng = random.Random(seed)
+    base = datetime(2026, 1, 5)
+    cusips = ["97988RBL5", " 97988rbl5", "12345ABC1", "55555XYZ9 ", "00000AAA0"]
+    colors = []
+    for i in range(n):
+        colors.append(ColorRaw(
+            message_id=17679633591029712 + i,
+            ticker=f"TICK {i}",
+            sector=rng.choice(["MM-CLO", "2.0_Mezz"]),
+            cusip=rng.choice(cusips),
+            date=base + timedelta(days=rng.randint(0, 2)),
+            price_level=100.0,
+            bid=100.0,
+            ask=101.0,
+            px=rng.choice([0.0, 99.5, 101.7, 101.7, 102.25]),
+            source="SMBC",
+            bias="BID",
+            rank=rng.randint(1, 3),
+            cov_price=102.2,
+            percent_diff=0.49,
+            price_diff=-0.5,
+            confidence=9,
+            date_1=base,
+            diff_status="Small Difference",
+        ))
+    return colors
+
+
+class RankingEngineParityTestCase(unittest.TestCase):
+    def setUp(self):
+        self.engine = RankingEngine()
+
+    def test_frame_matches_object_path(self):
+        colors = _make_colors(300)
+        expected = [
+            (c.message_id, c.is_parent, c.parent_message_id, c.children_count)
+            for c in self.engine.run_colors(colors)
+        ]
+        df = pd.DataFrame([{k.upper(): v for k, v in c.model_dump().items()} for c in colors])
+        out = self.engine.run_colors_frame(df)
+        actual = list(zip(
+            out["MESSAGE_ID"].tolist(),
+            out["IS_PARENT"].tolist(),
+            out["PARENT_MESSAGE_ID"].tolist(),
+            out["CHILDREN_COUNT"].tolist(),
+        ))
+        self.assertEqual(actual, expected)
+
+    def test_single_color_is_parent(self):
+        colors = _make_colors(1)
+        df = pd.DataFrame([{k.upper(): v for k, v in c.model_dump().items()} for c in colors])
+        out = self.engine.run_colors_frame(df)
+        self.assertTrue(bool(out["IS_PARENT"].iloc[0]))
+        self.assertIsNone(out["PARENT_MESSAGE_ID"].iloc[0])
+        self.assertEqual(int(out["CHILDREN_COUNT"].iloc[0]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import sys
+import os
+import io
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from test.fake_s3 import FakeS3Client
+from services.s3_destination import S3Destination, is_delta_key
+from services.s3_object_cache import S3ObjectCache
+
+BUCKET = "colors-bucket"
+
+
+def _rows(run_id, message_ids):
+    return pd.DataFrame({
+        "RUN_ID": [run_id] * len(message_ids),
+        "MESSAGE_ID": message_ids,
+        "CUSIP": [f"C{m}" for m in message_ids],
+        "SECTOR": ["MM-CLO"] * len(message_ids),
+    })
+
+
+class CompactSectorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        env = {"S3_BUCKET_NAME": BUCKET, "S3_PREFIX": "pc/", "S3_FILE_FORMAT": "parquet"}
+        with mock.patch.dict(os.environ, env):
+            self.dest = S3Destination()
+        self.client = FakeS3Client()
+        self.dest._s3_client = self.client
+        self.cache = mock.patch(
+            "services.s3_destination.get_s3_object_cache",
+            return_value=S3ObjectCache(self.tmp.name, 0),
+        )
+        self.cache.start()
+        self.dest.save_output(_rows(1, [1, 2]), "MM-CLO/Processed_Colors_MM-CLO")
+        self.dest.save_delta(_rows(2, [3]), "MM-CLO", run_id=2)
+        self.dest.save_delta(_rows(3, [4, 5]), "MM-CLO", run_id=3)
+
+    def tearDown(self):
+        self.cache.stop()
+        self.tmp.cleanup()
+
+    def _base(self):
+        body = self.client.objects[(BUCKET, "pc/MM-CLO/Processed_Colors_MM-CLO.parquet")]["Body"]
+        return pd.read_parquet(io.BytesIO(body))
+
+    def test_compaction_merges_and_removes_deltas(self):
+        result = self.dest.compact_sector("MM-CLO", min_age_seconds=0)
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["deltas_merged"], 2)
+        self.assertEqual(sorted(self._base()["MESSAGE_ID"]), [1, 2, 3, 4, 5])
+        self.assertFalse([key for _, key in self.client.objects if is_delta_key(key)])
+
+    def test_compaction_yields_to_concurrent_delete(self):
+        delta_keys = self.dest.list_delta_keys("MM-CLO")
+
+        def delete_run_meanwhile(key):
+            # Another process removes run 3 after compaction has read the deltas
+            if key == delta_keys[-1]:
+                self.client.on_get = None
+                self.client.delete_object(Bucket=BUCKET, Key=key)
+
+        self.client.on_get = delete_run_meanwhile
+        result = self.dest.compact_sector("MM-CLO", min_age_seconds=0)
+
+        self.assertEqual(result["status"], "conflict")
+        self.assertEqual(sorted(self._base()["MESSAGE_ID"]), [1, 2])
+        self.assertEqual(self.dest.list_delta_keys("MM-CLO"), delta_keys[:1])
+
+    def _assert_nothing_committed(self, compact):
+        before = {key: dict(obj) for key, obj in self.client.objects.items()}
+        self.client.calls.clear()
+
+        result = compact()
+
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["deltas_merged"], 0)
+        for call in ("put_object", "upload_fileobj", "delete_object", "delete_objects"):
+            self.assertNotIn(call, self.client.calls)
+        self.assertEqual(self.client.objects, before)
+
+    def test_corrupt_base_is_not_overwritten(self):
+        self.client.put_object(Bucket=BUCKET, Key="pc/MM-CLO/Processed_Colors_MM-CLO.parquet", Body=b"truncated")
+        self._assert_nothing_committed(lambda: self.dest.compact_sector("MM-CLO", min_age_seconds=0))
+
+    def test_corrupt_delta_is_not_deleted(self):
+        corrupt_key = self.dest.list_delta_keys("MM-CLO")[0]
+        self.client.put_object(Bucket=BUCKET, Key=corrupt_key, Body=b"truncated")
+        self._assert_nothing_committed(lambda: self.dest.compact_sector("MM-CLO", min_age_seconds=0))
+        self.assertEqual(sorted(self._base()["MESSAGE_ID"]), [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
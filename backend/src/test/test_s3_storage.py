@@ -0,0 +1,76 @@
+import sys
+import os
+import unittest
+from unittest import mock
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from test.fake_s3 import FakeS3Client
+from s3_storage import S3Storage
+
+BUCKET = "storage-bucket"
+
+
+class S3StorageCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeS3Client()
+        env = {"S3_STORAGE_CACHE": "true", "S3_STORAGE_CACHE_TTL": "60"}
+        with mock.patch.dict(os.environ, env), \
+                mock.patch.object(S3Storage, "_build_client", return_value=self.client):
+            self.storage = S3Storage(bucket_name=BUCKET)
+
+    def _expire(self, key):
+        self.storage._cache[self.storage._object_key(key)]["checked_at"] -= 3600
+
+    def test_save_writes_through_and_loads_hit_memory(self):
+        self.storage.save("rules", [{"id": 1}])
+        first = self.storage.load("rules")
+        first.append({"id": 2})
+
+        self.assertEqual(self.storage.load("rules"), [{"id": 1}])
+        self.assertNotIn("get_object", self.client.calls)
+        self.assertEqual(self.storage.cache_stats()["hits"], 2)
+
+    def test_expired_entry_is_revalidated_with_304(self):
+        self.storage.save("presets", {"a": 1})
+        self._expire("presets")
+
+        self.assertEqual(self.storage.load("presets"), {"a": 1})
+        self.assertEqual(self.client.calls["get_object"], 1)
+        self.assertEqual(self.storage.cache_stats()["revalidated"], 1)
+        # Revalidation renewed the TTL
+        self.storage.load("presets")
+        self.assertEqual(self.client.calls["get_object"], 1)
+
+    def test_expired_entry_picks_up_external_write(self):
+        self.storage.save("presets", {"a": 1})
+        self.client.put_object(Bucket=BUCKET, Key=self.storage._object_key("presets"), Body=b'{"a": 2}')
+        self._expire("presets")
+
+        self.assertEqual(self.storage.load("presets"), {"a": 2})
+
+    def test_slow_load_does_not_overwrite_concurrent_save(self):
+        self.storage.save("cron", {"v": 1})
+        self._expire("cron")
+        self.client.objects[(BUCKET, self.storage._object_key("cron"))]["ETag"] = '"changed"'
+        real_get = self.client.get_object
+
+        def get_then_save(**kwargs):
+            # The old body is already on the wire when another thread saves v2
+            response = real_get(**kwargs)
+            self.storage.save("cron", {"v": 2})
+            return response
+
+        with mock.patch.object(self.client, "get_object", side_effect=get_then_save):
+            self.assertEqual(self.storage.load("cron"), {"v": 1})
+        self.assertEqual(self.storage.load("cron"), {"v": 2})
+
+    def test_delete_drops_entry(self):
+        self.storage.save("email", {"on": True})
+        self.storage.delete("email")
+
+        self.assertIsNone(self.storage.load("email"))
+        self.assertFalse(self.storage.exists("email"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+import pandas as pd
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(2, os.path.abspath(os.path.join(os.path.dirname(__file__), '../main')))
+from data_source_interface import PartialFetchError
+from services.database_service import DatabaseService
+from services.source_state import SourceStateStore
+
+
+def _rows(message_ids, cusips, px):
+    return pd.DataFrame({"MESSAGE_ID": message_ids, "CUSIP": cusips, "PX": px})
+
+
+class SourceStateStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state = SourceStateStore("Oracle", "CLO1", state_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _sorted(self, df):
+        return df.sort_values(["MESSAGE_ID", "CUSIP"]).reset_index(drop=True)
+
+    def test_merge_dedups_on_message_id_and_cusip(self):
+        self.state.replace(_rows([1, 1, 2], ["A", "B", "A"], [10.0, 11.0, 12.0]))
+        merged = self.state.merge(_rows([1, 3], ["B", "C"], [99.0, 13.0]))
+
+        expected = _rows([1, 1, 2, 3], ["A", "B", "A", "C"], [10.0, 99.0, 12.0, 13.0])
+        pd.testing.assert_frame_equal(self._sorted(merged), expected)
+        pd.testing.assert_frame_equal(self._sorted(self.state.load()), expected)
+
+    def test_merge_writes_only_the_delta(self):
+        self.state.replace(_rows([1, 2], ["A", "B"], [1.0, 2.0]))
+        base_mtime = os.stat(self.state.data_path).st_mtime_ns
+        self.state.merge(_rows([3], ["C"], [3.0]))
+        self.state.merge(_rows([4], ["D"], [4.0]))
+
+        self.assertEqual(os.stat(self.state.data_path).st_mtime_ns, base_mtime)
+        self.assertEqual(sorted(os.listdir(self.state.parts_dir)), ["part-000001.parquet", "part-000002.parquet"])
+        self.assertEqual(len(self.state.load()), 4)
+
+    def test_watermark_advances(self):
+        self.assertIsNone(self.state.watermark)
+        self.state.replace(_rows([5, 7], ["A", "B"], [1.0, 2.0]))
+        self.assertEqual(self.state.watermark, 7)
+        self.state.merge(_rows([9, 8], ["C", "D"], [3.0, 4.0]))
+        self.assertEqual(self.state.watermark, 9)
+
+    def test_empty_delta_keeps_state(self):
+        self.state.replace(_rows([1], ["A"], [1.0]))
+        merged = self.state.merge(pd.DataFrame())
+
+        self.assertEqual(list(merged["MESSAGE_ID"]), [1])
+        self.assertEqual(self.state.watermark, 1)
+        self.assertFalse(os.path.exists(self.state.parts_dir))
+        with open(self.state.meta_path) as f:
+            self.assertEqual(json.load(f)["last_fetch_rows"], 0)
+
+    def test_full_refresh_due(self):
+        self.assertTrue(self.state.full_refresh_due())
+        self.state.replace(_rows([1], ["A"], [1.0]))
+        with mock.patch.dict(os.environ, {"SOURCE_FULL_REFRESH_HOURS": "24"}):
+            self.assertFalse(self.state.full_refresh_due())
+            self.state.request_full_refresh()
+            self.assertTrue(self.state.full_refresh_due())
+
+    def test_interval_refresh_due(self):
+        self.state.replace(_rows([1], ["A"], [1.0]))
+        meta = self.state._load_meta()
+        meta["last_full_refresh"] = (datetime.now() - timedelta(hours=25)).isoformat()
+        self.state._save_meta(meta)
+        with mock.patch.dict(os.environ, {"SOURCE_FULL_REFRESH_HOURS": "24"}):
+            self.assertTrue(self.state.full_refresh_due())
+        with mock.patch.dict(os.environ, {"SOURCE_FULL_REFRESH_HOURS": "48"}):
+            self.assertFalse(self.state.full_refresh_due())
+
+    def test_full_refresh_folds_parts_into_base(self):
+        self.state.replace(_rows([1], ["A"], [1.0]))
+        self.state.merge(_rows([2], ["B"], [2.0]))
+        self.state.replace(_rows([1, 2], ["A", "B"], [1.5, 2.5]))
+
+        self.assertFalse(os.path.exists(self.state.parts_dir))
+        self.assertFalse(self.state.full_refresh_due())
+        pd.testing.assert_frame_equal(self._sorted(self.state.load()), _rows([1, 2], ["A", "B"], [1.5, 2.5]))
+
+
+class IncrementalMultiCloLoadTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rows = {
+            "CLO1": _rows([1, 2], ["A", "B"], [1.0, 2.0]),
+            "CLO2": _rows([3], ["C"], [3.0]),
+        }
+        self.failing = set()
+        self.source = mock.Mock()
+        self.source.get_source_info.return_value = {"type": "Oracle"}
+        self.source.multi_clo_ids.return_value = ["CLO1", "CLO2"]
+        self.source.fetch_clos.side_effect = self._fetch_clos
+        env = {"SOURCE_INCREMENTAL": "true", "SOURCE_STATE_DIR": self.tmp.name}
+        self.patches = [
+            mock.patch.dict(os.environ, env),
+            mock.patch("services.database_service.get_data_source", return_value=self.source),
+            mock.patch("services.database_service.get_column_config"),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.tmp.cleanup()
+
+    def _fetch_clos(self, clo_ids, watermarks=None):
+        frames, failed = [], {}
+        for clo_id in clo_ids:
+            if clo_id in self.failing:
+                failed[clo_id] = "ORA-12170"
+                continue
+            df = self.rows[clo_id]
+            watermark = (watermarks or {}).get(clo_id)
+            if watermark is not None:
+                df = df[df["MESSAGE_ID"] > watermark]
+            frames.append(df.assign(CLO_ID=clo_id))
+        merged = pd.concat(frames, ignore_index=True)
+        if failed:
+            raise PartialFetchError(failed, merged)
+        return merged
+
+    def _watermarks(self):
+        return self.source.fetch_clos.call_args.kwargs["watermarks"]
+
+    def test_each_clo_fetches_past_its_own_watermark(self):
+        service = DatabaseService()
+        self.assertEqual(len(service._load_data()), 3)
+        self.assertEqual(self._watermarks(), {})
+        self.assertIsNone(service.last_fetch_delta)
+
+        self.rows["CLO1"] = _rows([1, 2, 4], ["A", "B", "D"], [1.0, 2.0, 4.0])
+        service = DatabaseService()
+        df = service._load_data()
+
+        self.assertEqual(self._watermarks(), {"CLO1": 2, "CLO2": 3})
+        self.assertEqual(sorted(df["MESSAGE_ID"]), [1, 2, 3, 4])
+        self.assertEqual(list(service.last_fetch_delta["MESSAGE_ID"]), [4])
+        self.assertEqual(service.last_failed_clos, {})
+
+    def test_failed_clo_is_reported_and_its_state_kept(self):
+        DatabaseService()._load_data()
+        self.rows["CLO1"] = _rows([1, 2, 4], ["A", "B", "D"], [1.0, 2.0, 4.0])
+        self.rows["CLO2"] = _rows([3, 5], ["C", "E"], [3.0, 5.0])
+        self.failing = {"CLO2"}
+
+        service = DatabaseService()
+        df = service._load_data()
+
+        self.assertEqual(list(service.last_failed_clos), ["CLO2"])
+        self.assertEqual(set(df["CLO_ID"]), {"CLO1"})
+        self.assertEqual(SourceStateStore("Oracle", "CLO2", state_dir=self.tmp.name).watermark, 3)
+        self.assertEqual(SourceStateStore("Oracle", "CLO1", state_dir=self.tmp.name).watermark, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()